@@ -9,6 +9,7 @@ import time
 import json
 import logging
 import os
+from dataclasses import dataclass
 from typing import Dict, Any, Optional
 
 try:
@@ -23,21 +24,39 @@ from src.llm.context_manager import LLMContextManager
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class DecisionResult:
+    """Outcome of one decision cycle with its (estimated) token usage."""
+    output: AgentOutput
+    success: bool
+    latency_ms: float
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
 class AgenticDecisionLoop:
     """
     Core agent decision loop that executes the OODA (Observe-Orient-Decide-Act) cycle
     using optimized prompts and structured outputs.
     """
 
-    def __init__(self, agent_id: str, prompt_engine: Optional[PromptEngine] = None):
+    def __init__(
+        self,
+        agent_id: str,
+        prompt_engine: Optional[PromptEngine] = None,
+        mock_latency_seconds: float = 0.0,
+    ):
         """
         Initialize the decision loop.
 
         Args:
             agent_id: Unique identifier for the agent
             prompt_engine: Optional PromptEngine instance (injected for testing)
+            mock_latency_seconds: Simulated model latency in MOCK mode
         """
         self.agent_id = agent_id
+        self.mock_latency_seconds = mock_latency_seconds
         self.prompt_engine = prompt_engine or PromptEngine()
         self.metrics = PromptMetrics()
         self.context_manager = LLMContextManager()
@@ -71,6 +90,24 @@ class AgenticDecisionLoop:
         Returns:
             Validated AgentOutput object
         """
+        return self.run_with_usage(task, context, complexity, task_type, session_id).output
+
+    def run_with_usage(
+        self,
+        task: str,
+        context: Dict[str, Any],
+        complexity: float = 0.5,
+        task_type: str = "analysis",
+        session_id: Optional[str] = None
+    ) -> DecisionResult:
+        """
+        Execute a single decision cycle (see run()) and report token usage.
+
+        Token counts are estimated with the context manager's token counter.
+
+        Returns:
+            DecisionResult; success is False when the fallback response was used
+        """
         start_time = time.time()
 
         # 1. Build Context Object
@@ -92,7 +129,8 @@ class AgenticDecisionLoop:
         # Context Management Integration
         if session_id:
             if not self.context_manager.has_session(session_id):
-                self.context_manager.create_session(session_id, messages)
+                # Pin the system prompt and few-shot examples; only turns are evicted
+                self.context_manager.create_session(session_id, messages, pinned=len(messages) - 1)
             else:
                 # Append only the new user message (typically the last one)
                 if messages:
@@ -101,12 +139,16 @@ class AgenticDecisionLoop:
                     if last_msg.get('role') == 'user':
                         self.context_manager.add_message(session_id, last_msg['role'], last_msg['content'])
 
-            # Use full context from session
-            messages = self.context_manager.get_context(session_id)
+            # Use session context packed into the token budget
+            messages = self.context_manager.build_context(session_id)
+
+        counter = self.context_manager.token_counter
+        prompt_tokens = sum(counter.count_message(m) for m in messages)
 
         # 3. Execute LLM Call (Phase 6, 11)
         try:
             response_data = self._call_llm(messages)
+            completion_tokens = counter.count_text(json.dumps(response_data))
 
             # Update Context with Assistant Response
             if session_id:
@@ -123,24 +165,30 @@ class AgenticDecisionLoop:
             latency = (time.time() - start_time) * 1000
             self.metrics.record(
                 latency_ms=latency,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
                 success=True
             )
 
-            return agent_output
+            return DecisionResult(agent_output, True, latency, prompt_tokens, completion_tokens)
 
         except Exception as e:
             logger.error(f"Agent decision failed: {e}")
+            latency = (time.time() - start_time) * 1000
             self.metrics.record(
-                latency_ms=(time.time() - start_time) * 1000,
+                latency_ms=latency,
+                prompt_tokens=prompt_tokens,
                 success=False,
                 error_type=type(e).__name__
             )
             # Fail-safe fallback
-            return self._fallback_response(str(e))
+            return DecisionResult(self._fallback_response(str(e)), False, latency, prompt_tokens)
 
     def _call_llm(self, messages: list) -> Dict[str, Any]:
         """Call OpenAI API with JSON mode enforcement."""
         if not self.client:
+            if self.mock_latency_seconds:
+                time.sleep(self.mock_latency_seconds)  # Stand-in for the model round trip
             return self._mock_response(messages)
 
         try:
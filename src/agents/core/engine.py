@@ -3,14 +3,26 @@ Prompt Engine - Modular Prompt Construction & Optimization
 
 Handles template loading, assembly, optimization (compression), and adaptation based on task complexity.
 Implements Phases 2, 4, 5, 7, 8, and 10 of the Prompt Optimization Framework.
+
+Templates are compiled once into segment lists; their placeholders are
+checked against the declared set at load time. The static parts of a
+prompt (tool and reasoning sections, few-shot examples) are cached per
+(version, tool set, reasoning tier), and template files are reloaded when
+their mtime changes.
 """
+import hashlib
 import json
 import logging
+import string
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple, Union
 from dataclasses import dataclass
 
 from src.agents.core.schema import AgentOutput
+from src.llm.tokenizer import TokenCounter, get_token_counter
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +30,15 @@ logger = logging.getLogger(__name__)
 COMPLEXITY_THRESHOLD = 0.7
 MAX_CONTEXT_TOKENS = 2000  # Soft limit for context compression
 
+# Placeholders each template may use
+SYSTEM_PLACEHOLDERS = {
+    "base": frozenset({"task_description"}),
+    "tools": frozenset({"tool_descriptions"}),
+    "reasoning": frozenset({"schema_description"}),
+}
+TASK_PLACEHOLDERS = frozenset({"telemetry_data", "system_state", "directive", "tool_names", "memory_context"})
+
+_CONVERSIONS = {"r": repr, "s": str, "a": ascii}
 @dataclass
 class PromptContext:
     """Context data for prompt rendering."""
@@ -28,48 +49,210 @@ class PromptContext:
     memory_context: Optional[str] = None
     complexity_score: float = 0.5  # 0.0 - 1.0
 
+class CompiledTemplate:
+    """
+    A str.format template parsed once into literal and placeholder segments.
+
+    Rendering joins the segments, producing the same text as
+    ``source.format(**values)``.
+    """
+
+    __slots__ = ("name", "source", "placeholders", "_segments")
+
+    def __init__(self, name: str, source: str, allowed: frozenset):
+        """
+        Args:
+            name: Template name (for error messages)
+            source: Template text
+            allowed: Placeholders the template may use
+
+        Raises:
+            ValueError: On malformed braces or undeclared/unsupported placeholders
+        """
+        self.name = name
+        self.source = source
+        segments: List[Union[str, Tuple[str, Optional[str], str]]] = []
+        placeholders = set()
+
+        try:
+            parsed = list(string.Formatter().parse(source))
+        except ValueError as e:
+            raise ValueError(f"Template '{name}' is malformed: {e}") from e
+
+        for literal, field, spec, conversion in parsed:
+            if literal:
+                if segments and isinstance(segments[-1], str):
+                    segments[-1] += literal
+                else:
+                    segments.append(literal)
+            if field is None:
+                continue
+            if not field.isidentifier() or (spec and "{" in spec):
+                raise ValueError(f"Template '{name}' uses unsupported placeholder '{{{field}}}'")
+            placeholders.add(field)
+            segments.append((field, conversion, spec or ""))
+
+        undeclared = placeholders - allowed
+        if undeclared:
+            raise ValueError(
+                f"Template '{name}' uses undeclared placeholders {sorted(undeclared)}; "
+                f"allowed: {sorted(allowed)}"
+            )
+        self.placeholders = frozenset(placeholders)
+        self._segments = tuple(segments)
+
+    def render(self, **values: Any) -> str:
+        """Fill the placeholders (KeyError if one is missing, like str.format)."""
+        parts = []
+        for segment in self._segments:
+            if isinstance(segment, str):
+                parts.append(segment)
+                continue
+            field, conversion, spec = segment
+            value = values[field]
+            if conversion:
+                value = _CONVERSIONS[conversion](value)
+            parts.append(format(value, spec))
+        return "".join(parts)
+
+
+@dataclass(frozen=True)
+class PromptPrefix:
+    """Static prompt content shared by calls with the same version, tools and tier."""
+    system_suffix: str  # Tool and reasoning sections appended to the base prompt
+    examples: Tuple[Dict[str, str], ...]
+    cache_key: str  # Content hash, usable as an LLM prefix-cache key
+
+
 class PromptEngine:
     """
     Core engine for constructing optimized LLM prompts.
     """
 
-    def __init__(self, template_dir: str = "src/agents/prompts"):
+    def __init__(
+        self,
+        template_dir: str = "src/agents/prompts",
+        token_counter: Optional[TokenCounter] = None,
+        reload_check_interval: Optional[float] = 1.0,
+        prefix_cache_size: int = 128,
+    ):
         """
         Initialize PromptEngine with template directory.
 
         Args:
             template_dir: Path to prompt templates
+            token_counter: Counter used for the context budget (offline heuristic by default)
+            reload_check_interval: Seconds between template mtime checks (None disables hot reload)
+            prefix_cache_size: Number of cached static prompt prefixes
         """
         self.template_dir = Path(template_dir)
+        self.token_counter = token_counter or get_token_counter()
+        self.reload_check_interval = reload_check_interval
+        self.prefix_cache_size = prefix_cache_size
         self.system_templates = {}
         self.task_templates = {}
         self.examples = []
+        self._compiled_system: Dict[str, CompiledTemplate] = {}
+        self._compiled_tasks: Dict[str, CompiledTemplate] = {}
+        self._prefix_cache: "OrderedDict[Tuple[str, Tuple[str, ...], bool], PromptPrefix]" = OrderedDict()
+        self._mtimes: Dict[str, float] = {}
+        self._next_reload_check = 0.0
+        self._lock = threading.RLock()
         self._load_templates()
 
+    def _template_files(self) -> List[Path]:
+        sys_path = self.template_dir / "system"
+        files = [sys_path / "base.txt", sys_path / "tools.txt", sys_path / "reasoning.txt"]
+        task_path = self.template_dir / "tasks"
+        if task_path.exists():
+            files.extend(sorted(task_path.glob("*.txt")))
+        ex_path = self.template_dir / "examples.json"
+        if ex_path.exists():
+            files.append(ex_path)
+        return files
+
+    def _snapshot_mtimes(self) -> Dict[str, float]:
+        return {str(f): f.stat().st_mtime for f in self._template_files()}
+
     def _load_templates(self):
-        """Load templates and examples from disk."""
+        """Load, compile and validate templates and examples from disk."""
         try:
+            mtimes = self._snapshot_mtimes()
+
             # Load System Components
             sys_path = self.template_dir / "system"
-            self.system_templates['base'] = (sys_path / "base.txt").read_text()
-            self.system_templates['tools'] = (sys_path / "tools.txt").read_text()
-            self.system_templates['reasoning'] = (sys_path / "reasoning.txt").read_text()
+            system_templates = {
+                name: (sys_path / f"{name}.txt").read_text() for name in SYSTEM_PLACEHOLDERS
+            }
 
             # Load Task Templates
+            task_templates = {}
             task_path = self.template_dir / "tasks"
             if task_path.exists():
                 for f in task_path.glob("*.txt"):
-                    self.task_templates[f.stem] = f.read_text()
+                    task_templates[f.stem] = f.read_text()
 
             # Load Few-Shot Examples
+            examples = []
             ex_path = self.template_dir / "examples.json"
             if ex_path.exists():
-                self.examples = json.loads(ex_path.read_text())
+                examples = json.loads(ex_path.read_text())
+
+            compiled_system = {
+                name: CompiledTemplate(name, text, SYSTEM_PLACEHOLDERS[name])
+                for name, text in system_templates.items()
+            }
+            compiled_tasks = {
+                name: CompiledTemplate(name, text, TASK_PLACEHOLDERS)
+                for name, text in task_templates.items()
+            }
 
         except Exception as e:
             logger.error(f"Failed to load prompt templates: {e}")
             raise
 
+        self.system_templates = system_templates
+        self.task_templates = task_templates
+        self.examples = examples
+        self._compiled_system = compiled_system
+        self._compiled_tasks = compiled_tasks
+        self._prefix_cache.clear()
+        self._mtimes = mtimes
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reload templates if any file was modified, added or removed.
+
+        A template that fails to load or validate is logged and the
+        previous templates stay in use.
+
+        Returns:
+            True if templates were reloaded
+        """
+        try:
+            mtimes = self._snapshot_mtimes()
+        except OSError:
+            mtimes = {}
+        if mtimes == self._mtimes:
+            return False
+        try:
+            self._load_templates()
+        except Exception:
+            logger.error("Prompt template reload failed; keeping previous templates")
+            self._mtimes = mtimes  # Retry only after the next change
+            return False
+        logger.info(f"Reloaded prompt templates from {self.template_dir}")
+        return True
+
+    def _maybe_reload(self) -> None:
+        if self.reload_check_interval is None:
+            return
+        now = time.monotonic()
+        if now >= self._next_reload_check:
+            with self._lock:
+                self._next_reload_check = now + self.reload_check_interval
+                self.reload_if_changed()
+
     def construct_prompt(
         self,
         task_type: str,
@@ -87,15 +270,15 @@ class PromptEngine:
         Returns:
             List of message dicts (role, content)
         """
-        messages = []
+        self._maybe_reload()
+        prefix = self.get_prefix(context, version)
 
         # 1. System Prompt Construction
-        system_content = self._build_system_prompt(context, version)
-        messages.append({"role": "system", "content": system_content})
+        system_content = self._build_system_prompt(context, version, prefix)
+        messages = [{"role": "system", "content": system_content}]
 
         # 2. Few-Shot Examples (Phase 4)
-        if self.examples:
-            messages.extend(self._build_few_shot_examples())
+        messages.extend(dict(m) for m in prefix.examples)
 
         # 3. Task Prompt (User Message)
         user_content = self._build_task_prompt(task_type, context)
@@ -103,28 +286,64 @@ class PromptEngine:
 
         return messages
 
-    def _build_system_prompt(self, context: PromptContext, version: str) -> str:
+    def get_prefix(self, context: PromptContext, version: str = "v1") -> PromptPrefix:
+        """
+        Static prompt content for this version, tool set and reasoning tier.
+
+        The returned cache_key hashes that content, so it changes whenever a
+        template, the tool set or the output schema changes.
+        """
+        tool_names = tuple(t['name'] for t in (context.tools or []))
+        detailed = context.complexity_score > COMPLEXITY_THRESHOLD
+        key = (version, tool_names, detailed)
+
+        with self._lock:
+            prefix = self._prefix_cache.get(key)
+            if prefix is not None:
+                self._prefix_cache.move_to_end(key)
+                return prefix
+
+        system_suffix = "\n\n".join(self._build_static_sections(tool_names, detailed))
+        examples = tuple(self._build_few_shot_examples()) if self.examples else ()
+        digest = hashlib.sha256()
+        for part in (version, self.system_templates['base'], system_suffix, json.dumps(examples)):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        prefix = PromptPrefix(system_suffix, examples, digest.hexdigest())
+
+        with self._lock:
+            self._prefix_cache[key] = prefix
+            if len(self._prefix_cache) > self.prefix_cache_size:
+                self._prefix_cache.popitem(last=False)
+        return prefix
+
+    def _build_system_prompt(self, context: PromptContext, version: str, prefix: Optional[PromptPrefix] = None) -> str:
         """Combine system templates based on context and version."""
-        # Format base template first to avoid conflicts with JSON braces later
-        parts = [self.system_templates['base'].format(task_description=context.task_description)]
+        prefix = prefix or self.get_prefix(context, version)
+        base = self._compiled_system['base'].render(task_description=context.task_description)
+        return f"{base}\n\n{prefix.system_suffix}"
+
+    def _build_static_sections(self, tool_names: Tuple[str, ...], detailed: bool) -> List[str]:
+        """Tool and reasoning sections of the system prompt."""
+        parts = []
 
         # Tool injection
-        if context.tools:
-            tool_desc = json.dumps([t['name'] for t in context.tools], indent=2)  # Simplified tool list
-            parts.append(self.system_templates['tools'].format(tool_descriptions=tool_desc))
+        if tool_names:
+            tool_desc = json.dumps(list(tool_names), indent=2)  # Simplified tool list
+            parts.append(self._compiled_system['tools'].render(tool_descriptions=tool_desc))
 
         # Adaptive Logic (Phase 10)
         # Only include heavy reasoning instructions if complexity is high
-        if context.complexity_score > COMPLEXITY_THRESHOLD:
+        if detailed:
             schema_desc = AgentOutput.model_json_schema()
-            parts.append(self.system_templates['reasoning'].format(
+            parts.append(self._compiled_system['reasoning'].render(
                 schema_description=json.dumps(schema_desc, indent=2)
             ))
         else:
             # Lightweight instructions for simple tasks
             parts.append("Provide a concise JSON response strictly adhering to the schema.")
 
-        return "\n\n".join(parts)
+        return parts
 
     def _build_few_shot_examples(self) -> List[Dict[str, str]]:
         """Format loaded examples into message history."""
@@ -136,33 +355,36 @@ class PromptEngine:
 
     def _build_task_prompt(self, task_type: str, context: PromptContext) -> str:
         """Render the specific task template."""
-        template = self.task_templates.get(task_type)
+        template = self._compiled_tasks.get(task_type)
         if not template:
             logger.warning(f"Task template '{task_type}' not found, using generic.")
             return f"Execute task: {context.task_description}"
 
-        # Context Compression (Phase 7)
-        compressed_memory = self._compress_context(context.memory_context)
+        # Only compute the values this template uses
+        used = template.placeholders
+        values: Dict[str, Any] = {"directive": context.task_description}
+        if "telemetry_data" in used:
+            values["telemetry_data"] = (
+                json.dumps(context.telemetry_data, indent=2) if context.telemetry_data else "None"
+            )
+        if "system_state" in used:
+            values["system_state"] = context.system_state or "Unknown"
+        if "tool_names" in used:
+            values["tool_names"] = [t['name'] for t in (context.tools or [])]
+        if "memory_context" in used:
+            # Context Compression (Phase 7)
+            values["memory_context"] = self._compress_context(context.memory_context)
 
-        return template.format(
-            telemetry_data=json.dumps(context.telemetry_data, indent=2) if context.telemetry_data else "None",
-            system_state=context.system_state or "Unknown",
-            directive=context.task_description,
-            tool_names=[t['name'] for t in (context.tools or [])],
-            memory_context=compressed_memory
-        )
+        return template.render(**values)
 
     def _compress_context(self, context_str: Optional[str]) -> str:
         """
         Simple context compression strategy (Phase 7).
-        Truncates or summarizes context to fit token budget.
+        Truncates context to fit the token budget.
         """
         if not context_str:
             return ""
 
-        # Simple character-based truncation as a proxy for token limits
-        # In production, use tiktoken here.
-        limit_chars = MAX_CONTEXT_TOKENS * 4
-        if len(context_str) > limit_chars:
-            return context_str[:limit_chars] + "...[TRUNCATED]"
+        if self.token_counter.count_text(context_str) > MAX_CONTEXT_TOKENS:
+            return self.token_counter.truncate(context_str, MAX_CONTEXT_TOKENS) + "...[TRUNCATED]"
         return context_str
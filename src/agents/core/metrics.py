@@ -4,9 +4,10 @@ Prompt Metrics Tracking
 Tracks token usage, latency, and success rates for LLM interactions.
 Designed for observability integration (Prometheus/logging).
 """
+import threading
 import time
 from dataclasses import dataclass, field
-from typing import Dict, Optional, List
+from typing import Any, Dict, Optional, List
 import logging
 
 logger = logging.getLogger(__name__)
@@ -32,6 +33,9 @@ class PromptMetrics:
     latency_history: List[float] = field(default_factory=list)
     token_history: List[int] = field(default_factory=list)
 
+    # record() runs on decision service worker threads
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+
     def record(
         self,
         latency_ms: float,
@@ -50,31 +54,32 @@ class PromptMetrics:
             success: Whether the request was successful
             error_type: Optional error classification string
         """
-        self.total_requests += 1
-
-        # Token tracking
-        self.prompt_tokens += prompt_tokens
-        self.completion_tokens += completion_tokens
-        total = prompt_tokens + completion_tokens
-        self.total_tokens += total
-        self.token_history.append(total)
-
-        # Latency tracking
-        self.total_latency_ms += latency_ms
-        self.latency_history.append(latency_ms)
-
-        # Success/Failure
-        if success:
-            self.success_count += 1
-        else:
-            self.failure_count += 1
-            if error_type:
-                logger.warning(f"Prompt failure recorded: {error_type}")
-
-        # Limit history size to prevent memory leaks (keep last 1000)
-        if len(self.latency_history) > 1000:
-            self.latency_history.pop(0)
-            self.token_history.pop(0)
+        with self._lock:
+            self.total_requests += 1
+
+            # Token tracking
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            total = prompt_tokens + completion_tokens
+            self.total_tokens += total
+            self.token_history.append(total)
+
+            # Latency tracking
+            self.total_latency_ms += latency_ms
+            self.latency_history.append(latency_ms)
+
+            # Success/Failure
+            if success:
+                self.success_count += 1
+            else:
+                self.failure_count += 1
+                if error_type:
+                    logger.warning(f"Prompt failure recorded: {error_type}")
+
+            # Limit history size to prevent memory leaks (keep last 1000)
+            if len(self.latency_history) > 1000:
+                self.latency_history.pop(0)
+                self.token_history.pop(0)
 
     @property
     def avg_latency(self) -> float:
@@ -98,11 +103,93 @@ class PromptMetrics:
         return self.failure_count / self.total_requests
 
     def to_dict(self) -> Dict[str, float]:
+        """Export metrics for logging/monitoring."""
+        with self._lock:
+            return {
+                "total_requests": self.total_requests,
+                "success_rate": 1.0 - self.error_rate,
+                "avg_latency_ms": self.avg_latency,
+                "avg_tokens": self.avg_tokens,
+                "total_tokens": self.total_tokens
+            }
+
+
+@dataclass
+class OutcomeStats:
+    """Latency and cost totals for one cache outcome."""
+    count: int = 0
+    total_latency_ms: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+    saved_cost: float = 0.0  # Model cost avoided by serving from cache / coalescing
+
+    @property
+    def avg_latency(self) -> float:
+        return self.total_latency_ms / self.count if self.count else 0.0
+
+
+@dataclass
+class DecisionServiceMetrics:
+    """
+    Per-outcome metrics for the async decision service.
+
+    Outcomes: hit (served from cache), coalesced (joined an identical
+    in-flight request), miss (model call), bypass (session request, not
+    cacheable), error (model call failed, fallback returned).
+    """
+
+    outcomes: Dict[str, OutcomeStats] = field(default_factory=dict)
+
+    def record(
+        self,
+        outcome: str,
+        latency_ms: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        cost: float = 0.0,
+        saved_cost: float = 0.0,
+    ):
+        """Record one request under its cache outcome."""
+        stats = self.outcomes.get(outcome)
+        if stats is None:
+            stats = self.outcomes[outcome] = OutcomeStats()
+        stats.count += 1
+        stats.total_latency_ms += latency_ms
+        stats.prompt_tokens += prompt_tokens
+        stats.completion_tokens += completion_tokens
+        stats.cost += cost
+        stats.saved_cost += saved_cost
+
+    @property
+    def total_requests(self) -> int:
+        return sum(s.count for s in self.outcomes.values())
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of requests answered without their own model call."""
+        total = self.total_requests
+        if total == 0:
+            return 0.0
+        served = sum(self.outcomes[o].count for o in ("hit", "coalesced") if o in self.outcomes)
+        return served / total
+
+    def to_dict(self) -> Dict[str, Any]:
         """Export metrics for logging/monitoring."""
         return {
             "total_requests": self.total_requests,
-            "success_rate": 1.0 - self.error_rate,
-            "avg_latency_ms": self.avg_latency,
-            "avg_tokens": self.avg_tokens,
-            "total_tokens": self.total_tokens
+            "hit_rate": self.hit_rate,
+            "total_cost": sum(s.cost for s in self.outcomes.values()),
+            "saved_cost": sum(s.saved_cost for s in self.outcomes.values()),
+            "outcomes": {
+                name: {
+                    "count": s.count,
+                    "avg_latency_ms": s.avg_latency,
+                    "prompt_tokens": s.prompt_tokens,
+                    "completion_tokens": s.completion_tokens,
+                    "cost": s.cost,
+                    "saved_cost": s.saved_cost,
+                }
+                for name, s in self.outcomes.items()
+            },
         }
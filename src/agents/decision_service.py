@@ -0,0 +1,337 @@
+"""
+Async Decision Service - Concurrent, Cached Decision Loop
+
+Serves AgenticDecisionLoop decisions to asyncio callers:
+- Decisions run on a bounded thread pool; requests of the same session run
+  one at a time, in submission order.
+- Session-less requests are fingerprinted from a normalized view of their
+  context (satellite ids, timestamps and float noise removed). Fresh
+  decisions for the same fingerprint are served from a TTL cache, and
+  concurrent identical requests share one model call (single flight).
+- Cache entries can be invalidated per system state when it changes.
+- Latency, tokens and cost are tracked per cache outcome.
+
+Session requests are never cached or coalesced: their prompt includes the
+conversation history.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from src.agents.agentic_decision_loop import AgenticDecisionLoop, DecisionResult
+from src.agents.core.engine import COMPLEXITY_THRESHOLD
+from src.agents.core.metrics import DecisionServiceMetrics
+from src.agents.core.schema import AgentOutput
+
+logger = logging.getLogger(__name__)
+
+# Context keys that identify a request rather than describe the situation
+IGNORED_CONTEXT_KEYS = frozenset({
+    "satellite_id", "sat_id", "node_id", "fault_id", "request_id", "timestamp", "ts", "time",
+})
+_ENTITY_ID = re.compile(r"\b(?:sat|satellite|node)[-_ ]?\d+\b", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+class DecisionServiceOverloaded(RuntimeError):
+    """Raised when more requests are pending than the service admits."""
+
+
+def _normalize_text(text: Optional[str]) -> str:
+    if not text:
+        return ""
+    return _WHITESPACE.sub(" ", _ENTITY_ID.sub("<id>", text)).strip().lower()
+
+
+def _normalize_value(value: Any, float_digits: int) -> Any:
+    if isinstance(value, float):
+        return round(value, float_digits)
+    if isinstance(value, dict):
+        return {
+            str(k): _normalize_value(v, float_digits)
+            for k, v in value.items() if k not in IGNORED_CONTEXT_KEYS
+        }
+    if isinstance(value, (list, tuple)):
+        return [_normalize_value(v, float_digits) for v in value]
+    if isinstance(value, str):
+        return _normalize_text(value)
+    return value
+
+
+def normalize_request(
+    task: str,
+    context: Dict[str, Any],
+    complexity: float,
+    task_type: str,
+    float_digits: int = 2,
+) -> Dict[str, Any]:
+    """
+    Normalized view of a decision request: the parts that shape the prompt,
+    minus identifiers and measurement noise.
+    """
+    return {
+        "task_type": task_type,
+        "task": _normalize_text(task),
+        "detailed": complexity > COMPLEXITY_THRESHOLD,
+        "system_state": context.get("system_state"),
+        "tools": sorted(t.get("name", "") for t in (context.get("tools") or [])),
+        "telemetry": _normalize_value(context.get("telemetry"), float_digits),
+        "memory": _normalize_text(context.get("memory")),
+    }
+
+
+@dataclass
+class _CacheEntry:
+    output: AgentOutput
+    expires_at: float
+    system_state: Optional[str]
+    cost: float
+
+
+class AsyncDecisionService:
+    """
+    Concurrent front end for an AgenticDecisionLoop.
+
+    Example:
+        service = AsyncDecisionService(AgenticDecisionLoop("agent-1"))
+        output = await service.decide("Investigate thermal spike", context)
+    """
+
+    def __init__(
+        self,
+        decision_loop: AgenticDecisionLoop,
+        max_workers: int = 8,
+        max_pending: Optional[int] = None,
+        cache_ttl_seconds: float = 30.0,
+        max_cache_entries: int = 1024,
+        normalizer: Optional[Callable[[str, Dict[str, Any], float, str], Dict[str, Any]]] = None,
+        cost_per_1k_prompt_tokens: float = 0.0025,
+        cost_per_1k_completion_tokens: float = 0.01,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            decision_loop: Loop executing the decisions
+            max_workers: Decisions running concurrently
+            max_pending: Requests admitted at once (queued or running); None = unbounded
+            cache_ttl_seconds: How long a decision is reused for identical requests
+            max_cache_entries: Cached decisions kept (least recently used evicted)
+            normalizer: Replaces normalize_request() for fingerprinting
+            cost_per_1k_prompt_tokens: Model price used for cost metrics
+            cost_per_1k_completion_tokens: Model price used for cost metrics
+            clock: Time source for cache expiry
+        """
+        self.decision_loop = decision_loop
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.max_cache_entries = max_cache_entries
+        self.normalizer = normalizer or normalize_request
+        self.cost_per_1k_prompt_tokens = cost_per_1k_prompt_tokens
+        self.cost_per_1k_completion_tokens = cost_per_1k_completion_tokens
+        self._clock = clock
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="decision")
+        self._cache: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Task[DecisionResult]"] = {}
+        self._session_locks: Dict[str, asyncio.Lock] = {}
+        self._session_waiters: Dict[str, int] = {}
+        self._pending = 0
+        self.metrics = DecisionServiceMetrics()
+
+    def fingerprint(
+        self, task: str, context: Dict[str, Any], complexity: float = 0.5, task_type: str = "analysis"
+    ) -> str:
+        """Cache key for a request."""
+        normalized = self.normalizer(task, context, complexity, task_type)
+        encoded = json.dumps(normalized, sort_keys=True, default=str).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _cost(self, result: DecisionResult) -> float:
+        return (
+            result.prompt_tokens * self.cost_per_1k_prompt_tokens
+            + result.completion_tokens * self.cost_per_1k_completion_tokens
+        ) / 1000
+
+    async def decide(
+        self,
+        task: str,
+        context: Dict[str, Any],
+        complexity: float = 0.5,
+        task_type: str = "analysis",
+        session_id: Optional[str] = None,
+    ) -> AgentOutput:
+        """
+        Make a decision (see AgenticDecisionLoop.run).
+
+        Raises:
+            DecisionServiceOverloaded: If max_pending requests are already admitted
+        """
+        start = time.perf_counter()
+        if session_id is not None:
+            # Admitted before queueing on the session lock, so session backlogs are bounded too
+            self._admit()
+            try:
+                result = await self._decide_in_session(task, context, complexity, task_type, session_id)
+            finally:
+                self._pending -= 1
+            self._record("bypass" if result.success else "error", start, result)
+            return result.output
+
+        key = self.fingerprint(task, context, complexity, task_type)
+        entry = self._cache_get(key)
+        if entry is not None:
+            self._record("hit", start, saved_cost=entry.cost)
+            return entry.output.model_copy(deep=True)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            result = await asyncio.shield(inflight)
+            self._record("coalesced", start, saved_cost=self._cost(result))
+            return result.output.model_copy(deep=True)
+
+        self._admit()
+        task_handle = asyncio.ensure_future(self._execute_shared(key, task, context, complexity, task_type))
+        self._inflight[key] = task_handle
+        result = await asyncio.shield(task_handle)
+        self._record("miss" if result.success else "error", start, result)
+        return result.output.model_copy(deep=True)
+
+    async def _execute_shared(
+        self, key: str, task: str, context: Dict[str, Any], complexity: float, task_type: str
+    ) -> DecisionResult:
+        """Run a cacheable request once for all its concurrent callers (admitted by decide)."""
+        try:
+            result = await self._run_in_pool(task, context, complexity, task_type, None)
+            if result.success:
+                self._cache_put(key, _CacheEntry(
+                    result.output,
+                    self._clock() + self.cache_ttl_seconds,
+                    context.get("system_state"),
+                    self._cost(result),
+                ))
+            return result
+        finally:
+            self._inflight.pop(key, None)
+            self._pending -= 1
+
+    async def _decide_in_session(
+        self, task: str, context: Dict[str, Any], complexity: float, task_type: str, session_id: str
+    ) -> DecisionResult:
+        """Run after earlier requests of the session (asyncio.Lock wakes waiters FIFO)."""
+        lock = self._session_locks.get(session_id)
+        if lock is None:
+            lock = self._session_locks[session_id] = asyncio.Lock()
+        self._session_waiters[session_id] = self._session_waiters.get(session_id, 0) + 1
+        try:
+            async with lock:
+                return await self._run_in_pool(task, context, complexity, task_type, session_id)
+        finally:
+            self._session_waiters[session_id] -= 1
+            if self._session_waiters[session_id] == 0:
+                del self._session_waiters[session_id]
+                del self._session_locks[session_id]
+
+    async def _run_in_pool(
+        self,
+        task: str,
+        context: Dict[str, Any],
+        complexity: float,
+        task_type: str,
+        session_id: Optional[str],
+    ) -> DecisionResult:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            self.decision_loop.run_with_usage,
+            task, context, complexity, task_type, session_id,
+        )
+
+    def _admit(self) -> None:
+        """Count a request that will need a model call, or shed it."""
+        if self.max_pending is not None and self._pending >= self.max_pending:
+            raise DecisionServiceOverloaded(f"{self._pending} decision requests pending")
+        self._pending += 1
+
+    def _cache_get(self, key: str) -> Optional[_CacheEntry]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= self._clock():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return entry
+
+    def _cache_put(self, key: str, entry: _CacheEntry) -> None:
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_cache_entries:
+            self._cache.popitem(last=False)
+
+    def invalidate(self, system_state: Optional[str] = None) -> int:
+        """
+        Drop cached decisions, e.g. when the system state changes.
+
+        Args:
+            system_state: Only drop decisions made in this state (all if None)
+
+        Returns:
+            Number of entries removed
+        """
+        if system_state is None:
+            removed = len(self._cache)
+            self._cache.clear()
+        else:
+            stale = [k for k, e in self._cache.items() if e.system_state == system_state]
+            for key in stale:
+                del self._cache[key]
+            removed = len(stale)
+        if removed:
+            logger.info(f"Invalidated {removed} cached decisions (state={system_state or 'all'})")
+        return removed
+
+    def on_system_state_change(self, previous_state: Optional[str], new_state: Optional[str]) -> int:
+        """State-change hook: decisions made in the previous state are stale."""
+        if previous_state == new_state:
+            return 0
+        return self.invalidate(previous_state)
+
+    def _record(
+        self, outcome: str, start: float, result: Optional[DecisionResult] = None, saved_cost: float = 0.0
+    ) -> None:
+        latency_ms = (time.perf_counter() - start) * 1000
+        if result is None:
+            self.metrics.record(outcome, latency_ms, saved_cost=saved_cost)
+        else:
+            self.metrics.record(
+                outcome, latency_ms, result.prompt_tokens, result.completion_tokens, self._cost(result)
+            )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Metrics plus cache and queue sizes."""
+        stats = self.metrics.to_dict()
+        stats.update(
+            cache_entries=len(self._cache),
+            inflight=len(self._inflight),
+            pending=self._pending,
+            max_workers=self.max_workers,
+        )
+        return stats
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker pool."""
+        self._executor.shutdown(wait=wait)
+
+    async def __aenter__(self) -> "AsyncDecisionService":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.shutdown(wait=False)
@@ -4,7 +4,9 @@ import os
 import pickle  # nosec B403
 import logging
 import asyncio
-from typing import Any, Dict, List, Tuple, Optional, cast
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Set, Tuple, Optional, cast
 
 # Import centralized error handling
 from core.error_handling import (
@@ -38,6 +40,20 @@ _MODEL: Optional[Any] = None
 _MODEL_LOADED: bool = False
 _USING_HEURISTIC_MODE: bool = False
 
+# Versioned model files live next to MODEL_PATH: anomaly_if.v<N>.pkl
+_MODEL_VERSION_FILE = re.compile(r"^anomaly_if\.v(\d+)\.pkl$")
+_MODEL_VERSION: Optional[int] = None  # None = unversioned MODEL_PATH
+# Compiled form of _MODEL (anomaly.tree_scoring), None if it cannot be compiled
+_COMPILED_MODEL: Optional[Any] = None
+# Batches up to this size are scored on the event loop by the compiled model
+# (larger ones would block it: ~10 ms per 1000 rows for 100 trees)
+INLINE_SCORING_MAX_ROWS: int = 256
+_SHADOW: Optional["ShadowModel"] = None
+# Shadow scoring runs in background tasks; rows arriving while this many are
+# pending are not shadow-scored (counted as skipped)
+SHADOW_MAX_PENDING: int = 64
+_SHADOW_TASKS: Set["asyncio.Task[None]"] = set()
+
 # Resource status cache to avoid blocking psutil.cpu_percent(interval=0.1) on every call
 _RESOURCE_STATUS_CACHE: Optional[Dict[str, str]] = None
 _RESOURCE_STATUS_CACHE_TIME: float = 0.0
@@ -92,62 +108,90 @@ async def _load_model_impl() -> bool:
         ANOMALY_MODEL_LOAD_ERRORS_TOTAL.inc()
         return False
 
+    # Newest versioned model file first; an unloadable one falls back to the
+    # previous version and finally to the unversioned MODEL_PATH
+    candidates = _model_candidates()
+    for index, (model_path, version) in enumerate(candidates):
+        try:
+            return await _load_model_file(model_path, version, health_monitor)
+        except ModelLoadError as e:
+            if index == len(candidates) - 1:
+                raise
+            logger.warning(
+                f"Model {model_path} unusable, falling back to {candidates[index + 1][0]}: {e.message}",
+                extra={
+                    "component": "anomaly_detector",
+                    "model_path": model_path,
+                    "model_version": version,
+                }
+            )
+    return False  # Unreachable: there is always at least one candidate
+
+
+async def _load_model_file(model_path: str, version: Optional[int], health_monitor: Any) -> bool:
+    """
+    Load, validate, compile and install one model file.
+
+    Raises:
+        ModelLoadError: If the file is missing or cannot be used as a model
+    """
     # Validate model path exists
-    if not os.path.exists(MODEL_PATH):
-        error_msg = f"Model file not found at {MODEL_PATH}"
+    if not os.path.exists(model_path):
+        error_msg = f"Model file not found at {model_path}"
         logger.error(
             error_msg,
             extra={
                 "component": "anomaly_detector",
                 "error_type": "ModelLoadError",
-                "model_path": MODEL_PATH
+                "model_path": model_path
             }
         )
         ANOMALY_MODEL_LOAD_ERRORS_TOTAL.inc()
         raise ModelLoadError(
             error_msg,
             component="anomaly_detector",
-            context={"model_path": MODEL_PATH},
+            context={"model_path": model_path},
         )
 
     # Load model with comprehensive error handling
     try:
-        with open(MODEL_PATH, "rb") as f:
-            _MODEL = await asyncio.to_thread(pickle.load, f)  # noqa: S301 - model file is trusted and part of deployment
+        with open(model_path, "rb") as f:
+            model = await asyncio.to_thread(pickle.load, f)  # noqa: S301 - model file is trusted and part of deployment
         
         # Validate model has required methods
-        if not hasattr(_MODEL, 'predict'):
+        if not hasattr(model, 'predict'):
             error_msg = "Loaded model missing required 'predict' method"
             logger.error(
                 error_msg,
                 extra={
                     "component": "anomaly_detector",
                     "error_type": "ModelValidationError",
-                    "model_type": type(_MODEL).__name__
+                    "model_type": type(model).__name__
                 }
             )
             ANOMALY_MODEL_LOAD_ERRORS_TOTAL.inc()
             raise ModelLoadError(
                 error_msg,
                 component="anomaly_detector",
-                context={"model_type": type(_MODEL).__name__},
+                context={"model_type": type(model).__name__},
             )
         
-        _MODEL_LOADED = True
-        _USING_HEURISTIC_MODE = False
+        _install_model(model, await _compile_off_loop(model), version)
         health_monitor.mark_healthy(
             "anomaly_detector",
             {
                 "mode": "model-based",
-                "model_path": MODEL_PATH,
+                "model_path": model_path,
+                "model_version": version,
+                "compiled": _COMPILED_MODEL is not None,
             },
         )
         logger.info(
             "Anomaly detection model loaded successfully",
             extra={
                 "component": "anomaly_detector",
-                "model_path": MODEL_PATH,
-                "model_type": type(_MODEL).__name__
+                "model_path": model_path,
+                "model_type": type(model).__name__
             }
         )
         return True
@@ -159,14 +203,14 @@ async def _load_model_impl() -> bool:
             extra={
                 "component": "anomaly_detector",
                 "error_type": type(e).__name__,
-                "model_path": MODEL_PATH
+                "model_path": model_path
             }
         )
         ANOMALY_MODEL_LOAD_ERRORS_TOTAL.inc()
         raise ModelLoadError(
             error_msg,
             component="anomaly_detector",
-            context={"model_path": MODEL_PATH, "pickle_error": str(e)},
+            context={"model_path": model_path, "pickle_error": str(e)},
         )
     
     except OSError as e:
@@ -176,14 +220,14 @@ async def _load_model_impl() -> bool:
             extra={
                 "component": "anomaly_detector",
                 "error_type": "OSError",
-                "model_path": MODEL_PATH
+                "model_path": model_path
             }
         )
         ANOMALY_MODEL_LOAD_ERRORS_TOTAL.inc()
         raise ModelLoadError(
             error_msg,
             component="anomaly_detector",
-            context={"model_path": MODEL_PATH, "os_error": str(e)},
+            context={"model_path": model_path, "os_error": str(e)},
         )
     
     except (AttributeError, TypeError) as e:
@@ -194,7 +238,7 @@ async def _load_model_impl() -> bool:
             extra={
                 "component": "anomaly_detector",
                 "error_type": type(e).__name__,
-                "model_path": MODEL_PATH
+                "model_path": model_path
             },
             exc_info=True
         )
@@ -202,7 +246,7 @@ async def _load_model_impl() -> bool:
         raise ModelLoadError(
             error_msg,
             component="anomaly_detector",
-            context={"model_path": MODEL_PATH, "structure_error": str(e)},
+            context={"model_path": model_path, "structure_error": str(e)},
         )
     except (MemoryError, RuntimeError) as e:
         # Handle resource-related errors during model loading
@@ -212,7 +256,7 @@ async def _load_model_impl() -> bool:
             extra={
                 "component": "anomaly_detector",
                 "error_type": type(e).__name__,
-                "model_path": MODEL_PATH
+                "model_path": model_path
             },
             exc_info=True
         )
@@ -220,7 +264,7 @@ async def _load_model_impl() -> bool:
         raise ModelLoadError(
             error_msg,
             component="anomaly_detector",
-            context={"model_path": MODEL_PATH, "resource_error": str(e)},
+            context={"model_path": model_path, "resource_error": str(e)},
         )
 
 
@@ -362,6 +406,386 @@ async def load_model() -> bool:
         return False
 
 
+def _compile_for_serving(model: Any) -> Optional[Any]:
+    """
+    Compiled, parity-checked form of a model for inline scoring.
+
+    Returns None when the model is not a supported tree ensemble or the
+    compiled scores deviate from the model's; it is then scored by the
+    model itself in a worker thread.
+    """
+    try:
+        from .tree_scoring import compile_and_verify
+    except ImportError as e:
+        logger.warning(
+            f"Compiled scoring unavailable: {e}",
+            extra={"component": "anomaly_detector", "error_type": "ImportError"}
+        )
+        return None
+
+    try:
+        compiled, deviation = compile_and_verify(model)
+    except TypeError as e:
+        logger.info(
+            f"Model not compiled, scoring with the estimator: {e}",
+            extra={"component": "anomaly_detector", "model_type": type(model).__name__}
+        )
+        return None
+    except ModelLoadError as e:
+        logger.warning(
+            f"Compiled model failed parity check, scoring with the estimator: {e.message}",
+            extra={"component": "anomaly_detector", "context": e.context}
+        )
+        return None
+
+    logger.info(
+        "Anomaly detection model compiled for inline scoring",
+        extra={"component": "anomaly_detector", "max_deviation": deviation, **compiled.describe()}
+    )
+    return compiled
+
+
+async def _compile_off_loop(model: Any) -> Optional[Any]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _compile_for_serving, model)
+
+
+def _install_model(model: Any, compiled: Optional[Any], version: Optional[int]) -> None:
+    """
+    Publish a model and its compiled form.
+
+    A single synchronous step: a detection running on the event loop sees
+    either the previous model or this one, never a mix.
+    """
+    global _MODEL, _COMPILED_MODEL, _MODEL_VERSION, _MODEL_LOADED, _USING_HEURISTIC_MODE
+    _MODEL = model
+    _COMPILED_MODEL = compiled
+    _MODEL_VERSION = version
+    _MODEL_LOADED = True
+    _USING_HEURISTIC_MODE = False
+
+
+def list_model_versions() -> List[Tuple[int, str]]:
+    """(version, path) of the versioned model files next to MODEL_PATH, oldest first."""
+    directory = os.path.dirname(MODEL_PATH) or "."
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    versions = []
+    for name in names:
+        match = _MODEL_VERSION_FILE.match(name)
+        if match:
+            versions.append((int(match.group(1)), os.path.join(directory, name)))
+    return sorted(versions)
+
+
+def _model_candidates() -> List[Tuple[str, Optional[int]]]:
+    """(path, version) to try at startup: versioned files newest first, then MODEL_PATH."""
+    candidates: List[Tuple[str, Optional[int]]] = [
+        (path, version) for version, path in reversed(list_model_versions())
+    ]
+    if not candidates or os.path.exists(MODEL_PATH):
+        candidates.append((MODEL_PATH, None))
+    return candidates
+
+
+def save_model_version(model: Any, version: Optional[int] = None) -> Tuple[int, str]:
+    """
+    Write a model as a new versioned file (atomically, via a temporary file).
+
+    Args:
+        model: Fitted model with a predict() method
+        version: Version number (default: one above the newest)
+
+    Returns:
+        (version, path) of the written file
+
+    Raises:
+        ValueError: If the version already exists
+    """
+    versions = list_model_versions()
+    if version is None:
+        version = versions[-1][0] + 1 if versions else 1
+    if any(v == version for v, _ in versions):
+        raise ValueError(f"Model version {version} already exists")
+
+    path = os.path.join(os.path.dirname(MODEL_PATH) or ".", f"anomaly_if.v{version}.pkl")
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        pickle.dump(model, f)
+    os.replace(temp_path, path)
+    return version, path
+
+
+def _read_model_file(path: str) -> Any:
+    with open(path, "rb") as f:
+        model = pickle.load(f)  # noqa: S301 - model file is trusted and part of deployment
+    if not hasattr(model, "predict"):
+        raise ModelLoadError(
+            "Loaded model missing required 'predict' method",
+            component="anomaly_detector",
+            context={"model_path": path, "model_type": type(model).__name__},
+        )
+    return model
+
+
+async def _load_model_version(version: Optional[int]) -> Tuple[Any, Optional[Any], int]:
+    """Load and compile a versioned model file (the newest if version is None)."""
+    versions = dict(list_model_versions())
+    if version is None and versions:
+        version = max(versions)
+    if version not in versions:
+        raise ModelLoadError(
+            f"Model version {version} not found",
+            component="anomaly_detector",
+            context={"available_versions": sorted(versions)},
+        )
+    try:
+        model = await asyncio.to_thread(_read_model_file, versions[version])
+    except (pickle.UnpicklingError, EOFError, OSError, AttributeError, TypeError) as e:
+        raise ModelLoadError(
+            f"Failed to load model version {version}: {e}",
+            component="anomaly_detector",
+            context={"model_path": versions[version], "error_type": type(e).__name__},
+        )
+    return model, await _compile_off_loop(model), version
+
+
+async def hot_swap_model(version: Optional[int] = None) -> int:
+    """
+    Replace the serving model with a versioned model file, without downtime.
+
+    The current model keeps serving while the new one is loaded, compiled
+    and parity-checked; if loading fails, it stays in place.
+
+    Args:
+        version: Version to serve (default: the newest)
+
+    Returns:
+        The version now serving
+
+    Raises:
+        ModelLoadError: If the version does not exist or cannot be loaded
+    """
+    model, compiled, version = await _load_model_version(version)
+    previous = _MODEL_VERSION
+    _install_model(model, compiled, version)
+    get_health_monitor().mark_healthy(
+        "anomaly_detector",
+        {"mode": "model-based", "model_version": version, "compiled": compiled is not None},
+    )
+    logger.info(
+        f"Anomaly detection model swapped: version {previous} -> {version}",
+        extra={"component": "anomaly_detector", "model_version": version, "compiled": compiled is not None}
+    )
+    return version
+
+
+async def reload_model_if_newer() -> bool:
+    """Hot-swap to the newest versioned model file if it is newer than the serving one."""
+    versions = list_model_versions()
+    if not versions or (_MODEL_VERSION is not None and versions[-1][0] <= _MODEL_VERSION):
+        return False
+    await hot_swap_model(versions[-1][0])
+    return True
+
+
+@dataclass
+class ShadowStats:
+    """Agreement between the serving model and a shadow candidate."""
+    rows: int = 0
+    disagreements: int = 0
+    scored_rows: int = 0  # Rows both models returned scores for
+    score_diff_total: float = 0.0
+    max_score_diff: float = 0.0
+    errors: int = 0
+    skipped: int = 0  # Rows not shadow-scored because too many batches were pending
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "disagreements": self.disagreements,
+            "agreement_rate": 1.0 - self.disagreements / self.rows if self.rows else None,
+            "mean_score_diff": self.score_diff_total / self.scored_rows if self.scored_rows else None,
+            "max_score_diff": self.max_score_diff,
+            "errors": self.errors,
+            "skipped": self.skipped,
+        }
+
+
+@dataclass
+class ShadowModel:
+    """Candidate model scored alongside the serving one; its results are only recorded."""
+    version: int
+    model: Any
+    compiled: Optional[Any]
+    stats: ShadowStats = field(default_factory=ShadowStats)
+
+
+async def set_shadow_model(version: Optional[int] = None) -> int:
+    """
+    Score a candidate model version in the shadow of the serving model.
+
+    Every model-based detection also scores the candidate in a background
+    task and records whether it agrees (get_shadow_stats()); results
+    returned to callers are neither changed nor delayed. Candidates that
+    cannot be compiled are scored in a worker thread.
+
+    Raises:
+        ModelLoadError: If the version does not exist or cannot be loaded
+    """
+    global _SHADOW
+    model, compiled, version = await _load_model_version(version)
+    _SHADOW = ShadowModel(version, model, compiled)
+    logger.info(
+        f"Shadow scoring model version {version}",
+        extra={"component": "anomaly_detector", "shadow_version": version, "compiled": compiled is not None}
+    )
+    return version
+
+
+def get_shadow_stats() -> Optional[Dict[str, Any]]:
+    """Agreement statistics of the shadow model (None without one)."""
+    if _SHADOW is None:
+        return None
+    return {"version": _SHADOW.version, **_SHADOW.stats.to_dict()}
+
+
+def clear_shadow_model() -> None:
+    """Stop shadow scoring."""
+    global _SHADOW
+    _SHADOW = None
+
+
+def promote_shadow_model() -> int:
+    """
+    Serve the shadow model and stop shadow scoring.
+
+    Returns:
+        The version now serving
+
+    Raises:
+        AnomalyEngineError: If no shadow model is set
+    """
+    global _SHADOW
+    shadow = _SHADOW
+    if shadow is None:
+        raise AnomalyEngineError("No shadow model to promote", component="anomaly_detector")
+    _install_model(shadow.model, shadow.compiled, shadow.version)
+    _SHADOW = None
+    logger.info(
+        f"Promoted shadow model version {shadow.version}",
+        extra={"component": "anomaly_detector", "model_version": shadow.version, **shadow.stats.to_dict()}
+    )
+    return shadow.version
+
+
+def get_model_info() -> Dict[str, Any]:
+    """Serving model version, scoring path and shadow state."""
+    return {
+        "loaded": _MODEL_LOADED,
+        "heuristic_mode": _USING_HEURISTIC_MODE,
+        "version": _MODEL_VERSION,
+        "compiled": _COMPILED_MODEL.describe() if _COMPILED_MODEL is not None else None,
+        "shadow": get_shadow_stats(),
+    }
+
+
+def _extract_features(data: Dict[str, Any]) -> List[float]:
+    """Model input row (order matters for model consistency)."""
+    return [
+        float(data.get("voltage", 8.0)),
+        float(data.get("temperature", 25.0)),
+        abs(float(data.get("gyro", 0.0))),
+        float(data.get("current", 1.0)),
+        float(data.get("wheel_speed", 5.0)),
+    ]
+
+
+def _normalize_score(score: Any) -> float:
+    # Ensure score is a valid float, default to 0.5 if None
+    if score is None:
+        score = 0.5
+    return max(0.0, min(float(score), 1.0))  # Normalize to 0-1
+
+
+async def _score_rows(
+    model: Any, compiled: Optional[Any], rows: List[List[float]]
+) -> Tuple[List[Any], List[Optional[float]]]:
+    """
+    Model labels and scores (None without score_samples) for feature rows.
+
+    The compiled model scores small batches directly on the event loop and
+    larger ones in a worker thread; models that could not be compiled run
+    in worker threads.
+    """
+    if compiled is not None and compiled.model is model:
+        if len(rows) <= INLINE_SCORING_MAX_ROWS:
+            labels, scores = compiled.predict_with_scores(rows)
+        else:
+            labels, scores = await asyncio.to_thread(compiled.predict_with_scores, rows)
+        return list(labels), list(scores) if scores is not None else [None] * len(rows)
+
+    # Run predict and score_samples in parallel when both available
+    if hasattr(model, "score_samples"):
+        labels, scores = await asyncio.gather(
+            asyncio.to_thread(model.predict, rows),
+            asyncio.to_thread(model.score_samples, rows),
+        )
+        return list(labels), list(scores)
+    return list(await asyncio.to_thread(model.predict, rows)), [None] * len(rows)
+
+
+def _schedule_shadow(rows: List[List[float]], labels: List[Any], scores: List[Optional[float]]) -> None:
+    """Shadow-score rows in a background task, or skip them if too many are pending."""
+    shadow = _SHADOW
+    if shadow is None:
+        return
+    if len(_SHADOW_TASKS) >= SHADOW_MAX_PENDING:
+        shadow.stats.skipped += len(rows)
+        return
+    task = asyncio.ensure_future(_observe_shadow(shadow, rows, labels, scores))
+    _SHADOW_TASKS.add(task)
+    task.add_done_callback(_SHADOW_TASKS.discard)
+
+
+async def drain_shadow_scoring() -> None:
+    """Wait for pending background shadow scoring (e.g. before reading its stats)."""
+    while _SHADOW_TASKS:
+        await asyncio.gather(*_SHADOW_TASKS)
+
+
+async def _observe_shadow(
+    shadow: ShadowModel, rows: List[List[float]], labels: List[Any], scores: List[Optional[float]]
+) -> None:
+    """
+    Score rows with the shadow model and record agreement; never raises.
+
+    Labels and scores are compared raw, before normalization: IsolationForest
+    labels are -1/1 and its scores are negative.
+    """
+    try:
+        shadow_labels, shadow_scores = await _score_rows(shadow.model, shadow.compiled, rows)
+    except Exception as e:  # Shadow failures must not affect detection
+        shadow.stats.errors += 1
+        logger.warning(
+            f"Shadow model scoring failed ({type(e).__name__}): {e}",
+            extra={"component": "anomaly_detector", "shadow_version": shadow.version}
+        )
+        return
+
+    stats = shadow.stats
+    for label, score, shadow_label, shadow_score in zip(labels, scores, shadow_labels, shadow_scores):
+        stats.rows += 1
+        stats.disagreements += int(label != shadow_label)
+        if score is not None and shadow_score is not None:
+            diff = abs(float(score) - float(shadow_score))
+            stats.scored_rows += 1
+            stats.score_diff_total += diff
+            stats.max_score_diff = max(stats.max_score_diff, diff)
+
+
 def _detect_anomaly_heuristic(data: Dict[str, Any]) -> Tuple[bool, float]:
     """
     Perform rule-based anomaly detection as a fallback mechanism.
@@ -564,30 +988,14 @@ async def detect_anomaly(data: Dict[str, Any]) -> Tuple[bool, float]:
         # Use model-based detection if available
         if _MODEL and not _USING_HEURISTIC_MODE:
             try:
-                # Prepare features (order matters for model consistency)
-                features: List[float] = [
-                    float(data.get("voltage", 8.0)),
-                    float(data.get("temperature", 25.0)),
-                    abs(float(data.get("gyro", 0.0))),
-                    float(data.get("current", 1.0)),
-                    float(data.get("wheel_speed", 5.0)),
-                ]
-
-                # Run predict and score_samples in parallel when both available
-                if hasattr(_MODEL, "score_samples"):
-                    pred_result, score_result = await asyncio.gather(
-                        asyncio.to_thread(_MODEL.predict, [features]),
-                        asyncio.to_thread(_MODEL.score_samples, [features]),
-                    )
-                    is_anomalous = pred_result[0]
-                    score = score_result[0]
-                else:
-                    is_anomalous = (await asyncio.to_thread(_MODEL.predict, [features]))[0]
-                    score = 0.5
-                # Ensure score is a valid float, default to 0.5 if None
-                if score is None:
-                    score = 0.5
-                score = max(0.0, min(float(score), 1.0))  # Normalize to 0-1
+                features: List[float] = _extract_features(data)
+                # Read once: a hot swap may replace the model while scoring awaits
+                model, compiled = _MODEL, _COMPILED_MODEL
+                labels, scores = await _score_rows(model, compiled, [features])
+                is_anomalous = labels[0]
+                score = _normalize_score(scores[0])
+                if _SHADOW is not None:
+                    _schedule_shadow([features], labels, scores)
 
                 health_monitor.mark_healthy("anomaly_detector")
 
@@ -732,3 +1140,72 @@ async def detect_anomaly(data: Dict[str, Any]) -> Tuple[bool, float]:
         )
         # Fall back to heuristic on any error
         return _detect_anomaly_heuristic(data)
+
+
+async def detect_anomaly_batch(records: List[Dict[str, Any]]) -> List[Tuple[bool, float]]:
+    """
+    Detect anomalies in many telemetry records with one model call.
+
+    Results match detect_anomaly() record by record: invalid records, and
+    all records when no model is serving, get the heuristic result.
+
+    Args:
+        records: Telemetry data dictionaries
+
+    Returns:
+        (is_anomalous, anomaly_score) for each record, in order
+    """
+    global _USING_HEURISTIC_MODE
+    if not records:
+        return []
+    if not _MODEL_LOADED or not _MODEL or _USING_HEURISTIC_MODE:
+        return [await detect_anomaly(data) for data in records]
+
+    start_time: float = time.time()
+    results: List[Optional[Tuple[bool, float]]] = [None] * len(records)
+    positions: List[int] = []
+    rows: List[List[float]] = []
+    model_scored = 0
+    for i, data in enumerate(records):
+        try:
+            TelemetryData.validate(data)
+            rows.append(_extract_features(data))
+            positions.append(i)
+        except (ValidationError, ValueError, TypeError, AttributeError):
+            results[i] = _detect_anomaly_heuristic(data)
+
+    if rows:
+        model, compiled = _MODEL, _COMPILED_MODEL
+        try:
+            labels, scores = await _score_rows(model, compiled, rows)
+            normalized = [_normalize_score(score) for score in scores]
+            if _SHADOW is not None:
+                _schedule_shadow(rows, labels, scores)
+            for i, label, score in zip(positions, labels, normalized):
+                results[i] = (bool(label), score)
+            model_scored = len(rows)
+            ANOMALY_DETECTIONS_TOTAL.labels(detector_type="model").inc(len(rows))
+            ANOMALY_DETECTION_LATENCY.labels(detector_type="model").observe(time.time() - start_time)
+            get_health_monitor().mark_healthy("anomaly_detector")
+        except (AttributeError, ValueError, TypeError, IndexError, KeyError, RuntimeError) as e:
+            logger.warning(
+                f"Batch model prediction error ({type(e).__name__}): {e}. Falling back to heuristic.",
+                extra={
+                    "component": "anomaly_detector",
+                    "error_type": type(e).__name__,
+                    "fallback_reason": "model_error",
+                    "batch_size": len(rows),
+                }
+            )
+            _USING_HEURISTIC_MODE = True
+            get_health_monitor().mark_degraded(
+                "anomaly_detector",
+                error_msg=f"Model prediction failed: {str(e)}",
+                fallback_active=True,
+            )
+            for i in positions:
+                results[i] = _detect_anomaly_heuristic(records[i])
+
+    if model_scored < len(records):
+        ANOMALY_DETECTIONS_TOTAL.labels(detector_type="heuristic").inc(len(records) - model_scored)
+    return cast(List[Tuple[bool, float]], results)
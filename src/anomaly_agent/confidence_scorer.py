@@ -9,12 +9,20 @@ Computes a single confidence score [0.0, 1.0] based on multiple factors:
 - Temporal decay
 
 Higher score = higher confidence in the system's decision.
+
+Batches of decisions (telemetry batches, replayed incident windows) can be
+scored with calculate_confidence_batch(), which takes one NumPy column per
+factor. Weights can be calibrated offline from labeled feedback with
+ConfidenceScorer.fit().
 """
 
 import logging
-from typing import Dict, Any, Optional, List
+import math
+from typing import Dict, Any, Optional, List, Sequence, Union
 from dataclasses import dataclass
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 
@@ -63,6 +71,7 @@ class ConfidenceScorer:
         "PAYLOAD_OPS": 0.4,      # Science mission, slight penalty
         "SAFE_MODE": 0.8,        # Emergency mode, high penalty
     }
+    UNKNOWN_PHASE_RISK = 0.5
     
     def __init__(
         self,
@@ -104,6 +113,21 @@ class ConfidenceScorer:
             self.weight_phase /= total_weight
             self.weight_policy /= total_weight
             self.weight_temporal /= total_weight
+
+        # Phase code -> phase signal (1 - risk); the last slot is for unknown phases
+        self.phase_names: List[str] = list(self.PHASE_RISK)
+        self._phase_codes = {name: code for code, name in enumerate(self.phase_names)}
+        self._phase_signal = np.array(
+            [1.0 - self.PHASE_RISK[name] for name in self.phase_names] + [1.0 - self.UNKNOWN_PHASE_RISK]
+        )
+
+    @property
+    def weights(self) -> np.ndarray:
+        """Weights in factor order: anomaly, recurrence, phase, policy, temporal."""
+        return np.array([
+            self.weight_anomaly, self.weight_recurrence, self.weight_phase,
+            self.weight_policy, self.weight_temporal,
+        ])
     
     def calculate_confidence(
         self,
@@ -138,7 +162,6 @@ class ConfidenceScorer:
         
         # 2. Recurrence contribution (historical pattern)
         # More recurrences = higher confidence (logarithmic growth)
-        import math
         if recurrence_count > 0:
             recurrence_signal = min(1.0, 0.3 + 0.2 * math.log(1 + recurrence_count))
         else:
@@ -210,7 +233,6 @@ class ConfidenceScorer:
         # Calculate individual factors
         anomaly_contribution = anomaly_score * self.weight_anomaly
         
-        import math
         if recurrence_count > 0:
             recurrence_signal = min(1.0, 0.3 + 0.2 * math.log(1 + recurrence_count))
         else:
@@ -244,12 +266,221 @@ class ConfidenceScorer:
         
         return confidence, factors
     
+    def encode_phases(self, mission_phases: Union[str, Sequence[str], np.ndarray]) -> np.ndarray:
+        """
+        Map mission phase names to lookup codes (unknown phases get the last code).
+
+        Encoding a column once lets repeated batch calls skip the string lookup.
+        """
+        if isinstance(mission_phases, str):
+            return np.array([self._phase_codes.get(mission_phases, len(self.phase_names))])
+        names = np.asarray(mission_phases)
+        if names.dtype.kind not in "US":
+            names = names.astype(str)
+        codes = np.full(names.shape, len(self.phase_names), dtype=np.intp)
+        for code, name in enumerate(self.phase_names):
+            codes[names == name] = code
+        return codes
+
+    def factor_signals(
+        self,
+        anomaly_scores: np.ndarray,
+        recurrence_counts: Optional[np.ndarray] = None,
+        mission_phases: Optional[Union[str, Sequence[str], np.ndarray]] = None,
+        policy_allowed: Optional[np.ndarray] = None,
+        temporal_decay: Optional[np.ndarray] = None,
+        on_invalid: str = "zero",
+    ) -> np.ndarray:
+        """
+        Unweighted factor signals for a batch, shape (n, 5).
+
+        Takes the same columns as calculate_confidence_batch(); rows with
+        invalid inputs are handled per ``on_invalid`` ("nan" leaves NaN rows).
+        """
+        anomaly, recurrence, phase_codes, policy, temporal, invalid = self._prepare_columns(
+            anomaly_scores, recurrence_counts, mission_phases, policy_allowed, temporal_decay, on_invalid
+        )
+        signals = np.empty((anomaly.shape[0], 5))
+        signals[:, 0] = anomaly
+        signals[:, 1] = np.where(recurrence > 0, np.minimum(1.0, 0.3 + 0.2 * np.log1p(recurrence)), 0.0)
+        signals[:, 2] = self._phase_signal[phase_codes]
+        signals[:, 3] = np.where(policy, 1.0, 0.3)
+        signals[:, 4] = temporal
+        if invalid is not None:
+            signals[invalid] = 0.0 if on_invalid == "zero" else np.nan
+        return signals
+
+    def calculate_confidence_batch(
+        self,
+        anomaly_scores: np.ndarray,
+        recurrence_counts: Optional[np.ndarray] = None,
+        mission_phases: Optional[Union[str, Sequence[str], np.ndarray]] = None,
+        policy_allowed: Optional[np.ndarray] = None,
+        temporal_decay: Optional[np.ndarray] = None,
+        on_invalid: str = "zero",
+    ) -> np.ndarray:
+        """
+        Calculate confidence scores for a batch of decisions.
+
+        Matches calculate_confidence() row by row. Each argument is a column
+        of length n (or a scalar, broadcast); omitted columns take the scalar
+        defaults.
+
+        Args:
+            anomaly_scores: Anomaly detection scores [0.0, 1.0]
+            recurrence_counts: Similar historical anomalies per decision
+            mission_phases: Phase names, or codes from encode_phases()
+            policy_allowed: Whether each action is allowed by phase policy
+            temporal_decay: Time decay factors [0.0, 1.0]
+            on_invalid: Rows with NaN/infinite inputs or unknown phase codes
+                score 0.0 ("zero"), NaN ("nan"), or raise ValueError ("raise")
+
+        Returns:
+            Confidence scores [0.0, 1.0], shape (n,)
+        """
+        anomaly, recurrence, phase_codes, policy, temporal, invalid = self._prepare_columns(
+            anomaly_scores, recurrence_counts, mission_phases, policy_allowed, temporal_decay, on_invalid
+        )
+
+        confidence = anomaly * self.weight_anomaly
+        recurrence_signal = np.minimum(1.0, 0.3 + 0.2 * np.log1p(recurrence))
+        recurrence_signal[recurrence == 0] = 0.0
+        confidence += recurrence_signal * self.weight_recurrence
+        confidence += (self._phase_signal * self.weight_phase)[phase_codes]
+        confidence += np.where(policy, self.weight_policy, 0.3 * self.weight_policy)
+        confidence += temporal * self.weight_temporal
+        np.clip(confidence, 0.0, 1.0, out=confidence)
+
+        if invalid is not None:
+            confidence[invalid] = 0.0 if on_invalid == "zero" else np.nan
+        return confidence
+
+    def _prepare_columns(
+        self,
+        anomaly_scores: np.ndarray,
+        recurrence_counts: Optional[np.ndarray],
+        mission_phases: Optional[Union[str, Sequence[str], np.ndarray]],
+        policy_allowed: Optional[np.ndarray],
+        temporal_decay: Optional[np.ndarray],
+        on_invalid: str,
+    ) -> tuple:
+        """Broadcast, validate (one pass) and clamp the factor columns."""
+        if on_invalid not in ("zero", "nan", "raise"):
+            raise ValueError(f"on_invalid must be 'zero', 'nan' or 'raise', got {on_invalid!r}")
+
+        anomaly = np.asarray(anomaly_scores, dtype=np.float64)
+        if anomaly.ndim != 1:
+            anomaly = np.atleast_1d(anomaly).ravel()
+        n = anomaly.shape[0]
+
+        def column(values: Any, default: Any, dtype: Any) -> np.ndarray:
+            if values is None:
+                return np.full(n, default, dtype=dtype)
+            array = np.asarray(values, dtype=dtype)
+            if array.ndim == 0:
+                return np.full(n, array, dtype=dtype)
+            if array.shape != (n,):
+                raise ValueError(f"Factor column has shape {array.shape}, expected ({n},)")
+            return array
+
+        recurrence = column(recurrence_counts, 0.0, np.float64)
+        temporal = column(temporal_decay, 1.0, np.float64)
+        policy = column(policy_allowed, True, bool)
+
+        if mission_phases is None:
+            phase_codes = np.full(n, self._phase_codes["NOMINAL_OPS"], dtype=np.intp)
+        elif isinstance(mission_phases, str):
+            phase_codes = np.full(n, self.encode_phases(mission_phases)[0], dtype=np.intp)
+        elif isinstance(mission_phases, np.ndarray) and mission_phases.dtype.kind in "iu":
+            phase_codes = column(mission_phases, 0, np.intp)
+        else:
+            phase_codes = column(self.encode_phases(mission_phases), 0, np.intp)
+
+        # One validation pass: a NaN/inf anywhere makes the sum non-finite
+        bad_phase = (phase_codes < 0) | (phase_codes > len(self.phase_names))
+        finite = np.isfinite(anomaly + recurrence + temporal)
+        invalid = ~finite | bad_phase
+        invalid_count = int(np.count_nonzero(invalid))
+        if invalid_count:
+            if on_invalid == "raise":
+                first = int(np.flatnonzero(invalid)[0])
+                raise ValueError(f"{invalid_count} decisions have invalid inputs (first at row {first})")
+            logger.warning(f"Confidence batch: {invalid_count} of {n} decisions have invalid inputs")
+            anomaly = np.where(invalid, 0.0, anomaly)
+            recurrence = np.where(invalid, 0.0, recurrence)
+            temporal = np.where(invalid, 0.0, temporal)
+            phase_codes = np.where(bad_phase, len(self.phase_names), phase_codes)
+        else:
+            invalid = None
+
+        anomaly = np.clip(anomaly, 0.0, 1.0)
+        temporal = np.clip(temporal, 0.0, 1.0)
+        recurrence = np.maximum(recurrence, 0.0)
+        return anomaly, recurrence, phase_codes, policy, temporal, invalid
+
+    @classmethod
+    def fit(
+        cls,
+        labels: np.ndarray,
+        anomaly_scores: np.ndarray,
+        recurrence_counts: Optional[np.ndarray] = None,
+        mission_phases: Optional[Union[str, Sequence[str], np.ndarray]] = None,
+        policy_allowed: Optional[np.ndarray] = None,
+        temporal_decay: Optional[np.ndarray] = None,
+        iterations: int = 500,
+    ) -> "ConfidenceScorer":
+        """
+        Calibrate weights offline from labeled feedback.
+
+        Finds non-negative weights summing to 1 that minimize the squared
+        error (Brier score) between confidence and outcome, by projected
+        gradient descent on the 5x5 normal equations.
+
+        Args:
+            labels: Outcome per decision, e.g. 1.0 for FeedbackLabel.CORRECT
+                and 0.0 for WRONG
+            anomaly_scores ... temporal_decay: Factor columns, as for
+                calculate_confidence_batch(); invalid rows are skipped
+            iterations: Gradient steps
+
+        Returns:
+            ConfidenceScorer with the fitted weights
+        """
+        reference = cls()
+        signals = reference.factor_signals(
+            anomaly_scores, recurrence_counts, mission_phases, policy_allowed, temporal_decay, on_invalid="nan"
+        )
+        target = np.asarray(labels, dtype=np.float64)
+        keep = np.isfinite(signals).all(axis=1) & np.isfinite(target)
+        signals, target = signals[keep], target[keep]
+        if signals.shape[0] == 0:
+            raise ValueError("No valid labeled decisions to fit confidence weights")
+
+        gram = signals.T @ signals / signals.shape[0]
+        moment = signals.T @ target / signals.shape[0]
+        step = 1.0 / max(np.linalg.eigvalsh(gram)[-1], 1e-12)
+
+        weights = reference.weights
+        for _ in range(iterations):
+            weights = _project_to_simplex(weights - step * (gram @ weights - moment))
+
+        logger.info(f"Fitted confidence weights on {signals.shape[0]} decisions: {np.round(weights, 3).tolist()}")
+        return cls(*weights.tolist())
+
     @staticmethod
     def _clamp(value: float, min_val: float, max_val: float) -> float:
         """Clamp value to range [min_val, max_val]."""
         return max(min_val, min(max_val, value))
 
 
+def _project_to_simplex(values: np.ndarray) -> np.ndarray:
+    """Euclidean projection onto {w >= 0, sum(w) = 1} (Duchi et al., 2008)."""
+    ordered = np.sort(values)[::-1]
+    cumulative = np.cumsum(ordered) - 1.0
+    rho = np.nonzero(ordered - cumulative / np.arange(1, len(values) + 1) > 0)[0][-1]
+    return np.maximum(values - cumulative[rho] / (rho + 1), 0.0)
+
+
 # Convenience function for quick integration
 def calculate_confidence(
     anomaly_score: float,
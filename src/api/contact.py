@@ -4,11 +4,14 @@ Contact Form API
 Handles contact form submissions with validation, rate limiting, spam protection,
 and persistence. Includes admin endpoint for reviewing submissions.
 
-Optimized for async I/O performance using aiosqlite and connection pooling.
+Persistence goes through ContactStore (api.contact_store): a bounded, WAL-mode
+aiosqlite pool with coalesced inserts, keyset pagination and maintained
+per-status counts.
 """
 
 import os
 import re
+import math
 import logging
 import sqlite3
 import json
@@ -24,6 +27,9 @@ from fastapi.responses import JSONResponse
 import aiosqlite
 import aiofiles
 
+from api.contact_store import ContactStore, apply_schema
+from core.local_rate_limiter import ShardedRateLimiter
+
 
 # Declare variables BEFORE try block
 REDIS_AVAILABLE: bool
@@ -55,7 +61,7 @@ else:
 
 router: APIRouter = APIRouter(prefix="/api/contact", tags=["contact"])
 
-DATA_DIR: Path = Path("data")
+DATA_DIR: Path = Path(os.getenv("CONTACT_DATA_DIR", "data"))
 DB_PATH: Path = DATA_DIR / "contact_submissions.db"
 NOTIFICATION_LOG: Path = DATA_DIR / "contact_notifications.log"
 CONTACT_EMAIL: str = os.getenv("CONTACT_EMAIL", "support@astraguard.ai")
@@ -67,10 +73,9 @@ TRUSTED_PROXIES: set[str] = {ip.strip() for ip in _raw_trusted.split(",") if ip.
 RATE_LIMIT_SUBMISSIONS: int = 5
 RATE_LIMIT_WINDOW: int = 3600
 
-# Database connection pool
+# Database connection pool (see get_contact_store)
 DB_POOL_SIZE: int = 10
-_db_connection_pool: deque = deque(maxlen=DB_POOL_SIZE)
-_pool_lock: asyncio.Lock = asyncio.Lock()
+_contact_store: Optional[ContactStore] = None
 
 # Batch logging buffer
 _log_buffer: deque = deque()
@@ -141,6 +146,7 @@ class SubmissionsResponse(BaseModel):
     limit: int
     offset: int
     submissions: List[SubmissionRecord]
+    next_cursor: Optional[str] = None
 
 
 def init_database() -> None:
@@ -162,35 +168,10 @@ def init_database() -> None:
 
     try:
         conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS contact_submissions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                email TEXT NOT NULL,
-                phone TEXT,
-                subject TEXT NOT NULL,
-                message TEXT NOT NULL,
-                ip_address TEXT,
-                user_agent TEXT,
-                submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                status TEXT DEFAULT 'pending'
-            )
-        """)
-
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_submitted_at
-            ON contact_submissions(submitted_at DESC)
-        """)
-
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_status
-            ON contact_submissions(status)
-        """)
-
-        conn.commit()
-        conn.close()
+        try:
+            apply_schema(conn)
+        finally:
+            conn.close()
         
         logger.info(
             "Contact database initialized successfully",
@@ -225,37 +206,20 @@ def init_database() -> None:
 
 class InMemoryRateLimiter:
     """
-    Optimized in-memory rate limiter with efficient cleanup strategy.
-    Uses deque for O(1) append operations and periodic cleanup.
-    """
+    Per-IP submission limiter backed by the sharded GCRA limiter.
 
-    def __init__(self) -> None:
-        self.requests: dict[str, deque[datetime]] = {}
-        self._lock = asyncio.Lock()
-        self._last_cleanup: datetime = datetime.now()
-        self._cleanup_interval: int = 300  # Run cleanup every 5 minutes
+    O(1) memory per client, no global lock, and idle clients expire
+    incrementally instead of in a periodic sweep.
+    """
 
-    async def _periodic_cleanup(self, window: int) -> None:
-        """Periodically clean up expired entries to prevent memory bloat"""
-        now = datetime.now()
-        if (now - self._last_cleanup).total_seconds() < self._cleanup_interval:
-            return
-            
-        cutoff = now - timedelta(seconds=window)
-        keys_to_delete = []
-        
-        for key, timestamps in self.requests.items():
-            # Remove expired timestamps
-            while timestamps and timestamps[0] <= cutoff:
-                timestamps.popleft()
-            
-            if not timestamps:
-                keys_to_delete.append(key)
-        
-        for key in keys_to_delete:
-            del self.requests[key]
-        
-        self._last_cleanup = now
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self.limiter: ShardedRateLimiter = ShardedRateLimiter(
+            RATE_LIMIT_SUBMISSIONS,
+            RATE_LIMIT_WINDOW,
+            max_keys=max_keys,
+            # Late-bound so tests patching get_client_ip/TRUSTED_PROXIES are honoured
+            key_func=lambda request: get_client_ip(request),
+        )
 
     async def is_allowed(self, key: str, limit: int, window: int) -> tuple[bool, dict[str, Any]]:
         """
@@ -264,47 +228,27 @@ class InMemoryRateLimiter:
         Returns:
             tuple: (is_allowed, metadata) where metadata contains:
                 - remaining: requests remaining in current window
-                - reset_at: when the rate limit window resets
+                - reset_at: when the client is back to a full allowance
                 - limit: total requests allowed per window
+                - retry_after: seconds until the next submission is accepted
         """
-        async with self._lock:
-            now = datetime.now()
-            cutoff = now - timedelta(seconds=window)
-
-            if key in self.requests:
-                # Efficient cleanup using deque
-                while self.requests[key] and self.requests[key][0] <= cutoff:
-                    self.requests[key].popleft()
-                
-                if not self.requests[key]:
-                    del self.requests[key]
-            
-            if key not in self.requests:
-                self.requests[key] = deque()
-
-            current_count = len(self.requests[key])
-            is_allowed = current_count < limit
-            
-            # Calculate reset time (oldest request + window)
-            reset_at = None
-            if self.requests[key]:
-                oldest = self.requests[key][0]
-                reset_at = (oldest + timedelta(seconds=window)).isoformat()
-            
-            metadata = {
-                "limit": limit,
-                "remaining": max(0, limit - current_count - (1 if is_allowed else 0)),
-                "reset_at": reset_at,
-                "window_seconds": window
-            }
-
-            if is_allowed:
-                self.requests[key].append(now)
-
-            # Run periodic cleanup
-            await self._periodic_cleanup(window)
+        decision = self.limiter.hit(key, limit=limit, window=window)
+        reset_at = None
+        if decision.reset_after > 0:
+            reset_at = (datetime.now() + timedelta(seconds=decision.reset_after)).isoformat()
+
+        metadata = {
+            "limit": limit,
+            "remaining": decision.remaining,
+            "reset_at": reset_at,
+            "window_seconds": window,
+            "retry_after": int(math.ceil(decision.retry_after)),
+        }
+        return decision.allowed, metadata
 
-            return is_allowed, metadata
+    def clear(self) -> None:
+        """Forget all tracked clients."""
+        self.limiter.clear()
 
 
 # Initialize database and limiter
@@ -312,25 +256,31 @@ init_database()
 _in_memory_limiter: InMemoryRateLimiter = InMemoryRateLimiter()
 
 
-async def get_db_connection() -> aiosqlite.Connection:
-    """Get a database connection from the pool or create a new one"""
-    async with _pool_lock:
-        if _db_connection_pool:
-            return _db_connection_pool.popleft()
-    
-    # Create new connection if pool is empty
-    conn = await aiosqlite.connect(DB_PATH)
-    conn.row_factory = aiosqlite.Row
-    return conn
-
+async def get_contact_store() -> ContactStore:
+    """
+    Get the shared contact store, starting it on first use.
 
-async def return_db_connection(conn: aiosqlite.Connection) -> None:
-    """Return a database connection to the pool"""
-    async with _pool_lock:
-        if len(_db_connection_pool) < DB_POOL_SIZE:
-            _db_connection_pool.append(conn)
-        else:
-            await conn.close()
+    A new store is opened when DB_PATH changes or when called from a
+    different event loop than the one the current store was started in.
+    """
+    global _contact_store
+    loop = asyncio.get_running_loop()
+    store = _contact_store
+    if store is None or store.db_path != Path(DB_PATH) or (store.loop not in (None, loop)):
+        if store is not None and store.loop is loop:
+            await store.close()
+        store = ContactStore(DB_PATH, pool_size=DB_POOL_SIZE)
+        _contact_store = store
+    await store.start()
+    return store
+
+
+async def close_contact_store() -> None:
+    """Flush pending writes and close the shared contact store."""
+    global _contact_store
+    store, _contact_store = _contact_store, None
+    if store is not None:
+        await store.close()
 
 
 @lru_cache(maxsize=128)
@@ -398,37 +348,28 @@ async def save_submission(
 ) -> Optional[int]:
     """Save contact submission to database with error handling."""
     try:
-        async with aiosqlite.connect(DB_PATH) as conn:
-            cursor = await conn.execute(
-                """
-                INSERT INTO contact_submissions
-                    (name, email, phone, subject, message, ip_address, user_agent)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    submission.name,
-                    submission.email,
-                    submission.phone,
-                    submission.subject,
-                    submission.message,
-                    ip_address,
-                    user_agent,
-                ),
-            )
-            await conn.commit()
-            submission_id = cursor.lastrowid
-            
-            logger.info(
-                "Contact submission saved",
-                extra={
-                    "submission_id": submission_id,
-                    "email": submission.email,
-                    "ip_address": ip_address
-                }
-            )
-            
-            return submission_id
-            
+        store = await get_contact_store()
+        submission_id = await store.insert((
+            submission.name,
+            submission.email,
+            submission.phone,
+            submission.subject,
+            submission.message,
+            ip_address,
+            user_agent,
+        ))
+
+        logger.info(
+            "Contact submission saved",
+            extra={
+                "submission_id": submission_id,
+                "email": submission.email,
+                "ip_address": ip_address
+            }
+        )
+
+        return submission_id
+
     except aiosqlite.IntegrityError as e:
         logger.error(
             "Database integrity error saving submission",
@@ -684,39 +625,24 @@ async def get_submissions(
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
     status_filter: Optional[str] = Query(None, pattern="^(pending|resolved|spam)$"),
+    cursor: Optional[str] = Query(None, max_length=256, description="next_cursor from the previous page"),
     current_user: Any = Depends(get_admin_user),
 ) -> SubmissionsResponse:
-    """Get contact submissions with pagination and filtering."""
-    where_clause = ""
-    params: list[Any] = []
-
-    if status_filter:
-        where_clause = "WHERE status = ?"
-        params.append(status_filter)
-
-    # where_clause is constructed from hardcoded string literal, not user input. Safe from injection.
-    count_query = f"SELECT COUNT(*) AS total FROM contact_submissions {where_clause}"  # nosec B608
-    select_query = f"""
-        SELECT id, name, email, phone, subject, message,
-               ip_address, user_agent, submitted_at, status
-        FROM contact_submissions
-        {where_clause}
-        ORDER BY submitted_at DESC
-        LIMIT ? OFFSET ?
-    """  # nosec B608
+    """
+    Get contact submissions, newest first, with filtering.
 
+    Pass the returned ``next_cursor`` back as ``cursor`` to page through
+    results at constant cost; ``offset`` is kept for compatibility and is
+    ignored when a cursor is given.
+    """
     try:
-        async with aiosqlite.connect(DB_PATH) as conn:
-            conn.row_factory = aiosqlite.Row
-
-            async with conn.execute(count_query, params) as cursor:
-                row = await cursor.fetchone()
-                if row is None:
-                    raise HTTPException(status_code=500, detail="Failed to count submissions")
-                total: int = row["total"]
-
-            async with conn.execute(select_query, [*params, limit, offset]) as cursor:
-                rows = await cursor.fetchall()
+        store = await get_contact_store()
+        try:
+            rows, total, next_cursor = await store.fetch_page(
+                limit, status=status_filter, cursor=cursor, offset=offset
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid pagination cursor")
 
         submissions = [
             SubmissionRecord(
@@ -737,10 +663,14 @@ async def get_submissions(
         return SubmissionsResponse(
             total=total,
             limit=limit,
-            offset=offset,
+            offset=0 if cursor else offset,
             submissions=submissions,
+            next_cursor=next_cursor,
         )
-        
+
+    except HTTPException:
+        # Re-raise HTTP exceptions (400 for a malformed cursor)
+        raise
     except aiosqlite.OperationalError as e:
         logger.error(
             "Database operational error fetching submissions",
@@ -773,9 +703,6 @@ async def get_submissions(
             status_code=500,
             detail="Failed to fetch submissions"
         )
-    except HTTPException:
-        # Re-raise HTTP exceptions (500 from count query)
-        raise
     except Exception as e:
         logger.error(
             "Unexpected error fetching submissions",
@@ -801,15 +728,9 @@ async def update_submission_status(
     """Update submission status with error handling."""
     
     try:
-        async with aiosqlite.connect(DB_PATH) as conn:
-            cursor = await conn.execute(
-                "UPDATE contact_submissions SET status = ? WHERE id = ?",
-                (status, submission_id),
-            )
-            await conn.commit()
-
-            if cursor.rowcount == 0:
-                raise HTTPException(status_code=404, detail="Submission not found")
+        store = await get_contact_store()
+        if not await store.update_status(submission_id, status):
+            raise HTTPException(status_code=404, detail="Submission not found")
 
         logger.info(
             "Submission status updated",
@@ -875,19 +796,11 @@ async def update_submission_status(
 
 @router.get("/health")
 async def contact_health() -> dict[str, Any]:
-    """Health check with connection pooling and cached status"""
+    """Health check backed by the pooled store and maintained counts"""
     try:
-        conn = await get_db_connection()
-        try:
-            async with conn.execute(
-                "SELECT COUNT(*) FROM contact_submissions"
-            ) as cursor:
-                row = await cursor.fetchone()
-                if row is None:
-                    raise HTTPException(status_code=503, detail="Health check query failed")
-                total_submissions: int = row[0]
-        finally:
-            await return_db_connection(conn)
+        store = await get_contact_store()
+        total_submissions: int = await store.count()
+        stats = await store.pool_stats()
 
         rate_limiter_status = "redis" if REDIS_AVAILABLE else "in-memory"
 
@@ -897,7 +810,8 @@ async def contact_health() -> dict[str, Any]:
             "total_submissions": total_submissions,
             "rate_limiter": rate_limiter_status,
             "email_configured": SENDGRID_API_KEY is not None,
-            "connection_pool_size": len(_db_connection_pool),
+            "connection_pool_size": stats.idle_connections,
+            "pending_writes": store.pending_writes,
             "log_buffer_size": len(_log_buffer),
         }
 
@@ -934,15 +848,14 @@ async def pool_health() -> dict[str, Any]:
     Returns pool metrics including active connections, idle connections,
     total created, timeouts, and average wait time.
     """
-    if not is_pool_enabled():
-        return {
-            "status": "disabled",
-            "message": "Connection pooling is not enabled"
-        }
-    
-    stats = await get_pool_stats()
-    
-    if stats is None:
+    try:
+        store = await get_contact_store()
+        stats = await store.pool_stats()
+    except Exception as e:
+        logger.error(
+            "Pool statistics unavailable",
+            extra={"error_type": type(e).__name__, "error_message": str(e)},
+        )
         raise HTTPException(
             status_code=503,
             detail="Pool statistics unavailable"
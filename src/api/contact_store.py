@@ -0,0 +1,384 @@
+"""
+Contact Submission Store
+
+Pooled, WAL-mode data layer for the contact API.
+
+- Connections come from a bounded AsyncConnectionPool and are reused across
+  requests; each one is opened once with WAL journaling and tuned PRAGMAs.
+  All SQL is fixed text, so sqlite3's per-connection statement cache keeps
+  every statement prepared.
+- Inserts are coalesced: concurrent submissions queue up behind a single
+  writer task that commits them as one transaction (group commit).
+- Listing uses keyset pagination on (submitted_at, id), so reading page N
+  costs the same as reading page 1.
+- Per-status totals live in contact_status_counts and are maintained by
+  triggers, replacing COUNT(*) scans.
+"""
+
+import asyncio
+import base64
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import aiosqlite
+
+from src.db.pool_config import PoolConfig
+from src.db.pool_manager import AsyncConnectionPool
+from src.db.pool_metrics import PoolStats
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+# PRAGMAs applied to every pooled connection. journal_mode=WAL lets readers
+# run alongside the writer; synchronous=NORMAL is durable in WAL mode except
+# for the last transactions before a power loss.
+CONTACT_PRAGMAS: Dict[str, Any] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -8000,
+    "temp_store": "MEMORY",
+}
+
+SUBMISSION_COLUMNS: Tuple[str, ...] = (
+    "id", "name", "email", "phone", "subject", "message",
+    "ip_address", "user_agent", "submitted_at", "status",
+)
+
+SCHEMA: Tuple[str, ...] = (
+    """
+    CREATE TABLE IF NOT EXISTS contact_submissions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        email TEXT NOT NULL,
+        phone TEXT,
+        subject TEXT NOT NULL,
+        message TEXT NOT NULL,
+        ip_address TEXT,
+        user_agent TEXT,
+        submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        status TEXT DEFAULT 'pending'
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_submitted_at ON contact_submissions(submitted_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_status ON contact_submissions(status)",
+    # Keyset pagination indices: ORDER BY submitted_at DESC, id DESC with and without a status filter
+    "CREATE INDEX IF NOT EXISTS idx_submitted_at_id ON contact_submissions(submitted_at DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_status_submitted_at_id "
+    "ON contact_submissions(status, submitted_at DESC, id DESC)",
+    """
+    CREATE TABLE IF NOT EXISTS contact_status_counts (
+        status TEXT PRIMARY KEY,
+        total INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+)
+
+COUNT_TRIGGERS: Tuple[str, ...] = (
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_contact_count_insert
+    AFTER INSERT ON contact_submissions
+    BEGIN
+        INSERT INTO contact_status_counts (status, total) VALUES (NEW.status, 1)
+        ON CONFLICT(status) DO UPDATE SET total = total + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_contact_count_delete
+    AFTER DELETE ON contact_submissions
+    BEGIN
+        UPDATE contact_status_counts SET total = total - 1 WHERE status = OLD.status;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_contact_count_update
+    AFTER UPDATE OF status ON contact_submissions
+    WHEN OLD.status IS NOT NEW.status
+    BEGIN
+        UPDATE contact_status_counts SET total = total - 1 WHERE status = OLD.status;
+        INSERT INTO contact_status_counts (status, total) VALUES (NEW.status, 1)
+        ON CONFLICT(status) DO UPDATE SET total = total + 1;
+    END
+    """,
+)
+
+_COLUMNS_SQL = ", ".join(SUBMISSION_COLUMNS)
+
+INSERT_SQL = """
+    INSERT INTO contact_submissions
+        (name, email, phone, subject, message, ip_address, user_agent)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+UPDATE_STATUS_SQL = "UPDATE contact_submissions SET status = ? WHERE id = ?"
+COUNT_ALL_SQL = "SELECT COALESCE(SUM(total), 0) FROM contact_status_counts"
+COUNT_STATUS_SQL = "SELECT COALESCE(SUM(total), 0) FROM contact_status_counts WHERE status = ?"
+STATUS_COUNTS_SQL = "SELECT status, total FROM contact_status_counts"
+
+# One fixed statement per (status filter, cursor) combination so each stays prepared
+_ORDER = "ORDER BY submitted_at DESC, id DESC"
+PAGE_SQL: Dict[Tuple[bool, bool], str] = {
+    (False, False): f"SELECT {_COLUMNS_SQL} FROM contact_submissions {_ORDER} LIMIT ? OFFSET ?",
+    (True, False): f"SELECT {_COLUMNS_SQL} FROM contact_submissions "
+                   f"WHERE status = ? {_ORDER} LIMIT ? OFFSET ?",
+    (False, True): f"SELECT {_COLUMNS_SQL} FROM contact_submissions "
+                   f"WHERE (submitted_at, id) < (?, ?) {_ORDER} LIMIT ?",
+    (True, True): f"SELECT {_COLUMNS_SQL} FROM contact_submissions "
+                  f"WHERE status = ? AND (submitted_at, id) < (?, ?) {_ORDER} LIMIT ?",
+}
+
+_PendingInsert = Tuple[Sequence[Any], "asyncio.Future[int]"]
+
+
+def apply_schema(conn: sqlite3.Connection) -> None:
+    """
+    Create tables, indices and count triggers on a synchronous connection.
+
+    Switches the database to WAL mode (persistent in the file). When the
+    count triggers are installed for the first time, contact_status_counts
+    is rebuilt from the existing rows in the same transaction.
+    """
+    conn.execute("PRAGMA journal_mode = WAL")
+    with conn:
+        for statement in SCHEMA:
+            conn.execute(statement)
+        installed = conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_contact_count_%'"
+        ).fetchone()[0]
+        if installed < len(COUNT_TRIGGERS):
+            conn.execute("DELETE FROM contact_status_counts")
+            conn.execute(
+                "INSERT INTO contact_status_counts (status, total) "
+                "SELECT status, COUNT(*) FROM contact_submissions GROUP BY status"
+            )
+            for statement in COUNT_TRIGGERS:
+                conn.execute(statement)
+
+
+def encode_cursor(submitted_at: Optional[str], submission_id: int) -> str:
+    """Encode the (submitted_at, id) position of a row as an opaque cursor."""
+    raw = f"{submitted_at or ''}|{submission_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        submitted_at, _, submission_id = raw.rpartition("|")
+        return submitted_at, int(submission_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid pagination cursor: {cursor!r}") from e
+
+
+class ContactStore:
+    """
+    Pooled data access for contact submissions.
+
+    Call start() inside the event loop that will use the store and close()
+    on shutdown. Inserts from concurrent requests are coalesced by a single
+    writer task into transactions of at most ``max_batch`` rows.
+    """
+
+    def __init__(
+        self,
+        db_path: Union[str, Path],
+        pool_size: int = 10,
+        max_batch: int = 256,
+        connection_timeout: float = 10.0,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.max_batch = max_batch
+        self.pool = AsyncConnectionPool(PoolConfig(
+            max_size=pool_size,
+            min_size=1,
+            connection_timeout=connection_timeout,
+            db_path=str(self.db_path),
+            validation_interval=30.0,
+            pragmas=dict(CONTACT_PRAGMAS),
+        ))
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: List[_PendingInsert] = []
+        self._wakeup = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self._start_lock = asyncio.Lock()
+        self._started = False
+        self._closed = False
+
+    async def start(self) -> None:
+        """Open the pool and start the writer task (idempotent)."""
+        async with self._start_lock:
+            if self._started:
+                return
+            self.loop = asyncio.get_running_loop()
+            await self.pool.initialize()
+            self._writer = asyncio.create_task(self._write_loop())
+            self._started = True
+
+    async def close(self) -> None:
+        """Flush queued inserts, stop the writer and close the pool."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer is not None:
+            self._wakeup.set()
+            await self._writer
+        await self.pool.close()
+
+    async def insert(self, values: Sequence[Any]) -> int:
+        """
+        Queue one submission row and wait for its commit.
+
+        Args:
+            values: (name, email, phone, subject, message, ip_address, user_agent)
+
+        Returns:
+            The new submission id
+        """
+        if self._closed:
+            raise RuntimeError("ContactStore is closed")
+        future: "asyncio.Future[int]" = asyncio.get_running_loop().create_future()
+        self._pending.append((values, future))
+        self._wakeup.set()
+        return await future
+
+    async def _write_loop(self) -> None:
+        """Drain queued inserts in batches until the store is closed."""
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending:
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                await self._write_batch(batch)
+            if self._closed:
+                return
+
+    async def _write_batch(self, batch: List[_PendingInsert]) -> None:
+        """Commit a batch in one transaction; on integrity errors fall back to row-at-a-time."""
+        try:
+            async with self.pool.acquire() as conn:
+                try:
+                    await conn.executemany(INSERT_SQL, [values for values, _ in batch])
+                    # AUTOINCREMENT ids within a single writer transaction are consecutive
+                    async with conn.execute("SELECT last_insert_rowid()") as cursor:
+                        row = await cursor.fetchone()
+                    await conn.commit()
+                except sqlite3.IntegrityError:
+                    await conn.rollback()
+                    await self._write_rows(conn, batch)
+                    return
+                except BaseException:
+                    await conn.rollback()
+                    raise
+        except Exception as e:
+            logger.error(
+                "Contact submission batch failed",
+                extra={"error_type": type(e).__name__, "error_message": str(e), "batch_size": len(batch)},
+            )
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        first_id = row[0] - len(batch) + 1
+        for offset, (_, future) in enumerate(batch):
+            if not future.done():
+                future.set_result(first_id + offset)
+
+    async def _write_rows(self, conn: aiosqlite.Connection, batch: List[_PendingInsert]) -> None:
+        """Insert rows individually so one bad row does not fail its neighbours."""
+        for values, future in batch:
+            try:
+                cursor = await conn.execute(INSERT_SQL, values)
+                await conn.commit()
+                if not future.done():
+                    future.set_result(cursor.lastrowid)
+            except sqlite3.Error as e:
+                await conn.rollback()
+                if not future.done():
+                    future.set_exception(e)
+
+    async def fetch_page(
+        self,
+        limit: int,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+    ) -> Tuple[List[aiosqlite.Row], int, Optional[str]]:
+        """
+        Fetch one page of submissions, newest first.
+
+        With a cursor the page starts strictly after that position (keyset
+        pagination); without one, ``offset`` rows are skipped.
+
+        Returns:
+            (rows, total matching the status filter, cursor for the next page or None)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        params: List[Any] = [status] if status else []
+        if cursor:
+            params.extend(decode_cursor(cursor))
+            params.append(limit + 1)
+        else:
+            params.extend((limit + 1, offset))
+        query = PAGE_SQL[(bool(status), bool(cursor))]
+
+        async with self.pool.acquire() as conn:
+            async with conn.execute(query, params) as cur:
+                # Per cursor: the pooled connection is shared with other callers
+                cur.row_factory = aiosqlite.Row
+                rows = list(await cur.fetchall())
+            total = await self._count(conn, status)
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(last["submitted_at"], last["id"])
+        return rows, total, next_cursor
+
+    async def count(self, status: Optional[str] = None) -> int:
+        """Number of submissions, optionally for one status, from the counts table."""
+        async with self.pool.acquire() as conn:
+            return await self._count(conn, status)
+
+    async def status_counts(self) -> Dict[str, int]:
+        """Submission totals keyed by status."""
+        async with self.pool.acquire() as conn:
+            async with conn.execute(STATUS_COUNTS_SQL) as cur:
+                return {row[0]: row[1] for row in await cur.fetchall() if row[1]}
+
+    @staticmethod
+    async def _count(conn: aiosqlite.Connection, status: Optional[str]) -> int:
+        if status:
+            query, params = COUNT_STATUS_SQL, (status,)
+        else:
+            query, params = COUNT_ALL_SQL, ()
+        async with conn.execute(query, params) as cur:
+            row = await cur.fetchone()
+        return int(row[0])
+
+    async def update_status(self, submission_id: int, status: str) -> bool:
+        """Set a submission's status. Returns False if the id does not exist."""
+        async with self.pool.acquire() as conn:
+            cursor = await conn.execute(UPDATE_STATUS_SQL, (status, submission_id))
+            await conn.commit()
+            return cursor.rowcount > 0
+
+    async def pool_stats(self) -> PoolStats:
+        """Connection pool statistics."""
+        return await self.pool.get_stats()
+
+    @property
+    def pending_writes(self) -> int:
+        """Inserts queued but not yet handed to the writer."""
+        return len(self._pending)
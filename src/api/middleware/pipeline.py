@@ -0,0 +1,747 @@
+"""
+Pure-ASGI Request Pipeline for FastAPI
+
+Replaces stacked BaseHTTPMiddleware layers with one composable chain of
+pure-ASGI stages. No stage wraps the request in a task or re-buffers the
+response stream; each adds at most one receive/send wrapper.
+
+Stages:
+- CorrelationIdStage: propagates or generates X-Correlation-ID
+- SampledLoggingStage: request/response logging with sampling
+- LatencyStage: request latency histogram
+- RateLimitStage: token-bucket rate limiting (429 short-circuit)
+- AdmissionControlStage: priority/tenant admission control (503 shedding)
+- ResponseCompressionStage: zstd/gzip negotiated from Accept-Encoding
+- ZstdDecompressionStage: streaming request decompression with a size guard
+
+Any stage can be skipped for routes by path prefix:
+
+    app.add_middleware(
+        RequestPipeline,
+        stages=[stage(CorrelationIdStage), stage(LatencyStage, histogram=H)],
+        skip={"/metrics": {"latency"}},
+    )
+"""
+
+import gzip
+import logging
+import random
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+import structlog
+import zstandard as zstd
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+request_logger = structlog.get_logger("api.logging_middleware")
+
+CORRELATION_HEADER = b"x-correlation-id"
+
+# Sensitive headers to exclude from logging
+SENSITIVE_HEADERS: Set[str] = {
+    "authorization",
+    "cookie",
+    "set-cookie",
+    "x-api-key",
+    "x-auth-token",
+    "proxy-authorization",
+    "www-authenticate",
+}
+
+# High-traffic endpoints for sampling
+HIGH_TRAFFIC_ENDPOINTS: Set[str] = {
+    "/health",
+    "/health/live",
+    "/health/ready",
+    "/metrics",
+}
+
+
+def get_header(scope: Scope, name: bytes) -> Optional[bytes]:
+    """Return the first raw header value (lower-case name) from an ASGI scope."""
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value
+    return None
+
+
+def merge_vary(headers: Iterable[Tuple[bytes, bytes]], token: bytes) -> bytes:
+    """Combined value of a response's Vary headers, with token added if missing."""
+    tokens = [
+        t.strip() for k, v in headers if k == b"vary" for t in v.split(b",") if t.strip()
+    ]
+    if b"*" not in tokens and token.lower() not in (t.lower() for t in tokens):
+        tokens.append(token)
+    return b", ".join(tokens)
+
+
+async def send_plain_response(
+    send: Send,
+    status: int,
+    body: bytes,
+    content_type: bytes = b"application/json",
+    headers: Sequence[Tuple[bytes, bytes]] = ()
+) -> None:
+    """Send a complete response without going through the application."""
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", content_type),
+            (b"content-length", str(len(body)).encode()),
+            *headers,
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class PipelineStage:
+    """
+    Base class for pipeline stages.
+
+    A stage is a pure-ASGI application wrapping the next stage. Subclasses
+    set ``name`` (used for per-route skipping) and implement ``handle``;
+    non-HTTP scopes bypass every stage.
+    """
+
+    name = "stage"
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        await self.handle(scope, receive, send)
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.app(scope, receive, send)
+
+
+StageSpec = Tuple[type, Dict[str, Any]]
+
+
+def stage(stage_class: type, **options: Any) -> StageSpec:
+    """Describe a pipeline stage and its options for RequestPipeline."""
+    return stage_class, options
+
+
+class RequestPipeline:
+    """
+    Single ASGI middleware running a chain of pipeline stages.
+
+    One chain is composed per distinct set of skipped stages, and the chain
+    for each path is memoized, so per-route skipping costs a dict lookup.
+    """
+
+    PATH_CACHE_SIZE = 4096
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        stages: Sequence[StageSpec],
+        skip: Optional[Mapping[str, Iterable[str]]] = None
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            app: The ASGI application
+            stages: Stage specs, outermost first (see stage())
+            skip: Path prefix → names of stages to bypass for those routes
+        """
+        self.app = app
+        self.stages = list(stages)
+        self.stage_names = [cls.name for cls, _ in self.stages]
+        self.skip_rules: List[Tuple[str, FrozenSet[str]]] = sorted(
+            ((prefix, frozenset(names)) for prefix, names in (skip or {}).items()),
+            key=lambda rule: len(rule[0]),
+            reverse=True,
+        )
+        unknown = {n for _, names in self.skip_rules for n in names} - set(self.stage_names)
+        if unknown:
+            raise ValueError(f"Unknown pipeline stages in skip rules: {sorted(unknown)}")
+
+        self._chains: Dict[FrozenSet[str], ASGIApp] = {}
+        self._path_chains: "OrderedDict[str, ASGIApp]" = OrderedDict()
+        self._default_chain = self._chain(frozenset())
+
+    def _chain(self, skipped: FrozenSet[str]) -> ASGIApp:
+        chain = self._chains.get(skipped)
+        if chain is None:
+            chain = self.app
+            for stage_class, options in reversed(self.stages):
+                if stage_class.name not in skipped:
+                    chain = stage_class(chain, **options)
+            self._chains[skipped] = chain
+        return chain
+
+    def chain_for_path(self, path: str) -> ASGIApp:
+        """Return the composed chain for a request path."""
+        if not self.skip_rules:
+            return self._default_chain
+        chain = self._path_chains.get(path)
+        if chain is None:
+            skipped: Set[str] = set()
+            for prefix, names in self.skip_rules:
+                if path.startswith(prefix):
+                    skipped |= names
+            chain = self._chain(frozenset(skipped))
+            self._path_chains[path] = chain
+            if len(self._path_chains) > self.PATH_CACHE_SIZE:
+                self._path_chains.popitem(last=False)
+        return chain
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        await self.chain_for_path(scope["path"])(scope, receive, send)
+
+
+# ============================================================================
+# Stages
+# ============================================================================
+
+
+class CorrelationIdStage(PipelineStage):
+    """
+    Attach a correlation ID to each request.
+
+    Reuses a well-formed incoming X-Correlation-ID, otherwise generates one.
+    The ID is exposed as ``request.state.correlation_id``, bound to the
+    structlog context and echoed in the response headers.
+    """
+
+    name = "correlation"
+
+    MAX_INCOMING_LENGTH = 128
+
+    def __init__(self, app: ASGIApp, trust_incoming: bool = True):
+        super().__init__(app)
+        self.trust_incoming = trust_incoming
+
+    def _correlation_id(self, scope: Scope) -> str:
+        if self.trust_incoming:
+            incoming = get_header(scope, CORRELATION_HEADER)
+            if incoming and len(incoming) <= self.MAX_INCOMING_LENGTH:
+                try:
+                    value = incoming.decode("ascii")
+                except UnicodeDecodeError:
+                    value = ""
+                if value and all(c.isalnum() or c in "-_." for c in value):
+                    return value
+        return str(uuid.uuid4())
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        correlation_id = self._correlation_id(scope)
+        scope.setdefault("state", {})["correlation_id"] = correlation_id
+
+        structlog.contextvars.clear_contextvars()
+        structlog.contextvars.bind_contextvars(correlation_id=correlation_id)
+        header = (CORRELATION_HEADER, correlation_id.encode())
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), header]
+            await send(message)
+
+        await self.app(scope, receive, send_with_id)
+
+
+class SampledLoggingStage(PipelineStage):
+    """
+    Log API requests and responses.
+
+    High-traffic endpoints are sampled at ``sample_rate``; everything else
+    is always logged. Sensitive headers are never logged.
+    """
+
+    name = "logging"
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = 0.1,
+        high_traffic_paths: Optional[Iterable[str]] = None,
+        log_headers: bool = True
+    ):
+        super().__init__(app)
+        self.sample_rate = max(0.0, min(1.0, sample_rate))  # Clamp between 0 and 1
+        self.high_traffic_paths = set(high_traffic_paths or HIGH_TRAFFIC_ENDPOINTS)
+        self.log_headers = log_headers
+
+    def _should_log(self, path: str) -> bool:
+        if path not in self.high_traffic_paths:
+            return True
+        return random.random() < self.sample_rate
+
+    @staticmethod
+    def _filter_headers(scope: Scope) -> Dict[str, str]:
+        return {
+            key.decode("latin-1"): value.decode("latin-1")
+            for key, value in scope.get("headers", ())
+            if key.decode("latin-1") not in SENSITIVE_HEADERS
+        }
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope["path"]
+        if not self._should_log(path):
+            await self.app(scope, receive, send)
+            return
+
+        correlation_id = scope.get("state", {}).get("correlation_id")
+        method = scope["method"]
+        client = scope.get("client")
+        query_string = scope.get("query_string", b"")
+        request_logger.info(
+            "api_request",
+            correlation_id=correlation_id,
+            method=method,
+            path=path,
+            query_params=query_string.decode("latin-1") if query_string else None,
+            client_host=client[0] if client else None,
+            headers=self._filter_headers(scope) if self.log_headers else None,
+        )
+
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_and_capture(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_capture)
+        except Exception as e:
+            request_logger.error(
+                "api_error",
+                correlation_id=correlation_id,
+                method=method,
+                path=path,
+                error=str(e),
+                error_type=type(e).__name__,
+                duration_ms=round((time.perf_counter() - start_time) * 1000, 2),
+            )
+            raise
+
+        request_logger.info(
+            "api_response",
+            correlation_id=correlation_id,
+            method=method,
+            path=path,
+            status_code=status_code,
+            duration_ms=round((time.perf_counter() - start_time) * 1000, 2),
+        )
+
+
+class LatencyStage(PipelineStage):
+    """
+    Observe request latency into a Prometheus histogram.
+
+    ``on_complete(scope, status_code, duration_seconds)`` is called after
+    every request, e.g. to refresh gauges.
+    """
+
+    name = "latency"
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        histogram: Any = None,
+        on_complete: Optional[Callable[[Scope, int, float], None]] = None
+    ):
+        super().__init__(app)
+        self.histogram = histogram
+        self.on_complete = on_complete
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_and_capture(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_capture)
+        finally:
+            duration = time.perf_counter() - start_time
+            if self.histogram is not None:
+                self.histogram.observe(duration)
+            if self.on_complete is not None:
+                self.on_complete(scope, status_code, duration)
+
+
+class RateLimitStage(PipelineStage):
+    """
+    Rate-limit requests with the token-bucket limiters from core.rate_limiter.
+
+    ``resolve_limiter(path)`` returns ``(limiter, endpoint_label)`` or
+    ``None`` when the path is not limited (or limiting is not configured).
+    """
+
+    name = "rate_limit"
+
+    def __init__(self, app: ASGIApp, resolve_limiter: Callable[[str], Optional[Tuple[Any, str]]]):
+        super().__init__(app)
+        self.resolve_limiter = resolve_limiter
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        resolved = self.resolve_limiter(scope["path"])
+        if resolved is None:
+            await self.app(scope, receive, send)
+            return
+
+        from core.rate_limiter import rate_limit_blocks, rate_limit_hits, rate_limit_latency
+
+        limiter, endpoint = resolved
+        start_time = time.perf_counter()
+        allowed = await limiter.is_allowed()
+        if rate_limit_latency:
+            rate_limit_latency.labels(endpoint=endpoint).observe(time.perf_counter() - start_time)
+
+        if not allowed:
+            if rate_limit_blocks:
+                rate_limit_blocks.labels(endpoint=endpoint).inc()
+            retry_after = limiter.get_retry_after()
+            body = (
+                '{"error":"Rate limit exceeded","message":"Too many requests. '
+                f'Try again in {retry_after} seconds.","retry_after":{retry_after}}}'
+            ).encode()
+            await send_plain_response(
+                send, 429, body, headers=[(b"retry-after", str(retry_after).encode())]
+            )
+            return
+
+        if rate_limit_hits:
+            rate_limit_hits.labels(endpoint=endpoint).inc()
+        await self.app(scope, receive, send)
+
+
+class AdmissionControlStage(PipelineStage):
+    """
+    Admit requests through a core.connection_limiter.AdmissionController.
+
+    The priority class comes from the longest matching path prefix in
+    ``route_priorities`` (else ``default_priority``); the tenant is the API
+    key header, falling back to the client host. Shed requests get a 503
+    with Retry-After. The slot is held until the response body completes,
+    and the observed latency feeds the adaptive concurrency limit.
+    """
+
+    name = "admission"
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: Any,
+        route_priorities: Optional[Mapping[str, int]] = None,
+        default_priority: Optional[int] = None,
+        tenant_header: bytes = b"x-api-key"
+    ):
+        from core.connection_limiter import Priority
+
+        super().__init__(app)
+        self.controller = controller
+        self.default_priority = Priority(Priority.NORMAL if default_priority is None else default_priority)
+        self.route_rules: List[Tuple[str, Any]] = sorted(
+            ((prefix, Priority(priority)) for prefix, priority in (route_priorities or {}).items()),
+            key=lambda rule: len(rule[0]),
+            reverse=True,
+        )
+        self.tenant_header = tenant_header
+        self._path_priorities: "OrderedDict[str, Any]" = OrderedDict()
+
+    def priority_for(self, path: str) -> Any:
+        """Return the priority class for a request path (memoized)."""
+        priority = self._path_priorities.get(path)
+        if priority is None:
+            priority = self.default_priority
+            for prefix, rule_priority in self.route_rules:
+                if path.startswith(prefix):
+                    priority = rule_priority
+                    break
+            self._path_priorities[path] = priority
+            if len(self._path_priorities) > RequestPipeline.PATH_CACHE_SIZE:
+                self._path_priorities.popitem(last=False)
+        return priority
+
+    def tenant_for(self, scope: Scope) -> str:
+        key = get_header(scope, self.tenant_header)
+        if key:
+            return "key:" + key.decode("latin-1")
+        client = scope.get("client")
+        return "ip:" + client[0] if client else "anonymous"
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        from core.connection_limiter import AdmissionRejected
+
+        try:
+            ticket = await self.controller.acquire(self.priority_for(scope["path"]), self.tenant_for(scope))
+        except AdmissionRejected as exc:
+            body = (
+                '{"error":"Service overloaded","message":"Request shed under load. '
+                f'Try again in {exc.retry_after} seconds.","reason":"{exc.reason}",'
+                f'"retry_after":{exc.retry_after}}}'
+            ).encode()
+            await send_plain_response(
+                send, 503, body, headers=[(b"retry-after", str(exc.retry_after).encode())]
+            )
+            return
+
+        dropped = True
+        try:
+            await self.app(scope, receive, send)
+            dropped = False
+        finally:
+            self.controller.release(ticket, dropped=dropped)
+
+
+class RequestBodyRejected(Exception):
+    """Request body could not be accepted (too large or undecodable)."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class _DecompressedSink:
+    """Write target for zstd.stream_writer that enforces the size limit."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.total = 0
+        self.chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self.total += len(data)
+        if self.total > self.max_size:
+            raise RequestBodyRejected(413, "Request body too large")
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data = self.chunks[0] if len(self.chunks) == 1 else b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+class ZstdDecompressionStage(PipelineStage):
+    """
+    Decompress zstd request bodies incrementally as they are received.
+
+    Memory is bounded by the chunk size rather than the body size, and
+    decompression stops as soon as ``max_size`` decompressed bytes is
+    exceeded (413). Corrupt input is rejected with 400. Whatever the
+    application does with the failed read, the client gets that response.
+    """
+
+    name = "decompression"
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_size: int = 16 * 1024 * 1024,
+        write_size: int = 64 * 1024
+    ):
+        super().__init__(app)
+        self.max_size = max_size
+        self.write_size = write_size
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = get_header(scope, b"content-encoding")
+        if encoding is None or encoding.lower() != b"zstd":
+            await self.app(scope, receive, send)
+            return
+
+        # Downstream sees the decoded body: drop encoding and stale length
+        scope = dict(scope)
+        scope["headers"] = [
+            (k, v) for k, v in scope["headers"] if k not in (b"content-encoding", b"content-length")
+        ]
+        sink = _DecompressedSink(self.max_size)
+        # One decompressor per request: a decompressor's context is shared by its writers
+        writer = zstd.ZstdDecompressor().stream_writer(sink, write_size=self.write_size, closefd=False)
+        rejection: Optional[RequestBodyRejected] = None
+        responded = False
+
+        async def decompressing_receive() -> Message:
+            nonlocal rejection
+            message = await receive()
+            if message["type"] != "http.request":
+                return message
+            chunk = message.get("body", b"")
+            try:
+                if chunk:
+                    writer.write(chunk)
+                    writer.flush()
+            except RequestBodyRejected as e:
+                rejection = e
+                raise
+            except zstd.ZstdError as e:
+                rejection = RequestBodyRejected(400, "Decompression failed")
+                raise rejection from e
+            return {
+                "type": "http.request",
+                "body": sink.take(),
+                "more_body": message.get("more_body", False),
+            }
+
+        async def reject() -> None:
+            nonlocal responded
+            responded = True
+            logger.warning(f"Rejected zstd request body: {rejection} ({rejection.status})")
+            await send_plain_response(send, rejection.status, str(rejection).encode(), b"text/plain")
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal responded
+            if rejection is not None:
+                # Replace the application's error response with ours
+                if not responded and message["type"] == "http.response.start":
+                    await reject()
+                return
+            if message["type"] == "http.response.start":
+                responded = True
+            await send(message)
+
+        try:
+            await self.app(scope, decompressing_receive, guarded_send)
+        except Exception:
+            if rejection is None:
+                raise
+        if rejection is not None and not responded:
+            await reject()
+
+
+class ResponseCompressionStage(PipelineStage):
+    """
+    Compress responses with zstd or gzip based on Accept-Encoding.
+
+    zstd is preferred when the client accepts both. Small, already-encoded
+    and non-compressible responses pass through untouched; streaming
+    responses are compressed chunk by chunk.
+    """
+
+    name = "compression"
+
+    INCOMPRESSIBLE_PREFIXES = (b"image/", b"video/", b"audio/", b"application/zip",
+                               b"application/gzip", b"application/zstd", b"text/event-stream")
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        zstd_level: int = 3,
+        gzip_level: int = 6,
+        encodings: Sequence[str] = ("zstd", "gzip")
+    ):
+        super().__init__(app)
+        self.minimum_size = minimum_size
+        self.zstd_level = zstd_level
+        self.gzip_level = gzip_level
+        self.encodings = tuple(encodings)
+        self.zstd_compressor = zstd.ZstdCompressor(level=zstd_level)
+
+    def negotiate(self, scope: Scope) -> Optional[str]:
+        """Pick the preferred encoding the client accepts (q=0 excluded)."""
+        accept = get_header(scope, b"accept-encoding")
+        if not accept:
+            return None
+        accepted = set()
+        for part in accept.decode("latin-1").lower().split(","):
+            coding, _, params = part.strip().partition(";")
+            if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                continue
+            accepted.add(coding.strip())
+        for encoding in self.encodings:
+            if encoding in accepted or "*" in accepted:
+                return encoding
+        return None
+
+    def _compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "zstd":
+            return self.zstd_compressor.compress(body)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def _compressobj(self, encoding: str):
+        if encoding == "zstd":
+            cobj = zstd.ZstdCompressor(level=self.zstd_level).compressobj()
+            return cobj.compress, lambda: cobj.flush(zstd.COMPRESSOBJ_FLUSH_BLOCK), cobj.flush
+        cobj = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return cobj.compress, lambda: cobj.flush(zlib.Z_SYNC_FLUSH), cobj.flush
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = self.negotiate(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        passthrough = False
+        streaming = None  # (compress, flush, finish) once streaming starts
+
+        async def compressing_send(message: Message) -> None:
+            nonlocal start_message, passthrough, streaming
+
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", ())
+                passthrough = any(
+                    (k == b"content-encoding")
+                    or (k == b"content-type" and v.startswith(self.INCOMPRESSIBLE_PREFIXES))
+                    for k, v in headers
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    start_message = message  # Defer until the first body chunk
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start_message is not None:
+                start = start_message
+                start_message = None
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+
+                original = start.get("headers", ())
+                headers = [(k, v) for k, v in original if k not in (b"content-length", b"vary")]
+                headers.append((b"content-encoding", encoding.encode()))
+                headers.append((b"vary", merge_vary(original, b"Accept-Encoding")))
+
+                if not more_body:
+                    compressed = self._compress(encoding, body)
+                    headers.append((b"content-length", str(len(compressed)).encode()))
+                    await send({**start, "headers": headers})
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+
+                streaming = self._compressobj(encoding)
+                await send({**start, "headers": headers})
+
+            compress, flush, finish = streaming
+            if more_body:
+                data = compress(body) + flush()
+            else:
+                data = compress(body) + finish()
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, compressing_send)
@@ -67,7 +67,7 @@ from core.auth import (
     APIKey,
 )
 from api.auth import get_api_key
-from api.logging_middleware import RequestLoggingMiddleware, get_correlation_id
+from api.logging_middleware import get_correlation_id
 from state_machine.state_engine import StateMachine, MissionPhase
 from config.mission_phase_policy_loader import MissionPhasePolicyLoader
 from anomaly_agent.phase_aware_handler import PhaseAwareAnomalyHandler
@@ -85,7 +85,8 @@ if TYPE_CHECKING:
     from security_engine.predictive_maintenance import PredictiveMaintenanceEngine
 from fastapi.responses import Response
 from core.metrics import get_metrics_text, get_metrics_content_type
-from core.rate_limiter import RateLimiter, RateLimitMiddleware, get_rate_limit_config
+from core.rate_limiter import RateLimiter, get_rate_limit_config
+from core.connection_limiter import AdmissionController, GradientLimit, Priority, set_admission_controller
 from core.shutdown import get_shutdown_manager
 from backend.redis_client import RedisClient
 import numpy as np
@@ -93,7 +94,17 @@ from numpy.typing import NDArray
 from astraguard.logging_config import get_logger
 import msgpack
 from fastapi import Request
-from api.middleware.network_optimization import ZstdMiddleware
+from api.middleware.pipeline import (
+    RequestPipeline,
+    stage,
+    CorrelationIdStage,
+    SampledLoggingStage,
+    LatencyStage,
+    RateLimitStage,
+    AdmissionControlStage,
+    ResponseCompressionStage,
+    ZstdDecompressionStage,
+)
 from prometheus_client import Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
 
 logger = get_logger(__name__)
@@ -257,6 +268,13 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     if redis_client:
         await redis_client.close()
 
+    # Flush queued contact submissions and close the contact store pool
+    try:
+        from api.contact import close_contact_store
+        await close_contact_store()
+    except Exception as e:
+        print(f"[WARNING] Contact store cleanup failed: {e}")
+
     # Close database connection pool
     try:
         from src.db.database import close_pool
@@ -276,9 +294,6 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# Add network optimization middleware (compression)
-app.add_middleware(ZstdMiddleware)
-
 # Add TLS enforcement middleware (early in the stack)
 # This ensures all internal service communication uses TLS
 tls_config = get_tls_config("api")
@@ -311,24 +326,64 @@ app.add_middleware(
     allow_headers=["Content-Type", "Authorization", "Accept"],
 )
 
-# Request logging middleware
-log_level = get_secret("log_level", "INFO")
-sample_rate = float(get_secret("log_sample_rate", "0.1"))  # 10% sampling for high-traffic endpoints
-app.add_middleware(
-    RequestLoggingMiddleware,
-    log_level=log_level,
-    sample_rate=sample_rate,
-)
-
 START_TIME = time.time()
 
-@app.middleware("http")
-async def monitoring_middleware(request: Request, call_next):
-    with HTTP_REQUEST_LATENCY.time():
-        response = await call_next(request)
 
+def _resolve_rate_limiter(path: str) -> Optional[Tuple[RateLimiter, str]]:
+    """Pick the rate limiter for a path (None until limiters are initialized)."""
+    if path.startswith("/api/v1/telemetry"):
+        return (telemetry_limiter, "telemetry") if telemetry_limiter else None
+    return (api_limiter, "api") if api_limiter else None
+
+
+def _record_uptime(scope: Any, status_code: int, duration: float) -> None:
     UPTIME_SECONDS.set(time.time() - START_TIME)
-    return response
+
+
+# Admission priority classes by path prefix (everything else is NORMAL):
+# telemetry ingestion is protected, deferrable reads and forms are shed first
+ROUTE_PRIORITIES = {
+    "/api/v1/telemetry": Priority.CRITICAL,
+    "/api/v1/history": Priority.BACKGROUND,
+    "/api/v1/feedback": Priority.BACKGROUND,
+    "/api/v1/system/diagnostics": Priority.BACKGROUND,
+    "/api/contact": Priority.BACKGROUND,
+}
+
+admission_controller = AdmissionController(
+    limit=GradientLimit(
+        initial_limit=int(get_secret("admission_initial_limit", "64")),
+        min_limit=int(get_secret("admission_min_limit", "8")),
+        max_limit=int(get_secret("admission_max_limit", "1024")),
+    )
+)
+# Background work (e.g. re-encryption) reads live load from the global controller
+set_admission_controller(admission_controller)
+
+# Request pipeline (pure ASGI): correlation IDs, sampled logging, latency,
+# rate limiting, admission control, response compression and streaming zstd
+# request decoding
+sample_rate = float(get_secret("log_sample_rate", "0.1"))  # 10% sampling for high-traffic endpoints
+max_request_body = int(get_secret("max_request_body_bytes", str(16 * 1024 * 1024)))
+app.add_middleware(
+    RequestPipeline,
+    stages=[
+        stage(CorrelationIdStage),
+        stage(SampledLoggingStage, sample_rate=sample_rate),
+        stage(LatencyStage, histogram=HTTP_REQUEST_LATENCY, on_complete=_record_uptime),
+        stage(RateLimitStage, resolve_limiter=_resolve_rate_limiter),
+        stage(AdmissionControlStage, controller=admission_controller, route_priorities=ROUTE_PRIORITIES),
+        stage(ResponseCompressionStage),
+        stage(ZstdDecompressionStage, max_size=max_request_body),
+    ],
+    skip={
+        "/health": {"rate_limit", "admission", "compression"},
+        "/metrics": {"rate_limit", "admission"},
+        "/docs": {"rate_limit", "admission"},
+        "/redoc": {"rate_limit", "admission"},
+        "/openapi.json": {"rate_limit", "admission"},
+    },
+)
 
 security = HTTPBasic()
 
@@ -607,7 +607,8 @@ class EnhancedRecoveryOrchestrator(OrchestratorBase):
         - "duration > X" - time-based condition
 
         Security: Uses safe_condition_parser instead of eval()
-        to prevent code injection attacks.
+        to prevent code injection attacks. Each condition string is
+        compiled once and cached, so repeated steps only evaluate it.
 
         Args:
             condition: Condition string from YAML
@@ -10,24 +10,42 @@ Security Features:
 - Type-safe variable substitution
 - Resource limits (no loops, no function calls)
 - Timeout protection via simple expression complexity limits
+- Bounded nesting depth
 
 Supports:
 - Comparisons: >=, <=, >, <, ==, !=
 - Logical: and, or
 - Literals: numbers, strings (quoted)
-- Variables: severity, recurrence_count, confidence, step
+- Variables: severity, recurrence_count, confidence, step, duration
+
+Each distinct condition string is tokenized and parsed once into an AST,
+constant-folded, and compiled into a tree of closures over a fixed
+variable-lookup table. Compiled conditions are LRU-cached by source string,
+so repeated evaluation only pays for the variable lookups and comparisons.
 
 Examples:
 - "always" → True
 - "severity >= 0.8" → True/False based on context
 - "severity >= 0.8 and recurrence_count >= 2" → Combined logic
 - "recurrence_count >= 3 or severity >= 0.9" → OR logic
+
+Batch evaluation:
+- evaluate_conditions([...], context) → many rules against one snapshot
+- compile_condition(expr).evaluate_columns({"severity": array}) → one rule
+  over a column of snapshots (backtesting)
 """
 
-import re
-from typing import Dict, Any, Union
+import logging
+import operator
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Tuple, Union
 from enum import Enum
 
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
 
 class TokenType(Enum):
     """Token types for lexical analysis."""
@@ -53,6 +71,41 @@ class Token:
         return f"Token({self.type}, {self.value!r})"
 
 
+# ============================================================================
+# AST
+# ============================================================================
+
+
+@dataclass(frozen=True)
+class Literal:
+    """Constant number, string or (after folding) boolean."""
+    value: Any
+
+
+@dataclass(frozen=True)
+class Variable:
+    """Whitelisted context variable."""
+    name: str
+
+
+@dataclass(frozen=True)
+class Compare:
+    """Binary comparison."""
+    op: str
+    left: Any
+    right: Any
+
+
+@dataclass(frozen=True)
+class BoolOp:
+    """N-ary 'and' / 'or'."""
+    op: str
+    operands: Tuple[Any, ...]
+
+
+Node = Union[Literal, Variable, Compare, BoolOp]
+
+
 class SafeConditionParser:
     """
     Safe expression parser for recovery condition evaluation.
@@ -63,12 +116,12 @@ class SafeConditionParser:
 
     # Whitelist of allowed comparison operators
     COMPARISON_OPS = {
-        ">=": lambda a, b: a >= b,
-        "<=": lambda a, b: a <= b,
-        ">": lambda a, b: a > b,
-        "<": lambda a, b: a < b,
-        "==": lambda a, b: a == b,
-        "!=": lambda a, b: a != b,
+        ">=": operator.ge,
+        "<=": operator.le,
+        ">": operator.gt,
+        "<": operator.lt,
+        "==": operator.eq,
+        "!=": operator.ne,
     }
 
     # Whitelist of allowed variables
@@ -83,6 +136,9 @@ class SafeConditionParser:
     # Maximum expression complexity (prevents DoS)
     MAX_TOKENS = 50
 
+    # Maximum parenthesis nesting depth
+    MAX_DEPTH = 16
+
     def __init__(self):
         self.tokens = []
         self.current = 0
@@ -98,12 +154,27 @@ class SafeConditionParser:
         Returns:
             Boolean result of evaluation
 
+        Raises:
+            ValueError: If expression is invalid or unsafe
+        """
+        return compile_condition(expression).evaluate(context)
+
+    def parse(self, expression: str) -> Node:
+        """
+        Parse a condition expression into a constant-folded AST.
+
+        Args:
+            expression: Condition string
+
+        Returns:
+            Root AST node
+
         Raises:
             ValueError: If expression is invalid or unsafe
         """
         # Special case: "always" keyword
         if expression.strip().lower() == "always":
-            return True
+            return Literal(True)
 
         # Tokenize
         self.tokens = self._tokenize(expression)
@@ -112,15 +183,15 @@ class SafeConditionParser:
         if len(self.tokens) > self.MAX_TOKENS:
             raise ValueError(f"Expression too complex ({len(self.tokens)} tokens > {self.MAX_TOKENS} max)")
 
-        # Parse and evaluate
+        # Parse
         self.current = 0
-        result = self._parse_or_expression(context)
+        tree = self._parse_or_expression(0)
 
         # Ensure all tokens consumed
         if self._current_token().type != TokenType.EOF:
             raise ValueError(f"Unexpected token at position {self.current}: {self._current_token()}")
 
-        return result
+        return fold_constants(tree)
 
     def _tokenize(self, expression: str) -> list:
         """
@@ -159,15 +230,11 @@ class SafeConditionParser:
             if expression[i] in ('"', "'"):
                 quote_char = expression[i]
                 start = i
-                i += 1
-                string_val = ""
-                while i < length and expression[i] != quote_char:
-                    string_val += expression[i]
-                    i += 1
-                if i >= length:
+                end = expression.find(quote_char, i + 1)
+                if end == -1:
                     raise ValueError(f"Unterminated string at position {start}")
-                i += 1  # Skip closing quote
-                tokens.append(Token(TokenType.STRING, string_val, start))
+                tokens.append(Token(TokenType.STRING, expression[i + 1:end], start))
+                i = end + 1  # Skip closing quote
                 continue
 
             # Operators (>=, <=, >, <, ==, !=)
@@ -242,65 +309,65 @@ class SafeConditionParser:
         if self.current < len(self.tokens) - 1:
             self.current += 1
 
-    def _parse_or_expression(self, context: Dict[str, Union[int, float]]) -> bool:
+    def _parse_or_expression(self, depth: int) -> Node:
         """
         Parse OR expression: and_expr (or and_expr)*
 
         Args:
-            context: Variable values
+            depth: Current parenthesis nesting depth
 
         Returns:
-            Boolean result
+            AST node
         """
-        result = self._parse_and_expression(context)
+        operands = [self._parse_and_expression(depth)]
 
         while self._current_token().type == TokenType.LOGICAL and self._current_token().value == "or":
             self._advance()  # consume 'or'
-            right = self._parse_and_expression(context)
-            result = result or right
+            operands.append(self._parse_and_expression(depth))
 
-        return result
+        return operands[0] if len(operands) == 1 else BoolOp("or", tuple(operands))
 
-    def _parse_and_expression(self, context: Dict[str, Union[int, float]]) -> bool:
+    def _parse_and_expression(self, depth: int) -> Node:
         """
         Parse AND expression: comparison (and comparison)*
 
         Args:
-            context: Variable values
+            depth: Current parenthesis nesting depth
 
         Returns:
-            Boolean result
+            AST node
         """
-        result = self._parse_comparison(context)
+        operands = [self._parse_comparison(depth)]
 
         while self._current_token().type == TokenType.LOGICAL and self._current_token().value == "and":
             self._advance()  # consume 'and'
-            right = self._parse_comparison(context)
-            result = result and right
+            operands.append(self._parse_comparison(depth))
 
-        return result
+        return operands[0] if len(operands) == 1 else BoolOp("and", tuple(operands))
 
-    def _parse_comparison(self, context: Dict[str, Union[int, float]]) -> bool:
+    def _parse_comparison(self, depth: int) -> Node:
         """
         Parse comparison: value OPERATOR value
 
         Args:
-            context: Variable values
+            depth: Current parenthesis nesting depth
 
         Returns:
-            Boolean result
+            AST node
         """
         # Handle parentheses
         if self._current_token().type == TokenType.LPAREN:
+            if depth >= self.MAX_DEPTH:
+                raise ValueError(f"Expression nested too deeply (> {self.MAX_DEPTH} levels)")
             self._advance()  # consume '('
-            result = self._parse_or_expression(context)
+            result = self._parse_or_expression(depth + 1)
             if self._current_token().type != TokenType.RPAREN:
                 raise ValueError(f"Expected ')' at position {self.current}")
             self._advance()  # consume ')'
             return result
 
         # Parse left value
-        left = self._parse_value(context)
+        left = self._parse_value()
 
         # Expect operator
         if self._current_token().type != TokenType.OPERATOR:
@@ -309,51 +376,293 @@ class SafeConditionParser:
                 f"got {self._current_token()}"
             )
 
-        operator = self._current_token().value
+        operator_symbol = self._current_token().value
         self._advance()
 
         # Parse right value
-        right = self._parse_value(context)
+        right = self._parse_value()
 
-        # Perform comparison
-        op_func = self.COMPARISON_OPS[operator]
-        return op_func(left, right)
+        return Compare(operator_symbol, left, right)
 
-    def _parse_value(self, context: Dict[str, Union[int, float]]) -> Union[int, float, str]:
+    def _parse_value(self) -> Node:
         """
         Parse value: NUMBER | STRING | VARIABLE
 
-        Args:
-            context: Variable values
-
         Returns:
-            Value (number, string, or variable value from context)
+            Literal or Variable node
         """
         token = self._current_token()
 
-        if token.type == TokenType.NUMBER:
+        if token.type in (TokenType.NUMBER, TokenType.STRING):
             self._advance()
-            return token.value
-
-        if token.type == TokenType.STRING:
-            self._advance()
-            return token.value
+            return Literal(token.value)
 
         if token.type == TokenType.VARIABLE:
-            var_name = token.value
             self._advance()
+            return Variable(token.value)
 
-            # Look up variable in context
-            if var_name not in context:
-                raise ValueError(f"Variable '{var_name}' not provided in context")
+        raise ValueError(f"Expected value at position {self.current}, got {token}")
 
-            return context[var_name]
 
-        raise ValueError(f"Expected value at position {self.current}, got {token}")
+# ============================================================================
+# CONSTANT FOLDING AND COMPILATION
+# ============================================================================
+
+# Fixed lookup table: every whitelisted variable has one slot, so a context
+# is resolved once and shared by every condition evaluated against it.
+VARIABLE_SLOTS = {
+    name: slot for slot, name in enumerate(sorted(SafeConditionParser.ALLOWED_VARIABLES))
+}
+
+_MISSING = object()
+
+
+def fold_constants(node: Node) -> Node:
+    """
+    Fold literal-only comparisons and simplify boolean operators.
+
+    Args:
+        node: AST node
+
+    Returns:
+        Equivalent AST with constant sub-expressions evaluated
+    """
+    if isinstance(node, Compare):
+        left, right = fold_constants(node.left), fold_constants(node.right)
+        if isinstance(left, Literal) and isinstance(right, Literal):
+            try:
+                return Literal(bool(SafeConditionParser.COMPARISON_OPS[node.op](left.value, right.value)))
+            except TypeError:
+                pass  # Leave mistyped comparisons to fail at evaluation, as before
+        return Compare(node.op, left, right)
+
+    if isinstance(node, BoolOp):
+        absorbing = node.op == "or"  # True absorbs 'or', False absorbs 'and'
+        operands = []
+        for child in map(fold_constants, node.operands):
+            # Flatten nested operators of the same kind
+            children = child.operands if isinstance(child, BoolOp) and child.op == node.op else (child,)
+            for operand in children:
+                if isinstance(operand, Literal) and isinstance(operand.value, bool):
+                    if operand.value is absorbing:
+                        return Literal(absorbing)
+                    continue  # Identity element
+                operands.append(operand)
+        if not operands:
+            return Literal(not absorbing)
+        if len(operands) == 1:
+            return operands[0]
+        return BoolOp(node.op, tuple(operands))
+
+    return node
+
+
+def _compile_value(node: Node) -> Tuple[bool, Any]:
+    """Return (is_constant, value_or_slot) for a comparison operand."""
+    if isinstance(node, Literal):
+        return True, node.value
+    return False, VARIABLE_SLOTS[node.name]
+
+
+def _compile_node(node: Node) -> Callable[[tuple], Any]:
+    """Compile an AST node into a closure over a resolved values tuple."""
+    if isinstance(node, Literal):
+        value = node.value
+        return lambda values: value
+
+    if isinstance(node, Compare):
+        op = SafeConditionParser.COMPARISON_OPS[node.op]
+        left_const, left = _compile_value(node.left)
+        right_const, right = _compile_value(node.right)
+        if right_const and not left_const:
+            return lambda values: op(values[left], right)
+        if left_const and not right_const:
+            return lambda values: op(left, values[right])
+        return lambda values: op(values[left], values[right])
+
+    if isinstance(node, BoolOp):
+        compiled = [_compile_node(operand) for operand in node.operands]
+        if len(compiled) == 2:
+            first, second = compiled
+            if node.op == "and":
+                return lambda values: first(values) and second(values)
+            return lambda values: first(values) or second(values)
+        if node.op == "and":
+            return lambda values: all(fn(values) for fn in compiled)
+        return lambda values: any(fn(values) for fn in compiled)
+
+    raise ValueError(f"Unsupported expression node: {node!r}")
+
+
+def _compile_vectorized(node: Node) -> Callable[[list, int], np.ndarray]:
+    """Compile an AST node into an element-wise NumPy evaluator."""
+    if isinstance(node, Literal):
+        value = node.value
+        return lambda columns, size: np.full(size, value)
+
+    if isinstance(node, Compare):
+        op = SafeConditionParser.COMPARISON_OPS[node.op]
+        left_const, left = _compile_value(node.left)
+        right_const, right = _compile_value(node.right)
+
+        def operand(is_const, ref, columns):
+            return ref if is_const else columns[ref]
+
+        return lambda columns, size: np.asarray(
+            op(operand(left_const, left, columns), operand(right_const, right, columns)),
+            dtype=bool
+        )
+
+    if isinstance(node, BoolOp):
+        compiled = [_compile_vectorized(operand) for operand in node.operands]
+        combine = np.logical_and if node.op == "and" else np.logical_or
+        return lambda columns, size: combine.reduce([fn(columns, size) for fn in compiled])
+
+    raise ValueError(f"Unsupported expression node: {node!r}")
+
+
+def _collect_variables(node: Node, names: set) -> set:
+    if isinstance(node, Variable):
+        names.add(node.name)
+    elif isinstance(node, Compare):
+        _collect_variables(node.left, names)
+        _collect_variables(node.right, names)
+    elif isinstance(node, BoolOp):
+        for operand in node.operands:
+            _collect_variables(operand, names)
+    return names
+
+
+def resolve_context(context: Mapping[str, Any]) -> tuple:
+    """
+    Resolve a context dict into the shared variable-lookup table.
+
+    Args:
+        context: Variable values
+
+    Returns:
+        Tuple indexed by VARIABLE_SLOTS (missing variables marked)
+    """
+    get = context.get
+    return tuple(get(name, _MISSING) for name in VARIABLE_SLOTS)
+
+
+class CompiledCondition:
+    """
+    A parsed, constant-folded and compiled condition.
+
+    Immutable and thread-safe; obtain instances via compile_condition().
+    """
+
+    __slots__ = ("source", "tree", "variables", "_slots", "_fn", "_vector_fn")
+
+    def __init__(self, source: str, tree: Node):
+        self.source = source
+        self.tree = tree
+        self.variables = tuple(sorted(_collect_variables(tree, set())))
+        self._slots = tuple(VARIABLE_SLOTS[name] for name in self.variables)
+        self._fn = _compile_node(tree)
+        self._vector_fn = None
+
+    def evaluate(self, context: Mapping[str, Any]) -> bool:
+        """
+        Evaluate the condition against one context.
+
+        Args:
+            context: Variable values
+
+        Returns:
+            Boolean result
+
+        Raises:
+            ValueError: If a referenced variable is missing from context
+        """
+        return self.evaluate_resolved(resolve_context(context))
+
+    def evaluate_resolved(self, values: tuple) -> bool:
+        """Evaluate against a table produced by resolve_context()."""
+        for slot, name in zip(self._slots, self.variables):
+            if values[slot] is _MISSING:
+                raise ValueError(f"Variable '{name}' not provided in context")
+        return bool(self._fn(values))
+
+    def evaluate_columns(self, columns: Mapping[str, Any]) -> np.ndarray:
+        """
+        Evaluate the condition element-wise over columns of snapshots.
 
+        Args:
+            columns: Variable name → 1-D array of values (equal lengths)
+
+        Returns:
+            Boolean array with one result per snapshot
 
-# Global parser instance (thread-safe as parsing is stateless)
-_parser = SafeConditionParser()
+        Raises:
+            ValueError: If a referenced column is missing or lengths differ
+        """
+        table: List[Any] = [None] * len(VARIABLE_SLOTS)
+        size = None
+        for name in self.variables:
+            if name not in columns:
+                raise ValueError(f"Variable '{name}' not provided in context")
+            column = np.asarray(columns[name])
+            if size is not None and column.shape[0] != size:
+                raise ValueError("All condition columns must have the same length")
+            size = column.shape[0]
+            table[VARIABLE_SLOTS[name]] = column
+        if size is None:
+            # Constant condition: size from any supplied column
+            size = len(next(iter(columns.values()))) if columns else 1
+
+        if self._vector_fn is None:
+            self._vector_fn = _compile_vectorized(self.tree)
+        return np.broadcast_to(self._vector_fn(table, size), (size,)).astype(bool)
+
+    def __call__(self, context: Mapping[str, Any]) -> bool:
+        return self.evaluate(context)
+
+    def __repr__(self):
+        return f"CompiledCondition({self.source!r})"
+
+
+@lru_cache(maxsize=1024)
+def compile_condition(expression: str) -> CompiledCondition:
+    """
+    Parse and compile a condition expression (LRU-cached by source string).
+
+    Args:
+        expression: Condition string (e.g., "severity >= 0.8")
+
+    Returns:
+        CompiledCondition ready for repeated evaluation
+
+    Raises:
+        ValueError: If expression is invalid or unsafe
+    """
+    return CompiledCondition(expression, SafeConditionParser().parse(expression))
+
+
+def evaluate_conditions(
+    expressions: Iterable[str],
+    context: Mapping[str, Any]
+) -> List[bool]:
+    """
+    Evaluate many conditions against one context snapshot.
+
+    The context is resolved into the lookup table once and shared by every
+    condition.
+
+    Args:
+        expressions: Condition strings
+        context: Variable values
+
+    Returns:
+        One boolean per expression, in order
+
+    Raises:
+        ValueError: If any expression is invalid or references a missing variable
+    """
+    values = resolve_context(context)
+    return [compile_condition(expression).evaluate_resolved(values) for expression in expressions]
 
 
 def safe_evaluate_condition(
@@ -388,13 +697,11 @@ def safe_evaluate_condition(
         True
     """
     try:
-        return _parser.evaluate(expression, context)
+        return compile_condition(expression).evaluate(context)
     except ValueError:
         # Validation and safety errors from the parser should surface to callers/tests
         raise
     except Exception as e:
         # Unexpected errors -> log and re-raise as ValueError to keep the API consistent
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"Unexpected error evaluating condition '{expression}': {e}", exc_info=True)
         raise ValueError("Unexpected error while evaluating condition") from e
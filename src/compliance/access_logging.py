@@ -2,12 +2,21 @@
 Access Control Logging for AstraGuard
 
 Tracks login/logout and permission changes.
+
+Events are indexed by user as they are logged, so access history lookups
+do not scan other users' events. With a ComplianceEventStore attached,
+events are also written through to SQLite.
 """
 
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, TYPE_CHECKING
 from datetime import datetime
 
+from src.compliance.data_retention import DataType
+
+if TYPE_CHECKING:
+    from src.compliance.event_store import ComplianceEventStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,11 +30,19 @@ class AccessControlLogger:
     - Access attempt logging
     """
     
-    def __init__(self):
+    def __init__(self, store: Optional["ComplianceEventStore"] = None):
         """Initialize access control logger."""
         self._events: List[Dict] = []
+        self._by_user: Dict[str, List[Dict]] = {}
+        self.store = store
         logger.info("Access control logger initialized")
     
+    def _record(self, event: Dict):
+        self._events.append(event)
+        self._by_user.setdefault(event["user_id"], []).append(event)
+        if self.store is not None:
+            self.store.submit(event, source="access", data_type=DataType.USER_DATA)
+    
     def log_login(self, user_id: str, ip_address: str, success: bool):
         """Log login attempt."""
         event = {
@@ -36,7 +53,7 @@ class AccessControlLogger:
             "success": success
         }
         
-        self._events.append(event)
+        self._record(event)
         logger.info(f"Login logged: {user_id} - {'success' if success else 'failed'}")
     
     def log_logout(self, user_id: str):
@@ -47,7 +64,7 @@ class AccessControlLogger:
             "user_id": user_id
         }
         
-        self._events.append(event)
+        self._record(event)
         logger.info(f"Logout logged: {user_id}")
     
     def log_permission_change(
@@ -67,12 +84,12 @@ class AccessControlLogger:
             "new_permissions": new_permissions
         }
         
-        self._events.append(event)
+        self._record(event)
         logger.info(f"Permission change logged for user: {user_id}")
     
     def get_user_access_history(self, user_id: str) -> List[Dict]:
         """Get access history for user."""
-        return [e for e in self._events if e.get("user_id") == user_id]
+        return list(self._by_user.get(user_id, ()))
 
 
 # Global instance
@@ -2,13 +2,25 @@
 Audit Trail System for AstraGuard
 
 Implements immutable audit trail for compliance.
+
+Events are indexed by user and event type as they are recorded, and event
+times are kept in a parallel list, so queries cost the size of the matching
+index rather than a scan of the whole trail. With a ComplianceEventStore
+attached, every event is also written through to SQLite for durable,
+large-scale queries, export and retention.
 """
 
+import bisect
 import logging
 import json
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, TYPE_CHECKING
 from datetime import datetime
 
+from src.compliance.data_retention import DataType
+
+if TYPE_CHECKING:
+    from src.compliance.event_store import ComplianceEventStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,13 +30,18 @@ class AuditTrail:
     
     Features:
     - Event tracking
-    - Compliance queries
-    - Immutable storage
+    - Indexed compliance queries (user, event type, time range)
+    - Immutable storage, optionally persisted to a ComplianceEventStore
     """
     
-    def __init__(self):
+    def __init__(self, store: Optional["ComplianceEventStore"] = None):
         """Initialize audit trail."""
         self._events: List[Dict] = []
+        self._times: List[float] = []
+        self._times_sorted = True
+        self._by_user: Dict[str, List[int]] = {}
+        self._by_type: Dict[str, List[int]] = {}
+        self.store = store
         logger.info("Audit trail system initialized")
     
     def record_event(
@@ -35,16 +52,26 @@ class AuditTrail:
         details: Optional[Dict] = None
     ) -> str:
         """Record audit event."""
+        now = datetime.now()
         event = {
             "event_id": f"EVT-{len(self._events) + 1:08d}",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "event_type": event_type,
             "user_id": user_id,
             "action": action,
             "details": details or {}
         }
         
+        position = len(self._events)
         self._events.append(event)
+        timestamp = now.timestamp()
+        if self._times and timestamp < self._times[-1]:
+            self._times_sorted = False  # Clock stepped back; range queries fall back to filtering
+        self._times.append(timestamp)
+        self._by_user.setdefault(user_id, []).append(position)
+        self._by_type.setdefault(event_type, []).append(position)
+        if self.store is not None:
+            self.store.submit(event, source="audit", data_type=DataType.AUDIT_LOGS)
         logger.info(f"Audit event recorded: {event['event_id']}")
         
         return event["event_id"]
@@ -57,32 +84,66 @@ class AuditTrail:
         end_date: Optional[datetime] = None
     ) -> List[Dict]:
         """Query audit events with filters."""
-        results = self._events.copy()
+        candidates: Optional[List[int]] = None
+        for index, key in ((self._by_user, user_id), (self._by_type, event_type)):
+            if key:
+                positions = index.get(key, [])
+                if candidates is None or len(positions) < len(candidates):
+                    candidates = positions
+        start = start_date.timestamp() if start_date else None
+        end = end_date.timestamp() if end_date else None
+        times = self._times
         
-        if user_id:
-            results = [e for e in results if e["user_id"] == user_id]
+        if candidates is None:
+            lo, hi = 0, len(self._events)
+            if self._times_sorted:
+                if start is not None:
+                    lo = bisect.bisect_left(times, start)
+                if end is not None:
+                    hi = bisect.bisect_right(times, end)
+            candidates = range(lo, hi)
+        elif self._times_sorted and (start is not None or end is not None):
+            # Index lists are in recording order, hence also in time order
+            lo = bisect.bisect_left(candidates, start, key=times.__getitem__) if start is not None else 0
+            hi = bisect.bisect_right(candidates, end, key=times.__getitem__) if end is not None else len(candidates)
+            candidates = candidates[lo:hi]
         
-        if event_type:
-            results = [e for e in results if e["event_type"] == event_type]
-        
-        if start_date:
-            results = [
-                e for e in results
-                if datetime.fromisoformat(e["timestamp"]) >= start_date
-            ]
-        
-        if end_date:
-            results = [
-                e for e in results
-                if datetime.fromisoformat(e["timestamp"]) <= end_date
-            ]
+        results = []
+        for position in candidates:
+            event = self._events[position]
+            if user_id and event["user_id"] != user_id:
+                continue
+            if event_type and event["event_type"] != event_type:
+                continue
+            if not self._times_sorted:
+                if start is not None and times[position] < start:
+                    continue
+                if end is not None and times[position] > end:
+                    continue
+            results.append(event)
         
         return results
     
-    def export_audit_trail(self, file_path: str):
-        """Export audit trail to file."""
+    def export_audit_trail(self, file_path: str, format: str = "json"):
+        """
+        Export audit trail to file.
+        
+        Events are written one at a time, as a JSON array (``json``) or one
+        object per line (``ndjson``).
+        """
+        if format not in ("json", "ndjson"):
+            raise ValueError(f"Unsupported export format: {format}")
         with open(file_path, 'w') as f:
-            json.dump(self._events, f, indent=2)
+            if format == "ndjson":
+                for event in self._events:
+                    f.write(json.dumps(event))
+                    f.write("\n")
+            else:
+                f.write("[")
+                for i, event in enumerate(self._events):
+                    f.write(",\n  " if i else "\n  ")
+                    f.write(json.dumps(event))
+                f.write("\n]\n" if self._events else "]\n")
         
         logger.info(f"Audit trail exported to {file_path}")
 
@@ -59,6 +59,11 @@ class DataRetentionPolicy:
         
         return age.days > retention_days
     
+    def get_cutoff(self, data_type: DataType, now: Optional[datetime] = None) -> datetime:
+        """Creation time at or before which data of this type is due for deletion."""
+        retention_days = self.get_retention_period(data_type)
+        return (now or datetime.now()) - timedelta(days=retention_days + 1)
+    
     def get_deletion_date(self, data_type: DataType, created_at: datetime) -> datetime:
         """Calculate when data should be deleted."""
         retention_days = self.get_retention_period(data_type)
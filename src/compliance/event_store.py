@@ -0,0 +1,449 @@
+"""
+Compliance Event Store for AstraGuard
+
+SQLite-backed (aiosqlite) store for audit and access events, sized for tens
+of millions of rows.
+
+- Each event is kept verbatim as a JSON payload next to the columns it is
+  queried by: user_id, timestamp (epoch seconds), event_type, source and
+  retention data type.
+- Indices on (user_id, ts), (ts) and (data_type, ts) turn subject-access
+  reads, time-window queries and retention into index range scans. The
+  rowid breaks ties, so (ts, seq) is a stable keyset cursor.
+- Appends are coalesced by a single writer task into one transaction per
+  batch (group commit), as in api.contact_store.
+- Exports stream NDJSON or CSV in chunks read with keyset pagination, so
+  memory does not grow with the result size.
+- Erasure and retention delete in bounded batches of index-selected rowids,
+  so a large purge never holds the write lock for long.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
+
+import aiosqlite
+
+from src.compliance.data_retention import DataRetentionPolicy, DataType, get_retention_policy
+from src.db.pool_config import PoolConfig
+from src.db.pool_manager import AsyncConnectionPool
+
+logger = logging.getLogger(__name__)
+
+
+EVENT_STORE_PRAGMAS: Dict[str, Any] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -16000,
+    "temp_store": "MEMORY",
+}
+
+SCHEMA: Tuple[str, ...] = (
+    """
+    CREATE TABLE IF NOT EXISTS compliance_events (
+        seq INTEGER PRIMARY KEY,
+        event_id TEXT,
+        source TEXT NOT NULL,
+        data_type TEXT NOT NULL,
+        event_type TEXT NOT NULL,
+        user_id TEXT,
+        ts REAL NOT NULL,
+        payload TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_compliance_user_ts ON compliance_events(user_id, ts)",
+    "CREATE INDEX IF NOT EXISTS idx_compliance_ts ON compliance_events(ts)",
+    "CREATE INDEX IF NOT EXISTS idx_compliance_type_ts ON compliance_events(data_type, ts)",
+)
+
+INSERT_SQL = """
+    INSERT INTO compliance_events (event_id, source, data_type, event_type, user_id, ts, payload)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Batched deletes: the inner SELECT walks an index, the outer DELETE hits rowids
+ERASE_USER_SQL = (
+    "DELETE FROM compliance_events WHERE seq IN "
+    "(SELECT seq FROM compliance_events WHERE user_id = ? LIMIT ?)"
+)
+RETENTION_SQL = (
+    "DELETE FROM compliance_events WHERE seq IN "
+    "(SELECT seq FROM compliance_events WHERE data_type = ? AND ts <= ? LIMIT ?)"
+)
+
+CSV_COLUMNS: Tuple[str, ...] = ("event_id", "timestamp", "source", "event_type", "user_id", "payload")
+
+_PendingAppend = Tuple[Sequence[Any], Optional["asyncio.Future[None]"]]
+
+
+def _epoch(value: Union[datetime, float, str, None]) -> float:
+    if value is None:
+        return datetime.now().timestamp()
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    return float(value)
+
+
+def _filters(
+    user_id: Optional[str],
+    event_type: Optional[str],
+    source: Optional[str],
+    start: Optional[float],
+    end: Optional[float],
+) -> Tuple[List[str], List[Any]]:
+    clauses: List[str] = []
+    params: List[Any] = []
+    for column, value in (("user_id", user_id), ("event_type", event_type), ("source", source)):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    if start is not None:
+        clauses.append("ts >= ?")
+        params.append(start)
+    if end is not None:
+        clauses.append("ts <= ?")
+        params.append(end)
+    return clauses, params
+
+
+class ComplianceEventStore:
+    """
+    Indexed, durable store for compliance events.
+
+    Call start() inside the event loop that will use the store and close()
+    on shutdown. submit() can be called from synchronous code (including
+    other threads) and is committed by the writer task; append() waits for
+    the commit.
+    """
+
+    def __init__(
+        self,
+        db_path: Union[str, Path],
+        pool_size: int = 4,
+        max_batch: int = 1000,
+        delete_batch: int = 10_000,
+        connection_timeout: float = 10.0,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.max_batch = max_batch
+        self.delete_batch = delete_batch
+        self.pool = AsyncConnectionPool(PoolConfig(
+            max_size=pool_size,
+            min_size=1,
+            connection_timeout=connection_timeout,
+            db_path=str(self.db_path),
+            validation_interval=30.0,
+            pragmas=dict(EVENT_STORE_PRAGMAS),
+        ))
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: List[_PendingAppend] = []
+        self._wakeup = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self._started = False
+        self._closed = False
+
+    async def start(self) -> None:
+        """Create the schema, open the pool and start the writer task (idempotent)."""
+        if self._started:
+            return
+        self._started = True
+        self.loop = asyncio.get_running_loop()
+        await self.pool.initialize()
+        async with self.pool.acquire() as conn:
+            for statement in SCHEMA:
+                await conn.execute(statement)
+            await conn.commit()
+        self._writer = asyncio.create_task(self._write_loop())
+        logger.info(f"Compliance event store started: {self.db_path}")
+
+    async def close(self) -> None:
+        """Flush queued events, stop the writer and close the pool."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer is not None:
+            self._wakeup.set()
+            await self._writer
+        await self.pool.close()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _row(event: Dict[str, Any], source: str, data_type: DataType) -> Tuple[Any, ...]:
+        return (
+            event.get("event_id"),
+            source,
+            DataType(data_type).value,
+            event.get("event_type", ""),
+            event.get("user_id"),
+            _epoch(event.get("timestamp")),
+            json.dumps(event, default=str),
+        )
+
+    def submit(self, event: Dict[str, Any], source: str, data_type: DataType = DataType.AUDIT_LOGS) -> None:
+        """Queue an event for the writer without waiting for the commit."""
+        if self._closed or self.loop is None:
+            raise RuntimeError("ComplianceEventStore is not running")
+        self._pending.append((self._row(event, source, data_type), None))
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self._wakeup.set()
+        else:
+            self.loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def append(
+        self,
+        event: Dict[str, Any],
+        source: str,
+        data_type: DataType = DataType.AUDIT_LOGS,
+    ) -> None:
+        """Queue an event and wait until it is committed."""
+        if self._closed or self.loop is None:
+            raise RuntimeError("ComplianceEventStore is not running")
+        future: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        self._pending.append((self._row(event, source, data_type), future))
+        self._wakeup.set()
+        await future
+
+    async def flush(self) -> None:
+        """Wait until every event queued so far is committed."""
+        if self._writer is not None and not self._writer.done():
+            future: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+            self._pending.append((None, future))
+            self._wakeup.set()
+            await future
+
+    async def _write_loop(self) -> None:
+        """Drain queued events in batches until the store is closed."""
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending:
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                await self._write_batch(batch)
+            if self._closed:
+                return
+
+    async def _write_batch(self, batch: List[_PendingAppend]) -> None:
+        error: Optional[BaseException] = None
+        try:
+            async with self.pool.acquire() as conn:
+                try:
+                    await conn.executemany(INSERT_SQL, [row for row, _ in batch if row is not None])
+                    await conn.commit()
+                except BaseException:
+                    await conn.rollback()
+                    raise
+        except Exception as e:
+            error = e
+            logger.error(
+                "Compliance event batch failed",
+                extra={"error_type": type(e).__name__, "error_message": str(e), "batch_size": len(batch)},
+            )
+        for _, future in batch:
+            if future is not None and not future.done():
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+
+    @property
+    def pending_writes(self) -> int:
+        """Events queued but not yet handed to the writer."""
+        return len(self._pending)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    async def iter_rows(
+        self,
+        user_id: Optional[str] = None,
+        event_type: Optional[str] = None,
+        source: Optional[str] = None,
+        start: Union[datetime, float, None] = None,
+        end: Union[datetime, float, None] = None,
+        chunk_size: int = 1000,
+    ) -> AsyncIterator[List[Tuple[Any, ...]]]:
+        """
+        Yield matching rows oldest first, in chunks of ``chunk_size``.
+
+        Rows are (seq, event_id, source, event_type, user_id, ts, payload).
+        Each chunk is one keyset-paginated query on (ts, seq), so no
+        connection or cursor is held between chunks.
+        """
+        clauses, params = _filters(
+            user_id, event_type, source,
+            None if start is None else _epoch(start),
+            None if end is None else _epoch(end),
+        )
+        base = " AND ".join(clauses) or "1"
+        first = (
+            "SELECT seq, event_id, source, event_type, user_id, ts, payload FROM compliance_events "
+            f"WHERE {base} ORDER BY ts, seq LIMIT ?"
+        )
+        following = (
+            "SELECT seq, event_id, source, event_type, user_id, ts, payload FROM compliance_events "
+            f"WHERE {base} AND (ts, seq) > (?, ?) ORDER BY ts, seq LIMIT ?"
+        )
+        cursor: Optional[Tuple[float, int]] = None
+        while True:
+            if cursor is None:
+                query, query_params = first, [*params, chunk_size]
+            else:
+                query, query_params = following, [*params, cursor[0], cursor[1], chunk_size]
+            async with self.pool.acquire() as conn:
+                async with conn.execute(query, query_params) as cur:
+                    rows = list(await cur.fetchall())
+            if not rows:
+                return
+            yield rows
+            if len(rows) < chunk_size:
+                return
+            cursor = (rows[-1][5], rows[-1][0])
+
+    async def query_events(
+        self,
+        user_id: Optional[str] = None,
+        event_type: Optional[str] = None,
+        source: Optional[str] = None,
+        start: Union[datetime, float, None] = None,
+        end: Union[datetime, float, None] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return matching events (as originally recorded), oldest first."""
+        events: List[Dict[str, Any]] = []
+        chunk_size = min(limit, 1000) if limit else 1000
+        async for rows in self.iter_rows(user_id, event_type, source, start, end, chunk_size):
+            events.extend(json.loads(row[6]) for row in rows)
+            if limit and len(events) >= limit:
+                return events[:limit]
+        return events
+
+    async def count(self, user_id: Optional[str] = None) -> int:
+        """Number of stored events, optionally for one user (index range count)."""
+        query, params = "SELECT COUNT(*) FROM compliance_events", ()
+        if user_id is not None:
+            query, params = query + " WHERE user_id = ?", (user_id,)
+        async with self.pool.acquire() as conn:
+            async with conn.execute(query, params) as cur:
+                row = await cur.fetchone()
+        return int(row[0])
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    async def export_chunks(self, format: str = "ndjson", **filters: Any) -> AsyncIterator[bytes]:
+        """
+        Stream matching events as NDJSON or CSV byte chunks.
+
+        NDJSON lines are the stored payloads, written without re-encoding.
+        CSV has one row per event with the full event as a JSON payload
+        column. Suitable for a StreamingResponse body.
+
+        Raises:
+            ValueError: If the format is not supported
+        """
+        if format not in ("ndjson", "csv"):
+            raise ValueError(f"Unsupported export format: {format}")
+        if format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(CSV_COLUMNS)
+            header = buffer.getvalue().encode()
+        async for rows in self.iter_rows(**filters):
+            if format == "ndjson":
+                yield ("\n".join(row[6] for row in rows) + "\n").encode()
+                continue
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for seq, event_id, source, event_type, user_id, ts, payload in rows:
+                writer.writerow((
+                    event_id, datetime.fromtimestamp(ts).isoformat(), source, event_type, user_id, payload,
+                ))
+            if header:
+                yield header + buffer.getvalue().encode()
+                header = b""
+            else:
+                yield buffer.getvalue().encode()
+        if format == "csv" and header:
+            yield header
+
+    async def export(self, file_path: Union[str, Path], format: str = "ndjson", **filters: Any) -> int:
+        """
+        Stream matching events to a file. Returns the number of bytes written.
+
+        Raises:
+            ValueError: If the format is not supported
+        """
+        written = 0
+        with open(file_path, "wb") as f:
+            async for chunk in self.export_chunks(format, **filters):
+                f.write(chunk)
+                written += len(chunk)
+        logger.info(f"Compliance events exported to {file_path} ({written} bytes)")
+        return written
+
+    # ------------------------------------------------------------------
+    # Deletion
+    # ------------------------------------------------------------------
+
+    async def _delete_batched(self, query: str, params: Sequence[Any]) -> int:
+        deleted = 0
+        while True:
+            async with self.pool.acquire() as conn:
+                cursor = await conn.execute(query, (*params, self.delete_batch))
+                await conn.commit()
+                removed = cursor.rowcount
+            deleted += removed
+            if removed < self.delete_batch:
+                return deleted
+            await asyncio.sleep(0)  # Let readers and the writer in between batches
+
+    async def erase_user(self, user_id: str) -> int:
+        """Delete every event of a user (GDPR erasure). Returns the number deleted."""
+        await self.flush()
+        deleted = await self._delete_batched(ERASE_USER_SQL, (user_id,))
+        logger.info(f"Erased {deleted} compliance events for user: {user_id}")
+        return deleted
+
+    async def enforce_retention(
+        self,
+        policy: Optional[DataRetentionPolicy] = None,
+        now: Optional[datetime] = None,
+    ) -> Dict[str, int]:
+        """
+        Delete events older than their data type's retention period.
+
+        Each data type is one range delete on (data_type, ts) up to the
+        policy's cutoff, matching DataRetentionPolicy.should_delete().
+
+        Returns:
+            Deleted event counts by data type
+        """
+        policy = policy or get_retention_policy()
+        now = now or datetime.now()
+        deleted: Dict[str, int] = {}
+        for data_type in DataType:
+            cutoff = policy.get_cutoff(data_type, now)
+            removed = await self._delete_batched(RETENTION_SQL, (data_type.value, cutoff.timestamp()))
+            if removed:
+                deleted[data_type.value] = removed
+        if deleted:
+            logger.info(f"Retention enforced: {deleted}")
+        return deleted
@@ -2,13 +2,23 @@
 GDPR Compliance Features for AstraGuard
 
 Implements GDPR rights: access, erasure, portability.
+
+Activity logs are assembled from the audit trail and access logger through
+their per-user indexes. Events persisted in a ComplianceEventStore are
+exported (streamed) and erased through its (user_id, ts) index.
 """
 
 import logging
 import json
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, TYPE_CHECKING
 from datetime import datetime
 
+from src.compliance.access_logging import AccessControlLogger, get_access_logger
+from src.compliance.audit_trail import AuditTrail, get_audit_trail
+
+if TYPE_CHECKING:
+    from src.compliance.event_store import ComplianceEventStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,10 +32,26 @@ class GDPRCompliance:
     - Data portability
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        audit_trail: Optional[AuditTrail] = None,
+        access_logger: Optional[AccessControlLogger] = None,
+        event_store: Optional["ComplianceEventStore"] = None
+    ):
         """Initialize GDPR compliance."""
+        self.audit_trail = audit_trail
+        self.access_logger = access_logger
+        self.event_store = event_store
         logger.info("GDPR compliance initialized")
     
+    def _activity_logs(self, user_id: str) -> List[Dict]:
+        logs: List[Dict] = []
+        if self.audit_trail is not None:
+            logs.extend(self.audit_trail.query_events(user_id=user_id))
+        if self.access_logger is not None:
+            logs.extend(self.access_logger.get_user_access_history(user_id))
+        return logs
+    
     def right_to_access(self, user_id: str) -> Dict:
         """
         Provide all data for a user (GDPR Article 15).
@@ -42,7 +68,7 @@ class GDPRCompliance:
         user_data = {
             "user_id": user_id,
             "personal_data": {},
-            "activity_logs": [],
+            "activity_logs": self._activity_logs(user_id),
             "preferences": {},
             "generated_at": datetime.now().isoformat()
         }
@@ -96,6 +122,35 @@ class GDPRCompliance:
         
         return file_path
 
+    
+    async def export_stored_events(self, user_id: str, file_path: str, format: str = "ndjson") -> int:
+        """
+        Stream a user's persisted events to a file (Articles 15 and 20).
+        
+        Args:
+            user_id: User ID
+            file_path: Destination file
+            format: Export format (ndjson, csv)
+            
+        Returns:
+            Number of bytes written
+        """
+        if self.event_store is None:
+            raise RuntimeError("No compliance event store configured")
+        logger.info(f"Exporting stored events for user: {user_id}")
+        await self.event_store.flush()
+        return await self.event_store.export(file_path, format=format, user_id=user_id)
+    
+    async def erase_stored_events(self, user_id: str) -> int:
+        """
+        Delete a user's persisted events (Article 17).
+        
+        Returns:
+            Number of events deleted
+        """
+        if self.event_store is None:
+            raise RuntimeError("No compliance event store configured")
+        return await self.event_store.erase_user(user_id)
 
 # Global instance
 _gdpr_compliance: Optional[GDPRCompliance] = None
@@ -105,5 +160,8 @@ def get_gdpr_compliance() -> GDPRCompliance:
     """Get global GDPR compliance."""
     global _gdpr_compliance
     if _gdpr_compliance is None:
-        _gdpr_compliance = GDPRCompliance()
+        _gdpr_compliance = GDPRCompliance(
+            audit_trail=get_audit_trail(),
+            access_logger=get_access_logger()
+        )
     return _gdpr_compliance
@@ -4,16 +4,26 @@ Comprehensive Alerting System for AstraGuard
 Implements all alert types and advanced alerting features:
 - Issues #686-#691: Alert types (anomaly, performance, SLA, availability, resource, security)
 - Issues #692-#695: Advanced features (trends, predictive, deduplication, routing)
+
+Notifications are delivered off the caller's thread: alerts are queued,
+grouped and batched Alertmanager-style, and each handler runs under its
+own timeout and circuit breaker.
 """
 
 import logging
+import queue
 import threading
+import time
+from concurrent.futures import Future, wait as wait_futures
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional, List, Callable
+from typing import Dict, Any, Optional, List, Callable, Tuple
 from datetime import datetime, timedelta
 from enum import Enum
 import uuid
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+
+from core.circuit_breaker import CircuitBreaker
+from core.timeout_handler import TimeoutPoolSaturatedError, get_timeout_executor
 
 logger = logging.getLogger(__name__)
 
@@ -72,24 +82,142 @@ class Alert:
         }
 
 
+@dataclass
+class AlertGroup:
+    """Alerts batched into one notification (same group key within group_wait)."""
+    group_key: str
+    alerts: List[Alert]
+    first_seen: float = field(default_factory=time.monotonic)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "group_key": self.group_key,
+            "count": len(self.alerts),
+            "alerts": [a.to_dict() for a in self.alerts],
+        }
+
+
+@dataclass
+class _HandlerSlot:
+    """A registered notification handler with its delivery guards and counters."""
+    handler: Callable
+    name: str
+    batched: bool
+    timeout: float
+    breaker: CircuitBreaker
+    delivered: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    skipped: int = 0
+
+    def invoke(self, group: AlertGroup) -> None:
+        if self.batched:
+            self.handler(group)
+        else:
+            for alert in group.alerts:
+                self.handler(alert)
+
+
+@dataclass
+class _Delivery:
+    """One group handed to one handler; settled once, by its completion or its deadline."""
+    slot: _HandlerSlot
+    op_name: str
+    group: AlertGroup
+    deadline: float
+    future: Optional[Future] = None
+    settled: bool = False
+
+
+class _Flush:
+    """Queue marker: dispatch every pending group, then set the event."""
+    __slots__ = ("event",)
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+
+
+_STOP = object()
+
+
+def default_group_key(alert: Alert) -> str:
+    """Group notifications by alert type and severity."""
+    return f"{alert.alert_type.value}:{alert.severity.value}"
+
+
 class AlertManager:
     """
     Central alert management system.
     
     Features:
     - Multiple alert types (#686-#691)
-    - Alert deduplication (#694)
-    - Notification routing (#695)
+    - Alert deduplication (#694), TTL-bounded
+    - Notification routing (#695) through a background dispatcher: alerts
+      are queued, grouped by ``group_by`` for ``group_wait_seconds`` (or
+      until ``max_group_size``), and each group is delivered to every
+      handler on the shared timeout pool, guarded by a per-handler timeout
+      and circuit breaker. create_alert never waits on a handler.
+    - Bounded retention: active/acknowledged and resolved alerts are kept in
+      separate rings; statistics come from counters maintained on every
+      transition.
     - Trend analysis (#692)
     - Predictive alerting (#693)
     """
     
-    def __init__(self, dedup_window_minutes: int = 5):
-        """Initialize alert manager."""
-        self._alerts: Dict[str, Alert] = {}
+    def __init__(
+        self,
+        dedup_window_minutes: float = 5,
+        group_wait_seconds: float = 0.5,
+        max_group_size: int = 100,
+        group_by: Callable[[Alert], str] = default_group_key,
+        handler_timeout_seconds: float = 5.0,
+        max_queue_size: int = 10_000,
+        max_active_alerts: int = 10_000,
+        max_resolved_alerts: int = 1_000,
+        max_dedup_keys: int = 10_000,
+    ):
+        """
+        Initialize alert manager.
+
+        Args:
+            dedup_window_minutes: Suppress repeats of the same type/title within this window
+            group_wait_seconds: How long a notification group collects alerts before dispatch
+            max_group_size: Dispatch a group early once it holds this many alerts
+            group_by: Maps an alert to its notification group key
+            handler_timeout_seconds: Default per-handler delivery timeout
+            max_queue_size: Alerts awaiting dispatch before new notifications are dropped
+            max_active_alerts: Active/acknowledged alerts retained (oldest evicted first)
+            max_resolved_alerts: Resolved alerts retained (oldest evicted first)
+            max_dedup_keys: Upper bound on tracked dedup fingerprints
+        """
         self._dedup_window = timedelta(minutes=dedup_window_minutes)
-        self._dedup_cache: Dict[str, datetime] = {}
-        self._notification_handlers: List[Callable] = []
+        self._dedup_seconds = self._dedup_window.total_seconds()
+        self._dedup_cache: "OrderedDict[str, float]" = OrderedDict()
+        self._max_dedup_keys = max_dedup_keys
+
+        self._active: "OrderedDict[str, Alert]" = OrderedDict()
+        self._resolved: "OrderedDict[str, Alert]" = OrderedDict()
+        self._max_active = max_active_alerts
+        self._max_resolved = max_resolved_alerts
+
+        self._total_alerts = 0
+        self._by_type: Dict[str, int] = defaultdict(int)
+        self._by_severity: Dict[str, int] = defaultdict(int)
+        self._by_status: Dict[str, int] = defaultdict(int)
+        self._suppressed_total = 0
+        self._evicted_total = 0
+        self._dropped_total = 0
+        self._groups_dispatched = 0
+
+        self.group_wait = group_wait_seconds
+        self.max_group_size = max_group_size
+        self._group_by = group_by
+        self._handler_timeout = handler_timeout_seconds
+        self._notification_handlers: List[_HandlerSlot] = []
+        self._deliveries: List[_Delivery] = []  # Unsettled; owned by the dispatcher thread
+        self._flush_waiters: List[Tuple[_Flush, List[_Delivery]]] = []
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue_size)
+        self._worker: Optional[threading.Thread] = None
         self._lock = threading.Lock()
         
         logger.info(f"AlertManager initialized with dedup window: {dedup_window_minutes}min")
@@ -105,6 +233,9 @@ class AlertManager:
         """
         Create a new alert with deduplication.
         
+        Notification is asynchronous: the alert is queued for the
+        dispatcher and this call returns immediately.
+
         Args:
             alert_type: Type of alert
             severity: Severity level
@@ -117,14 +248,15 @@ class AlertManager:
         """
         # Check for duplicate (#694: Alert Deduplication)
         dedup_key = f"{alert_type.value}:{title}"
+        now = time.monotonic()
         
         with self._lock:
+            self._expire_dedup(now)
             # Check if we've seen this alert recently
             if dedup_key in self._dedup_cache:
-                last_time = self._dedup_cache[dedup_key]
-                if datetime.now() - last_time < self._dedup_window:
-                    logger.debug(f"Alert deduplicated: {title}")
-                    return None
+                self._suppressed_total += 1
+                logger.debug(f"Alert deduplicated: {title}")
+                return None
             
             # Create new alert
             alert_id = str(uuid.uuid4())
@@ -137,38 +269,254 @@ class AlertManager:
                 metadata=metadata or {}
             )
             
-            self._alerts[alert_id] = alert
-            self._dedup_cache[dedup_key] = datetime.now()
-            
-            logger.info(
-                f"Alert created: {alert_type.value} - {title} "
-                f"(severity: {severity.value})"
-            )
-            
-            # Route notification (#695: Notification Routing)
-            self._route_notification(alert)
+            self._retain(self._active, alert, self._max_active)
+            self._dedup_cache[dedup_key] = now
+            if len(self._dedup_cache) > self._max_dedup_keys:
+                self._dedup_cache.popitem(last=False)
+
+            self._total_alerts += 1
+            self._by_type[alert_type.value] += 1
+            self._by_severity[severity.value] += 1
+            self._by_status[alert.status.value] += 1
+            has_handlers = bool(self._notification_handlers)
             
-            return alert_id
-    
-    def _route_notification(self, alert: Alert):
-        """Route alert to notification handlers."""
-        for handler in self._notification_handlers:
+        logger.info(
+            f"Alert created: {alert_type.value} - {title} "
+            f"(severity: {severity.value})"
+        )
+        
+        # Route notification (#695: Notification Routing)
+        if has_handlers:
             try:
-                handler(alert)
-            except Exception as e:
-                logger.error(f"Error in notification handler: {e}")
+                self._queue.put_nowait(alert)
+            except queue.Full:
+                with self._lock:
+                    self._dropped_total += 1
+                logger.warning(f"Alert notification queue full, dropped notification for {alert_id}")
+        
+        return alert_id
+
+    def _expire_dedup(self, now: float) -> None:
+        """Drop dedup fingerprints older than the window (oldest first)."""
+        cache = self._dedup_cache
+        while cache:
+            key, seen = next(iter(cache.items()))
+            if now - seen < self._dedup_seconds:
+                return
+            del cache[key]
+
+    def _retain(self, ring: "OrderedDict[str, Alert]", alert: Alert, capacity: int) -> None:
+        ring[alert.alert_id] = alert
+        if len(ring) > capacity:
+            ring.popitem(last=False)
+            self._evicted_total += 1
+
+    def _find(self, alert_id: str) -> Optional[Alert]:
+        return self._active.get(alert_id) or self._resolved.get(alert_id)
+
+    def _set_status(self, alert: Alert, status: AlertStatus) -> None:
+        self._by_status[alert.status.value] -= 1
+        self._by_status[status.value] += 1
+        alert.status = status
     
-    def register_notification_handler(self, handler: Callable):
-        """Register a notification handler."""
-        self._notification_handlers.append(handler)
-        logger.info(f"Registered notification handler: {handler.__name__}")
+    def register_notification_handler(
+        self,
+        handler: Callable,
+        batched: bool = False,
+        timeout: Optional[float] = None,
+        failure_threshold: int = 3,
+        recovery_timeout: int = 30,
+    ):
+        """
+        Register a notification handler.
+
+        Args:
+            handler: Called with each Alert, or with an AlertGroup if ``batched``
+            batched: Deliver one AlertGroup per group instead of one call per alert
+            timeout: Seconds a delivery may take before it is abandoned
+            failure_threshold: Consecutive failures/timeouts that open the handler's circuit
+            recovery_timeout: Seconds an open circuit waits before a trial delivery
+        """
+        name = getattr(handler, "__name__", repr(handler))
+        slot = _HandlerSlot(
+            handler=handler,
+            name=name,
+            batched=batched,
+            timeout=self._handler_timeout if timeout is None else timeout,
+            breaker=CircuitBreaker(
+                name=f"alert_handler:{name}",
+                failure_threshold=failure_threshold,
+                recovery_timeout=recovery_timeout,
+            ),
+        )
+        with self._lock:
+            self._notification_handlers.append(slot)
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._dispatch_loop, name="astra-alert-dispatcher", daemon=True
+                )
+                self._worker.start()
+        logger.info(f"Registered notification handler: {name}")
+
+    def _dispatch_loop(self) -> None:
+        """Group queued alerts, dispatch each group when its wait expires and time out late deliveries."""
+        groups: Dict[str, AlertGroup] = {}
+        while True:
+            now = time.monotonic()
+            wakeups = [min(g.first_seen for g in groups.values()) + self.group_wait] if groups else []
+            next_deadline = self._expire_deliveries(now)
+            if next_deadline is not None:
+                wakeups.append(next_deadline)
+            timeout = max(0.0, min(wakeups) - now) if wakeups else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, Alert):
+                key = self._group_by(item)
+                group = groups.get(key)
+                if group is None:
+                    group = groups[key] = AlertGroup(group_key=key, alerts=[])
+                group.alerts.append(item)
+                if len(group.alerts) >= self.max_group_size:
+                    self._dispatch(groups.pop(key))
+
+            drain = item is _STOP or isinstance(item, _Flush)
+            now = time.monotonic()
+            for key in [k for k, g in groups.items() if drain or now - g.first_seen >= self.group_wait]:
+                self._dispatch(groups.pop(key))
+
+            if isinstance(item, _Flush):
+                self._release_after_deliveries(item)
+            elif item is _STOP:
+                self._finish_deliveries()
+                return
+
+    def _dispatch(self, group: AlertGroup) -> None:
+        """Hand a group to every handler on the timeout pool; results are settled by callbacks."""
+        executor = get_timeout_executor()
+        with self._lock:
+            slots = list(self._notification_handlers)
+            self._groups_dispatched += 1
+
+        for slot in slots:
+            if not slot.breaker.allow_request():
+                with self._lock:
+                    slot.skipped += len(group.alerts)
+                continue
+            delivery = _Delivery(slot, f"alert_handler:{slot.name}", group, time.monotonic() + slot.timeout)
+            try:
+                delivery.future = executor.submit(delivery.op_name, slot.invoke, group)
+            except TimeoutPoolSaturatedError as e:
+                with self._lock:
+                    slot.failed += 1
+                slot.breaker.record_failure()
+                logger.error(f"Notification handler {slot.name} not run: {e}")
+                continue
+            self._deliveries.append(delivery)
+            delivery.future.add_done_callback(lambda future, d=delivery: self._on_delivered(d, future))
+
+    def _on_delivered(self, delivery: _Delivery, future: Future) -> None:
+        if future.cancelled():
+            return  # Abandoned before it started; its deadline already settled it
+        self._settle(delivery, error=future.exception())
+
+    def _expire_deliveries(self, now: float) -> Optional[float]:
+        """Abandon deliveries past their deadline; return the next pending deadline."""
+        pending = []
+        for delivery in self._deliveries:
+            if delivery.settled:
+                continue
+            if now >= delivery.deadline and not delivery.future.done():
+                get_timeout_executor().abandon(delivery.op_name, delivery.future)
+                self._settle(delivery, timed_out=True)
+            else:
+                pending.append(delivery)
+        self._deliveries = pending
+        return min((d.deadline for d in pending), default=None)
+
+    def _settle(
+        self, delivery: _Delivery, error: Optional[BaseException] = None, timed_out: bool = False
+    ) -> None:
+        """Record a delivery's outcome once and release flushes waiting on it."""
+        slot, group = delivery.slot, delivery.group
+        with self._lock:
+            if delivery.settled:
+                return
+            delivery.settled = True
+            if timed_out:
+                slot.timed_out += 1
+            elif error is not None:
+                slot.failed += 1
+            else:
+                slot.delivered += len(group.alerts)
+            ready = [marker for marker, waiting in self._flush_waiters if all(d.settled for d in waiting)]
+            if ready:
+                self._flush_waiters = [(m, w) for m, w in self._flush_waiters if m not in ready]
+
+        if timed_out:
+            slot.breaker.record_failure()
+            logger.warning(
+                f"Notification handler {slot.name} timed out after {slot.timeout}s "
+                f"({len(group.alerts)} alerts in group {group.group_key})"
+            )
+        elif error is not None:
+            slot.breaker.record_failure()
+            logger.error(f"Error in notification handler {slot.name}: {error}")
+        else:
+            slot.breaker.record_success()
+        for marker in ready:
+            marker.event.set()
+
+    def _release_after_deliveries(self, marker: _Flush) -> None:
+        """Set a flush marker once every delivery dispatched so far has settled."""
+        with self._lock:
+            waiting = [d for d in self._deliveries if not d.settled]
+            if waiting:
+                self._flush_waiters.append((marker, waiting))
+        if not waiting:
+            marker.event.set()
+
+    def _finish_deliveries(self) -> None:
+        """On stop, wait for in-flight deliveries until their deadlines."""
+        while True:
+            next_deadline = self._expire_deliveries(time.monotonic())
+            if next_deadline is None:
+                return
+            wait_futures(
+                [d.future for d in self._deliveries],
+                timeout=max(0.0, next_deadline - time.monotonic()),
+            )
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """
+        Dispatch all queued and grouped notifications now.
+
+        Returns:
+            True if the dispatcher finished within ``timeout``
+        """
+        if self._worker is None:
+            return True
+        marker = _Flush()
+        self._queue.put(marker, timeout=timeout)
+        return marker.event.wait(timeout)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Dispatch pending notifications and stop the dispatcher thread."""
+        with self._lock:
+            worker, self._worker = self._worker, None
+        if worker is not None:
+            self._queue.put(_STOP, timeout=timeout)
+            worker.join(timeout)
     
     def acknowledge_alert(self, alert_id: str) -> bool:
         """Acknowledge an alert."""
         with self._lock:
-            if alert_id in self._alerts:
-                self._alerts[alert_id].status = AlertStatus.ACKNOWLEDGED
-                self._alerts[alert_id].acknowledged_at = datetime.now()
+            alert = self._active.get(alert_id)  # Resolved alerts stay resolved
+            if alert is not None:
+                self._set_status(alert, AlertStatus.ACKNOWLEDGED)
+                alert.acknowledged_at = datetime.now()
                 logger.info(f"Alert acknowledged: {alert_id}")
                 return True
             return False
@@ -176,9 +524,12 @@ class AlertManager:
     def resolve_alert(self, alert_id: str) -> bool:
         """Resolve an alert."""
         with self._lock:
-            if alert_id in self._alerts:
-                self._alerts[alert_id].status = AlertStatus.RESOLVED
-                self._alerts[alert_id].resolved_at = datetime.now()
+            alert = self._find(alert_id)
+            if alert is not None:
+                self._set_status(alert, AlertStatus.RESOLVED)
+                alert.resolved_at = datetime.now()
+                if self._active.pop(alert_id, None) is not None:
+                    self._retain(self._resolved, alert, self._max_resolved)
                 logger.info(f"Alert resolved: {alert_id}")
                 return True
             return False
@@ -186,7 +537,7 @@ class AlertManager:
     def get_alert(self, alert_id: str) -> Optional[Dict[str, Any]]:
         """Get alert details."""
         with self._lock:
-            alert = self._alerts.get(alert_id)
+            alert = self._find(alert_id)
             return alert.to_dict() if alert else None
     
     def list_alerts(
@@ -195,9 +546,14 @@ class AlertManager:
         severity: Optional[AlertSeverity] = None,
         status: Optional[AlertStatus] = None
     ) -> List[Dict[str, Any]]:
-        """List alerts with optional filters."""
+        """List retained alerts with optional filters."""
         with self._lock:
-            alerts = self._alerts.values()
+            if status == AlertStatus.RESOLVED:
+                alerts = list(self._resolved.values())
+            elif status is not None:
+                alerts = list(self._active.values())
+            else:
+                alerts = [*self._active.values(), *self._resolved.values()]
             
             if alert_type:
                 alerts = [a for a in alerts if a.alert_type == alert_type]
@@ -209,23 +565,31 @@ class AlertManager:
             return [a.to_dict() for a in alerts]
     
     def get_statistics(self) -> Dict[str, Any]:
-        """Get alert statistics."""
+        """Get alert statistics (lifetime counters, O(1) in the number of alerts)."""
         with self._lock:
-            total = len(self._alerts)
-            by_type = defaultdict(int)
-            by_severity = defaultdict(int)
-            by_status = defaultdict(int)
-            
-            for alert in self._alerts.values():
-                by_type[alert.alert_type.value] += 1
-                by_severity[alert.severity.value] += 1
-                by_status[alert.status.value] += 1
-            
             return {
-                "total_alerts": total,
-                "by_type": dict(by_type),
-                "by_severity": dict(by_severity),
-                "by_status": dict(by_status)
+                "total_alerts": self._total_alerts,
+                "by_type": {k: v for k, v in self._by_type.items() if v},
+                "by_severity": {k: v for k, v in self._by_severity.items() if v},
+                "by_status": {k: v for k, v in self._by_status.items() if v},
+                "retained_alerts": len(self._active) + len(self._resolved),
+                "evicted_alerts": self._evicted_total,
+                "suppressed_duplicates": self._suppressed_total,
+                "notifications": {
+                    "queued": self._queue.qsize(),
+                    "dropped": self._dropped_total,
+                    "groups_dispatched": self._groups_dispatched,
+                    "handlers": {
+                        slot.name: {
+                            "circuit_state": slot.breaker.state.value,
+                            "delivered": slot.delivered,
+                            "failed": slot.failed,
+                            "timed_out": slot.timed_out,
+                            "skipped": slot.skipped,
+                        }
+                        for slot in self._notification_handlers
+                    },
+                },
             }
 
 
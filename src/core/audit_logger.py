@@ -9,24 +9,36 @@ Features:
 - Audit event types for all security-relevant operations
 - Log rotation and archival to prevent disk space issues
 - Tamper-evident logging through SHA-256 hashing
+- Sealed integrity segments with signed Merkle checkpoints
+- Indexed, streaming audit queries
 - Sensitive data sanitization
 - Integration with existing logging infrastructure
 """
 
 import os
 import json
-import hashlib
 import logging
 import logging.handlers
 import queue
 import atexit
+import secrets
+import threading
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from itertools import islice
+from typing import Dict, Any, Optional, List, Iterator
 from enum import Enum
 from pathlib import Path
 import structlog
 from astraguard.logging_config import get_logger
 from core.io_utils import measure_io
+from core.secrets import get_secret
+from core.audit_segments import (
+    GENESIS_HASH,
+    AuditIndex,
+    AuditSegmentHandler,
+    chain_hash,
+    read_last_line,
+)
 
 
 class AuditEventType(str, Enum):
@@ -80,16 +92,20 @@ class AuditLogger:
         log_dir: str = "logs/audit",
         max_bytes: int = 10 * 1024 * 1024,  # 10MB per file
         backup_count: int = 5,
-        service_name: str = "astra-guard"
+        service_name: str = "astra-guard",
+        segment_max_age_seconds: float = 3600.0,
+        checkpoint_every: int = 1
     ):
         """
         Initialize audit logger with rotation and tamper-evident features.
 
         Args:
             log_dir: Directory for audit logs
-            max_bytes: Maximum bytes per log file before rotation
+            max_bytes: Maximum bytes per log file (and integrity segment) before rotation
             backup_count: Number of backup files to keep
             service_name: Name of the service for log entries
+            segment_max_age_seconds: Maximum age of an integrity segment before it is sealed
+            checkpoint_every: Number of sealed segments per signed checkpoint
         """
         self.service_name = service_name
         self.log_dir = Path(log_dir)
@@ -97,7 +113,13 @@ class AuditLogger:
 
         # Main audit log file
         self.audit_log_path = self.log_dir / "audit.log"
+        # Pre-segment integrity log; its tail seeds the segment chain
         self.integrity_log_path = self.log_dir / "audit_integrity.log"
+        self.segment_dir = self.log_dir / "segments"
+        self.index_path = self.log_dir / "audit_index.db"
+
+        # Structlog logger for integration
+        self.struct_logger = get_logger('audit')
 
         # Setup rotating file handler for audit logs
         self.audit_handler = logging.handlers.RotatingFileHandler(
@@ -109,8 +131,18 @@ class AuditLogger:
         # Filter to only accept records for 'astra_audit'
         self.audit_handler.addFilter(logging.Filter('astra_audit'))
 
-        # Setup integrity log handler (append-only)
-        self.integrity_handler = logging.FileHandler(self.integrity_log_path)
+        # Setup integrity handler (sealed segments + sidecar index)
+        self.index = AuditIndex(self.index_path)
+        self.integrity_handler = AuditSegmentHandler(
+            self.segment_dir,
+            self.index,
+            signing_key=self._load_checkpoint_key(),
+            max_bytes=max_bytes,
+            max_age_seconds=segment_max_age_seconds,
+            checkpoint_every=checkpoint_every,
+            genesis_hash=self._load_legacy_last_hash(),
+            legacy_path=self.integrity_log_path
+        )
         self.integrity_handler.setFormatter(logging.Formatter('%(message)s'))
         # Filter to only accept records for 'audit_integrity'
         self.integrity_handler.addFilter(logging.Filter('audit_integrity'))
@@ -126,7 +158,8 @@ class AuditLogger:
             respect_handler_level=True
         )
         self.listener.start()
-        atexit.register(self.listener.stop)
+        self._closed = False
+        atexit.register(self.close)
 
         # Setup QueueHandler
         self.queue_handler = logging.handlers.QueueHandler(self.log_queue)
@@ -144,31 +177,50 @@ class AuditLogger:
         self.integrity_logger.addHandler(self.queue_handler)
         self.integrity_logger.propagate = False
 
-        # Structlog logger for integration
-        self.struct_logger = get_logger('audit')
-
         # Track last hash for tamper-evident chain
+        self._chain_lock = threading.Lock()
         self._last_hash = self._load_last_hash()
 
-    def _load_last_hash(self) -> str:
-        """Load the last hash from integrity log for tamper-evident chain."""
+    def _load_checkpoint_key(self) -> bytes:
+        """Load the checkpoint signing key (secret, else a local key file)."""
+        key = get_secret('audit_checkpoint_key')
+        if key:
+            return key.encode()
+
+        key_path = self.log_dir / ".checkpoint_key"
+        if key_path.exists():
+            return key_path.read_bytes()
+
+        key_bytes = secrets.token_hex(32).encode()
+        fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(key_bytes)
+        self.struct_logger.warning(
+            "audit_checkpoint_key not configured; generated local checkpoint key",
+            path=str(key_path)
+        )
+        return key_bytes
+
+    def _load_legacy_last_hash(self) -> str:
+        """Tail-read the last hash of the pre-segment integrity log."""
         if not self.integrity_log_path.exists():
-            return "0" * 64  # Initial hash
+            return GENESIS_HASH
 
         try:
-            with open(self.integrity_log_path, 'r') as f:
-                lines = f.readlines()
-                if lines:
-                    last_line = lines[-1].strip()
-                    # Extract hash from integrity log entry
-                    if '|' in last_line:
-                        return last_line.split('|')[0]
+            last_line = read_last_line(self.integrity_log_path)
+            # Extract hash from integrity log entry
+            if last_line and '|' in last_line:
+                return last_line.split('|')[0]
         except Exception as e:
             # Bandit B110: Don't use pass in except block
             # We fail gracefully to default hash if log file is missing or corrupted
             self.struct_logger.warning(f"Failed to load last hash from integrity log: {e}")
 
-        return "0" * 64
+        return GENESIS_HASH
+
+    def _load_last_hash(self) -> str:
+        """Load the last hash of the tamper-evident chain (recovered from segments)."""
+        return self.integrity_handler.last_hash
 
     def _sanitize_sensitive_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -287,21 +339,22 @@ class AuditLogger:
         # Convert to JSON
         entry_json = json.dumps(entry, sort_keys=True, default=str)
 
-        # Create hash chain for tamper-evident logging
-        hash_input = self._last_hash + entry_json
-        current_hash = hashlib.sha256(hash_input.encode()).hexdigest()
+        # Hash and enqueue under one lock so the chain order matches the queue order
+        with self._chain_lock:
+            # Create hash chain for tamper-evident logging
+            current_hash = chain_hash(self._last_hash, entry_json)
 
-        # Create integrity entry
-        integrity_entry = f"{current_hash}|{entry_json}"
+            # Create integrity entry
+            integrity_entry = f"{current_hash}|{entry_json}"
 
-        # Log to audit file (JSON only) - Non-blocking via Queue
-        self.audit_logger.info(entry_json)
+            # Log to audit file (JSON only) - Non-blocking via Queue
+            self.audit_logger.info(entry_json)
 
-        # Log to integrity file (hash + JSON) - Non-blocking via Queue
-        self.integrity_logger.info(integrity_entry)
+            # Log to integrity segment (hash + JSON) - Non-blocking via Queue
+            self.integrity_logger.info(integrity_entry, extra={"audit_entry": entry})
 
-        # Update last hash for chain
-        self._last_hash = current_hash
+            # Update last hash for chain
+            self._last_hash = current_hash
 
         # Also log to structlog for integration with existing logging
         self.struct_logger.info(
@@ -314,44 +367,134 @@ class AuditLogger:
             **(details or {})
         )
 
-    def verify_integrity(self) -> bool:
+    def flush(self) -> None:
+        """Wait for queued audit events to be written and indexed."""
+        if not self._closed:
+            self.log_queue.join()
+        self.integrity_handler.flush()
+
+    def close(self) -> None:
+        """Drain the queue, stop the listener and close the index."""
+        if self._closed:
+            return
+        self._closed = True
+        self.audit_logger.removeHandler(self.queue_handler)
+        self.integrity_logger.removeHandler(self.queue_handler)
+        self.listener.stop()
+        self.audit_handler.close()
+        self.integrity_handler.close()
+        self.index.close()
+
+    def rotate_segment(self) -> None:
+        """Seal the active integrity segment now (checkpointing as configured)."""
+        self.flush()
+        self.integrity_handler.rotate()
+
+    def _verify_legacy_chain(self) -> Optional[str]:
+        """Verify the pre-segment integrity log; return its last hash or None."""
+        expected_hash = GENESIS_HASH
+        if not self.integrity_log_path.exists():
+            return expected_hash
+
+        with open(self.integrity_log_path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+
+                parts = line.split('|', 1)
+                if len(parts) != 2:
+                    return None
+
+                stored_hash, entry_json = parts
+
+                # Verify hash chain
+                if chain_hash(expected_hash, entry_json) != stored_hash:
+                    return None
+
+                expected_hash = stored_hash
+
+        return expected_hash
+
+    def verify_integrity(self, full: bool = False) -> bool:
         """
         Verify the integrity of audit logs using hash chain.
 
+        By default only segments written since the latest signed checkpoint
+        are re-hashed; earlier segments are checked against the checkpoint's
+        Merkle root.
+
+        Args:
+            full: Re-hash the entire chain from genesis
+
         Returns:
             True if logs are intact, False if tampering detected
         """
-        if not self.integrity_log_path.exists():
-            return True
-
-        expected_hash = "0" * 64
-
         try:
-            with open(self.integrity_log_path, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
+            self.flush()
 
-                    parts = line.split('|', 1)
-                    if len(parts) != 2:
-                        return False
+            if full or not self.index.checkpoints():
+                start_hash = self._verify_legacy_chain()
+                if start_hash is None:
+                    return False
+                full = True
+            else:
+                start_hash = self.integrity_handler.genesis_hash
 
-                    stored_hash, entry_json = parts
+            return self.integrity_handler.verify(start_hash, full=full)
 
-                    # Verify hash chain
-                    hash_input = expected_hash + entry_json
-                    calculated_hash = hashlib.sha256(hash_input.encode()).hexdigest()
+        except Exception:
+            return False
 
-                    if calculated_hash != stored_hash:
-                        return False
+    def iter_audit_logs(
+        self,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        event_type: Optional[AuditEventType] = None,
+        user_id: Optional[str] = None,
+        resource: Optional[str] = None,
+        status: Optional[str] = None,
+        newest_first: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream audit entries matching the filters in timestamp order.
 
-                    expected_hash = stored_hash
+        Uses the sidecar index to locate entries and reads only those lines.
 
-            return True
+        Args:
+            start_time: Start time for query
+            end_time: End time for query
+            event_type: Filter by event type
+            user_id: Filter by user ID
+            resource: Filter by resource
+            status: Filter by status
+            newest_first: Yield the most recent entries first
 
-        except Exception:
-            return False
+        Yields:
+            Matching audit entries
+        """
+        self.flush()
+        filters = {
+            "event_type": event_type.value if event_type else None,
+            "user_id": user_id,
+            "resource": resource,
+            "status": status,
+        }
+        handles: Dict[int, Any] = {}
+        try:
+            for segment, offset, length in self.index.iter_locations(
+                filters,
+                start_ts=start_time.isoformat() if start_time else None,
+                end_ts=end_time.isoformat() if end_time else None,
+                descending=newest_first
+            ):
+                try:
+                    yield self.integrity_handler.read_entry(segment, offset, length, handles)
+                except (OSError, json.JSONDecodeError) as e:
+                    self.struct_logger.warning(f"Skipping unreadable audit entry: {e}")
+        finally:
+            for f in handles.values():
+                f.close()
 
     def query_audit_logs(
         self,
@@ -378,52 +521,17 @@ class AuditLogger:
         Returns:
             List of matching audit entries
         """
-        results = []
-
-        # Check all audit log files (including rotated ones)
-        log_files = [self.audit_log_path]
-        for i in range(1, self.audit_handler.backupCount + 1):
-            backup_file = self.log_dir / f"audit.log.{i}"
-            if backup_file.exists():
-                log_files.append(backup_file)
-
-        for log_file in log_files:
-            try:
-                with open(log_file, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if not line:
-                            continue
-
-                        try:
-                            entry = json.loads(line)
-
-                            # Apply filters
-                            if start_time and datetime.fromisoformat(entry['timestamp'][:-1]) < start_time:
-                                continue
-                            if end_time and datetime.fromisoformat(entry['timestamp'][:-1]) > end_time:
-                                continue
-                            if event_type and entry.get('event_type') != event_type.value:
-                                continue
-                            if user_id and entry.get('user_id') != user_id:
-                                continue
-                            if resource and entry.get('resource') != resource:
-                                continue
-                            if status and entry.get('status') != status:
-                                continue
-
-                            results.append(entry)
-
-                            if len(results) >= limit:
-                                return results
-
-                        except json.JSONDecodeError:
-                            continue
-
-            except FileNotFoundError:
-                continue
-
-        return results
+        return list(islice(
+            self.iter_audit_logs(
+                start_time=start_time,
+                end_time=end_time,
+                event_type=event_type,
+                user_id=user_id,
+                resource=resource,
+                status=status
+            ),
+            limit
+        ))
 
     def get_audit_stats(self) -> Dict[str, Any]:
         """
@@ -432,49 +540,16 @@ class AuditLogger:
         Returns:
             Dictionary with audit statistics
         """
-        total_entries = 0
-        event_counts = {}
-        user_counts = {}
-        recent_entries = []
-
-        # Count entries in current log file
-        try:
-            with open(self.audit_log_path, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    try:
-                        entry = json.loads(line)
-                        total_entries += 1
-
-                        # Count event types
-                        event_type = entry.get('event_type', 'unknown')
-                        event_counts[event_type] = event_counts.get(event_type, 0) + 1
-
-                        # Count users
-                        user_id = entry.get('user_id')
-                        if user_id:
-                            user_counts[user_id] = user_counts.get(user_id, 0) + 1
-
-                        # Keep recent entries
-                        if len(recent_entries) < 10:
-                            recent_entries.append(entry)
-
-                    except json.JSONDecodeError:
-                        continue
-
-        except FileNotFoundError:
-            pass
+        self.flush()
+        stats = self.index.stats()
+        recent_entries = list(islice(self.iter_audit_logs(newest_first=True), 5))
+        recent_entries.reverse()
 
         return {
-            "total_entries": total_entries,
-            "event_type_counts": event_counts,
-            "unique_users": len(user_counts),
+            **stats,
             "integrity_verified": self.verify_integrity(),
             "log_file_size": self.audit_log_path.stat().st_size if self.audit_log_path.exists() else 0,
-            "recent_entries": recent_entries[-5:]  # Last 5 entries
+            "recent_entries": recent_entries  # Last 5 entries
         }
 
 
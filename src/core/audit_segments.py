@@ -0,0 +1,657 @@
+"""
+Segmented, Indexed Storage for the AstraGuard Audit Log
+
+Backs AuditLogger's tamper-evident chain with storage whose startup,
+verification and query costs do not grow with total log size:
+
+- Size- and time-rotated segment files of "hash|json" lines, each closed
+  with a sealed footer (chain hashes, entry count, time range)
+- Tail-seek recovery of the last hash (no full-file reads at startup)
+- Signed Merkle checkpoints over sealed segments, so routine verification
+  only re-hashes segments written since the latest checkpoint
+- A SQLite sidecar index on event_type, user_id, resource and timestamp
+  that maps each entry to its (segment, offset) for streaming range queries;
+  entries of the pre-segment integrity log are indexed once on startup
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+GENESIS_HASH = "0" * 64
+SEAL_PREFIX = "SEAL|"
+SEGMENT_GLOB = "segment-*.log"
+# Index segment number of entries in the pre-segment integrity log (segments start at 1)
+LEGACY_SEGMENT = 0
+
+
+def segment_name(number: int) -> str:
+    """File name for a segment number."""
+    return f"segment-{number:08d}.log"
+
+
+def seal_digest(seal: Dict[str, Any]) -> str:
+    """Merkle leaf for a sealed segment footer."""
+    return hashlib.sha256(json.dumps(seal, sort_keys=True).encode()).hexdigest()
+
+
+def merkle_root(leaves: List[str]) -> str:
+    """Merkle root over hex digests (last node duplicated on odd levels)."""
+    if not leaves:
+        return GENESIS_HASH
+    level = [bytes.fromhex(leaf) for leaf in leaves]
+    while len(level) > 1:
+        if len(level) % 2:
+            level.append(level[-1])
+        level = [
+            hashlib.sha256(level[i] + level[i + 1]).digest()
+            for i in range(0, len(level), 2)
+        ]
+    return level[0].hex()
+
+
+def read_last_line(path: Path) -> Optional[str]:
+    """Return the last non-empty line of a file by seeking from the end."""
+    with open(path, "rb") as f:
+        f.seek(0, 2)
+        pos = f.tell()
+        buf = b""
+        chunk = 4096
+        while pos > 0:
+            step = min(chunk, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+            stripped = buf.rstrip(b"\n")
+            newline = stripped.rfind(b"\n")
+            if newline != -1:
+                return stripped[newline + 1:].decode()
+            chunk *= 2
+        stripped = buf.rstrip(b"\n")
+        return stripped.decode() if stripped else None
+
+
+def chain_hash(previous_hash: str, entry_json: str) -> str:
+    """Hash-chain step shared by the writer and the verifier."""
+    return hashlib.sha256((previous_hash + entry_json).encode()).hexdigest()
+
+
+class AuditIndex:
+    """
+    SQLite sidecar index for audit segments.
+
+    A single connection guarded by a lock serves the writer (the logging
+    listener thread) and readers, so queries see entries as soon as they
+    are written, before the batch is committed.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                segment INTEGER NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                ts TEXT NOT NULL,
+                event_type TEXT,
+                user_id TEXT,
+                resource TEXT,
+                status TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_audit_ts ON entries(ts);
+            CREATE INDEX IF NOT EXISTS idx_audit_event_ts ON entries(event_type, ts);
+            CREATE INDEX IF NOT EXISTS idx_audit_user_ts ON entries(user_id, ts);
+            CREATE INDEX IF NOT EXISTS idx_audit_resource_ts ON entries(resource, ts);
+            CREATE INDEX IF NOT EXISTS idx_audit_segment ON entries(segment, offset);
+
+            CREATE TABLE IF NOT EXISTS segments (
+                segment INTEGER PRIMARY KEY,
+                seal TEXT NOT NULL,
+                digest TEXT NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                upto_segment INTEGER NOT NULL,
+                root TEXT NOT NULL,
+                last_hash TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                signature TEXT NOT NULL
+            );
+        """)
+        self._conn.commit()
+        self._closed = False
+
+    def add_entry(self, segment: int, offset: int, length: int, entry: Dict[str, Any]) -> None:
+        """Index one entry (committed by the next commit())."""
+        ts = str(entry.get("timestamp", "")).rstrip("Z")
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO entries (segment, offset, length, ts, event_type, user_id, resource, status) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (segment, offset, length, ts, entry.get("event_type"), entry.get("user_id"),
+                 entry.get("resource"), entry.get("status")),
+            )
+
+    def commit(self) -> None:
+        with self._lock:
+            if not self._closed:
+                self._conn.commit()
+
+    def indexed_end(self, segment: int) -> int:
+        """Byte offset just past the last indexed entry of a segment."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT offset + length FROM entries WHERE segment = ? "
+                "ORDER BY offset DESC LIMIT 1",
+                (segment,),
+            ).fetchone()
+        return row[0] if row else 0
+
+    def record_seal(self, seal: Dict[str, Any]) -> str:
+        """Store a segment footer and return its Merkle leaf digest."""
+        digest = seal_digest(seal)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO segments (segment, seal, digest) VALUES (?, ?, ?)",
+                (seal["segment"], json.dumps(seal, sort_keys=True), digest),
+            )
+            self._conn.commit()
+        return digest
+
+    def has_seal(self, segment: int) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM segments WHERE segment = ?", (segment,)
+            ).fetchone() is not None
+
+    def sealed_digests(self, upto_segment: Optional[int] = None) -> List[Tuple[int, str]]:
+        """(segment, digest) of sealed segments, oldest first."""
+        query = "SELECT segment, digest FROM segments"
+        params: tuple = ()
+        if upto_segment is not None:
+            query += " WHERE segment <= ?"
+            params = (upto_segment,)
+        with self._lock:
+            return self._conn.execute(query + " ORDER BY segment", params).fetchall()
+
+    def add_checkpoint(self, checkpoint: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO checkpoints (upto_segment, root, last_hash, created_at, signature) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (checkpoint["upto_segment"], checkpoint["root"], checkpoint["last_hash"],
+                 checkpoint["created_at"], checkpoint["signature"]),
+            )
+            self._conn.commit()
+
+    def checkpoints(self) -> List[Dict[str, Any]]:
+        """All checkpoints, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT upto_segment, root, last_hash, created_at, signature "
+                "FROM checkpoints ORDER BY id"
+            ).fetchall()
+        return [
+            {"upto_segment": r[0], "root": r[1], "last_hash": r[2],
+             "created_at": r[3], "signature": r[4]}
+            for r in rows
+        ]
+
+    def iter_locations(
+        self,
+        filters: Dict[str, Any],
+        start_ts: Optional[str] = None,
+        end_ts: Optional[str] = None,
+        descending: bool = False,
+        batch_size: int = 500
+    ) -> Iterator[Tuple[int, int, int]]:
+        """Yield (segment, offset, length) of matching entries in time order."""
+        clauses = []
+        params: List[Any] = []
+        for column, value in filters.items():
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if start_ts is not None:
+            clauses.append("ts >= ?")
+            params.append(start_ts)
+        if end_ts is not None:
+            clauses.append("ts <= ?")
+            params.append(end_ts)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        order = "DESC" if descending else "ASC"
+
+        # Keyset pagination on (ts, id) keeps each batch an index range scan
+        last: Optional[Tuple[str, int]] = None
+        while True:
+            page_clauses = list(clauses)
+            page_params = list(params)
+            if last is not None:
+                op = "<" if descending else ">"
+                page_clauses.append(f"(ts, id) {op} (?, ?)")
+                page_params.extend(last)
+            page_where = f"WHERE {' AND '.join(page_clauses)}" if page_clauses else where
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT segment, offset, length, ts, id FROM entries {page_where} "
+                    f"ORDER BY ts {order}, id {order} LIMIT ?",
+                    (*page_params, batch_size),
+                ).fetchall()
+            for segment, offset, length, _, _ in rows:
+                yield segment, offset, length
+            if len(rows) < batch_size:
+                return
+            last = (rows[-1][3], rows[-1][4])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            by_type = dict(self._conn.execute(
+                "SELECT event_type, COUNT(*) FROM entries GROUP BY event_type"
+            ).fetchall())
+            users = self._conn.execute(
+                "SELECT COUNT(DISTINCT user_id) FROM entries WHERE user_id IS NOT NULL"
+            ).fetchone()[0]
+        return {"total_entries": total, "event_type_counts": by_type, "unique_users": users}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._conn.commit()
+            self._conn.close()
+            self._closed = True
+
+
+class AuditSegmentHandler(logging.Handler):
+    """
+    Logging handler that appends the audit hash chain to rotated segments.
+
+    Runs on AuditLogger's QueueListener thread, so segment writes, index
+    inserts, sealing and checkpointing stay off the request path.
+    """
+
+    def __init__(
+        self,
+        segment_dir: Path,
+        index: AuditIndex,
+        signing_key: bytes,
+        max_bytes: int = 10 * 1024 * 1024,
+        max_age_seconds: float = 3600.0,
+        checkpoint_every: int = 1,
+        commit_every: int = 256,
+        genesis_hash: str = GENESIS_HASH,
+        legacy_path: Optional[Path] = None
+    ):
+        super().__init__()
+        self.segment_dir = Path(segment_dir)
+        self.segment_dir.mkdir(parents=True, exist_ok=True)
+        self.index = index
+        self.signing_key = signing_key
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.commit_every = commit_every
+        self.genesis_hash = genesis_hash
+        self.legacy_path = Path(legacy_path) if legacy_path is not None else None
+
+        self._file = None
+        self._segment = 0
+        self._size = 0
+        self._opened_at = 0.0
+        self._uncommitted = 0
+        self._seal_state: Dict[str, Any] = {}
+        self.last_hash = genesis_hash
+
+        self._recover()
+        self._backfill_legacy()
+
+    # ------------------------------------------------------------------
+    # Recovery
+    # ------------------------------------------------------------------
+
+    def segment_paths(self) -> List[Tuple[int, Path]]:
+        """(number, path) of all segment files, oldest first."""
+        paths = []
+        for path in self.segment_dir.glob(SEGMENT_GLOB):
+            try:
+                paths.append((int(path.stem.split("-")[1]), path))
+            except (IndexError, ValueError):
+                continue
+        return sorted(paths)
+
+    def _recover(self) -> None:
+        """Seal an interrupted segment, catch up the index, open a new segment."""
+        segments = self.segment_paths()
+        if segments:
+            number, path = segments[-1]
+            prev_hash = self.genesis_hash
+            if len(segments) > 1:
+                prev_seal = self._read_seal(segments[-2][1])
+                if prev_seal is not None:
+                    prev_hash = prev_seal["last_hash"]
+
+            seal = self._read_seal(path)
+            if seal is not None:
+                if not self.index.has_seal(number):
+                    self._catch_up(number, path, prev_hash)
+                    self.index.record_seal(seal)
+                self.last_hash = seal["last_hash"]
+                self._segment = number
+            else:
+                # Crash while this segment was active: scan it once, then seal
+                self._seal_state = self._catch_up(number, path, prev_hash)
+                self.last_hash = self._seal_state["last_hash"]
+                self._segment = number
+                self._file = open(path, "ab")
+                logger.warning(f"Recovered unsealed audit segment {path.name}")
+                self._seal()
+        self._open_segment(self._segment + 1)
+
+    @staticmethod
+    def _read_seal(path: Path) -> Optional[Dict[str, Any]]:
+        last_line = read_last_line(path)
+        if last_line and last_line.startswith(SEAL_PREFIX):
+            return json.loads(last_line[len(SEAL_PREFIX):])
+        return None
+
+    def _catch_up(self, number: int, path: Path, prev_hash: str) -> Dict[str, Any]:
+        """Index entries missing from the sidecar and rebuild seal state."""
+        indexed_end = self.index.indexed_end(number)
+        state = self._new_seal_state(number, prev_hash)
+        offset = 0
+        with open(path, "rb") as f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    # Torn write from a crash: drop the partial line
+                    f.close()
+                    with open(path, "r+b") as tf:
+                        tf.truncate(offset)
+                    break
+                line = raw.decode().rstrip("\n")
+                if line and not line.startswith(SEAL_PREFIX):
+                    current_hash, _, entry_json = line.partition("|")
+                    entry = json.loads(entry_json)
+                    self._advance_seal_state(state, current_hash, entry)
+                    if offset >= indexed_end:
+                        self.index.add_entry(number, offset, len(raw), entry)
+                offset += len(raw)
+        self.index.commit()
+        return state
+
+    def _backfill_legacy(self) -> None:
+        """
+        Index the pre-segment integrity log as LEGACY_SEGMENT.
+
+        That log is no longer written, so this indexes it once; an
+        interrupted backfill resumes from the last indexed entry.
+        """
+        if self.legacy_path is None or not self.legacy_path.exists():
+            return
+        offset = indexed_end = self.index.indexed_end(LEGACY_SEGMENT)
+        added = 0
+        with open(self.legacy_path, "rb") as f:
+            f.seek(indexed_end)
+            for raw in f:
+                line = raw.decode(errors="replace").strip()
+                try:
+                    entry = json.loads(line.partition("|")[2]) if line else None
+                except json.JSONDecodeError:
+                    entry = None
+                if isinstance(entry, dict):
+                    self.index.add_entry(LEGACY_SEGMENT, offset, len(raw), entry)
+                    added += 1
+                offset += len(raw)
+        self.index.commit()
+        if added:
+            logger.info(f"Indexed {added} entries from legacy audit log {self.legacy_path}")
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _new_seal_state(number: int, prev_hash: Optional[str]) -> Dict[str, Any]:
+        return {
+            "segment": number, "prev_hash": prev_hash, "last_hash": prev_hash,
+            "count": 0, "start": None, "end": None,
+        }
+
+    @staticmethod
+    def _advance_seal_state(state: Dict[str, Any], current_hash: str, entry: Dict[str, Any]) -> None:
+        ts = entry.get("timestamp")
+        if state["start"] is None:
+            state["start"] = ts
+        state["end"] = ts
+        state["count"] += 1
+        state["last_hash"] = current_hash
+
+    def _open_segment(self, number: int) -> None:
+        self._segment = number
+        path = self.segment_dir / segment_name(number)
+        self._file = open(path, "ab")
+        self._size = path.stat().st_size
+        self._opened_at = time.monotonic()
+        self._seal_state = self._new_seal_state(number, self.last_hash)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.acquire()
+            try:
+                line = record.getMessage()
+                current_hash, _, entry_json = line.partition("|")
+                entry = getattr(record, "audit_entry", None) or json.loads(entry_json)
+
+                if self._seal_state["count"] and (
+                    self._size >= self.max_bytes
+                    or time.monotonic() - self._opened_at >= self.max_age_seconds
+                ):
+                    self.rotate()
+
+                data = (line + "\n").encode()
+                offset = self._size
+                self._file.write(data)
+                self._file.flush()
+                self._size += len(data)
+
+                self.index.add_entry(self._segment, offset, len(data), entry)
+                self._advance_seal_state(self._seal_state, current_hash, entry)
+                self.last_hash = current_hash
+
+                self._uncommitted += 1
+                if self._uncommitted >= self.commit_every:
+                    self.index.commit()
+                    self._uncommitted = 0
+            finally:
+                self.release()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            if self._file is not None:
+                self._file.flush()
+            self.index.commit()
+            self._uncommitted = 0
+        finally:
+            self.release()
+
+    def rotate(self) -> None:
+        """Seal the active segment and start the next one."""
+        self.acquire()
+        try:
+            if not self._seal_state["count"]:
+                return
+            self._seal()
+            self._open_segment(self._segment + 1)
+        finally:
+            self.release()
+
+    def _seal(self) -> None:
+        seal = dict(self._seal_state)
+        seal["sealed_at"] = datetime.utcnow().isoformat() + "Z"
+        self._file.write((SEAL_PREFIX + json.dumps(seal, sort_keys=True) + "\n").encode())
+        self._file.flush()
+        self._file.close()
+        self._file = None
+        self.index.commit()
+        self._uncommitted = 0
+        self.index.record_seal(seal)
+
+        sealed = self.index.sealed_digests()
+        checkpoints = self.index.checkpoints()
+        covered = checkpoints[-1]["upto_segment"] if checkpoints else 0
+        if sum(1 for number, _ in sealed if number > covered) >= self.checkpoint_every:
+            self.create_checkpoint(sealed)
+
+    def create_checkpoint(self, sealed: Optional[List[Tuple[int, str]]] = None) -> Optional[Dict[str, Any]]:
+        """Sign a Merkle root over all sealed segments."""
+        sealed = sealed if sealed is not None else self.index.sealed_digests()
+        if not sealed:
+            return None
+        upto = sealed[-1][0]
+        seal_line = read_last_line(self.segment_dir / segment_name(upto)) or ""
+        checkpoint = {
+            "upto_segment": upto,
+            "root": merkle_root([digest for _, digest in sealed]),
+            "last_hash": json.loads(seal_line[len(SEAL_PREFIX):])["last_hash"],
+            "created_at": datetime.utcnow().isoformat() + "Z",
+        }
+        checkpoint["signature"] = sign_checkpoint(self.signing_key, checkpoint)
+        self.index.add_checkpoint(checkpoint)
+        logger.info(f"Audit checkpoint created through segment {upto}")
+        return checkpoint
+
+    def close(self) -> None:
+        """Seal the active segment (or drop it if empty) on clean shutdown."""
+        self.acquire()
+        try:
+            if self._file is not None:
+                if self._seal_state["count"]:
+                    self._seal()
+                else:
+                    self._file.close()
+                    self._file = None
+                    (self.segment_dir / segment_name(self._segment)).unlink(missing_ok=True)
+            self.index.commit()
+        finally:
+            self.release()
+        super().close()
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def read_entry(self, segment: int, offset: int, length: int,
+                   handles: Optional[Dict[int, Any]] = None) -> Dict[str, Any]:
+        """Read one entry by its index location."""
+        handles = handles if handles is not None else {}
+        f = handles.get(segment)
+        if f is None:
+            path = self.legacy_path if segment == LEGACY_SEGMENT else self.segment_dir / segment_name(segment)
+            f = handles[segment] = open(path, "rb")
+        f.seek(offset)
+        line = f.read(length).decode().rstrip("\n")
+        return json.loads(line.partition("|")[2])
+
+    def verify(self, start_hash: str, full: bool = False) -> bool:
+        """
+        Verify the segment chain.
+
+        With a valid signed checkpoint only segments written after it are
+        re-hashed; covered segments are checked against the checkpoint's
+        Merkle root using their (tail-read) footers.
+
+        Args:
+            start_hash: Chain hash preceding the first segment
+            full: Re-hash every segment regardless of checkpoints
+        """
+        segments = self.segment_paths()
+        expected = start_hash
+        covered = 0
+
+        checkpoints = self.index.checkpoints()
+        if checkpoints and not full:
+            checkpoint = checkpoints[-1]
+            if not hmac.compare_digest(
+                sign_checkpoint(self.signing_key, checkpoint), checkpoint["signature"]
+            ):
+                logger.error("Audit checkpoint signature mismatch")
+                return False
+            covered = checkpoint["upto_segment"]
+            leaves = []
+            for number, path in segments:
+                if number > covered:
+                    break
+                seal = self._read_seal(path)
+                if seal is None:
+                    return False
+                leaves.append(seal_digest(seal))
+            if merkle_root(leaves) != checkpoint["root"]:
+                logger.error("Audit checkpoint Merkle root mismatch")
+                return False
+            if leaves and seal["last_hash"] != checkpoint["last_hash"]:
+                return False
+            expected = checkpoint["last_hash"]
+
+        for number, path in segments:
+            if number <= covered:
+                continue
+            expected = self.verify_segment(path, expected)
+            if expected is None:
+                logger.error(f"Audit chain broken in segment {path.name}")
+                return False
+        return True
+
+    def verify_segment(self, path: Path, expected_prev: str) -> Optional[str]:
+        """Re-hash one segment; return its last hash or None if tampered."""
+        expected = expected_prev
+        count = 0
+        seal = None
+        with open(path, "r") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if not line:
+                    continue
+                if line.startswith(SEAL_PREFIX):
+                    seal = json.loads(line[len(SEAL_PREFIX):])
+                    continue
+                if seal is not None:
+                    return None  # entries after the seal
+                stored_hash, sep, entry_json = line.partition("|")
+                if not sep or chain_hash(expected, entry_json) != stored_hash:
+                    return None
+                expected = stored_hash
+                count += 1
+        if seal is not None and (
+            seal["prev_hash"] != expected_prev
+            or seal["last_hash"] != expected
+            or seal["count"] != count
+        ):
+            return None
+        return expected
+
+
+def sign_checkpoint(key: bytes, checkpoint: Dict[str, Any]) -> str:
+    """HMAC-SHA256 over the checkpoint's identifying fields."""
+    message = (
+        f"{checkpoint['upto_segment']}|{checkpoint['root']}|"
+        f"{checkpoint['last_hash']}|{checkpoint['created_at']}"
+    )
+    return hmac.new(key, message.encode(), hashlib.sha256).hexdigest()
@@ -28,6 +28,7 @@ from pydantic import BaseModel, Field
 from astraguard.logging_config import get_logger
 from core.audit_logger import get_audit_logger, AuditEventType
 from core.secrets import get_secret
+from core.local_rate_limiter import ShardedRateLimiter
 
 logger = get_logger(__name__)
 
@@ -177,7 +178,8 @@ class APIKeyManager:
         self.keys_file = keys_file
         self.api_keys: Dict[str, APIKey] = {}
         self.key_hashes: Dict[str, str] = {}  # Store hashed versions for security
-        self.rate_limits: Dict[str, List[datetime]] = {}  # Track request timestamps
+        # Per-key hourly quotas (APIKey.rate_limit), O(1) state per key
+        self.rate_limiter = ShardedRateLimiter(limit=1000, window=3600)
 
         # Load existing keys
         self._load_keys()
@@ -629,6 +631,23 @@ class APIKeyManager:
             return min(limits) if limits else None
         return None
 
+    def check_rate_limit(self, api_key: str) -> None:
+        """
+        Check if the API key has exceeded its rate limit.
+
+        Args:
+            api_key: The API key to check
+
+        Raises:
+            ValueError: If rate limit exceeded
+        """
+        if api_key not in self.api_keys:
+            return  # Invalid keys are caught elsewhere
+
+        key = self.api_keys[api_key]
+        if not self.rate_limiter.hit(api_key, limit=key.rate_limit).allowed:
+            raise ValueError(f"Rate limit exceeded. Maximum {key.rate_limit} requests per hour.")
+
 
 # Global auth manager instance
 _auth_manager = None
@@ -740,39 +759,6 @@ class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
 
-    def check_rate_limit(self, api_key: str) -> None:
-        """
-        Check if the API key has exceeded its rate limit.
-
-        Args:
-            api_key: The API key to check
-
-        Raises:
-            ValueError: If rate limit exceeded
-        """
-        if api_key not in self.api_keys:
-            return  # Invalid keys are caught elsewhere
-
-        key = self.api_keys[api_key]
-        now = datetime.now()
-
-        # Initialize rate tracking for this key
-        if api_key not in self.rate_limits:
-            self.rate_limits[api_key] = []
-
-        # Clean old timestamps (older than 1 hour)
-        cutoff = now - timedelta(hours=1)
-        self.rate_limits[api_key] = [
-            ts for ts in self.rate_limits[api_key] if ts > cutoff
-        ]
-
-        # Check rate limit
-        if len(self.rate_limits[api_key]) >= key.rate_limit:
-            raise ValueError(f"Rate limit exceeded. Maximum {key.rate_limit} requests per hour.")
-
-        # Add current request timestamp
-        self.rate_limits[api_key].append(now)
-
     def revoke_key(self, api_key: str) -> bool:
         """
         Revoke an API key.
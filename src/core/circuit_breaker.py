@@ -13,7 +13,7 @@ Follows Netflix Hystrix and AWS patterns for production reliability.
 import asyncio
 import time
 import logging
-from typing import Callable, Any, Optional, Tuple, Set
+from typing import Callable, Any, Dict, Optional, Tuple, Set
 from enum import Enum
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -177,7 +177,27 @@ class CircuitBreaker:
                 raise
             else:
                 raise
-    
+
+    def allow_request(self) -> bool:
+        """
+        Synchronous gate for callers that manage execution themselves.
+
+        Moves OPEN -> HALF_OPEN once the recovery timeout has passed; pair
+        with record_success() / record_failure().
+        """
+        with self._lock:
+            if self.is_open and self._should_attempt_recovery():
+                self._transition_to_half_open()
+            return not self.is_open
+
+    def record_success(self) -> None:
+        """Record a successful call made outside call()."""
+        self._record_success()
+
+    def record_failure(self) -> None:
+        """Record a failed call made outside call()."""
+        self._record_failure()
+
     def _record_success(self):
         """Record successful call"""
         with self._lock:
@@ -256,6 +276,17 @@ class CircuitBreaker:
             self.metrics = CircuitBreakerMetrics()
             logger.info(f"Circuit '{self.name}' manually reset to CLOSED")
     
+    def get_stats(self) -> Dict[str, Any]:
+        """Current state and counters as a plain dict"""
+        metrics = self.metrics
+        return {
+            "state": metrics.state.value,
+            "failures_total": metrics.failures_total,
+            "successes_total": metrics.successes_total,
+            "trips_total": metrics.trips_total,
+            "consecutive_failures": metrics.consecutive_failures,
+        }
+    
     def get_metrics(self) -> CircuitBreakerMetrics:
         """Get current metrics snapshot"""
         with self._lock:
@@ -271,6 +302,283 @@ class CircuitBreaker:
             )
 
 
+class _WindowBucket:
+    __slots__ = ("epoch", "calls", "failures", "slow_calls")
+
+    def __init__(self) -> None:
+        self.epoch = -1
+        self.calls = 0
+        self.failures = 0
+        self.slow_calls = 0
+
+
+class SlidingWindowCircuitBreaker(CircuitBreaker):
+    """
+    Circuit breaker that trips on failure rate over a sliding time window.
+    
+    Differences from CircuitBreaker:
+    1. Outcomes are counted in time buckets covering ``window_seconds``; the
+       circuit opens when the failure rate or slow-call rate over the window
+       crosses its threshold, once at least ``minimum_calls`` were made. A
+       single success does not reset the count, so flapping dependencies
+       trip instead of oscillating.
+    2. CLOSED-state calls take no lock: the state is a plain attribute read
+       and outcomes are bucket counter increments. The lock is only taken to
+       rotate a bucket, change state, or admit HALF_OPEN probes. Under
+       thread races a counter increment can be lost, which only makes the
+       window statistics approximate.
+    3. HALF_OPEN admits at most ``half_open_max_calls`` concurrent probes;
+       ``success_threshold`` probe successes close the circuit and any probe
+       failure (or slow probe) reopens it.
+    """
+    
+    def __init__(
+        self,
+        name: str = "default",
+        failure_rate_threshold: float = 0.5,
+        slow_call_rate_threshold: float = 1.0,
+        slow_call_seconds: Optional[float] = None,
+        minimum_calls: int = 20,
+        window_seconds: float = 60.0,
+        buckets: int = 10,
+        half_open_max_calls: int = 3,
+        success_threshold: int = 2,
+        recovery_timeout: int = 30,
+        expected_exceptions: Tuple[type, ...] = (Exception,),
+    ):
+        """
+        Initialize sliding-window circuit breaker.
+        
+        Args:
+            name: Circuit breaker identifier
+            failure_rate_threshold: Failure fraction (0-1] over the window that opens the circuit
+            slow_call_rate_threshold: Slow-call fraction (0-1] over the window that opens the circuit
+            slow_call_seconds: Calls at least this long count as slow (None disables)
+            minimum_calls: Calls required in the window before rates are evaluated
+            window_seconds: Length of the sliding window
+            buckets: Number of time buckets the window is divided into
+            half_open_max_calls: Concurrent probes allowed in HALF_OPEN
+            success_threshold: Probe successes in HALF_OPEN to close
+            recovery_timeout: Seconds before attempting recovery
+            expected_exceptions: Exception types to count as failures
+        """
+        super().__init__(
+            name=name,
+            failure_threshold=minimum_calls,
+            success_threshold=success_threshold,
+            recovery_timeout=recovery_timeout,
+            expected_exceptions=expected_exceptions,
+        )
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.minimum_calls = minimum_calls
+        self.window_seconds = window_seconds
+        self.half_open_max_calls = half_open_max_calls
+        
+        self._bucket_width = window_seconds / buckets
+        self._buckets = [_WindowBucket() for _ in range(buckets)]
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+    
+    @property
+    def state(self) -> CircuitState:
+        """Get current circuit state (lock-free read)"""
+        return self.metrics.state
+    
+    # Sliding window
+    
+    def _bucket(self, now: float) -> _WindowBucket:
+        epoch = int(now / self._bucket_width)
+        bucket = self._buckets[epoch % len(self._buckets)]
+        if bucket.epoch != epoch:
+            with self._lock:
+                if bucket.epoch != epoch:
+                    bucket.calls = bucket.failures = bucket.slow_calls = 0
+                    bucket.epoch = epoch
+        return bucket
+    
+    def _window_counts(self, now: float) -> Tuple[int, int, int]:
+        oldest = int(now / self._bucket_width) - len(self._buckets)
+        calls = failures = slow_calls = 0
+        for bucket in self._buckets:
+            if bucket.epoch > oldest:
+                calls += bucket.calls
+                failures += bucket.failures
+                slow_calls += bucket.slow_calls
+        return calls, failures, slow_calls
+    
+    def _clear_window(self) -> None:
+        for bucket in self._buckets:
+            bucket.epoch = -1
+    
+    # Permission and outcomes
+    
+    def _should_attempt_recovery(self) -> bool:
+        return time.monotonic() - self._opened_at >= self.recovery_timeout
+    
+    def _acquire_permission(self) -> bool:
+        """Admit a call outside CLOSED (caller checked the fast path)."""
+        with self._lock:
+            state = self.metrics.state
+            if state == CircuitState.OPEN and self._should_attempt_recovery():
+                self._transition_to_half_open()
+                state = CircuitState.HALF_OPEN
+            if state == CircuitState.CLOSED:
+                return True
+            if state == CircuitState.HALF_OPEN and self._probes_in_flight < self.half_open_max_calls:
+                self._probes_in_flight += 1
+                return True
+            return False
+    
+    def allow_request(self) -> bool:
+        """Synchronous gate; pair with record_success() / record_failure()."""
+        return self.metrics.state == CircuitState.CLOSED or self._acquire_permission()
+    
+    async def call(
+        self,
+        func: Callable,
+        *args,
+        fallback: Optional[Callable] = None,
+        **kwargs
+    ) -> Any:
+        """
+        Execute function through circuit breaker.
+        
+        Raises:
+            CircuitOpenError: If the circuit is open (or HALF_OPEN with all
+                probe slots taken) and no fallback is provided
+        """
+        if self.metrics.state != CircuitState.CLOSED and not self._acquire_permission():
+            if fallback:
+                logger.warning(f"Circuit '{self.name}' is {self.metrics.state.value}, using fallback")
+                return await fallback(*args, **kwargs)
+            raise CircuitOpenError(
+                f"Circuit breaker '{self.name}' is {self.metrics.state.value}. "
+                f"Service recovery in ~{self.recovery_timeout}s",
+                state=self.metrics.state
+            )
+        
+        start = time.monotonic()
+        try:
+            result = await func(*args, **kwargs)
+        except BaseException as e:
+            if isinstance(e, self.expected_exceptions) and not isinstance(e, (KeyboardInterrupt, SystemExit)):
+                self._on_outcome(False, time.monotonic() - start)
+            else:
+                self._release_probe()
+            raise
+        self._on_outcome(True, time.monotonic() - start)
+        return result
+    
+    def record_success(self, duration: Optional[float] = None) -> None:
+        """Record a successful call made outside call()."""
+        self._on_outcome(True, duration or 0.0)
+    
+    def record_failure(self, duration: Optional[float] = None) -> None:
+        """Record a failed call made outside call()."""
+        self._on_outcome(False, duration or 0.0)
+    
+    def _record_success(self):
+        self._on_outcome(True, 0.0)
+    
+    def _record_failure(self):
+        self._on_outcome(False, 0.0)
+    
+    def _on_outcome(self, success: bool, duration: float) -> None:
+        slow = self.slow_call_seconds is not None and duration >= self.slow_call_seconds
+        metrics = self.metrics
+        if metrics.state == CircuitState.CLOSED:
+            # Fast path: no lock
+            now = time.monotonic()
+            bucket = self._bucket(now)
+            bucket.calls += 1
+            if success:
+                metrics.successes_total += 1
+            else:
+                bucket.failures += 1
+                metrics.failures_total += 1
+                metrics.last_failure_time = datetime.now()
+            if slow:
+                bucket.slow_calls += 1
+            if slow or not success:
+                self._evaluate(now)
+            return
+        
+        with self._lock:
+            if success:
+                metrics.successes_total += 1
+            else:
+                metrics.failures_total += 1
+                metrics.last_failure_time = datetime.now()
+            if metrics.state != CircuitState.HALF_OPEN:
+                return
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if not success or slow:
+                self._transition_to_open()
+                return
+            self._probe_successes += 1
+            metrics.consecutive_successes = self._probe_successes
+            if self._probe_successes >= self.success_threshold:
+                self._transition_to_closed()
+    
+    def _release_probe(self) -> None:
+        if self.metrics.state == CircuitState.HALF_OPEN:
+            with self._lock:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+    
+    def _evaluate(self, now: float) -> None:
+        calls, failures, slow_calls = self._window_counts(now)
+        if calls < self.minimum_calls:
+            return
+        if (
+            failures / calls >= self.failure_rate_threshold
+            or slow_calls / calls >= self.slow_call_rate_threshold
+        ):
+            with self._lock:
+                if self.metrics.state == CircuitState.CLOSED:
+                    self.metrics.consecutive_failures = failures
+                    self._transition_to_open()
+    
+    def _transition_to_open(self):
+        self._opened_at = time.monotonic()
+        self._probes_in_flight = 0
+        super()._transition_to_open()
+    
+    def _transition_to_half_open(self):
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        super()._transition_to_half_open()
+    
+    def _transition_to_closed(self):
+        self._clear_window()
+        super()._transition_to_closed()
+    
+    def reset(self):
+        """Reset circuit to CLOSED state (manual override)"""
+        with self._lock:
+            self._clear_window()
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+            super().reset()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Current state plus failure/slow-call rates over the window"""
+        calls, failures, slow_calls = self._window_counts(time.monotonic())
+        stats = super().get_stats()
+        stats.update({
+            "window_seconds": self.window_seconds,
+            "window_calls": calls,
+            "window_failures": failures,
+            "window_slow_calls": slow_calls,
+            "failure_rate": failures / calls if calls else 0.0,
+            "slow_call_rate": slow_calls / calls if calls else 0.0,
+            "half_open_in_flight": self._probes_in_flight,
+        })
+        return stats
+
+
 class CircuitBreakerRegistry:
     """
     Registry for managing multiple circuit breakers.
@@ -304,6 +612,12 @@ class CircuitBreakerRegistry:
                 name: breaker.get_metrics()
                 for name, breaker in self._breakers.items()
             }
+    
+    def get_stats(self) -> dict[str, Dict[str, Any]]:
+        """Export state and window stats for every breaker in one pass"""
+        with self._lock:
+            breakers = list(self._breakers.items())
+        return {name: breaker.get_stats() for name, breaker in breakers}
 
 
 # Global registry
@@ -324,3 +638,8 @@ def get_circuit_breaker(name: str) -> Optional[CircuitBreaker]:
 def get_all_circuit_breakers() -> dict[str, CircuitBreaker]:
     """Get all registered circuit breakers"""
     return _global_registry.get_all()
+
+
+def get_circuit_breaker_stats() -> dict[str, Dict[str, Any]]:
+    """Get state and window stats for all registered circuit breakers"""
+    return _global_registry.get_stats()
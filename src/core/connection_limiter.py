@@ -3,17 +3,49 @@ Connection Limit Enforcement for AstraGuard
 
 Extends resource_limits.py to add connection-specific tracking and enforcement.
 Monitors active connections and enforces configurable limits.
+
+AdmissionController adds request admission control for the API:
+- Priority classes: each class may occupy at most a share of the
+  concurrency limit and is served before lower classes when slots free up.
+- Adaptive concurrency limit (GradientLimit) driven by observed latency
+  against a no-load baseline instead of a static cap.
+- Bounded wait queues per class with deadlines; requests that cannot be
+  queued or time out are shed with a Retry-After estimate.
+- Per-tenant (API key) fair share: queued requests are granted round-robin
+  across tenants and a tenant may not exceed limit / active tenants.
 """
 
+import asyncio
 import logging
+import math
 import threading
+import time
+from collections import OrderedDict, deque
 from dataclasses import dataclass
-from typing import Dict, Any, Optional, Set
+from typing import Callable, Deque, Dict, Any, List, Mapping, Optional, Set
 from datetime import datetime
-from enum import Enum
+from enum import Enum, IntEnum
+
+from prometheus_client import Counter, Gauge
+
+from astraguard.observability import _safe_create_metric
+from core.timeout_handler import remaining_time
 
 logger = logging.getLogger(__name__)
 
+ADMISSION_DECISIONS_TOTAL = _safe_create_metric(
+    Counter,
+    'astra_admission_decisions_total',
+    'Admission control decisions by priority class and outcome',
+    labelnames=['priority', 'outcome']  # admitted, queued, shed_queue_full, shed_timeout
+)
+
+ADMISSION_CONCURRENCY_LIMIT = _safe_create_metric(
+    Gauge,
+    'astra_admission_concurrency_limit',
+    'Current adaptive concurrency limit'
+)
+
 
 class ConnectionType(str, Enum):
     """Types of connections"""
@@ -67,6 +99,7 @@ class ConnectionLimiter:
         }
         
         self._connections: Dict[str, ConnectionInfo] = {}
+        self._counts: Dict[ConnectionType, int] = {conn_type: 0 for conn_type in ConnectionType}
         self._lock = threading.Lock()
         
         logger.info(f"ConnectionLimiter initialized with limits: {self.limits}")
@@ -89,11 +122,10 @@ class ConnectionLimiter:
             ValueError: If connection limit exceeded
         """
         with self._lock:
-            # Check current count for this type
-            current_count = sum(
-                1 for conn in self._connections.values()
-                if conn.connection_type == connection_type
-            )
+            current_count = self._counts[connection_type]
+            previous = self._connections.get(connection_id)
+            if previous is not None and previous.connection_type == connection_type:
+                current_count -= 1  # Re-acquiring an ID replaces its slot
             
             if current_count >= self.limits[connection_type]:
                 raise ValueError(
@@ -108,7 +140,10 @@ class ConnectionLimiter:
                 created_at=datetime.now(),
                 metadata=metadata or {}
             )
+            if previous is not None:
+                self._counts[previous.connection_type] -= 1
             self._connections[connection_id] = conn_info
+            self._counts[connection_type] += 1
             
             logger.debug(
                 f"Connection acquired: {connection_id} ({connection_type.value}), "
@@ -119,8 +154,8 @@ class ConnectionLimiter:
         """Release a connection slot."""
         with self._lock:
             if connection_id in self._connections:
-                conn_type = self._connections[connection_id].connection_type
-                del self._connections[connection_id]
+                conn_type = self._connections.pop(connection_id).connection_type
+                self._counts[conn_type] -= 1
                 logger.debug(f"Connection released: {connection_id} ({conn_type.value})")
     
     def get_connection_stats(self) -> Dict[str, Any]:
@@ -128,10 +163,7 @@ class ConnectionLimiter:
         with self._lock:
             stats = {}
             for conn_type in ConnectionType:
-                count = sum(
-                    1 for conn in self._connections.values()
-                    if conn.connection_type == conn_type
-                )
+                count = self._counts[conn_type]
                 stats[conn_type.value] = {
                     "active": count,
                     "limit": self.limits[conn_type],
@@ -154,6 +186,368 @@ class ConnectionLimiter:
             return [c.to_dict() for c in conns]
 
 
+# ============================================================================
+# Admission control
+# ============================================================================
+
+class Priority(IntEnum):
+    """Request priority classes (lower value is served first)."""
+    CRITICAL = 0    # Telemetry ingestion
+    NORMAL = 1      # Interactive API
+    BACKGROUND = 2  # History, feedback, contact and other deferrable work
+
+
+@dataclass(frozen=True)
+class PriorityPolicy:
+    """Admission policy for one priority class."""
+    max_share: float      # Fraction of the concurrency limit the class may occupy
+    max_queue: int        # Requests allowed to wait for a slot
+    queue_timeout: float  # Seconds a request may wait before it is shed
+
+
+DEFAULT_PRIORITY_POLICIES: Dict[Priority, PriorityPolicy] = {
+    Priority.CRITICAL: PriorityPolicy(max_share=1.0, max_queue=512, queue_timeout=2.0),
+    Priority.NORMAL: PriorityPolicy(max_share=0.8, max_queue=128, queue_timeout=1.0),
+    Priority.BACKGROUND: PriorityPolicy(max_share=0.4, max_queue=32, queue_timeout=0.25),
+}
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of admitted."""
+
+    def __init__(self, priority: Priority, reason: str, retry_after: int):
+        super().__init__(f"{priority.name.lower()} request shed: {reason}")
+        self.priority = priority
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class GradientLimit:
+    """
+    Latency-driven concurrency limit (gradient algorithm).
+
+    Each completed request updates a short-term latency average and compares
+    it with a no-load baseline (a running minimum that is allowed to drift up
+    slowly so it follows genuine changes in service time):
+
+        gradient  = clamp(tolerance * baseline / short_rtt, 0.5, 1.0)
+        new_limit = limit * gradient + sqrt(limit)
+
+    and the limit moves towards new_limit by ``smoothing``. While latency is
+    within tolerance the limit grows by roughly sqrt(limit) headroom; once
+    queueing inflates latency it shrinks proportionally. Dropped requests
+    (errors, timeouts) back off multiplicatively. Growth is skipped while
+    less than half of the limit is in use, since such samples say nothing
+    about the capacity above it; shrinking is not.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 32,
+        min_limit: int = 4,
+        max_limit: int = 512,
+        tolerance: float = 2.0,
+        smoothing: float = 0.2,
+        short_window: int = 10,
+        baseline_drift: float = 0.001,
+        backoff_ratio: float = 0.9
+    ):
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("limits must satisfy 1 <= min_limit <= initial_limit <= max_limit")
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.baseline_drift = baseline_drift
+        self.backoff_ratio = backoff_ratio
+        self._short_alpha = 2.0 / (short_window + 1)
+        self.short_rtt = 0.0
+        self.baseline_rtt = 0.0
+
+    def update(self, rtt: float, inflight: int, dropped: bool = False) -> float:
+        """Record one completed request and return the new limit."""
+        if dropped:
+            self.limit = max(float(self.min_limit), self.limit * self.backoff_ratio)
+            return self.limit
+
+        if self.short_rtt == 0.0:
+            self.short_rtt = self.baseline_rtt = rtt
+        else:
+            self.short_rtt += self._short_alpha * (rtt - self.short_rtt)
+            self.baseline_rtt = min(self.short_rtt, self.baseline_rtt * (1.0 + self.baseline_drift))
+
+        if self.short_rtt <= 0.0:
+            return self.limit
+
+        gradient = max(0.5, min(1.0, self.tolerance * self.baseline_rtt / self.short_rtt))
+        target = self.limit * gradient + math.sqrt(self.limit)
+        if target > self.limit and inflight < self.limit / 2:
+            return self.limit
+        limit = self.limit * (1.0 - self.smoothing) + target * self.smoothing
+        self.limit = max(float(self.min_limit), min(float(self.max_limit), limit))
+        return self.limit
+
+
+class AdmissionTicket:
+    """A granted admission slot; pass it back to AdmissionController.release()."""
+
+    __slots__ = ("priority", "tenant", "start")
+
+    def __init__(self, priority: Priority, tenant: str, start: float):
+        self.priority = priority
+        self.tenant = tenant
+        self.start = start
+
+
+class _Waiter:
+    __slots__ = ("future", "tenant")
+
+    def __init__(self, future: "asyncio.Future[AdmissionTicket]", tenant: str):
+        self.future = future
+        self.tenant = tenant
+
+
+class AdmissionController:
+    """
+    Priority- and tenant-aware admission control over an adaptive limit.
+
+    Intended for a single event loop (the ASGI server's); acquire() and
+    release() must be called from that loop. A request is admitted at once
+    when the limit, its class share and its tenant's fair share all have
+    room and nobody of equal or higher priority is waiting; otherwise it
+    waits in its class queue until a slot is handed to it, its deadline
+    passes, or the queue is full.
+    """
+
+    def __init__(
+        self,
+        limit: Optional[GradientLimit] = None,
+        policies: Optional[Mapping[Priority, PriorityPolicy]] = None,
+        fair_share: bool = True,
+        max_retry_after: int = 30,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize admission controller.
+
+        Args:
+            limit: Adaptive concurrency limit (default GradientLimit())
+            policies: Per-class policies (missing classes use the defaults)
+            fair_share: Cap each tenant at limit / active tenants
+            max_retry_after: Upper bound for Retry-After hints in seconds
+            clock: Monotonic time source in seconds
+        """
+        self.limit = limit or GradientLimit()
+        self.policies: Dict[Priority, PriorityPolicy] = dict(DEFAULT_PRIORITY_POLICIES)
+        self.policies.update(policies or {})
+        self.fair_share = fair_share
+        self.max_retry_after = max_retry_after
+        self._clock = clock
+
+        classes = len(Priority)
+        self._inflight = 0
+        self._inflight_by_class = [0] * classes
+        self._queued_by_class = [0] * classes
+        # Per class: tenant -> waiters; tenants are served round-robin
+        self._queues: List["OrderedDict[str, Deque[_Waiter]]"] = [OrderedDict() for _ in range(classes)]
+        # Tenant -> in-flight requests, and tenant -> in-flight + queued (active tenants)
+        self._tenant_inflight: Dict[str, int] = {}
+        self._tenants: Dict[str, int] = {}
+
+        self._admitted = [0] * classes
+        self._queued_total = [0] * classes
+        self._shed: Dict[str, List[int]] = {
+            "queue_full": [0] * classes,
+            "timeout": [0] * classes,
+        }
+        self._decisions = {
+            (priority, outcome): ADMISSION_DECISIONS_TOTAL.labels(
+                priority=priority.name.lower(), outcome=outcome
+            )
+            for priority in Priority
+            for outcome in ("admitted", "queued", "shed_queue_full", "shed_timeout")
+        }
+        ADMISSION_CONCURRENCY_LIMIT.set(self.limit.limit)
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    def _tenant_share(self, tenant: str) -> int:
+        active = len(self._tenants) + (tenant not in self._tenants)
+        return max(1, math.ceil(self.limit.limit / active))
+
+    def _has_room(self, priority: Priority, tenant: str) -> bool:
+        limit = self.limit.limit
+        if self._inflight >= int(limit):
+            return False
+        class_cap = max(1, int(limit * self.policies[priority].max_share))
+        if self._inflight_by_class[priority] >= class_cap:
+            return False
+        if self.fair_share and self._tenant_inflight.get(tenant, 0) >= self._tenant_share(tenant):
+            return False
+        return True
+
+    def _grant(self, priority: Priority, tenant: str, queued: bool = False) -> AdmissionTicket:
+        if not queued:
+            self._tenants[tenant] = self._tenants.get(tenant, 0) + 1
+        self._inflight += 1
+        self._inflight_by_class[priority] += 1
+        self._tenant_inflight[tenant] = self._tenant_inflight.get(tenant, 0) + 1
+        self._admitted[priority] += 1
+        self._decisions[priority, "admitted"].inc()
+        return AdmissionTicket(priority, tenant, self._clock())
+
+    def retry_after(self) -> int:
+        """Estimate (in whole seconds) how long the current backlog takes to drain."""
+        backlog = self._inflight + sum(self._queued_by_class)
+        drain = backlog * self.limit.short_rtt / max(self.limit.limit, 1.0)
+        return max(1, min(self.max_retry_after, math.ceil(drain)))
+
+    def _reject(self, priority: Priority, reason: str) -> AdmissionRejected:
+        self._shed[reason][priority] += 1
+        self._decisions[priority, f"shed_{reason}"].inc()
+        return AdmissionRejected(priority, reason, self.retry_after())
+
+    async def acquire(self, priority: Priority = Priority.NORMAL, tenant: str = "") -> AdmissionTicket:
+        """
+        Admit a request or wait for a slot.
+
+        The wait is bounded by the class queue_timeout and by the enclosing
+        core.timeout_handler deadline, if any.
+
+        Raises:
+            AdmissionRejected: If the request is shed
+        """
+        if not any(self._queued_by_class[:priority + 1]) and self._has_room(priority, tenant):
+            return self._grant(priority, tenant)
+
+        policy = self.policies[priority]
+        if self._queued_by_class[priority] >= policy.max_queue:
+            raise self._reject(priority, "queue_full")
+
+        timeout = policy.queue_timeout
+        budget = remaining_time()
+        if budget is not None:
+            timeout = min(timeout, budget)
+        if timeout <= 0:
+            raise self._reject(priority, "timeout")
+
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), tenant)
+        queue = self._queues[priority].get(tenant)
+        if queue is None:
+            queue = self._queues[priority][tenant] = deque()
+        queue.append(waiter)
+        self._queued_by_class[priority] += 1
+        self._tenants[tenant] = self._tenants.get(tenant, 0) + 1
+        self._queued_total[priority] += 1
+        self._decisions[priority, "queued"].inc()
+
+        try:
+            return await asyncio.wait_for(waiter.future, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted while being cancelled: hand the slot back
+                self.release(waiter.future.result(), dropped=False, record=False)
+            else:
+                self._unqueue(priority, waiter)
+            if isinstance(exc, asyncio.TimeoutError):
+                raise self._reject(priority, "timeout") from None
+            raise
+
+    def _unqueue(self, priority: Priority, waiter: _Waiter) -> None:
+        queue = self._queues[priority].get(waiter.tenant)
+        if queue is None:
+            return
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            return
+        if not queue:
+            del self._queues[priority][waiter.tenant]
+        self._queued_by_class[priority] -= 1
+        self._leave(waiter.tenant)
+
+    def _leave(self, tenant: str) -> None:
+        remaining = self._tenants[tenant] - 1
+        if remaining:
+            self._tenants[tenant] = remaining
+        else:
+            del self._tenants[tenant]
+
+    def release(self, ticket: AdmissionTicket, dropped: bool = False, record: bool = True) -> None:
+        """
+        Return a slot and hand it (and any headroom) to waiting requests.
+
+        Args:
+            ticket: Ticket returned by acquire()
+            dropped: The request failed or timed out (backs the limit off)
+            record: Feed the request latency into the adaptive limit
+        """
+        if record:
+            self.limit.update(self._clock() - ticket.start, self._inflight, dropped)
+            ADMISSION_CONCURRENCY_LIMIT.set(self.limit.limit)
+        self._inflight -= 1
+        self._inflight_by_class[ticket.priority] -= 1
+        remaining = self._tenant_inflight[ticket.tenant] - 1
+        if remaining:
+            self._tenant_inflight[ticket.tenant] = remaining
+        else:
+            del self._tenant_inflight[ticket.tenant]
+        self._leave(ticket.tenant)
+        self._wake()
+
+    def _wake(self) -> None:
+        """Grant queued requests in priority order, round-robin across tenants."""
+        for priority in Priority:
+            queues = self._queues[priority]
+            while queues and self._inflight < int(self.limit.limit):
+                granted = False
+                for tenant in list(queues):
+                    if not self._has_room(priority, tenant):
+                        continue
+                    queue = queues.pop(tenant)
+                    waiter = queue.popleft()
+                    if queue:
+                        queues[tenant] = queue  # Re-insert at the back of the rotation
+                    self._queued_by_class[priority] -= 1
+                    if waiter.future.done():
+                        self._leave(tenant)  # Cancelled before it could be granted
+                    else:
+                        waiter.future.set_result(self._grant(priority, tenant, queued=True))
+                    granted = True
+                    break
+                if not granted:
+                    break
+            if self._inflight >= int(self.limit.limit):
+                return
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get admission statistics by priority class."""
+        limit = self.limit.limit
+        return {
+            "limit": round(limit, 2),
+            "inflight": self._inflight,
+            "short_rtt_ms": round(self.limit.short_rtt * 1000, 3),
+            "baseline_rtt_ms": round(self.limit.baseline_rtt * 1000, 3),
+            "active_tenants": len(self._tenants),
+            "retry_after": self.retry_after(),
+            "by_priority": {
+                priority.name.lower(): {
+                    "inflight": self._inflight_by_class[priority],
+                    "share_limit": max(1, int(limit * self.policies[priority].max_share)),
+                    "queued": self._queued_by_class[priority],
+                    "admitted": self._admitted[priority],
+                    "waited": self._queued_total[priority],
+                    "shed_queue_full": self._shed["queue_full"][priority],
+                    "shed_timeout": self._shed["timeout"][priority],
+                }
+                for priority in Priority
+            },
+        }
+
+
 # Global singleton
 _connection_limiter: Optional[ConnectionLimiter] = None
 _limiter_lock = threading.Lock()
@@ -167,3 +561,23 @@ def get_connection_limiter() -> ConnectionLimiter:
             if _connection_limiter is None:
                 _connection_limiter = ConnectionLimiter()
     return _connection_limiter
+
+
+_admission_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get global admission controller singleton."""
+    global _admission_controller
+    if _admission_controller is None:
+        with _limiter_lock:
+            if _admission_controller is None:
+                _admission_controller = AdmissionController()
+    return _admission_controller
+
+
+def set_admission_controller(controller: AdmissionController) -> None:
+    """Install the admission controller that serves requests as the global instance."""
+    global _admission_controller
+    with _limiter_lock:
+        _admission_controller = controller
@@ -2,14 +2,16 @@
 Deadlock Detection for AstraGuard
 
 Detects potential deadlocks in async operations using dependency graph analysis.
-Monitors resource acquisition patterns and alerts on circular wait conditions.
+Monitors resource acquisition patterns and alerts on circular wait conditions
+as soon as the edge that closes a cycle is registered. TrackedLock and
+TrackedAsyncLock feed the detector from threading/asyncio lock usage.
 """
 
 import logging
 import threading
 import asyncio
 from dataclasses import dataclass, field
-from typing import Dict, Set, List, Optional, Any
+from typing import Any, Callable, Collection, Dict, List, Optional, Set, Tuple
 from datetime import datetime
 from enum import Enum
 from collections import defaultdict
@@ -48,25 +50,109 @@ class DeadlockReport:
     cycle: List[str] = field(default_factory=list)
     affected_tasks: Set[str] = field(default_factory=set)
     timestamp: datetime = field(default_factory=datetime.now)
+    cycles: List[List[str]] = field(default_factory=list)
     
     def to_dict(self) -> Dict[str, Any]:
         return {
             "status": self.status.value,
             "cycle": self.cycle,
+            "cycles": self.cycles,
             "affected_tasks": list(self.affected_tasks),
             "timestamp": self.timestamp.isoformat()
         }
 
 
+class DeadlockError(RuntimeError):
+    """Raised by tracked locks when waiting would close a wait-for cycle."""
+
+    def __init__(self, report: DeadlockReport):
+        super().__init__(f"Deadlock: {' -> '.join(report.cycle)}")
+        self.report = report
+
+
+def strongly_connected_components(graph: Dict[str, Collection[str]]) -> List[List[str]]:
+    """
+    Tarjan's algorithm, iterative so deep wait chains cannot hit the recursion limit.
+
+    Args:
+        graph: Adjacency list (node -> successors)
+
+    Returns:
+        Every strongly connected component, in reverse topological order
+    """
+    index: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    on_stack: Set[str] = set()
+    stack: List[str] = []
+    components: List[List[str]] = []
+    counter = 0
+
+    for root in graph:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph.get(root, ())))]
+        while work:
+            node, successors = work[-1]
+            for succ in successors:
+                if succ not in index:
+                    index[succ] = lowlink[succ] = counter
+                    counter += 1
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, iter(graph.get(succ, ()))))
+                    break
+                if succ in on_stack:
+                    lowlink[node] = min(lowlink[node], index[succ])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+def _cycle_in(component: List[str], graph: Dict[str, Collection[str]]) -> List[str]:
+    """Walk edges inside a strongly connected component until a node repeats."""
+    members = set(component)
+    path: List[str] = []
+    position: Dict[str, int] = {}
+    node = component[0]
+    while node not in position:
+        position[node] = len(path)
+        path.append(node)
+        node = next(succ for succ in graph[node] if succ in members)
+    return path[position[node]:] + [node]
+
+
 class DeadlockDetector:
     """
     Detect potential deadlocks using dependency graph analysis.
     
     Features:
     - Track resource acquisition and waiting patterns
-    - Detect circular wait conditions (deadlock cycles)
-    - Alert on potential deadlocks
+    - Incrementally maintained wait-for graph (waiting task -> resource owner)
+    - Detect circular wait conditions when the closing edge is inserted,
+      walking only the chain that edge extends
+    - Full scans report every cycle (Tarjan SCCs)
+    - Optional tracked locks that feed the detector automatically
     - Thread-safe operation
+    
+    A task waits for at most one resource and every resource has at most one
+    owner, so each task has at most one outgoing wait-for edge and the check
+    on insert is a walk along a single chain.
     """
     
     def __init__(self, check_interval_seconds: float = 5.0):
@@ -74,17 +160,26 @@ class DeadlockDetector:
         Initialize deadlock detector.
         
         Args:
-            check_interval_seconds: How often to check for deadlocks
+            check_interval_seconds: How often the background full scan runs
         """
         self.check_interval = check_interval_seconds
         self._dependencies: Dict[str, ResourceDependency] = {}
+        self._owners: Dict[str, str] = {}  # resource -> owning task
+        self._held: Dict[str, Set[str]] = defaultdict(set)  # task -> resources held
+        self._waiting: Dict[str, str] = {}  # task -> resource waited for
+        self._waiters: Dict[str, Set[str]] = defaultdict(set)  # resource -> waiting tasks
+        self._callbacks: List[Callable[[DeadlockReport], None]] = []
+        self._deadlocks_detected = 0
+        self._last_report: Optional[DeadlockReport] = None
         self._lock = threading.Lock()
         self._monitoring = False
         self._monitor_task: Optional[asyncio.Task] = None
         
         logger.info(f"DeadlockDetector initialized with check interval: {check_interval_seconds}s")
     
-    def register_dependency(self, task_id: str, resource_id: str, waiting_for: Optional[str] = None):
+    def register_dependency(
+        self, task_id: str, resource_id: str, waiting_for: Optional[str] = None
+    ) -> Optional[DeadlockReport]:
         """
         Register a resource dependency.
         
@@ -92,111 +187,224 @@ class DeadlockDetector:
             task_id: ID of the task acquiring the resource
             resource_id: ID of the resource being acquired
             waiting_for: Optional ID of resource this task is waiting for
+            
+        Each call replaces the task's previous registration: it then holds
+        only resource_id and waits only for waiting_for.
+
+        Returns:
+            DeadlockReport if this dependency closes a wait-for cycle, else None
         """
         with self._lock:
+            self._drop_task_edges(task_id)
             dep = ResourceDependency(
                 task_id=task_id,
                 resource_id=resource_id,
                 waiting_for=waiting_for
             )
             self._dependencies[task_id] = dep
+            cycle = self._set_owner(task_id, resource_id)
+            if waiting_for is not None:
+                cycle = self._set_waiting(task_id, waiting_for) or cycle
             
             logger.debug(
                 f"Registered dependency: task={task_id}, resource={resource_id}, "
                 f"waiting_for={waiting_for}"
             )
+        return self._emit(cycle)
+    
+    def wait_for(self, task_id: str, resource_id: str) -> Optional[DeadlockReport]:
+        """
+        Record that a task is blocked waiting for a resource.
+        
+        Returns:
+            DeadlockReport if the wait closes a cycle, else None
+        """
+        with self._lock:
+            cycle = self._set_waiting(task_id, resource_id)
+            self._touch(task_id, resource_id)
+        return self._emit(cycle)
+    
+    def acquired(self, task_id: str, resource_id: str) -> Optional[DeadlockReport]:
+        """
+        Record that a task now owns a resource (ending any wait for it).
+        
+        Returns:
+            DeadlockReport if existing waiters on the resource now form a cycle
+        """
+        with self._lock:
+            if self._waiting.get(task_id) == resource_id:
+                self._clear_waiting(task_id)
+            cycle = self._set_owner(task_id, resource_id)
+            self._touch(task_id, resource_id)
+        return self._emit(cycle)
+    
+    def released(self, task_id: str, resource_id: str) -> None:
+        """Record that a task released one resource or gave up waiting for it."""
+        with self._lock:
+            if self._owners.get(resource_id) == task_id:
+                del self._owners[resource_id]
+                self._held[task_id].discard(resource_id)
+            if self._waiting.get(task_id) == resource_id:
+                self._clear_waiting(task_id)
+            self._forget_if_idle(task_id)
     
     def release_dependency(self, task_id: str):
         """
-        Release a resource dependency.
+        Release every resource held or waited for by a task.
         
         Args:
             task_id: ID of the task releasing the resource
         """
         with self._lock:
+            self._drop_task_edges(task_id)
             if task_id in self._dependencies:
                 del self._dependencies[task_id]
                 logger.debug(f"Released dependency for task: {task_id}")
     
+    def on_deadlock(self, callback: Callable[[DeadlockReport], None]) -> None:
+        """Register a callback invoked as soon as a wait-for cycle is formed."""
+        with self._lock:
+            self._callbacks.append(callback)
+    
+    # Incremental graph maintenance (caller holds self._lock)
+    
+    def _set_owner(self, task_id: str, resource_id: str) -> Optional[List[str]]:
+        previous = self._owners.get(resource_id)
+        if previous is not None and previous != task_id:
+            self._held[previous].discard(resource_id)
+        self._owners[resource_id] = task_id
+        self._held[task_id].add(resource_id)
+        # Waiters on this resource now have an edge to task_id
+        if self._waiters.get(resource_id):
+            return self._cycle_through(task_id)
+        return None
+    
+    def _set_waiting(self, task_id: str, resource_id: str) -> Optional[List[str]]:
+        self._clear_waiting(task_id)
+        self._waiting[task_id] = resource_id
+        self._waiters[resource_id].add(task_id)
+        return self._cycle_through(task_id)
+    
+    def _drop_task_edges(self, task_id: str) -> None:
+        """Release everything a task holds and stop its wait."""
+        for resource_id in self._held.pop(task_id, ()):
+            if self._owners.get(resource_id) == task_id:
+                del self._owners[resource_id]
+        self._clear_waiting(task_id)
+    
+    def _clear_waiting(self, task_id: str) -> None:
+        resource_id = self._waiting.pop(task_id, None)
+        if resource_id is not None:
+            waiters = self._waiters[resource_id]
+            waiters.discard(task_id)
+            if not waiters:
+                del self._waiters[resource_id]
+    
+    def _touch(self, task_id: str, resource_id: str) -> None:
+        """Refresh the task's dependency record after a wait or acquisition."""
+        waiting = self._waiting.get(task_id)
+        dep = self._dependencies.get(task_id)
+        held = dep.resource_id if dep is not None and waiting == resource_id else resource_id
+        self._dependencies[task_id] = ResourceDependency(
+            task_id=task_id, resource_id=held, waiting_for=waiting
+        )
+    
+    def _forget_if_idle(self, task_id: str) -> None:
+        held = self._held.get(task_id)
+        if not held:
+            self._held.pop(task_id, None)
+            if task_id not in self._waiting:
+                self._dependencies.pop(task_id, None)
+                return
+        dep = self._dependencies.get(task_id)
+        if dep is not None:
+            self._dependencies[task_id] = ResourceDependency(
+                task_id=task_id,
+                resource_id=dep.resource_id if not held or dep.resource_id in held else next(iter(held)),
+                waiting_for=self._waiting.get(task_id),
+            )
+    
+    def _cycle_through(self, start: str) -> Optional[List[str]]:
+        """Follow the wait-for chain from start; return the cycle if it leads back."""
+        path = [start]
+        seen = {start}
+        node = start
+        while True:
+            resource_id = self._waiting.get(node)
+            if resource_id is None:
+                return None
+            owner = self._owners.get(resource_id)
+            if owner is None:
+                return None
+            if owner == start:
+                return path + [start]
+            if owner in seen:
+                return None  # Joins a cycle that does not include start
+            seen.add(owner)
+            path.append(owner)
+            node = owner
+    
+    def _emit(self, cycle: Optional[List[str]]) -> Optional[DeadlockReport]:
+        if not cycle:
+            return None
+        report = DeadlockReport(
+            status=DeadlockStatus.DEADLOCK_DETECTED,
+            cycle=cycle,
+            affected_tasks=set(cycle),
+            cycles=[cycle],
+        )
+        with self._lock:
+            self._deadlocks_detected += 1
+            self._last_report = report
+            callbacks = list(self._callbacks)
+        logger.warning(f"Deadlock detected! Cycle: {' -> '.join(cycle)}")
+        for callback in callbacks:
+            try:
+                callback(report)
+            except Exception as e:
+                logger.error(f"Error in deadlock callback: {e}")
+        return report
+    
+    def wait_for_graph(self) -> Dict[str, Set[str]]:
+        """Snapshot of the wait-for graph (waiting task -> owning tasks)."""
+        with self._lock:
+            return {task_id: set(owners) for task_id, owners in self._wait_for_graph().items()}
+    
+    def _wait_for_graph(self) -> Dict[str, Tuple[str, ...]]:
+        owners = self._owners
+        return {
+            task_id: (owners[resource_id],)
+            for task_id, resource_id in self._waiting.items()
+            if resource_id in owners
+        }
+    
     def detect_deadlock(self) -> DeadlockReport:
         """
-        Detect deadlocks using cycle detection in dependency graph.
+        Full scan for every wait-for cycle.
         
         Returns:
             DeadlockReport with detection results
         """
         with self._lock:
-            # Build dependency graph: task -> waiting_for_task
-            graph: Dict[str, Set[str]] = defaultdict(set)
-            resource_owners: Dict[str, str] = {}
-            
-            # Map resources to their owners
-            for task_id, dep in self._dependencies.items():
-                if dep.waiting_for is None:
-                    # Task owns the resource
-                    resource_owners[dep.resource_id] = task_id
-            
-            # Build wait-for graph
-            for task_id, dep in self._dependencies.items():
-                if dep.waiting_for:
-                    # Task is waiting for a resource
-                    owner = resource_owners.get(dep.waiting_for)
-                    if owner:
-                        graph[task_id].add(owner)
-            
-            # Detect cycles using DFS
-            cycle = self._find_cycle(graph)
-            
-            if cycle:
-                logger.warning(f"Deadlock detected! Cycle: {' -> '.join(cycle)}")
-                return DeadlockReport(
-                    status=DeadlockStatus.DEADLOCK_DETECTED,
-                    cycle=cycle,
-                    affected_tasks=set(cycle)
-                )
-            
-            return DeadlockReport(status=DeadlockStatus.NO_DEADLOCK)
-    
-    def _find_cycle(self, graph: Dict[str, Set[str]]) -> List[str]:
-        """
-        Find a cycle in the dependency graph using DFS.
-        
-        Args:
-            graph: Adjacency list representation of dependency graph
-            
-        Returns:
-            List of task IDs forming a cycle, or empty list if no cycle
-        """
-        visited: Set[str] = set()
-        rec_stack: Set[str] = set()
-        path: List[str] = []
+            graph = self._wait_for_graph()
         
-        def dfs(node: str) -> Optional[List[str]]:
-            visited.add(node)
-            rec_stack.add(node)
-            path.append(node)
-            
-            for neighbor in graph.get(node, set()):
-                if neighbor not in visited:
-                    result = dfs(neighbor)
-                    if result:
-                        return result
-                elif neighbor in rec_stack:
-                    # Found a cycle
-                    cycle_start = path.index(neighbor)
-                    return path[cycle_start:] + [neighbor]
-            
-            path.pop()
-            rec_stack.remove(node)
-            return None
+        cycles = [
+            _cycle_in(component, graph)
+            for component in strongly_connected_components(graph)
+            if len(component) > 1 or component[0] in graph.get(component[0], ())
+        ]
         
-        for node in graph:
-            if node not in visited:
-                result = dfs(node)
-                if result:
-                    return result
+        if cycles:
+            for cycle in cycles:
+                logger.warning(f"Deadlock detected! Cycle: {' -> '.join(cycle)}")
+            return DeadlockReport(
+                status=DeadlockStatus.DEADLOCK_DETECTED,
+                cycle=cycles[0],
+                affected_tasks={task for cycle in cycles for task in cycle},
+                cycles=cycles,
+            )
         
-        return []
+        return DeadlockReport(status=DeadlockStatus.NO_DEADLOCK)
     
     def get_dependencies(self) -> List[Dict[str, Any]]:
         """
@@ -217,18 +425,26 @@ class DeadlockDetector:
         """
         with self._lock:
             total_deps = len(self._dependencies)
-            waiting_deps = sum(1 for dep in self._dependencies.values() if dep.waiting_for)
+            waiting_deps = len(self._waiting)
             
             return {
                 "total_dependencies": total_deps,
                 "waiting_dependencies": waiting_deps,
                 "active_dependencies": total_deps - waiting_deps,
+                "held_resources": len(self._owners),
+                "deadlocks_detected": self._deadlocks_detected,
+                "last_deadlock": self._last_report.to_dict() if self._last_report else None,
                 "monitoring_active": self._monitoring,
                 "check_interval_seconds": self.check_interval
             }
     
     async def start_monitoring(self):
-        """Start continuous deadlock monitoring."""
+        """
+        Start continuous deadlock monitoring.
+        
+        Cycles are reported when they form; the periodic full scan is a
+        safety net that also reports every cycle currently present.
+        """
         if self._monitoring:
             logger.warning("Deadlock monitoring already active")
             return
@@ -242,7 +458,7 @@ class DeadlockDetector:
                 if report.status == DeadlockStatus.DEADLOCK_DETECTED:
                     logger.error(
                         f"Deadlock detected! Affected tasks: {report.affected_tasks}, "
-                        f"Cycle: {' -> '.join(report.cycle)}"
+                        f"Cycles: {len(report.cycles)}"
                     )
                 
                 await asyncio.sleep(self.check_interval)
@@ -256,6 +472,124 @@ class DeadlockDetector:
         logger.info("Stopped deadlock monitoring")
 
 
+class TrackedLock:
+    """
+    threading.Lock wrapper that reports waits, acquisitions and releases to a
+    DeadlockDetector, keyed by the current thread.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        detector: Optional[DeadlockDetector] = None,
+        raise_on_deadlock: bool = False,
+    ):
+        """
+        Args:
+            name: Resource ID reported to the detector
+            detector: Detector to feed (defaults to the global singleton)
+            raise_on_deadlock: Raise DeadlockError instead of blocking when the wait closes a cycle
+        """
+        self.name = name
+        self._inner = threading.Lock()
+        self._detector = detector or get_deadlock_detector()
+        self._raise = raise_on_deadlock
+
+    @staticmethod
+    def _task_id() -> str:
+        return f"thread:{threading.get_ident()}"
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        task_id = self._task_id()
+        if self._inner.acquire(False):
+            self._detector.acquired(task_id, self.name)
+            return True
+        if not blocking:
+            return False
+        report = self._detector.wait_for(task_id, self.name)
+        if report is not None and self._raise:
+            self._detector.released(task_id, self.name)
+            raise DeadlockError(report)
+        acquired = self._inner.acquire(True, timeout)
+        if acquired:
+            self._detector.acquired(task_id, self.name)
+        else:
+            self._detector.released(task_id, self.name)
+        return acquired
+
+    def release(self) -> None:
+        self._detector.released(self._task_id(), self.name)
+        self._inner.release()
+
+    def locked(self) -> bool:
+        return self._inner.locked()
+
+    def __enter__(self) -> bool:
+        return self.acquire()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.release()
+
+
+class TrackedAsyncLock:
+    """
+    asyncio.Lock wrapper that reports waits, acquisitions and releases to a
+    DeadlockDetector, keyed by the current asyncio task.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        detector: Optional[DeadlockDetector] = None,
+        raise_on_deadlock: bool = False,
+    ):
+        """
+        Args:
+            name: Resource ID reported to the detector
+            detector: Detector to feed (defaults to the global singleton)
+            raise_on_deadlock: Raise DeadlockError instead of blocking when the wait closes a cycle
+        """
+        self.name = name
+        self._inner = asyncio.Lock()
+        self._detector = detector or get_deadlock_detector()
+        self._raise = raise_on_deadlock
+
+    @staticmethod
+    def _task_id() -> str:
+        return f"task:{id(asyncio.current_task())}"
+
+    async def acquire(self) -> bool:
+        task_id = self._task_id()
+        if not self._inner.locked():
+            await self._inner.acquire()
+            self._detector.acquired(task_id, self.name)
+            return True
+        report = self._detector.wait_for(task_id, self.name)
+        if report is not None and self._raise:
+            self._detector.released(task_id, self.name)
+            raise DeadlockError(report)
+        try:
+            await self._inner.acquire()
+        except BaseException:
+            self._detector.released(task_id, self.name)
+            raise
+        self._detector.acquired(task_id, self.name)
+        return True
+
+    def release(self) -> None:
+        self._detector.released(self._task_id(), self.name)
+        self._inner.release()
+
+    def locked(self) -> bool:
+        return self._inner.locked()
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self.release()
+
+
 # Global singleton instance
 _deadlock_detector: Optional[DeadlockDetector] = None
 _detector_lock = threading.Lock()
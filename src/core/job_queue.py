@@ -3,16 +3,24 @@ Job Queue Monitoring for AstraGuard
 
 Monitors job queue depth, wait times, and processing rates.
 Alerts when queue depth exceeds thresholds.
+
+Jobs are held in one FIFO per priority level; dequeue serves the most
+urgent level first. Each entry is paired with its monotonic enqueue time;
+wait-time metrics come from a running sum of those times and the head of
+each level, so they cost O(levels), not O(depth).
 """
 
 import logging
 import threading
+import time
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional, List
+from typing import Deque, Dict, Any, Optional, List, Tuple
 from datetime import datetime, timedelta
 from collections import deque
 from enum import Enum
 
+from .job_scheduler import JobPriority
+
 logger = logging.getLogger(__name__)
 
 
@@ -48,6 +56,7 @@ class JobQueue:
     
     Features:
     - Track queue depth over time
+    - Priority levels (lower value is dequeued first), FIFO within a level
     - Calculate wait times and processing rates
     - Alert on queue depth thresholds
     - Historical metrics tracking
@@ -64,7 +73,9 @@ class JobQueue:
         self.critical_depth = critical_depth
         self.metrics_window = timedelta(minutes=metrics_window_minutes)
         
-        self._queue: deque = deque()
+        self._levels: Dict[int, Deque[Tuple[float, Dict[str, Any]]]] = {}
+        self._depth = 0
+        self._enqueued_sum = 0.0  # sum of monotonic enqueue times of queued jobs
         self._processed_count = 0
         self._metrics_history: deque = deque(maxlen=100)
         self._lock = threading.Lock()
@@ -74,41 +85,78 @@ class JobQueue:
             f"critical={critical_depth}"
         )
     
-    def enqueue(self, job_id: str, metadata: Optional[Dict] = None):
-        """Add job to queue."""
+    def enqueue(
+        self,
+        job_id: str,
+        metadata: Optional[Dict] = None,
+        priority: int = JobPriority.NORMAL
+    ):
+        """
+        Add job to queue.
+
+        Args:
+            job_id: Job identifier
+            metadata: Optional job metadata
+            priority: Priority level, lower is more urgent (default NORMAL)
+        """
         with self._lock:
             job = {
                 "id": job_id,
                 "enqueued_at": datetime.now(),
-                "metadata": metadata or {}
+                "priority": priority,
+                "metadata": metadata or {},
             }
-            self._queue.append(job)
-            logger.debug(f"Job enqueued: {job_id}, depth: {len(self._queue)}")
+            enqueued_mono = time.monotonic()
+            level = self._levels.get(priority)
+            if level is None:
+                level = self._levels[priority] = deque()
+            level.append((enqueued_mono, job))
+            self._depth += 1
+            self._enqueued_sum += enqueued_mono
+            logger.debug(f"Job enqueued: {job_id}, priority: {priority}, depth: {self._depth}")
     
     def dequeue(self) -> Optional[Dict]:
-        """Remove and return next job from queue."""
+        """Remove and return the oldest job of the most urgent priority level."""
+        with self._lock:
+            if not self._depth:
+                return None
+            priority = min(self._levels)
+            level = self._levels[priority]
+            enqueued_mono, job = level.popleft()
+            if not level:
+                del self._levels[priority]
+            self._depth -= 1
+            self._enqueued_sum -= enqueued_mono
+            self._processed_count += 1
+            logger.debug(f"Job dequeued: {job['id']}")
+            return job
+    
+    def clear(self) -> int:
+        """Drop all queued jobs and return how many were removed."""
         with self._lock:
-            if self._queue:
-                job = self._queue.popleft()
-                self._processed_count += 1
-                logger.debug(f"Job dequeued: {job['id']}")
-                return job
-            return None
+            removed = self._depth
+            self._levels.clear()
+            self._depth = 0
+            self._enqueued_sum = 0.0
+            logger.debug(f"Job queue cleared: {removed} jobs removed")
+            return removed
+    
+    def __len__(self) -> int:
+        return self._depth
     
     def get_metrics(self) -> QueueMetrics:
         """Get current queue metrics."""
         with self._lock:
-            depth = len(self._queue)
+            depth = self._depth
             
-            # Calculate average wait time
+            # Average wait from the running sum; oldest is at a level head
             now = datetime.now()
-            if self._queue:
-                wait_times = [
-                    (now - job["enqueued_at"]).total_seconds()
-                    for job in self._queue
-                ]
-                avg_wait = sum(wait_times) / len(wait_times)
-                oldest_age = max(wait_times)
+            if depth:
+                now_mono = time.monotonic()
+                avg_wait = max(0.0, now_mono - self._enqueued_sum / depth)
+                oldest_age = max(
+                    now_mono - level[0][0] for level in self._levels.values()
+                )
             else:
                 avg_wait = 0.0
                 oldest_age = 0.0
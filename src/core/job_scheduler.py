@@ -3,19 +3,35 @@ Background Job Scheduler for AstraGuard
 
 Provides cron-style and interval-based job scheduling with persistence.
 Supports async job execution and monitoring.
+
+Due jobs are kept in a min-heap keyed by next run time, so the scheduler
+loop sleeps exactly until the earliest deadline (or until a job is added
+ahead of it) instead of polling every job once per second. Due jobs then
+pass through ready queues that enforce priorities, per-class concurrency
+limits and round-robin fairness across tenants.
 """
 
+import heapq
+import importlib
 import logging
 import asyncio
 import threading
+import time
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional, Callable, List
+from typing import Deque, Dict, Any, Optional, Callable, List, Tuple, TYPE_CHECKING
 from datetime import datetime, timedelta
-from enum import Enum
+from enum import Enum, IntEnum
 import uuid
 
+if TYPE_CHECKING:
+    from core.job_store import SQLiteJobStore
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_JOB_CLASS = "default"
+DEFAULT_TENANT = "default"
+
 
 class JobStatus(str, Enum):
     """Job execution status"""
@@ -33,6 +49,21 @@ class ScheduleType(str, Enum):
     ONE_TIME = "one_time"  # Run once at specific time
 
 
+class JobPriority(IntEnum):
+    """Dispatch priority for due jobs (lower value runs first)"""
+    CRITICAL = 0
+    HIGH = 1
+    NORMAL = 2
+    LOW = 3
+
+
+class MisfirePolicy(str, Enum):
+    """What to do when a job is found later than its grace period"""
+    COALESCE = "coalesce"  # Run once, then continue from now
+    RUN_ALL = "run_all"  # Run every missed occurrence back-to-back
+    SKIP = "skip"  # Drop missed occurrences, keep the original cadence
+
+
 @dataclass
 class ScheduledJob:
     """Represents a scheduled job"""
@@ -47,7 +78,15 @@ class ScheduledJob:
     next_run: Optional[datetime] = None
     run_count: int = 0
     metadata: Dict[str, Any] = field(default_factory=dict)
-    
+    priority: int = JobPriority.NORMAL
+    job_class: str = DEFAULT_JOB_CLASS
+    tenant: str = DEFAULT_TENANT
+    misfire_policy: MisfirePolicy = MisfirePolicy.COALESCE
+    missed_runs: int = 0
+    handler_ref: Optional[str] = None
+    # Bumped whenever next_run changes; stale heap entries are skipped
+    _version: int = field(default=0, repr=False)
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             "job_id": self.job_id,
@@ -59,126 +98,284 @@ class ScheduledJob:
             "last_run": self.last_run.isoformat() if self.last_run else None,
             "next_run": self.next_run.isoformat() if self.next_run else None,
             "run_count": self.run_count,
-            "metadata": self.metadata
+            "metadata": self.metadata,
+            "priority": int(self.priority),
+            "job_class": self.job_class,
+            "tenant": self.tenant,
+            "misfire_policy": self.misfire_policy.value,
+            "missed_runs": self.missed_runs,
         }
 
+    def to_record(self) -> Dict[str, Any]:
+        """Serializable form used by the job store."""
+        record = self.to_dict()
+        record["handler_ref"] = self.handler_ref
+        return record
+
+
+def _handler_ref(handler: Callable) -> Optional[str]:
+    """Import reference for a module-level handler, if it has one."""
+    module = getattr(handler, "__module__", None)
+    qualname = getattr(handler, "__qualname__", None)
+    if not module or not qualname or "<" in qualname:
+        return None
+    return f"{module}:{qualname}"
+
+
+def _resolve_handler_ref(ref: str) -> Callable:
+    """Import a handler from a "module:qualname" reference."""
+    module_name, _, qualname = ref.partition(":")
+    target: Any = importlib.import_module(module_name)
+    for part in qualname.split("."):
+        target = getattr(target, part)
+    return target
+
+
+class _ClassQueue:
+    """Ready jobs of one job class: priority levels, each round-robin by tenant."""
+
+    __slots__ = ("limit", "running", "levels", "size")
+
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit
+        self.running = 0
+        self.levels: Dict[int, "OrderedDict[str, Deque[ScheduledJob]]"] = {}
+        self.size = 0
+
+    def has_capacity(self) -> bool:
+        return self.limit is None or self.running < self.limit
+
+    def push(self, job: ScheduledJob) -> None:
+        tenants = self.levels.get(job.priority)
+        if tenants is None:
+            tenants = self.levels[job.priority] = OrderedDict()
+        queue = tenants.get(job.tenant)
+        if queue is None:
+            queue = tenants[job.tenant] = deque()
+        queue.append(job)
+        self.size += 1
+
+    def best_priority(self) -> Optional[int]:
+        return min(self.levels) if self.levels else None
+
+    def pop(self) -> ScheduledJob:
+        level = min(self.levels)
+        tenants = self.levels[level]
+        tenant, queue = next(iter(tenants.items()))
+        job = queue.popleft()
+        if queue:
+            tenants.move_to_end(tenant)  # next tenant gets the following slot
+        else:
+            del tenants[tenant]
+            if not tenants:
+                del self.levels[level]
+        self.size -= 1
+        return job
+
 
 class JobScheduler:
     """
     Background job scheduler with cron and interval support.
-    
+
     Features:
     - Interval-based scheduling (run every N seconds)
     - Cron-style scheduling (future enhancement)
     - One-time scheduled jobs
     - Async job execution
     - Job cancellation
+    - Deadline-driven wakeups (min-heap, no polling)
+    - Priorities, per-class concurrency limits, tenant fairness
+    - Misfire policies for runs found late
+    - Optional SQLite persistence of the schedule
     """
-    
-    def __init__(self):
-        """Initialize job scheduler."""
+
+    def __init__(
+        self,
+        max_concurrency: int = 100,
+        class_limits: Optional[Dict[str, int]] = None,
+        misfire_grace_seconds: float = 1.0,
+        store: Optional["SQLiteJobStore"] = None,
+        handlers: Optional[Dict[str, Callable]] = None
+    ):
+        """
+        Initialize job scheduler.
+
+        Args:
+            max_concurrency: Maximum jobs running at once across all classes
+            class_limits: Maximum concurrent jobs per job class
+            misfire_grace_seconds: Lateness tolerated before the misfire policy applies
+            store: Optional persistent job store; persisted jobs are reloaded
+            handlers: Named handlers used to resolve persisted jobs
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+
         self._jobs: Dict[str, ScheduledJob] = {}
         self._running = False
         self._lock = threading.Lock()
         self._scheduler_task: Optional[asyncio.Task] = None
-        
+
+        self.max_concurrency = max_concurrency
+        self.misfire_grace_seconds = misfire_grace_seconds
+        self._heap: List[Tuple[float, int, str, int]] = []  # (run_at, seq, job_id, version)
+        self._seq = 0
+        self._classes: Dict[str, _ClassQueue] = {}
+        self._class_limits: Dict[str, int] = dict(class_limits or {})
+        self._active = 0
+        self._tasks: set = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._wakeups = 0
+
+        self._store = store
+        self._handlers: Dict[str, Callable] = dict(handlers or {})
+        self._dirty: Dict[str, ScheduledJob] = {}
+
+        if store is not None:
+            self.load_persisted_jobs()
+
         logger.info("JobScheduler initialized")
-    
+
+    # ------------------------------------------------------------------
+    # Scheduling API
+    # ------------------------------------------------------------------
+
+    def register_handler(self, name: str, handler: Callable) -> None:
+        """Register a named handler so persisted jobs can be restored."""
+        self._handlers[name] = handler
+
+    def set_class_limit(self, job_class: str, max_concurrent: Optional[int]) -> None:
+        """Set (or clear with None) the concurrency limit for a job class."""
+        with self._lock:
+            if max_concurrent is None:
+                self._class_limits.pop(job_class, None)
+            else:
+                self._class_limits[job_class] = max_concurrent
+            if job_class in self._classes:
+                self._classes[job_class].limit = max_concurrent
+        self._notify()
+
     def schedule_interval(
         self,
         name: str,
         handler: Callable,
         interval_seconds: float,
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        priority: int = JobPriority.NORMAL,
+        job_class: str = DEFAULT_JOB_CLASS,
+        tenant: str = DEFAULT_TENANT,
+        misfire_policy: MisfirePolicy = MisfirePolicy.COALESCE,
+        start_at: Optional[datetime] = None
     ) -> str:
         """
         Schedule a job to run at regular intervals.
-        
+
         Args:
             name: Job name
             handler: Async function to execute
             interval_seconds: Interval between runs
             metadata: Optional job metadata
-            
+            priority: Dispatch priority when several jobs are due
+            job_class: Concurrency class the job counts against
+            tenant: Tenant used for fair scheduling
+            misfire_policy: Behaviour when a run is found late
+            start_at: First run time (defaults to now + interval)
+
         Returns:
             Job ID
         """
-        job_id = str(uuid.uuid4())
-        
-        with self._lock:
-            job = ScheduledJob(
-                job_id=job_id,
-                name=name,
-                schedule_type=ScheduleType.INTERVAL,
-                schedule_config={"interval_seconds": interval_seconds},
-                handler=handler,
-                next_run=datetime.now() + timedelta(seconds=interval_seconds),
-                metadata=metadata or {}
-            )
-            self._jobs[job_id] = job
-        
-        logger.info(f"Scheduled interval job: {name} ({job_id}), interval={interval_seconds}s")
-        return job_id
-    
+        if interval_seconds <= 0:
+            raise ValueError("interval_seconds must be positive")
+
+        job = ScheduledJob(
+            job_id=str(uuid.uuid4()),
+            name=name,
+            schedule_type=ScheduleType.INTERVAL,
+            schedule_config={"interval_seconds": interval_seconds},
+            handler=handler,
+            next_run=start_at or datetime.now() + timedelta(seconds=interval_seconds),
+            metadata=metadata or {},
+            priority=priority,
+            job_class=job_class,
+            tenant=tenant,
+            misfire_policy=misfire_policy,
+        )
+        self._add_job(job)
+
+        logger.info(f"Scheduled interval job: {name} ({job.job_id}), interval={interval_seconds}s")
+        return job.job_id
+
     def schedule_one_time(
         self,
         name: str,
         handler: Callable,
         run_at: datetime,
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        priority: int = JobPriority.NORMAL,
+        job_class: str = DEFAULT_JOB_CLASS,
+        tenant: str = DEFAULT_TENANT,
+        misfire_policy: MisfirePolicy = MisfirePolicy.COALESCE
     ) -> str:
         """
         Schedule a one-time job.
-        
+
         Args:
             name: Job name
             handler: Async function to execute
             run_at: When to run the job
             metadata: Optional job metadata
-            
+            priority: Dispatch priority when several jobs are due
+            job_class: Concurrency class the job counts against
+            tenant: Tenant used for fair scheduling
+            misfire_policy: SKIP drops the job if found later than the grace period
+
         Returns:
             Job ID
         """
-        job_id = str(uuid.uuid4())
-        
-        with self._lock:
-            job = ScheduledJob(
-                job_id=job_id,
-                name=name,
-                schedule_type=ScheduleType.ONE_TIME,
-                schedule_config={"run_at": run_at.isoformat()},
-                handler=handler,
-                next_run=run_at,
-                metadata=metadata or {}
-            )
-            self._jobs[job_id] = job
-        
-        logger.info(f"Scheduled one-time job: {name} ({job_id}), run_at={run_at}")
-        return job_id
-    
+        job = ScheduledJob(
+            job_id=str(uuid.uuid4()),
+            name=name,
+            schedule_type=ScheduleType.ONE_TIME,
+            schedule_config={"run_at": run_at.isoformat()},
+            handler=handler,
+            next_run=run_at,
+            metadata=metadata or {},
+            priority=priority,
+            job_class=job_class,
+            tenant=tenant,
+            misfire_policy=misfire_policy,
+        )
+        self._add_job(job)
+
+        logger.info(f"Scheduled one-time job: {name} ({job.job_id}), run_at={run_at}")
+        return job.job_id
+
     def cancel_job(self, job_id: str) -> bool:
         """
         Cancel a scheduled job.
-        
+
         Args:
             job_id: Job ID to cancel
-            
+
         Returns:
             True if cancelled, False if not found
         """
         with self._lock:
-            if job_id in self._jobs:
-                self._jobs[job_id].status = JobStatus.CANCELLED
-                logger.info(f"Job cancelled: {job_id}")
-                return True
-            return False
-    
+            job = self._jobs.get(job_id)
+            if job is None:
+                return False
+            job.status = JobStatus.CANCELLED
+            job._version += 1  # invalidates its heap entry
+        self._persist(job)
+        logger.info(f"Job cancelled: {job_id}")
+        return True
+
     def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
         """Get job details."""
         with self._lock:
             job = self._jobs.get(job_id)
             return job.to_dict() if job else None
-    
+
     def list_jobs(self, status: Optional[JobStatus] = None) -> List[Dict[str, Any]]:
         """List all jobs, optionally filtered by status."""
         with self._lock:
@@ -186,76 +383,326 @@ class JobScheduler:
             if status:
                 jobs = [j for j in jobs if j.status == status]
             return [j.to_dict() for j in jobs]
-    
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Scheduler load: heap size, ready/running jobs per class, wakeups."""
+        with self._lock:
+            return {
+                "jobs": len(self._jobs),
+                "heap_entries": len(self._heap),
+                "running": self._active,
+                "max_concurrency": self.max_concurrency,
+                "wakeups": self._wakeups,
+                "classes": {
+                    name: {"ready": q.size, "running": q.running, "limit": q.limit}
+                    for name, q in self._classes.items()
+                },
+            }
+
+    # ------------------------------------------------------------------
+    # Scheduler loop
+    # ------------------------------------------------------------------
+
     async def start(self):
         """Start the scheduler."""
         if self._running:
             logger.warning("Scheduler already running")
             return
-        
+
         self._running = True
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
         logger.info("Scheduler started")
-        
+
         while self._running:
             try:
+                self._wakeup.clear()
+                self._wakeups += 1
                 await self._process_jobs()
-                await asyncio.sleep(1)  # Check every second
+                self._flush_dirty()
+
+                delay = self._next_delay()
+                if delay is None:
+                    await self._wakeup.wait()
+                elif delay > 0:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
             except Exception as e:
                 logger.error(f"Error in scheduler loop: {e}")
                 await asyncio.sleep(1)
-    
+
+        self._flush_dirty()
+
     def stop(self):
         """Stop the scheduler."""
         self._running = False
+        self._notify()
         logger.info("Scheduler stopped")
-    
+
+    def flush(self) -> int:
+        """Persist pending run-state changes now. Returns records written."""
+        return self._flush_dirty()
+
     async def _process_jobs(self):
-        """Process due jobs."""
-        now = datetime.now()
-        
+        """Move due jobs to the ready queues and dispatch within limits."""
+        for job in self._release_due(time.time()):
+            self._start_task(job)
+
+    def _release_due(self, now_ts: float) -> List[ScheduledJob]:
+        """Pop due heap entries, apply misfire policy, return jobs to start."""
+        skipped: List[ScheduledJob] = []
+        with self._lock:
+            heap = self._heap
+            while heap and heap[0][0] <= now_ts:
+                run_at, _, job_id, version = heapq.heappop(heap)
+                job = self._jobs.get(job_id)
+                if job is None or job._version != version or job.status == JobStatus.CANCELLED:
+                    continue
+
+                lateness = now_ts - run_at
+                if job.misfire_policy == MisfirePolicy.SKIP and lateness > self.misfire_grace_seconds:
+                    self._skip_missed(job, run_at, now_ts)
+                    skipped.append(job)
+                    continue
+
+                queue = self._class_queue(job.job_class)
+                queue.push(job)
+
+            started = self._take_ready()
+
+        for job in skipped:
+            self._persist(job)
+        return started
+
+    def _take_ready(self) -> List[ScheduledJob]:
+        """Select ready jobs in priority order within concurrency limits (lock held)."""
+        started: List[ScheduledJob] = []
+        while self._active < self.max_concurrency:
+            best: Optional[_ClassQueue] = None
+            best_priority = None
+            for queue in self._classes.values():
+                if not queue.size or not queue.has_capacity():
+                    continue
+                priority = queue.best_priority()
+                if best is None or priority < best_priority:
+                    best, best_priority = queue, priority
+            if best is None:
+                break
+            job = best.pop()
+            if job.status == JobStatus.CANCELLED:
+                continue
+            best.running += 1
+            self._active += 1
+            job.status = JobStatus.RUNNING
+            started.append(job)
+        return started
+
+    def _start_task(self, job: ScheduledJob) -> None:
+        task = asyncio.create_task(self._execute_job(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _skip_missed(self, job: ScheduledJob, run_at: float, now_ts: float) -> None:
+        """Apply the SKIP misfire policy (lock held)."""
+        if job.schedule_type == ScheduleType.INTERVAL:
+            interval = job.schedule_config["interval_seconds"]
+            missed = int((now_ts - run_at) // interval) + 1
+            job.missed_runs += missed
+            self._set_next_run(job, datetime.fromtimestamp(run_at + missed * interval))
+        else:
+            job.missed_runs += 1
+            job.next_run = None
+            job.status = JobStatus.CANCELLED
+        logger.warning(f"Job misfired, skipped: {job.name} ({job.job_id})")
+
+    def _next_delay(self) -> Optional[float]:
+        """Seconds until the earliest deadline (None if nothing scheduled)."""
         with self._lock:
-            jobs_to_run = [
-                job for job in self._jobs.values()
-                if job.status not in [JobStatus.CANCELLED, JobStatus.RUNNING]
-                and job.next_run and job.next_run <= now
-            ]
-        
-        for job in jobs_to_run:
-            asyncio.create_task(self._execute_job(job))
-    
+            if self._active >= self.max_concurrency and self._ready_count():
+                return None  # a completion will wake us up
+            if not self._heap:
+                return None
+            return max(0.0, self._heap[0][0] - time.time())
+
+    def _ready_count(self) -> int:
+        return sum(q.size for q in self._classes.values())
+
+    def _notify(self) -> None:
+        """Wake the scheduler loop (safe from any thread)."""
+        loop, event = self._loop, self._wakeup
+        if loop is None or event is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            event.set()
+        else:
+            loop.call_soon_threadsafe(event.set)
+
     async def _execute_job(self, job: ScheduledJob):
         """Execute a job."""
+        started_at = datetime.now()
+        scheduled_for = job.next_run
         try:
-            with self._lock:
-                job.status = JobStatus.RUNNING
-            
             logger.info(f"Executing job: {job.name} ({job.job_id})")
-            
+
             # Execute handler
             if asyncio.iscoroutinefunction(job.handler):
                 await job.handler()
             else:
                 await asyncio.to_thread(job.handler)
-            
+
             with self._lock:
-                job.status = JobStatus.COMPLETED
-                job.last_run = datetime.now()
                 job.run_count += 1
-                
-                # Schedule next run for interval jobs
-                if job.schedule_type == ScheduleType.INTERVAL:
-                    interval = job.schedule_config["interval_seconds"]
-                    job.next_run = datetime.now() + timedelta(seconds=interval)
-                    job.status = JobStatus.PENDING
-                elif job.schedule_type == ScheduleType.ONE_TIME:
-                    job.next_run = None
-            
+                self._finish_run(job, JobStatus.COMPLETED, scheduled_for, started_at)
+
             logger.info(f"Job completed: {job.name} ({job.job_id})")
-            
+
         except Exception as e:
             logger.error(f"Job failed: {job.name} ({job.job_id}), error: {e}")
             with self._lock:
-                job.status = JobStatus.FAILED
+                self._finish_run(job, JobStatus.FAILED, scheduled_for, started_at)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._class_queue(job.job_class).running -= 1
+            self._dirty[job.job_id] = job
+            self._notify()
+
+    def _finish_run(self, job: ScheduledJob, status: JobStatus,
+                    scheduled_for: Optional[datetime], started_at: datetime) -> None:
+        """
+        Record a finished execution and schedule the next (lock held).
+
+        A job cancelled while it ran stays cancelled and is not rescheduled.
+        """
+        job.last_run = datetime.now()
+        if job.status == JobStatus.CANCELLED:
+            return
+        job.status = status
+        self._reschedule(job, scheduled_for, started_at)
+
+    def _reschedule(self, job: ScheduledJob, scheduled_for: Optional[datetime],
+                    started_at: datetime) -> None:
+        """Compute the next run after an execution (lock held)."""
+        if job.schedule_type == ScheduleType.INTERVAL:
+            interval = timedelta(seconds=job.schedule_config["interval_seconds"])
+            if job.misfire_policy == MisfirePolicy.COALESCE or scheduled_for is None:
+                next_run = datetime.now() + interval
+            else:
+                next_run = scheduled_for + interval  # fixed rate
+            if job.status == JobStatus.COMPLETED:
+                job.status = JobStatus.PENDING
+            self._set_next_run(job, next_run)
+        elif job.schedule_type == ScheduleType.ONE_TIME:
+            job.next_run = None
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _class_queue(self, job_class: str) -> _ClassQueue:
+        queue = self._classes.get(job_class)
+        if queue is None:
+            queue = self._classes[job_class] = _ClassQueue(self._class_limits.get(job_class))
+        return queue
+
+    def _set_next_run(self, job: ScheduledJob, next_run: datetime) -> None:
+        """Update next_run and push a fresh heap entry (lock held)."""
+        job.next_run = next_run
+        job._version += 1
+        self._seq += 1
+        heapq.heappush(self._heap, (next_run.timestamp(), self._seq, job.job_id, job._version))
+
+    def _add_job(self, job: ScheduledJob, persist: bool = True) -> None:
+        if job.handler_ref is None:
+            job.handler_ref = self._ref_for(job.handler)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            head = self._heap[0][0] if self._heap else None
+            if job.next_run is not None and job.status != JobStatus.CANCELLED:
+                self._set_next_run(job, job.next_run)
+            earlier = head is None or (job.next_run is not None and job.next_run.timestamp() < head)
+        if persist:
+            self._persist(job)
+        if earlier:
+            self._notify()
+
+    def _ref_for(self, handler: Callable) -> Optional[str]:
+        for name, registered in self._handlers.items():
+            if registered is handler:
+                return name
+        return _handler_ref(handler)
+
+    def _persist(self, job: ScheduledJob) -> None:
+        if self._store is not None:
+            self._store.save(job.to_record())
+
+    def _flush_dirty(self) -> int:
+        if self._store is None or not self._dirty:
+            self._dirty.clear()
+            return 0
+        dirty, self._dirty = self._dirty, {}
+        with self._lock:
+            records = [job.to_record() for job in dirty.values()]
+        return self._store.save_many(records)
+
+    def load_persisted_jobs(self) -> int:
+        """
+        Reload jobs from the store.
+
+        Handlers are resolved from registered names first, then as import
+        references. Jobs whose handler cannot be resolved are skipped.
+
+        Returns:
+            Number of jobs restored
+        """
+        if self._store is None:
+            return 0
+
+        restored = 0
+        for record in self._store.load_all():
+            ref = record.get("handler_ref")
+            handler = self._handlers.get(ref) if ref else None
+            if handler is None and ref:
+                try:
+                    handler = _resolve_handler_ref(ref)
+                except (ImportError, AttributeError) as e:
+                    logger.warning(f"Cannot restore job {record['job_id']}: handler {ref}: {e}")
+            if handler is None:
+                continue
+
+            status = JobStatus(record["status"])
+            if status == JobStatus.RUNNING:
+                status = JobStatus.PENDING  # interrupted by the restart
+            job = ScheduledJob(
+                job_id=record["job_id"],
+                name=record["name"],
+                schedule_type=ScheduleType(record["schedule_type"]),
+                schedule_config=record["schedule_config"],
+                handler=handler,
+                status=status,
+                created_at=record["created_at"] or datetime.now(),
+                last_run=record["last_run"],
+                next_run=record["next_run"],
+                run_count=record["run_count"],
+                metadata=record["metadata"],
+                priority=record["priority"],
+                job_class=record["job_class"],
+                tenant=record["tenant"],
+                misfire_policy=MisfirePolicy(record["misfire_policy"]),
+                missed_runs=record["missed_runs"],
+                handler_ref=ref,
+            )
+            self._add_job(job, persist=False)
+            restored += 1
+
+        logger.info(f"Restored {restored} persisted jobs")
+        return restored
 
 
 # Global singleton
@@ -0,0 +1,166 @@
+"""
+SQLite Persistence for Scheduled Jobs
+
+Stores the JobScheduler schedule so restarts don't lose jobs. Handlers
+are persisted as import references ("module:qualname") or names registered
+with the scheduler, and are resolved again when jobs are loaded.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Union
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteJobStore:
+    """
+    Durable job schedule backed by a single SQLite table.
+
+    Uses WAL journaling so the scheduler can write run-state updates in
+    batches without blocking readers.
+    """
+
+    def __init__(self, db_path: Union[str, Path]):
+        """
+        Open (and create if needed) the job store.
+
+        Args:
+            db_path: Path to the SQLite database file (":memory:" for tests)
+        """
+        self.db_path = str(db_path)
+        if self.db_path != ":memory:":
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS scheduled_jobs (
+                job_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                schedule_type TEXT NOT NULL,
+                schedule_config TEXT NOT NULL,
+                handler_ref TEXT,
+                status TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                job_class TEXT NOT NULL,
+                tenant TEXT NOT NULL,
+                misfire_policy TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                last_run TEXT,
+                next_run TEXT,
+                run_count INTEGER NOT NULL DEFAULT 0,
+                missed_runs INTEGER NOT NULL DEFAULT 0,
+                metadata TEXT NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+        logger.info(f"SQLiteJobStore initialized: {self.db_path}")
+
+    @staticmethod
+    def _row(record: Dict[str, Any]) -> tuple:
+        return (
+            record["job_id"],
+            record["name"],
+            record["schedule_type"],
+            json.dumps(record["schedule_config"]),
+            record.get("handler_ref"),
+            record["status"],
+            record["priority"],
+            record["job_class"],
+            record["tenant"],
+            record["misfire_policy"],
+            record["created_at"],
+            record["last_run"],
+            record["next_run"],
+            record["run_count"],
+            record["missed_runs"],
+            json.dumps(record["metadata"], default=str),
+        )
+
+    def save_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Upsert job records in a single transaction.
+
+        Args:
+            records: Job dictionaries as produced by ScheduledJob.to_record()
+
+        Returns:
+            Number of records written
+        """
+        rows = [self._row(r) for r in records]
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO scheduled_jobs VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def save(self, record: Dict[str, Any]) -> None:
+        """Upsert a single job record."""
+        self.save_many([record])
+
+    def delete(self, job_id: str) -> None:
+        """Remove a job from the store."""
+        with self._lock:
+            self._conn.execute("DELETE FROM scheduled_jobs WHERE job_id = ?", (job_id,))
+            self._conn.commit()
+
+    def load_all(self) -> List[Dict[str, Any]]:
+        """
+        Load every persisted job that may still run.
+
+        Cancelled jobs are skipped.
+
+        Returns:
+            List of job dictionaries (timestamps as datetime objects)
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT job_id, name, schedule_type, schedule_config, handler_ref, "
+                "status, priority, job_class, tenant, misfire_policy, created_at, "
+                "last_run, next_run, run_count, missed_runs, metadata "
+                "FROM scheduled_jobs WHERE status != 'cancelled'"
+            )
+            rows = cursor.fetchall()
+
+        def parse(value):
+            return datetime.fromisoformat(value) if value else None
+
+        return [
+            {
+                "job_id": row[0],
+                "name": row[1],
+                "schedule_type": row[2],
+                "schedule_config": json.loads(row[3]),
+                "handler_ref": row[4],
+                "status": row[5],
+                "priority": row[6],
+                "job_class": row[7],
+                "tenant": row[8],
+                "misfire_policy": row[9],
+                "created_at": parse(row[10]),
+                "last_run": parse(row[11]),
+                "next_run": parse(row[12]),
+                "run_count": row[13],
+                "missed_runs": row[14],
+                "metadata": json.loads(row[15]),
+            }
+            for row in rows
+        ]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
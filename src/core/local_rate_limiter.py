@@ -0,0 +1,182 @@
+"""
+AstraGuard Local Rate Limiter - In-Process GCRA Rate Limiting
+
+Single-process counterpart to the Redis-backed RateLimiter for paths that
+limit per client or per API key without shared state (contact form, API
+key auth).
+
+- GCRA (Generic Cell Rate Algorithm): each key stores one float, its
+  theoretical arrival time (TAT), on the monotonic clock. A limit of N per
+  window admits bursts of up to N and then one request every window/N.
+- Keys are hashed onto independent shards, each with its own lock, so
+  callers on different keys do not contend.
+- Each shard is an LRU-ordered table with a hard size bound. Every decision
+  also expires a few of the least recently used keys whose TAT has passed
+  (their state equals a fresh key), so memory follows active keys without
+  a periodic full sweep.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, List, NamedTuple, Optional
+
+
+class RateDecision(NamedTuple):
+    """Outcome of a single rate limit check."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float  # Seconds until the next request would be allowed (0 if allowed)
+    reset_after: float  # Seconds until the key is back to a full burst
+
+
+class _Shard:
+    __slots__ = ("lock", "tats")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.tats: "OrderedDict[str, float]" = OrderedDict()
+
+
+class ShardedRateLimiter:
+    """
+    Key-sharded GCRA rate limiter with an LRU-bounded key table.
+
+    Safe to share between coroutines and threads. ``limit`` and ``window``
+    are defaults and can be overridden per call, e.g. for per-key quotas.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        window: float,
+        shards: int = 16,
+        max_keys: int = 100_000,
+        expire_batch: int = 2,
+        key_func: Optional[Callable[[Any], str]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize rate limiter.
+
+        Args:
+            limit: Requests allowed per window (also the burst size)
+            window: Window length in seconds
+            shards: Number of independently locked shards (rounded up to a power of two)
+            max_keys: Upper bound on tracked keys across all shards
+            expire_batch: Least recently used keys examined for expiry per decision
+            key_func: Maps a request to its key for hit_request(), e.g. api.contact.get_client_ip
+            clock: Monotonic time source in seconds
+        """
+        if limit < 1 or window <= 0:
+            raise ValueError("limit must be >= 1 and window must be positive")
+        shard_count = 1
+        while shard_count < shards:
+            shard_count <<= 1
+        self.limit = limit
+        self.window = float(window)
+        self.max_keys = max_keys
+        self.expire_batch = expire_batch
+        self.key_func = key_func
+        self._clock = clock
+        self._mask = shard_count - 1
+        self._shard_capacity = max(1, max_keys // shard_count)
+        self._shards: List[_Shard] = [_Shard() for _ in range(shard_count)]
+
+    def hit(
+        self,
+        key: str,
+        cost: int = 1,
+        limit: Optional[int] = None,
+        window: Optional[float] = None,
+    ) -> RateDecision:
+        """
+        Record a request for ``key`` if it fits within the limit.
+
+        Args:
+            key: Client identifier (IP address, API key, ...)
+            cost: Number of requests this call accounts for
+            limit: Override the default limit for this call
+            window: Override the default window for this call
+
+        Returns:
+            RateDecision; denied requests do not consume quota
+        """
+        limit = limit or self.limit
+        window = float(window or self.window)
+        interval = window / limit
+        now = self._clock()
+        shard = self._shards[hash(key) & self._mask]
+
+        with shard.lock:
+            tats = shard.tats
+            tat = tats.get(key, now)
+            if tat < now:
+                tat = now
+            new_tat = tat + interval * cost
+            # Relative tolerance absorbs float rounding on large monotonic timestamps
+            allowed = new_tat - now <= window * (1 + 1e-9)
+            if allowed:
+                tats[key] = new_tat
+                tats.move_to_end(key)
+                if len(tats) > self._shard_capacity:
+                    tats.popitem(last=False)
+            elif key in tats:
+                tats.move_to_end(key)
+            self._expire(tats, now)
+
+        if allowed:
+            backlog = new_tat - now
+            return RateDecision(True, limit, max(0, int((window - backlog) / interval + 1e-9)), 0.0, backlog)
+        backlog = tat - now
+        return RateDecision(
+            False, limit, max(0, int((window - backlog) / interval + 1e-9)),
+            new_tat - window - now, backlog,
+        )
+
+    def hit_request(self, request: Any, prefix: str = "", **overrides: Any) -> RateDecision:
+        """Check a request keyed by ``key_func`` (defaults to the direct client host)."""
+        if self.key_func is not None:
+            key = self.key_func(request)
+        else:
+            key = request.client.host if request.client else "unknown"
+        return self.hit(prefix + key, **overrides)
+
+    def _expire(self, tats: "OrderedDict[str, float]", now: float) -> None:
+        """Drop up to expire_batch least recently used keys whose TAT has passed."""
+        for _ in range(self.expire_batch):
+            if not tats:
+                return
+            key, tat = next(iter(tats.items()))
+            if tat > now:
+                return
+            del tats[key]
+
+    def sweep(self) -> int:
+        """Remove every expired key. Returns the number removed."""
+        now = self._clock()
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                expired = [key for key, tat in shard.tats.items() if tat <= now]
+                for key in expired:
+                    del shard.tats[key]
+            removed += len(expired)
+        return removed
+
+    def reset(self, key: str) -> None:
+        """Forget the state of one key."""
+        shard = self._shards[hash(key) & self._mask]
+        with shard.lock:
+            shard.tats.pop(key, None)
+
+    def clear(self) -> None:
+        """Forget all keys."""
+        for shard in self._shards:
+            with shard.lock:
+                shard.tats.clear()
+
+    def __len__(self) -> int:
+        return sum(len(shard.tats) for shard in self._shards)
@@ -3,15 +3,26 @@ Memory Leak Detection for AstraGuard
 
 Tracks memory growth patterns to detect potential memory leaks.
 Monitors process memory usage over time and alerts on sustained growth.
+
+- Growth rate is a least-squares slope over a sliding window kept as
+  running sums, so each sample and each check is O(1).
+- A change-point detector separates a one-off step (cache warm-up, a large
+  batch) from steady growth; the regression restarts after each step.
+- An opt-in tracemalloc mode diffs snapshots over a window to report the
+  top growing allocation sites and object types.
 """
 
+import gc
 import logging
+import math
 import psutil
 import threading
+import time
+import tracemalloc
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
-from collections import deque
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
+from collections import Counter, deque
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +32,7 @@ class MemorySample:
     """Memory usage sample"""
     timestamp: datetime
     memory_mb: float
+    monotonic_time: float = field(default_factory=time.monotonic, repr=False)
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -29,6 +41,59 @@ class MemorySample:
         }
 
 
+@dataclass
+class ChangePoint:
+    """A one-off step in memory usage"""
+    timestamp: datetime
+    delta_mb: float
+    memory_mb: float
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "timestamp": self.timestamp.isoformat(),
+            "delta_mb": round(self.delta_mb, 2),
+            "memory_mb": round(self.memory_mb, 2)
+        }
+
+
+@dataclass
+class AllocationSite:
+    """Growth of one allocation site between two tracemalloc snapshots"""
+    location: str
+    size_diff_kb: float
+    count_diff: int
+    size_kb: float
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "location": self.location,
+            "size_diff_kb": round(self.size_diff_kb, 1),
+            "count_diff": self.count_diff,
+            "size_kb": round(self.size_kb, 1)
+        }
+
+
+@dataclass
+class AllocationReport:
+    """Top growing allocation sites and object types over a window"""
+    window_seconds: float
+    top_sites: List[AllocationSite]
+    top_types: List[Tuple[str, int]]
+    traced_memory_mb: float
+    tracemalloc_overhead_mb: float
+    timestamp: datetime = field(default_factory=datetime.now)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "window_seconds": round(self.window_seconds, 1),
+            "top_sites": [s.to_dict() for s in self.top_sites],
+            "top_types": [{"type": name, "count_diff": diff} for name, diff in self.top_types],
+            "traced_memory_mb": round(self.traced_memory_mb, 2),
+            "tracemalloc_overhead_mb": round(self.tracemalloc_overhead_mb, 2),
+            "timestamp": self.timestamp.isoformat()
+        }
+
+
 @dataclass
 class LeakReport:
     """Memory leak detection report"""
@@ -38,6 +103,9 @@ class LeakReport:
     current_memory_mb: float
     baseline_memory_mb: float
     timestamp: datetime = field(default_factory=datetime.now)
+    pattern: str = "stable"  # stable | steady_growth | step
+    change_points: List[ChangePoint] = field(default_factory=list)
+    allocations: Optional[AllocationReport] = None
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -46,18 +114,83 @@ class LeakReport:
             "samples_analyzed": self.samples_analyzed,
             "current_memory_mb": round(self.current_memory_mb, 2),
             "baseline_memory_mb": round(self.baseline_memory_mb, 2),
-            "timestamp": self.timestamp.isoformat()
+            "timestamp": self.timestamp.isoformat(),
+            "pattern": self.pattern,
+            "change_points": [c.to_dict() for c in self.change_points],
+            "allocations": self.allocations.to_dict() if self.allocations else None
         }
 
 
+class _SlidingRegression:
+    """
+    Least-squares slope over the last ``size`` points from running sums.
+    
+    Time is stored relative to an origin that is moved to the oldest point
+    every ``size`` updates (sums recomputed then), which keeps the sums well
+    conditioned over multi-day runs at amortized O(1) cost.
+    """
+    
+    def __init__(self, size: int):
+        self.size = size
+        self.points: deque = deque()
+        self.clear()
+    
+    def clear(self) -> None:
+        self.points.clear()
+        self._origin: Optional[float] = None
+        self._n = 0
+        self._sx = self._sy = self._sxy = self._sxx = 0.0
+        self._updates = 0
+    
+    def _accumulate(self, t: float, y: float, sign: int) -> None:
+        x = (t - self._origin) / 3600.0
+        self._n += sign
+        self._sx += sign * x
+        self._sy += sign * y
+        self._sxy += sign * x * y
+        self._sxx += sign * x * x
+    
+    def add(self, t: float, y: float) -> None:
+        if self._origin is None:
+            self._origin = t
+        if len(self.points) >= self.size:
+            old_t, old_y = self.points.popleft()
+            self._accumulate(old_t, old_y, -1)
+        self.points.append((t, y))
+        self._accumulate(t, y, 1)
+        self._updates += 1
+        if self._updates >= self.size:
+            self._rebase()
+    
+    def _rebase(self) -> None:
+        points = list(self.points)
+        self.clear()
+        self._origin = points[0][0]
+        for t, y in points:
+            self.points.append((t, y))
+            self._accumulate(t, y, 1)
+    
+    def __len__(self) -> int:
+        return self._n
+    
+    def slope(self) -> float:
+        """Slope in units of y per hour."""
+        denominator = self._n * self._sxx - self._sx * self._sx
+        if self._n < 2 or denominator <= 1e-18:
+            return 0.0
+        return (self._n * self._sxy - self._sx * self._sy) / denominator
+
+
 class MemoryLeakDetector:
     """
     Detect potential memory leaks by tracking memory growth patterns.
     
     Features:
     - Track memory usage over time
-    - Calculate growth rate
+    - Calculate growth rate (O(1) per sample and per check)
+    - Distinguish one-off steps from steady growth
     - Alert on sustained memory growth
+    - Optional tracemalloc attribution of growth to allocation sites
     - Configurable thresholds
     """
     
@@ -65,24 +198,56 @@ class MemoryLeakDetector:
         self,
         sample_interval_seconds: float = 60.0,
         max_samples: int = 60,
-        leak_threshold_mb_per_hour: float = 10.0
+        leak_threshold_mb_per_hour: float = 10.0,
+        step_threshold_mb: float = 20.0,
+        step_sigma: float = 4.0,
+        track_allocations: bool = False,
+        allocation_frames: int = 1,
+        allocation_top_n: int = 10,
+        allocation_window_seconds: float = 3600.0
     ):
         """
         Initialize memory leak detector.
         
         Args:
             sample_interval_seconds: How often to sample memory
-            max_samples: Maximum number of samples to retain
+            max_samples: Maximum number of samples to retain (regression window)
             leak_threshold_mb_per_hour: Growth rate threshold for leak detection
+            step_threshold_mb: Smallest jump between samples treated as a step
+            step_sigma: Jump must also exceed the mean increment by this many std devs
+            track_allocations: Start tracemalloc attribution immediately
+            allocation_frames: Stack frames tracemalloc records per allocation
+            allocation_top_n: Allocation sites / object types per report
+            allocation_window_seconds: Age at which the baseline snapshot is replaced
         """
         self.sample_interval = sample_interval_seconds
         self.max_samples = max_samples
         self.leak_threshold = leak_threshold_mb_per_hour
+        self.step_threshold = step_threshold_mb
+        self.step_sigma = step_sigma
         
         self._samples: deque = deque(maxlen=max_samples)
+        self._regression = _SlidingRegression(max_samples)
+        self._change_points: deque = deque(maxlen=10)
+        self._last_change_time: Optional[float] = None
+        # Exponentially weighted mean/variance of sample-to-sample increments
+        self._inc_mean = 0.0
+        self._inc_var = 0.0
+        self._inc_count = 0
+        self._inc_alpha = 0.1
         self._process = psutil.Process()
         self._lock = threading.Lock()
         
+        self.allocation_frames = allocation_frames
+        self.allocation_top_n = allocation_top_n
+        self.allocation_window = allocation_window_seconds
+        self._started_tracemalloc = False
+        self._baseline_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._baseline_types: Counter = Counter()
+        self._baseline_time = 0.0
+        if track_allocations:
+            self.start_allocation_tracking()
+        
         logger.info(
             f"MemoryLeakDetector initialized: "
             f"interval={sample_interval_seconds}s, "
@@ -99,18 +264,62 @@ class MemoryLeakDetector:
         """
         memory_info = self._process.memory_info()
         memory_mb = memory_info.rss / (1024 * 1024)
+        sample = self.add_sample(memory_mb)
+        logger.debug(f"Memory sample: {memory_mb:.2f}MB")
+        return sample
+    
+    def add_sample(self, memory_mb: float, monotonic_time: Optional[float] = None) -> MemorySample:
+        """
+        Record a memory measurement from any source.
         
+        Args:
+            memory_mb: Memory usage in MB
+            monotonic_time: Sample time on the monotonic clock (defaults to now)
+        
+        Returns:
+            The recorded MemorySample
+        """
         sample = MemorySample(
             timestamp=datetime.now(),
-            memory_mb=memory_mb
+            memory_mb=memory_mb,
+            monotonic_time=time.monotonic() if monotonic_time is None else monotonic_time
         )
         
         with self._lock:
+            previous = self._samples[-1] if self._samples else None
             self._samples.append(sample)
+            if previous is not None and self._is_step(sample.memory_mb - previous.memory_mb):
+                change = ChangePoint(
+                    timestamp=sample.timestamp,
+                    delta_mb=sample.memory_mb - previous.memory_mb,
+                    memory_mb=sample.memory_mb
+                )
+                self._change_points.append(change)
+                self._last_change_time = sample.monotonic_time
+                # Measure growth from the new level only
+                self._regression.clear()
+                logger.info(f"Memory step of {change.delta_mb:+.2f}MB (not counted as growth)")
+            self._regression.add(sample.monotonic_time, sample.memory_mb)
         
-        logger.debug(f"Memory sample: {memory_mb:.2f}MB")
         return sample
     
+    def _is_step(self, increment: float) -> bool:
+        """Change-point test on one increment; updates the increment statistics otherwise."""
+        deviation = increment - self._inc_mean
+        if (
+            self._inc_count >= 3
+            and abs(increment) >= self.step_threshold
+            and abs(deviation) > self.step_sigma * math.sqrt(self._inc_var)
+        ):
+            return True
+        if self._inc_count == 0:
+            self._inc_mean = increment
+        else:
+            self._inc_mean += self._inc_alpha * deviation
+            self._inc_var = (1 - self._inc_alpha) * (self._inc_var + self._inc_alpha * deviation * deviation)
+        self._inc_count += 1
+        return False
+    
     def detect_leak(self) -> LeakReport:
         """
         Detect memory leaks based on growth rate.
@@ -130,60 +339,143 @@ class MemoryLeakDetector:
                     baseline_memory_mb=current_mem
                 )
             
-            # Calculate growth rate using linear regression
-            samples_list = list(self._samples)
-            growth_rate = self._calculate_growth_rate(samples_list)
+            # Growth rate by linear regression since the last step
+            growth_rate = self._regression.slope()
+            samples_analyzed = len(self._regression)
             
-            baseline_mb = samples_list[0].memory_mb
-            current_mb = samples_list[-1].memory_mb
-            
-            is_leaking = growth_rate > self.leak_threshold
+            baseline_mb = self._regression.points[0][1]
+            current_mb = self._samples[-1].memory_mb
             
+            is_leaking = samples_analyzed >= 2 and growth_rate > self.leak_threshold
             if is_leaking:
-                logger.warning(
-                    f"Memory leak detected! Growth rate: {growth_rate:.2f}MB/h "
-                    f"(threshold: {self.leak_threshold}MB/h)"
-                )
-            
-            return LeakReport(
-                is_leaking=is_leaking,
-                growth_rate_mb_per_hour=growth_rate,
-                samples_analyzed=len(samples_list),
-                current_memory_mb=current_mb,
-                baseline_memory_mb=baseline_mb
+                pattern = "steady_growth"
+            elif (
+                self._last_change_time is not None
+                and self._last_change_time >= self._samples[0].monotonic_time
+            ):
+                pattern = "step"
+            else:
+                pattern = "stable"
+            change_points = list(self._change_points)
+        
+        allocations = None
+        if is_leaking:
+            logger.warning(
+                f"Memory leak detected! Growth rate: {growth_rate:.2f}MB/h "
+                f"(threshold: {self.leak_threshold}MB/h)"
             )
+            allocations = self.allocation_report()
+        
+        return LeakReport(
+            is_leaking=is_leaking,
+            growth_rate_mb_per_hour=growth_rate,
+            samples_analyzed=samples_analyzed,
+            current_memory_mb=current_mb,
+            baseline_memory_mb=baseline_mb,
+            pattern=pattern,
+            change_points=change_points,
+            allocations=allocations
+        )
     
-    def _calculate_growth_rate(self, samples: List[MemorySample]) -> float:
+    def start_allocation_tracking(self) -> None:
         """
-        Calculate memory growth rate in MB/hour using linear regression.
+        Start tracemalloc attribution and take the baseline snapshot.
         
-        Args:
-            samples: List of memory samples
-            
-        Returns:
-            Growth rate in MB/hour
+        Overhead is bounded by recording ``allocation_frames`` frames per
+        allocation (1 by default) and keeping only the baseline snapshot.
         """
-        if len(samples) < 2:
-            return 0.0
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.allocation_frames)
+                self._started_tracemalloc = True
+            self._reset_baseline(time.monotonic())
+        logger.info(f"Allocation tracking started (frames={self.allocation_frames})")
+    
+    def stop_allocation_tracking(self) -> None:
+        """Stop attribution (and tracemalloc, if this detector started it)."""
+        with self._lock:
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+            self._baseline_snapshot = None
+            self._baseline_types = Counter()
+        logger.info("Allocation tracking stopped")
+    
+    @property
+    def tracking_allocations(self) -> bool:
+        return self._baseline_snapshot is not None and tracemalloc.is_tracing()
+    
+    def _reset_baseline(self, now: float) -> None:
+        self._baseline_snapshot = self._take_snapshot()
+        self._baseline_types = self._type_census()
+        self._baseline_time = now
+    
+    @staticmethod
+    def _take_snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+    
+    @staticmethod
+    def _type_census() -> Counter:
+        return Counter(type(obj).__qualname__ for obj in gc.get_objects())
+    
+    def allocation_report(self) -> Optional[AllocationReport]:
+        """
+        Top growing allocation sites and object types since the baseline.
         
-        # Convert timestamps to hours since first sample
-        first_time = samples[0].timestamp
-        times = [(s.timestamp - first_time).total_seconds() / 3600.0 for s in samples]
-        memories = [s.memory_mb for s in samples]
+        The baseline is replaced once it is older than the allocation window,
+        so reports cover at most one window.
         
-        # Simple linear regression: y = mx + b
-        n = len(samples)
-        sum_x = sum(times)
-        sum_y = sum(memories)
-        sum_xy = sum(t * m for t, m in zip(times, memories))
-        sum_x2 = sum(t * t for t in times)
+        Returns:
+            AllocationReport, or None if allocation tracking is off
+        """
+        if not self.tracking_allocations:
+            return None
+        # Heap walks run without the lock so sampling is not stalled behind them
+        now = time.monotonic()
+        try:
+            snapshot = self._take_snapshot()
+        except RuntimeError:
+            return None  # Tracking stopped concurrently
+        types = self._type_census()
         
-        # Calculate slope (growth rate)
-        if n * sum_x2 - sum_x * sum_x == 0:
-            return 0.0
+        with self._lock:
+            if self._baseline_snapshot is None:
+                return None
+            baseline_snapshot = self._baseline_snapshot
+            baseline_types = self._baseline_types
+            baseline_time = self._baseline_time
+            if now - baseline_time >= self.allocation_window:
+                # The census just taken becomes the next baseline
+                self._baseline_snapshot = snapshot
+                self._baseline_types = types
+                self._baseline_time = now
         
-        slope = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x * sum_x)
-        return slope
+        top_n = self.allocation_top_n
+        sites = [
+            AllocationSite(
+                location=f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                size_diff_kb=stat.size_diff / 1024,
+                count_diff=stat.count_diff,
+                size_kb=stat.size / 1024
+            )
+            for stat in snapshot.compare_to(baseline_snapshot, "lineno")[:top_n]
+            if stat.size_diff > 0
+        ]
+        top_types = (types - baseline_types).most_common(top_n)  # Counter difference keeps growth only
+        
+        traced_current, _ = tracemalloc.get_traced_memory()
+        return AllocationReport(
+            window_seconds=max(0.0, now - baseline_time),
+            top_sites=sites,
+            top_types=top_types,
+            traced_memory_mb=traced_current / (1024 * 1024),
+            tracemalloc_overhead_mb=tracemalloc.get_tracemalloc_memory() / (1024 * 1024)
+        )
     
     def get_samples(self, count: Optional[int] = None) -> List[Dict[str, Any]]:
         """
@@ -191,7 +483,7 @@ class MemoryLeakDetector:
         
         Args:
             count: Number of recent samples (None for all)
-            
+        
         Returns:
             List of sample dictionaries
         """
@@ -228,13 +520,20 @@ class MemoryLeakDetector:
                 "max_memory_mb": round(max(memories), 2),
                 "avg_memory_mb": round(sum(memories) / len(memories), 2),
                 "sample_interval_seconds": self.sample_interval,
-                "leak_threshold_mb_per_hour": self.leak_threshold
+                "leak_threshold_mb_per_hour": self.leak_threshold,
+                "change_points": len(self._change_points),
+                "tracking_allocations": self.tracking_allocations
             }
     
     def reset(self):
         """Clear all samples."""
         with self._lock:
             self._samples.clear()
+            self._regression.clear()
+            self._change_points.clear()
+            self._last_change_time = None
+            self._inc_mean = self._inc_var = 0.0
+            self._inc_count = 0
         logger.info("Memory leak detector reset")
 
 
@@ -10,7 +10,8 @@ Features:
 - Resource usage history for diagnostics
 - Integration with health monitor
 - Automatic alerts when thresholds exceeded
-- Non-blocking CPU monitoring
+- Non-blocking CPU monitoring via a background sampler
+- O(1) snapshot reads with EWMA and percentiles over recent samples
 """
 
 import psutil
@@ -18,8 +19,10 @@ import logging
 import os
 import threading
 import functools
+import time
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Callable, Any, TypeVar
+from typing import Deque, Dict, List, Optional, Callable, Any, Sequence, Tuple, TypeVar
 from datetime import datetime, timedelta
 from enum import Enum
 
@@ -31,12 +34,19 @@ T = TypeVar('T')
 logger = logging.getLogger(__name__)
 
 
+# Per-operation thresholds for resource warnings
+OPERATION_CPU_WARNING_PERCENT = 50.0   # Process CPU share during the operation
+OPERATION_CPU_WARNING_MIN_SECONDS = 1.0  # Ignore short bursts below this CPU time
+OPERATION_MEMORY_WARNING_MB = 100.0   # RSS growth during the operation
+
+
 def monitor_operation_resources(operation_name: Optional[str] = None):
     """
     Decorator to monitor CPU and memory usage during operation execution.
 
-    Logs resource usage before and after the operation, and warns if usage
-    exceeds thresholds during the operation.
+    Measures the operation's own cost from process CPU times and RSS before
+    and after the call, which is cheap and never blocks. System-wide load
+    comes from the monitor's latest sampled snapshot.
 
     Args:
         operation_name: Optional name for the operation (defaults to function name)
@@ -55,61 +65,61 @@ def monitor_operation_resources(operation_name: Optional[str] = None):
         def wrapper(*args: Any, **kwargs: Any) -> T:
             op_name = operation_name or func.__name__
             monitor = get_resource_monitor()
+            if not monitor.monitoring_enabled:
+                return func(*args, **kwargs)
 
-            # Get initial metrics
-            initial_metrics = monitor.get_current_metrics()
+            start_wall = time.perf_counter()
+            start_cpu, start_rss_mb = monitor.get_process_usage()
 
             logger.debug(
                 f"Starting operation '{op_name}' - "
-                f"CPU: {initial_metrics.cpu_percent:.1f}%, "
-                f"Memory: {initial_metrics.memory_percent:.1f}% "
-                f"({initial_metrics.process_memory_mb:.1f}MB)"
+                f"process RSS: {start_rss_mb:.1f}MB"
             )
 
+            def usage() -> Tuple[float, float, float]:
+                end_cpu, end_rss_mb = monitor.get_process_usage()
+                wall = max(time.perf_counter() - start_wall, 1e-9)
+                cpu_seconds = max(end_cpu - start_cpu, 0.0)
+                return cpu_seconds, cpu_seconds / wall * 100.0, end_rss_mb - start_rss_mb
+
             try:
                 # Execute the function
                 result = func(*args, **kwargs)
-
-                # Get final metrics
-                final_metrics = monitor.get_current_metrics()
-
-                # Calculate resource usage during operation
-                cpu_used = final_metrics.cpu_percent - initial_metrics.cpu_percent
-                memory_used = final_metrics.process_memory_mb - initial_metrics.process_memory_mb
-
-                logger.debug(
-                    f"Completed operation '{op_name}' - "
-                    f"CPU delta: {cpu_used:+.1f}%, "
-                    f"Memory delta: {memory_used:+.1f}MB"
-                )
-
-                # Check for excessive resource usage
-                if cpu_used > 50.0:  # More than 50% CPU increase
-                    logger.warning(
-                        f"High CPU usage in '{op_name}': +{cpu_used:.1f}% "
-                        f"(final: {final_metrics.cpu_percent:.1f}%)"
-                    )
-
-                if memory_used > 100.0:  # More than 100MB memory increase
-                    logger.warning(
-                        f"High memory usage in '{op_name}': +{memory_used:.1f}MB "
-                        f"(final: {final_metrics.process_memory_mb:.1f}MB)"
-                    )
-
-                return result
-
             except Exception as e:
                 # Log resource usage even on failure
-                final_metrics = monitor.get_current_metrics()
-                cpu_used = final_metrics.cpu_percent - initial_metrics.cpu_percent
-                memory_used = final_metrics.process_memory_mb - initial_metrics.process_memory_mb
-
+                cpu_seconds, cpu_used, memory_used = usage()
                 logger.error(
                     f"Operation '{op_name}' failed after using "
-                    f"CPU: +{cpu_used:.1f}%, Memory: +{memory_used:.1f}MB - {e}"
+                    f"CPU: {cpu_seconds:.3f}s ({cpu_used:.1f}%), "
+                    f"Memory: {memory_used:+.1f}MB - {e}"
                 )
                 raise
 
+            cpu_seconds, cpu_used, memory_used = usage()
+
+            logger.debug(
+                f"Completed operation '{op_name}' - "
+                f"CPU: {cpu_seconds:.3f}s ({cpu_used:.1f}%), "
+                f"Memory delta: {memory_used:+.1f}MB"
+            )
+
+            # Check for excessive resource usage
+            if (cpu_seconds >= OPERATION_CPU_WARNING_MIN_SECONDS
+                    and cpu_used > OPERATION_CPU_WARNING_PERCENT):
+                system_cpu = monitor.get_latest_metrics().cpu_percent
+                logger.warning(
+                    f"High CPU usage in '{op_name}': {cpu_used:.1f}% over "
+                    f"{cpu_seconds:.2f}s CPU time (system: {system_cpu:.1f}%)"
+                )
+
+            if memory_used > OPERATION_MEMORY_WARNING_MB:
+                logger.warning(
+                    f"High memory usage in '{op_name}': +{memory_used:.1f}MB "
+                    f"(final: {start_rss_mb + memory_used:.1f}MB)"
+                )
+
+            return result
+
         return wrapper
 
     return decorator
@@ -176,12 +186,175 @@ class ResourceThresholds:
     disk_critical: float = 95.0
 
 
+@dataclass(frozen=True)
+class ResourceSnapshot:
+    """
+    Immutable view of the most recent resource sample.
+
+    Published by swapping a single reference, so readers never take a lock.
+
+    Attributes:
+        metrics: Latest raw sample
+        cpu_ewma: Exponentially weighted CPU utilization
+        memory_ewma: Exponentially weighted memory utilization
+        sampled_at: time.monotonic() when the sample was taken
+        sequence: Number of samples recorded so far
+    """
+    metrics: ResourceMetrics
+    cpu_ewma: float
+    memory_ewma: float
+    sampled_at: float
+    sequence: int
+
+    @property
+    def age_seconds(self) -> float:
+        """Seconds since the sample was taken"""
+        return time.monotonic() - self.sampled_at
+
+
+class ResourceSampleRing:
+    """
+    Fixed-capacity ring buffer of recent resource samples.
+
+    Writers are serialized by a small lock; readers use the published
+    ResourceSnapshot (O(1)) or copy the ring for percentile queries.
+    """
+
+    def __init__(self, capacity: int = 120, ewma_alpha: float = 0.2):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        if not 0.0 < ewma_alpha <= 1.0:
+            raise ValueError("ewma_alpha must be in (0, 1]")
+
+        self.capacity = capacity
+        self.ewma_alpha = ewma_alpha
+        self._cpu: List[float] = [0.0] * capacity
+        self._memory: List[float] = [0.0] * capacity
+        self._count = 0
+        self._write_lock = threading.Lock()
+        self._snapshot: Optional[ResourceSnapshot] = None
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def latest(self) -> Optional[ResourceSnapshot]:
+        """Most recent snapshot (None until the first sample)"""
+        return self._snapshot
+
+    def record(self, metrics: ResourceMetrics) -> ResourceSnapshot:
+        """Store a sample and publish an updated snapshot"""
+        with self._write_lock:
+            slot = self._count % self.capacity
+            self._cpu[slot] = metrics.cpu_percent
+            self._memory[slot] = metrics.memory_percent
+            self._count += 1
+
+            previous = self._snapshot
+            if previous is None:
+                cpu_ewma, memory_ewma = metrics.cpu_percent, metrics.memory_percent
+            else:
+                a = self.ewma_alpha
+                cpu_ewma = a * metrics.cpu_percent + (1 - a) * previous.cpu_ewma
+                memory_ewma = a * metrics.memory_percent + (1 - a) * previous.memory_ewma
+
+            snapshot = ResourceSnapshot(
+                metrics=metrics,
+                cpu_ewma=cpu_ewma,
+                memory_ewma=memory_ewma,
+                sampled_at=time.monotonic(),
+                sequence=self._count,
+            )
+            self._snapshot = snapshot
+            return snapshot
+
+    def percentiles(
+        self,
+        resource: str = "cpu",
+        quantiles: Sequence[float] = (50.0, 95.0, 99.0)
+    ) -> Dict[str, float]:
+        """
+        Nearest-rank percentiles over the samples currently in the ring.
+
+        Args:
+            resource: 'cpu' or 'memory'
+            quantiles: Percentiles to compute (0-100)
+
+        Returns:
+            Mapping like {'p50': 12.0, 'p95': 40.5, 'p99': 61.0}
+        """
+        if resource not in ("cpu", "memory"):
+            raise ValueError(f"Unknown resource: {resource}")
+
+        values = sorted((self._cpu if resource == "cpu" else self._memory)[:len(self)])
+        if not values:
+            return {}
+
+        result = {}
+        for q in quantiles:
+            rank = min(len(values) - 1, max(0, int(round(q / 100.0 * len(values))) - 1))
+            result[f"p{q:g}"] = values[rank]
+        return result
+
+
+class ResourceSampler:
+    """
+    Daemon thread that samples resources at a fixed cadence.
+
+    Each tick calls ResourceMonitor.get_current_metrics(), which is
+    non-blocking, so request paths only ever read the published snapshot.
+    """
+
+    def __init__(self, monitor: "ResourceMonitor", interval_seconds: float = 1.0):
+        if interval_seconds <= 0:
+            raise ValueError("interval_seconds must be positive")
+
+        self.monitor = monitor
+        self.interval_seconds = interval_seconds
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start sampling (no-op if already running)"""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="astra-resource-sampler", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Resource sampler started (interval={self.interval_seconds}s)")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop sampling and wait for the thread to exit"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.monitor.get_current_metrics()
+            except Exception as e:
+                logger.error(f"Resource sampler tick failed: {e}")
+            self._stop_event.wait(self.interval_seconds)
+
+
 class ResourceMonitor:
     """
     Monitor system resource utilization.
     
     Tracks CPU, memory, and disk usage with configurable thresholds.
     Maintains history for trend analysis and diagnostics.
+
+    Readers (health checks, availability checks, the operation decorator)
+    use get_latest_metrics(), which returns the snapshot published by the
+    background ResourceSampler in O(1) without touching psutil.
     """
     
     def __init__(
@@ -189,7 +362,10 @@ class ResourceMonitor:
         thresholds: Optional[ResourceThresholds] = None,
         history_size: int = 100,
         history_time_window_hours: int = 1,
-        monitoring_enabled: bool = True
+        monitoring_enabled: bool = True,
+        sample_interval_seconds: float = 1.0,
+        sample_buffer_size: int = 120,
+        ewma_alpha: float = 0.2
     ):
         """
         Initialize resource monitor.
@@ -199,15 +375,26 @@ class ResourceMonitor:
             history_size: Number of metric snapshots to retain
             history_time_window_hours: Time window in hours to retain metrics
             monitoring_enabled: Whether monitoring is active
+            sample_interval_seconds: Cadence of the background sampler, also
+                the max snapshot age tolerated when the sampler is not running
+            sample_buffer_size: Number of recent samples kept for percentiles
+            ewma_alpha: Smoothing factor for the CPU/memory EWMA
         """
         self.thresholds = thresholds or ResourceThresholds()
         self.history_size = history_size
         self.history_time_window_hours = history_time_window_hours
         self.monitoring_enabled = monitoring_enabled
+        self.sample_interval_seconds = sample_interval_seconds
 
-        self._metrics_history: List[ResourceMetrics] = []
+        self._metrics_history: Deque[ResourceMetrics] = deque(maxlen=history_size)
+        self._history_lock = threading.Lock()
+        self._samples = ResourceSampleRing(sample_buffer_size, ewma_alpha)
+        self._sampler: Optional[ResourceSampler] = None
         self._process = psutil.Process()
 
+        # Prime psutil's CPU counters so the first non-blocking read is meaningful
+        psutil.cpu_percent(interval=None)
+
         logger.info(
             f"ResourceMonitor initialized: "
             f"cpu_warning={self.thresholds.cpu_warning}%, "
@@ -218,9 +405,11 @@ class ResourceMonitor:
     
     def get_current_metrics(self) -> ResourceMetrics:
         """
-        Collect current resource metrics.
+        Collect current resource metrics and publish them as the new snapshot.
 
-        Uses interval=0 for CPU to ensure non-blocking operation.
+        Uses interval=None for CPU to ensure non-blocking operation: the
+        value is utilization since the previous sample, which is exactly the
+        sampler cadence when the background sampler is running.
 
         Returns:
             ResourceMetrics snapshot of current system state
@@ -235,11 +424,8 @@ class ResourceMonitor:
             )
 
         try:
-            # CPU usage (interval=0 for non-blocking return)
-            # This returns usage since last call, which is ideal for periodic monitoring
-            cpu_percent = psutil.cpu_percent(interval=0)
-            # CPU usage (1 second interval for accuracy)
-            cpu_percent = psutil.cpu_percent(interval=0.1)
+            # CPU usage (non-blocking, utilization since the last call)
+            cpu_percent = psutil.cpu_percent(interval=None)
 
             # Memory usage
             memory = psutil.virtual_memory()
@@ -266,8 +452,9 @@ class ResourceMonitor:
                 timestamp=datetime.now()
             )
 
-            # Add to history
+            # Add to history and publish snapshot
             self._add_to_history(metrics)
+            self._samples.record(metrics)
 
             return metrics
 
@@ -300,8 +487,8 @@ class ResourceMonitor:
             )
 
         try:
-            # CPU usage (interval=0 for non-blocking return)
-            cpu_percent = psutil.cpu_percent(interval=0.1)
+            # CPU usage (non-blocking, utilization since the last call)
+            cpu_percent = psutil.cpu_percent(interval=None)
 
             # Memory usage
             memory = psutil.virtual_memory()
@@ -337,18 +524,94 @@ class ResourceMonitor:
     
     def _add_to_history(self, metrics: ResourceMetrics):
         """Add metrics to history, maintaining size and time limits"""
-        self._metrics_history.append(metrics)
-
-        # Clean up old entries based on time window
         cutoff_time = datetime.now() - timedelta(hours=self.history_time_window_hours)
-        self._metrics_history = [
-            m for m in self._metrics_history
-            if m.timestamp >= cutoff_time
-        ]
-
-        # Trim history if exceeded size (after time-based cleanup)
-        if len(self._metrics_history) > self.history_size:
-            self._metrics_history = self._metrics_history[-self.history_size:]
+        with self._history_lock:
+            # deque(maxlen) enforces the size limit; expire from the old end
+            self._metrics_history.append(metrics)
+            while self._metrics_history and self._metrics_history[0].timestamp < cutoff_time:
+                self._metrics_history.popleft()
+
+    def get_latest_metrics(self) -> ResourceMetrics:
+        """
+        Get the most recent sampled metrics in O(1).
+
+        Reads the published snapshot. Only when no sampler is running and
+        the snapshot is older than sample_interval_seconds is a fresh
+        (non-blocking) sample taken.
+
+        Returns:
+            Latest ResourceMetrics
+        """
+        snapshot = self._samples.latest
+        if snapshot is None or (
+            not self.is_sampling and snapshot.age_seconds > self.sample_interval_seconds
+        ):
+            return self.get_current_metrics()
+        return snapshot.metrics
+
+    def get_snapshot(self) -> Optional[ResourceSnapshot]:
+        """Get the latest published snapshot (None before the first sample)"""
+        return self._samples.latest
+
+    def get_sample_stats(self) -> Dict[str, Any]:
+        """
+        Get EWMA and percentiles over the recent sample ring.
+
+        Returns:
+            Dictionary with per-resource EWMA and p50/p95/p99 values
+        """
+        snapshot = self._samples.latest
+        if snapshot is None:
+            return {'samples': 0}
+        return {
+            'samples': len(self._samples),
+            'cpu': {'ewma': snapshot.cpu_ewma, **self._samples.percentiles('cpu')},
+            'memory': {'ewma': snapshot.memory_ewma, **self._samples.percentiles('memory')},
+            'age_seconds': snapshot.age_seconds,
+        }
+
+    def get_process_usage(self) -> Tuple[float, float]:
+        """
+        Get cumulative process CPU time and current RSS.
+
+        Both reads are cheap syscalls, suitable for per-operation deltas.
+
+        Returns:
+            Tuple of (cpu_seconds, rss_mb)
+        """
+        try:
+            cpu_times = self._process.cpu_times()
+            rss = self._process.memory_info().rss
+            return cpu_times.user + cpu_times.system, rss / (1024 * 1024)
+        except Exception as e:
+            logger.debug(f"Error reading process usage: {e}")
+            return 0.0, 0.0
+
+    @property
+    def is_sampling(self) -> bool:
+        """Whether the background sampler is running"""
+        return self._sampler is not None and self._sampler.is_running
+
+    def start_sampler(self, interval_seconds: Optional[float] = None) -> None:
+        """
+        Start the background sampler thread.
+
+        Args:
+            interval_seconds: Sampling cadence (defaults to sample_interval_seconds)
+        """
+        if not self.monitoring_enabled:
+            return
+        if interval_seconds is not None:
+            self.sample_interval_seconds = interval_seconds
+        if self._sampler is None:
+            self._sampler = ResourceSampler(self, self.sample_interval_seconds)
+        self._sampler.interval_seconds = self.sample_interval_seconds
+        self._sampler.start()
+
+    def stop_sampler(self, timeout: Optional[float] = None) -> None:
+        """Stop the background sampler thread"""
+        if self._sampler is not None:
+            self._sampler.stop(timeout=timeout)
     
     def check_resource_health(self) -> Dict[str, str]:
         """
@@ -363,7 +626,7 @@ class ResourceMonitor:
                 'overall': 'healthy' | 'warning' | 'critical'
             }
         """
-        metrics = self.get_current_metrics()
+        metrics = self.get_latest_metrics()
         
         status = {
             'cpu': ResourceStatus.HEALTHY,
@@ -432,7 +695,7 @@ class ResourceMonitor:
         Returns:
             True if resources are available, False otherwise
         """
-        metrics = self.get_current_metrics()
+        metrics = self.get_latest_metrics()
         
         cpu_free = 100.0 - metrics.cpu_percent
         memory_available = metrics.memory_available_mb
@@ -462,10 +725,11 @@ class ResourceMonitor:
             Dictionary with min/max/avg for each metric
         """
         cutoff_time = datetime.now() - timedelta(minutes=duration_minutes)
-        recent_metrics = [
-            m for m in self._metrics_history 
-            if m.timestamp >= cutoff_time
-        ]
+        with self._history_lock:
+            recent_metrics = [
+                m for m in self._metrics_history
+                if m.timestamp >= cutoff_time
+            ]
         
         if not recent_metrics:
             return {'error': 'No metrics available'}
@@ -486,7 +750,7 @@ class ResourceMonitor:
                 'max': max(memory_values),
                 'avg': sum(memory_values) / len(memory_values)
             },
-            'current': self.get_current_metrics().to_dict()
+            'current': self.get_latest_metrics().to_dict()
         }
     
     def get_history(self, count: Optional[int] = None) -> List[Dict]:
@@ -499,7 +763,10 @@ class ResourceMonitor:
         Returns:
             List of metric dictionaries
         """
-        history = self._metrics_history[-count:] if count else self._metrics_history
+        with self._history_lock:
+            history = list(self._metrics_history)
+        if count:
+            history = history[-count:]
         return [m.to_dict() for m in history]
 
 
@@ -550,9 +817,16 @@ def get_resource_monitor() -> ResourceMonitor:
 
                 monitoring_enabled = get_secret('resource_monitoring_enabled')
 
-                _resource_monitor = ResourceMonitor(
+                sample_interval = get_secret('resource_sample_interval') or os.environ.get('RESOURCE_SAMPLE_INTERVAL')
+                sample_interval = float(sample_interval) if sample_interval else 1.0
+
+                monitor = ResourceMonitor(
                     thresholds=thresholds,
-                    monitoring_enabled=monitoring_enabled
+                    monitoring_enabled=monitoring_enabled,
+                    sample_interval_seconds=sample_interval if sample_interval > 0 else 1.0
                 )
+                if sample_interval > 0:
+                    monitor.start_sampler()
+                _resource_monitor = monitor
 
     return _resource_monitor
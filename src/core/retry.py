@@ -1,18 +1,29 @@
 """
 Self-Healing Retry Logic with Exponential Backoff + Full Jitter
 Implements automatic retry with exponential backoff before circuit breaker engagement.
+
+Retries are bounded so they cannot amplify an outage:
+- RetryBudget: token bucket shared per target; retries are capped at a
+  fraction of first attempts (plus a small per-second reserve)
+- Deadline-aware: a retry whose backoff would overrun the call's deadline
+  (explicit, or the enclosing with_timeout scope) is not attempted
+- Hedge: for idempotent reads, a second attempt is sent once the first has
+  taken longer than the observed p95 latency; the first success wins
 """
 import asyncio
 import random
 import secrets
+import threading
 import time
+from collections import deque
 from functools import wraps
-from typing import Callable, Any, Tuple, Optional
+from typing import Callable, Any, Dict, Tuple, Optional, Union
 from datetime import datetime
 import logging
 
 from prometheus_client import Counter, Histogram, Gauge
 from astraguard.observability import _safe_create_metric
+from core.timeout_handler import remaining_time
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -25,7 +36,7 @@ RETRY_ATTEMPTS_TOTAL = _safe_create_metric(
     Counter,
     'astra_retry_attempts_total',
     documentation='Total retry attempts',
-    labelnames=['outcome']  # success, failed
+    labelnames=['endpoint', 'outcome']  # success, failed; shared with astraguard.observability
 )
 
 RETRY_DELAYS_SECONDS = _safe_create_metric(
@@ -50,6 +61,134 @@ RETRY_BACKOFF_LEVEL = _safe_create_metric(
     labelnames=['function']
 )
 
+RETRY_GIVEUPS_TOTAL = _safe_create_metric(
+    Counter,
+    'astra_retry_giveups_total',
+    'Retries not attempted because of the retry budget or deadline',
+    labelnames=['function', 'reason']  # budget, deadline
+)
+
+RETRY_BUDGET_TOKENS = _safe_create_metric(
+    Gauge,
+    'astra_retry_budget_tokens',
+    'Retry tokens currently available per target',
+    labelnames=['target']
+)
+
+HEDGED_REQUESTS_TOTAL = _safe_create_metric(
+    Counter,
+    'astra_hedged_requests_total',
+    'Hedged requests sent and won per target',
+    labelnames=['target', 'outcome']  # sent, won, denied
+)
+
+_sys_random = random.SystemRandom()
+
+
+# ============================================================================
+# RETRY BUDGET
+# ============================================================================
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of base traffic for a target.
+    
+    Every first attempt deposits ``ratio`` tokens and the bucket also refills
+    at ``min_retries_per_second`` so low-traffic callers can still retry.
+    Each retry (or hedge) withdraws one token; with an empty bucket the
+    retry is skipped. Shared by every caller of the same target, so a
+    degraded dependency sees at most ~(1 + ratio)x its normal load.
+    """
+    
+    def __init__(
+        self,
+        target: str = "default",
+        ratio: float = 0.2,
+        min_retries_per_second: float = 1.0,
+        max_tokens: float = 100.0
+    ):
+        """
+        Initialize retry budget.
+        
+        Args:
+            target: Dependency name (metrics label)
+            ratio: Retry tokens earned per first attempt (0.2 = retries capped at 20%)
+            min_retries_per_second: Reserve refill rate independent of traffic
+            max_tokens: Bucket capacity (bounds retry bursts after a quiet period)
+        """
+        self.target = target
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self.requests_total = 0
+        self.retries_total = 0
+        self.rejected_total = 0
+    
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(self.max_tokens, self._tokens + elapsed * self.min_retries_per_second)
+    
+    def deposit(self) -> None:
+        """Record a first attempt."""
+        with self._lock:
+            self.requests_total += 1
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+    
+    def try_withdraw(self) -> bool:
+        """Take a token for a retry; False if the budget is exhausted."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                self.retries_total += 1
+                allowed = True
+            else:
+                self.rejected_total += 1
+                allowed = False
+            tokens = self._tokens
+        RETRY_BUDGET_TOKENS.labels(target=self.target).set(tokens)
+        return allowed
+    
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "tokens": round(self.tokens, 2),
+            "requests_total": self.requests_total,
+            "retries_total": self.retries_total,
+            "rejected_total": self.rejected_total,
+            "ratio": self.ratio,
+        }
+
+
+_budgets: Dict[str, RetryBudget] = {}
+_budgets_lock = threading.Lock()
+
+
+def get_retry_budget(target: str, **kwargs: Any) -> RetryBudget:
+    """
+    Get (or create) the shared retry budget for a target.
+    
+    Args:
+        target: Dependency name, e.g. "redis" or "swarm_peer"
+        **kwargs: RetryBudget options, used only when the budget is created
+    """
+    budget = _budgets.get(target)
+    if budget is None:
+        with _budgets_lock:
+            budget = _budgets.get(target)
+            if budget is None:
+                budget = _budgets[target] = RetryBudget(target=target, **kwargs)
+    return budget
+
 
 # ============================================================================
 # RETRY DECORATOR
@@ -67,11 +206,13 @@ class Retry:
     Features:
     - Configurable exception filtering
     - Full jitter to prevent thundering herd
+    - Shared per-target retry budget
+    - Deadline-aware giving up
     - Prometheus metrics integration
     - Async/await compatible
     
     Example:
-        @Retry(max_attempts=3, base_delay=0.5)
+        @Retry(max_attempts=3, base_delay=0.5, budget="redis", deadline=2.0)
         async def fetch_data():
             return await api.call()
     """
@@ -82,7 +223,9 @@ class Retry:
         base_delay: float = 0.5,
         max_delay: float = 8.0,
         allowed_exceptions: Optional[Tuple] = None,
-        jitter_type: str = "full"
+        jitter_type: str = "full",
+        budget: Optional[Union[RetryBudget, str]] = None,
+        deadline: Optional[float] = None
     ):
         """
         Initialize retry decorator.
@@ -94,6 +237,9 @@ class Retry:
             allowed_exceptions: Tuple of exception types to retry on
                                (default: TimeoutError, ConnectionError)
             jitter_type: Type of jitter - "full" (default), "equal", "decorrelated"
+            budget: RetryBudget, or a target name for the shared budget of that target
+            deadline: Seconds from the first attempt after which no retry is started
+                      (the enclosing with_timeout deadline also applies)
         """
         self.max_attempts = max_attempts
         self.base_delay = base_delay
@@ -105,6 +251,8 @@ class Retry:
             asyncio.TimeoutError,
         )
         self.jitter_type = jitter_type
+        self.budget = get_retry_budget(budget) if isinstance(budget, str) else budget
+        self.deadline = deadline
         self.last_exception: Optional[Exception] = None
     
     def __call__(self, func: Callable) -> Callable:
@@ -133,6 +281,10 @@ class Retry:
         """Execute async function with retry logic."""
         func_name = getattr(func, '__name__', 'unknown')
         last_exception = None
+        started = time.monotonic()
+        delay = None
+        if self.budget is not None:
+            self.budget.deposit()
         
         for attempt in range(self.max_attempts):
             try:
@@ -140,7 +292,7 @@ class Retry:
                 result = await func(*args, **kwargs)
                 
                 # Success
-                RETRY_ATTEMPTS_TOTAL.labels(outcome='success').inc()
+                RETRY_ATTEMPTS_TOTAL.labels(endpoint=func_name, outcome='success').inc()
                 if attempt > 0:
                     logger.debug(
                         f"Retry successful for {func_name} "
@@ -150,7 +302,7 @@ class Retry:
             
             except self.allowed_exceptions as e:
                 last_exception = e
-                RETRY_ATTEMPTS_TOTAL.labels(outcome='failed').inc()
+                RETRY_ATTEMPTS_TOTAL.labels(endpoint=func_name, outcome='failed').inc()
                 
                 # Check if this is the last attempt
                 if attempt == self.max_attempts - 1:
@@ -162,9 +314,17 @@ class Retry:
                     raise
                 
                 # Calculate backoff delay
-                delay = self._calculate_delay(attempt)
+                delay = self._calculate_delay(attempt, delay)
+                reason = self._give_up_reason(delay, started)
+                if reason is not None:
+                    RETRY_GIVEUPS_TOTAL.labels(function=func_name, reason=reason).inc()
+                    logger.warning(
+                        f"Not retrying {func_name} ({reason}) after "
+                        f"{attempt + 1} attempts: {str(e)}"
+                    )
+                    raise
                 RETRY_BACKOFF_LEVEL.labels(function=func_name).set(attempt + 1)
-                RETRY_DELAYS_SECONDS.observe(delay)
+                RETRY_DELAYS_SECONDS.labels(function=func_name).observe(delay)
                 
                 logger.warning(
                     f"Retry {attempt + 1}/{self.max_attempts} for {func_name} "
@@ -195,6 +355,10 @@ class Retry:
         """Execute sync function with retry logic."""
         func_name = getattr(func, '__name__', 'unknown')
         last_exception = None
+        started = time.monotonic()
+        delay = None
+        if self.budget is not None:
+            self.budget.deposit()
         
         for attempt in range(self.max_attempts):
             try:
@@ -202,7 +366,7 @@ class Retry:
                 result = func(*args, **kwargs)
                 
                 # Success
-                RETRY_ATTEMPTS_TOTAL.labels(outcome='success').inc()
+                RETRY_ATTEMPTS_TOTAL.labels(endpoint=func_name, outcome='success').inc()
                 if attempt > 0:
                     logger.debug(
                         f"Retry successful for {func_name} "
@@ -212,7 +376,7 @@ class Retry:
             
             except self.allowed_exceptions as e:
                 last_exception = e
-                RETRY_ATTEMPTS_TOTAL.labels(outcome='failed').inc()
+                RETRY_ATTEMPTS_TOTAL.labels(endpoint=func_name, outcome='failed').inc()
                 
                 # Check if this is the last attempt
                 if attempt == self.max_attempts - 1:
@@ -224,9 +388,17 @@ class Retry:
                     raise
                 
                 # Calculate backoff delay
-                delay = self._calculate_delay(attempt)
+                delay = self._calculate_delay(attempt, delay)
+                reason = self._give_up_reason(delay, started)
+                if reason is not None:
+                    RETRY_GIVEUPS_TOTAL.labels(function=func_name, reason=reason).inc()
+                    logger.warning(
+                        f"Not retrying {func_name} ({reason}) after "
+                        f"{attempt + 1} attempts: {str(e)}"
+                    )
+                    raise
                 RETRY_BACKOFF_LEVEL.labels(function=func_name).set(attempt + 1)
-                RETRY_DELAYS_SECONDS.observe(delay)
+                RETRY_DELAYS_SECONDS.labels(function=func_name).observe(delay)
                 
                 logger.warning(
                     f"Retry {attempt + 1}/{self.max_attempts} for {func_name} "
@@ -248,7 +420,19 @@ class Retry:
             raise last_exception
         raise RuntimeError(f"Unexpected retry exhaustion for {func_name}")
     
-    def _calculate_delay(self, attempt: int) -> float:
+    def _give_up_reason(self, delay: float, started: float) -> Optional[str]:
+        """Return why the next retry must not be attempted, or None to retry."""
+        left = remaining_time()
+        if self.deadline is not None:
+            own = self.deadline - (time.monotonic() - started)
+            left = own if left is None else min(left, own)
+        if left is not None and delay >= left:
+            return "deadline"
+        if self.budget is not None and not self.budget.try_withdraw():
+            return "budget"
+        return None
+    
+    def _calculate_delay(self, attempt: int, previous_delay: Optional[float] = None) -> float:
         """
         Calculate exponential backoff with jitter.
         
@@ -260,7 +444,8 @@ class Retry:
         Jitter types:
             - full: delay * uniform(0.5, 1.5)
             - equal: delay / 2 + uniform(0, delay / 2)
-            - decorrelated: min(max_delay, delay * uniform(0, 3))
+            - decorrelated: min(max_delay, uniform(base_delay, previous_delay * 3)),
+              growing from the previous sleep rather than the attempt number
         """
         # Exponential backoff: 0.5 * 2^attempt
         exponential = self.base_delay * (2 ** attempt)
@@ -273,7 +458,7 @@ class Retry:
         # though standard random is often sufficient for jitter.
         # Bandit B311: Standard pseudo-random generators are not suitable for security/cryptographic purposes.
         # We switch to SystemRandom to satisfy the linter and be safer.
-        sys_random = random.SystemRandom()
+        sys_random = _sys_random
 
         if self.jitter_type == "full":
             # Full jitter: uniformly distributed between 0 and 2x delay
@@ -283,7 +468,8 @@ class Retry:
             jittered = (capped / 2) + (capped / 2) * sys_random.random()
         elif self.jitter_type == "decorrelated":
             # Decorrelated jitter: recommended for general use
-            jittered = min(self.max_delay, capped * sys_random.uniform(0, 3))
+            previous = previous_delay or self.base_delay
+            jittered = min(self.max_delay, sys_random.uniform(self.base_delay, previous * 3))
         else:
             jittered = capped
         
@@ -296,6 +482,171 @@ class Retry:
         RETRY_EXHAUSTIONS_TOTAL._metrics.clear()
 
 
+# ============================================================================
+# HEDGED REQUESTS
+# ============================================================================
+
+class LatencyTracker:
+    """
+    Rolling latency percentiles over the last ``size`` observations.
+    
+    The sorted view is rebuilt every ``refresh_every`` observations, so
+    recording is O(1) and percentile lookups are amortized O(1).
+    """
+    
+    def __init__(self, size: int = 512, refresh_every: int = 32):
+        self._samples: deque = deque(maxlen=size)
+        self._refresh_every = refresh_every
+        self._since_refresh = 0
+        self._sorted: list = []
+        self._lock = threading.Lock()
+    
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self._since_refresh += 1
+    
+    def __len__(self) -> int:
+        return len(self._samples)
+    
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency at quantile q (0-1), or None without observations."""
+        with self._lock:
+            if not self._samples:
+                return None
+            if self._since_refresh >= self._refresh_every or not self._sorted:
+                self._sorted = sorted(self._samples)
+                self._since_refresh = 0
+            values = self._sorted
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class Hedge:
+    """
+    Hedged-request decorator for idempotent async reads.
+    
+    The first attempt runs immediately; if it has not completed after the
+    observed ``percentile`` latency (clamped to [min_delay, max_delay]), one
+    more attempt is started, up to ``max_hedges``. The first success is
+    returned and the rest are cancelled; if every attempt fails the last
+    error is raised. Hedges draw from the target's retry budget, so hedging
+    backs off when the dependency is degraded.
+    
+    The latency tracker records every successful attempt, and for an
+    attempt cancelled because another one won, its time until cancellation
+    (a lower bound of its latency). Recording only winners would drop the
+    slow attempts the hedges exist for and pull the hedge delay down.
+    
+    Each call deposits into the budget once, as Retry does, so do not stack
+    Hedge and Retry on the same budget: every call would be credited twice.
+    
+    Example:
+        @Hedge(target="swarm_peer")
+        async def fetch_pattern(peer, key):
+            return await peer.get(key)
+    """
+    
+    def __init__(
+        self,
+        target: str = "default",
+        percentile: float = 0.95,
+        min_delay: float = 0.005,
+        max_delay: float = 1.0,
+        max_hedges: int = 1,
+        min_samples: int = 20,
+        budget: Optional[Union[RetryBudget, str]] = None,
+        tracker: Optional[LatencyTracker] = None
+    ):
+        """
+        Initialize hedging policy.
+        
+        Args:
+            target: Dependency name (metrics label, default budget)
+            percentile: Latency quantile after which a hedge is sent
+            min_delay: Lower bound on the hedge delay
+            max_delay: Hedge delay used until enough latencies are observed, and its upper bound
+            max_hedges: Extra attempts allowed per call
+            min_samples: Observations needed before the percentile is trusted
+            budget: RetryBudget or target name; defaults to the shared budget of ``target``
+            tracker: Latency tracker (shared between decorators of the same target if given)
+        """
+        self.target = target
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.max_hedges = max_hedges
+        self.min_samples = min_samples
+        if budget is None:
+            budget = target
+        self.budget = get_retry_budget(budget) if isinstance(budget, str) else budget
+        self.tracker = tracker or LatencyTracker()
+    
+    def hedge_delay(self) -> float:
+        """Current delay before a hedge is sent."""
+        if len(self.tracker) < self.min_samples:
+            return self.max_delay
+        observed = self.tracker.percentile(self.percentile)
+        return min(self.max_delay, max(self.min_delay, observed))
+    
+    def __call__(self, func: Callable) -> Callable:
+        """Decorate async function with hedging."""
+        if not asyncio.iscoroutinefunction(func):
+            raise TypeError("Hedge only supports async functions")
+        
+        @wraps(func)
+        async def wrapper(*args, **kwargs) -> Any:
+            return await self._execute_hedged(func, args, kwargs)
+        
+        return wrapper
+    
+    async def _attempt(self, func: Callable, args: tuple, kwargs: dict) -> Any:
+        start = time.monotonic()
+        try:
+            result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            self.tracker.record(time.monotonic() - start)  # Lost the race: a lower bound
+            raise
+        self.tracker.record(time.monotonic() - start)
+        return result
+    
+    async def _execute_hedged(self, func: Callable, args: tuple, kwargs: dict) -> Any:
+        self.budget.deposit()
+        delay = self.hedge_delay()
+        primary = asyncio.ensure_future(self._attempt(func, args, kwargs))
+        pending = {primary}
+        hedges_sent = 0
+        last_exception: Optional[BaseException] = None
+        
+        try:
+            while pending:
+                can_hedge = hedges_sent < self.max_hedges
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=delay if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            HEDGED_REQUESTS_TOTAL.labels(target=self.target, outcome='won').inc()
+                        return task.result()
+                    last_exception = task.exception()
+                
+                if not done and can_hedge:
+                    # Slower than the hedge delay: send another attempt if the budget allows
+                    if self.budget.try_withdraw():
+                        HEDGED_REQUESTS_TOTAL.labels(target=self.target, outcome='sent').inc()
+                        pending.add(asyncio.ensure_future(self._attempt(func, args, kwargs)))
+                    else:
+                        HEDGED_REQUESTS_TOTAL.labels(target=self.target, outcome='denied').inc()
+                    hedges_sent += 1
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        raise last_exception
+
+
 # ============================================================================
 # EXPONENTIAL BACKOFF UTILITIES
 # ============================================================================
@@ -326,6 +677,9 @@ def get_retry_metrics() -> dict:
     return {
         'attempts_total': RETRY_ATTEMPTS_TOTAL._metrics,
         'exhaustions_total': RETRY_EXHAUSTIONS_TOTAL._metrics,
+        'giveups_total': RETRY_GIVEUPS_TOTAL._metrics,
+        'hedged_requests_total': HEDGED_REQUESTS_TOTAL._metrics,
+        'budgets': {target: budget.get_stats() for target, budget in list(_budgets.items())},
     }
 
 # merge coflicts
@@ -5,20 +5,30 @@ Provides decorator-based timeout enforcement for both synchronous and
 asynchronous operations to prevent hanging processes.
 
 Features:
-- @with_timeout decorator for sync functions
-- @async_timeout decorator for async functions
+- @with_timeout decorator for sync functions (runs on a shared, bounded pool)
+- @async_timeout decorator for async functions (asyncio.timeout, no threads)
+- Deadline propagation: nested decorated calls share one time budget
+- Cooperative cancellation tokens for long-running loops
+- Abandoned-work tracking exposed as metrics
 - Cross-platform support (Windows, Linux, macOS)
 - Graceful timeout exceptions with context
 - Integration with circuit breaker and retry logic
 """
 
 import asyncio
+import contextvars
 import threading
 import functools
 import logging
-from typing import Callable, Any, Optional, TypeVar, cast
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Any, Dict, Optional, TypeVar, cast
 from datetime import datetime
 
+from prometheus_client import Counter, Gauge
+from astraguard.observability import _safe_create_metric
+
 # Import centralized secrets management
 from core.secrets import get_secret
 
@@ -27,45 +37,351 @@ logger = logging.getLogger(__name__)
 # Type variable for generic function returns
 T = TypeVar('T')
 
+# asyncio.timeout is available from Python 3.11; older interpreters fall back
+# to asyncio.wait_for, which still avoids spawning threads.
+_asyncio_timeout = getattr(asyncio, "timeout", None)
+
+
+# ============================================================================
+# PROMETHEUS METRICS
+# ============================================================================
+
+TIMEOUTS_TOTAL = _safe_create_metric(
+    Counter,
+    'astra_timeouts_total',
+    'Operations that exceeded their timeout budget',
+    labelnames=['operation', 'kind']  # kind: sync, async
+)
+
+TIMEOUT_ABANDONED_TOTAL = _safe_create_metric(
+    Counter,
+    'astra_timeout_abandoned_total',
+    'Sync operations still running on the timeout pool after their deadline',
+    labelnames=['operation']
+)
+
+TIMEOUT_ABANDONED_IN_FLIGHT = _safe_create_metric(
+    Gauge,
+    'astra_timeout_abandoned_in_flight',
+    'Abandoned sync operations that have not finished yet'
+)
+
+TIMEOUT_POOL_REJECTIONS_TOTAL = _safe_create_metric(
+    Counter,
+    'astra_timeout_pool_rejections_total',
+    'Sync operations rejected because the timeout pool queue was full',
+    labelnames=['operation']
+)
+
 
 class TimeoutError(Exception):
     """
     Raised when an operation exceeds its timeout limit.
-    
+
     Attributes:
         operation: Name of the operation that timed out
         timeout_seconds: Timeout value that was exceeded
         start_time: When the operation started
     """
-    
+
     def __init__(
-        self, 
-        operation: str, 
+        self,
+        operation: str,
         timeout_seconds: float,
         start_time: Optional[datetime] = None
     ):
         self.operation = operation
         self.timeout_seconds = timeout_seconds
         self.start_time = start_time or datetime.now()
-        
+
         msg = f"Operation '{operation}' exceeded timeout of {timeout_seconds}s"
         super().__init__(msg)
 
 
+class TimeoutPoolSaturatedError(Exception):
+    """
+    Raised when the shared timeout pool cannot accept more work.
+
+    Attributes:
+        operation: Name of the rejected operation
+        pending: Number of operations queued or running when rejected
+    """
+
+    def __init__(self, operation: str, pending: int):
+        self.operation = operation
+        self.pending = pending
+        super().__init__(
+            f"Timeout pool saturated: rejected '{operation}' with {pending} pending operations"
+        )
+
+
+# ============================================================================
+# CANCELLATION TOKENS & DEADLINES
+# ============================================================================
+
+class CancellationToken:
+    """
+    Cooperative cancellation flag for long-running work.
+
+    The timeout machinery cancels the token when the caller gives up, so
+    loops inside decorated functions can stop early instead of running
+    unbounded as abandoned work.
+
+    Example:
+        @with_timeout(seconds=30.0)
+        def rebuild_index(items):
+            token = current_cancellation_token()
+            for item in items:
+                token.raise_if_cancelled()
+                index(item)
+    """
+
+    __slots__ = ("_event", "operation", "deadline", "timeout_seconds")
+
+    def __init__(self, operation: str = "operation", deadline: Optional[float] = None,
+                 timeout_seconds: float = 0.0):
+        self._event = threading.Event()
+        self.operation = operation
+        self.deadline = deadline
+        self.timeout_seconds = timeout_seconds
+
+    @property
+    def cancelled(self) -> bool:
+        """True once cancel() was called or the deadline has passed."""
+        if self._event.is_set():
+            return True
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def cancel(self) -> None:
+        """Request cancellation of the associated work."""
+        self._event.set()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline (None if unbounded)."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def raise_if_cancelled(self) -> None:
+        """Raise TimeoutError if the work has been cancelled."""
+        if self.cancelled:
+            raise TimeoutError(self.operation, self.timeout_seconds)
+
+
+# Absolute deadline (time.monotonic) of the innermost active timeout scope
+_current_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "astra_timeout_deadline", default=None
+)
+_current_token: contextvars.ContextVar[Optional[CancellationToken]] = contextvars.ContextVar(
+    "astra_timeout_token", default=None
+)
+
+# Never-cancelled token handed out when no timeout scope is active
+_NULL_TOKEN = CancellationToken("unbounded")
+
+
+def current_cancellation_token() -> CancellationToken:
+    """Get the cancellation token of the innermost active timeout scope."""
+    return _current_token.get() or _NULL_TOKEN
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left in the current deadline budget (None if unbounded)."""
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def _effective_budget(seconds: float) -> float:
+    """Clamp a requested timeout to the budget left in the enclosing scope."""
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return seconds
+    return min(seconds, deadline - time.monotonic())
+
+
+# ============================================================================
+# SHARED TIMEOUT EXECUTOR
+# ============================================================================
+
+_worker_state = threading.local()
+
+
+def _mark_worker_thread() -> None:
+    _worker_state.is_timeout_worker = True
+
+
+class TimeoutExecutor:
+    """
+    Bounded, reusable thread pool for sync timeout enforcement.
+
+    Replaces the thread-per-call approach: workers are named and reused,
+    the number of queued operations is capped, and work that outlives its
+    deadline is tracked as abandoned until it actually finishes.
+    """
+
+    def __init__(self, max_workers: int = 16, max_queue_depth: int = 256,
+                 thread_name_prefix: str = "astra-timeout"):
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
+        if max_queue_depth < 0:
+            raise ValueError("max_queue_depth must be >= 0")
+
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=thread_name_prefix,
+            initializer=_mark_worker_thread,
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._abandoned = 0
+        self._abandoned_total = 0
+        self._timeouts_total = 0
+        self._rejected_total = 0
+
+    @property
+    def capacity(self) -> int:
+        """Maximum operations running or queued at once."""
+        return self.max_workers + self.max_queue_depth
+
+    def submit(self, op_name: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> "Future[T]":
+        """Submit work, raising TimeoutPoolSaturatedError if the queue is full."""
+        with self._lock:
+            if self._pending >= self.capacity:
+                self._rejected_total += 1
+                pending = self._pending
+            else:
+                self._pending += 1
+                pending = -1
+        if pending >= 0:
+            TIMEOUT_POOL_REJECTIONS_TOTAL.labels(operation=op_name).inc()
+            raise TimeoutPoolSaturatedError(op_name, pending)
+
+        try:
+            future = self._pool.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda _f: self._release())
+        return future
+
+    def abandon(self, op_name: str, future: Future) -> None:
+        """Record a timed-out future; queued work is cancelled outright."""
+        with self._lock:
+            self._timeouts_total += 1
+        if future.cancel():
+            return
+
+        with self._lock:
+            self._abandoned += 1
+            self._abandoned_total += 1
+        TIMEOUT_ABANDONED_TOTAL.labels(operation=op_name).inc()
+        TIMEOUT_ABANDONED_IN_FLIGHT.inc()
+
+        def _finished(_f: Future) -> None:
+            with self._lock:
+                self._abandoned -= 1
+            TIMEOUT_ABANDONED_IN_FLIGHT.dec()
+            logger.debug(f"Abandoned operation {op_name} finished after its deadline")
+
+        future.add_done_callback(_finished)
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """Point-in-time snapshot of pool usage."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue_depth": self.max_queue_depth,
+                "pending": self._pending,
+                "abandoned_in_flight": self._abandoned,
+                "abandoned_total": self._abandoned_total,
+                "timeouts_total": self._timeouts_total,
+                "rejected_total": self._rejected_total,
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop accepting work and release idle workers."""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+_timeout_executor: Optional[TimeoutExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_timeout_executor() -> TimeoutExecutor:
+    """Get the shared timeout executor, creating it from config on first use."""
+    global _timeout_executor
+    executor = _timeout_executor
+    if executor is None:
+        with _executor_lock:
+            if _timeout_executor is None:
+                config = get_timeout_config()
+                _timeout_executor = TimeoutExecutor(
+                    max_workers=config.executor_max_workers,
+                    max_queue_depth=config.executor_max_queue_depth,
+                )
+            executor = _timeout_executor
+    return executor
+
+
+def shutdown_timeout_executor(wait: bool = False) -> None:
+    """Shut down the shared timeout executor (a new one is created on demand)."""
+    global _timeout_executor
+    with _executor_lock:
+        executor, _timeout_executor = _timeout_executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+def get_timeout_metrics() -> Dict[str, int]:
+    """Get current timeout pool metrics snapshot."""
+    if _timeout_executor is None:
+        return {}
+    return _timeout_executor.stats()
+
+
+# ============================================================================
+# DECORATORS
+# ============================================================================
+
+def _run_scoped(func: Callable[..., T], deadline: float, token: CancellationToken,
+                args: tuple, kwargs: dict) -> T:
+    """Run func with the deadline and token bound in the current context."""
+    deadline_reset = _current_deadline.set(deadline)
+    token_reset = _current_token.set(token)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _current_token.reset(token_reset)
+        _current_deadline.reset(deadline_reset)
+
+
 def with_timeout(seconds: float, operation_name: Optional[str] = None):
     """
     Decorator to enforce timeout on synchronous functions.
-    
-    Uses threading.Timer for cross-platform compatibility.
-    When timeout is reached, raises TimeoutError.
-    
+
+    Sync functions run on the shared, bounded TimeoutExecutor. Async
+    functions are delegated to async_timeout and never touch a thread.
+    When called inside another timeout scope, the effective timeout is the
+    smaller of `seconds` and the remaining outer budget; nested sync calls
+    already running on a pool worker execute inline under that budget.
+    When timeout is reached, raises TimeoutError and cancels the call's
+    CancellationToken.
+
     Args:
         seconds: Maximum execution time in seconds
         operation_name: Optional name for logging (defaults to function name)
-    
+
     Returns:
         Decorated function that raises TimeoutError on timeout
-    
+
     Example:
         @with_timeout(seconds=5.0)
         def load_model():
@@ -73,48 +389,50 @@ def with_timeout(seconds: float, operation_name: Optional[str] = None):
             pass
     """
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        if asyncio.iscoroutinefunction(func):
+            return cast(Callable[..., T], async_timeout(seconds, operation_name)(func))
+
+        op_name = operation_name or func.__name__
+
         @functools.wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> T:
-            op_name = operation_name or func.__name__
             start_time = datetime.now()
-            
-            # Container to hold result or exception
-            result_container: dict = {'exception': None, 'result': None, 'completed': False}
-            timeout_triggered = threading.Event()
-            
-            def target():
-                """Execute function in thread"""
-                try:
-                    result_container['result'] = func(*args, **kwargs)
-                    result_container['completed'] = True
-                except Exception as e:
-                    result_container['exception'] = e
-                    result_container['completed'] = True
-            
-            # Start function in separate thread
-            thread = threading.Thread(target=target, daemon=True)
-            thread.start()
-            
-            # Wait for completion or timeout
-            thread.join(timeout=seconds)
-            
-            if not result_container['completed']:
-                # Timeout occurred
-                timeout_triggered.set()
+            budget = _effective_budget(seconds)
+            if budget <= 0:
+                TIMEOUTS_TOTAL.labels(operation=op_name, kind='sync').inc()
+                raise TimeoutError(op_name, seconds, start_time)
+
+            deadline = time.monotonic() + budget
+
+            # Nested call on a pool worker: the enclosing scope already
+            # enforces the deadline, so run inline rather than occupying a
+            # second worker (which could also deadlock a saturated pool).
+            if getattr(_worker_state, "is_timeout_worker", False):
+                parent = _current_token.get()
+                if parent is not None:
+                    return _run_scoped(func, deadline, parent, args, kwargs)
+
+            token = CancellationToken(op_name, deadline, seconds)
+            ctx = contextvars.copy_context()
+            executor = get_timeout_executor()
+            future = executor.submit(
+                op_name, ctx.run, _run_scoped, func, deadline, token, args, kwargs
+            )
+
+            try:
+                return future.result(timeout=budget)
+            except FutureTimeoutError:
+                token.cancel()
+                executor.abandon(op_name, future)
+                TIMEOUTS_TOTAL.labels(operation=op_name, kind='sync').inc()
                 elapsed = (datetime.now() - start_time).total_seconds()
                 logger.warning(
-                    f"Timeout: {op_name} exceeded {seconds}s (elapsed: {elapsed:.2f}s)"
+                    f"Timeout: {op_name} exceeded {budget:.3f}s (elapsed: {elapsed:.2f}s)"
                 )
-                raise TimeoutError(op_name, seconds, start_time)
-            
-            # Check for exception in thread
-            if result_container['exception']:
-                raise result_container['exception']
-            
-            return cast(T, result_container['result'])
-        
+                raise TimeoutError(op_name, seconds, start_time) from None
+
         return wrapper
-    
+
     return decorator
 
 
@@ -122,7 +440,8 @@ def async_timeout(seconds: float, operation_name: Optional[str] = None):
     """
     Decorator to enforce timeout on asynchronous functions.
 
-    Uses custom implementation with asyncio.create_task and asyncio.wait for proper cancellation.
+    Uses asyncio.timeout on the running task, so no extra tasks or threads
+    are created. Shares the deadline budget with enclosing timeout scopes.
     When timeout is reached, raises TimeoutError.
 
     Args:
@@ -139,40 +458,45 @@ def async_timeout(seconds: float, operation_name: Optional[str] = None):
             pass
     """
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        op_name = operation_name or func.__name__
+
         @functools.wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
-            op_name = operation_name or func.__name__
             start_time = datetime.now()
+            budget = _effective_budget(seconds)
+            if budget <= 0:
+                TIMEOUTS_TOTAL.labels(operation=op_name, kind='async').inc()
+                raise TimeoutError(op_name, seconds, start_time)
 
-            # Create task for the function
-            task = asyncio.create_task(func(*args, **kwargs))
-
-            # Create timeout task
-            timeout_task = asyncio.create_task(asyncio.sleep(seconds))
+            deadline = time.monotonic() + budget
+            token = CancellationToken(op_name, deadline, seconds)
+            deadline_reset = _current_deadline.set(deadline)
+            token_reset = _current_token.set(token)
+            try:
+                if _asyncio_timeout is not None:
+                    scope = _asyncio_timeout(budget)
+                    try:
+                        async with scope:
+                            return await func(*args, **kwargs)
+                    except asyncio.TimeoutError:
+                        if not scope.expired():
+                            raise  # raised by func itself, not by our deadline
+                else:
+                    try:
+                        return await asyncio.wait_for(func(*args, **kwargs), budget)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                _current_token.reset(token_reset)
+                _current_deadline.reset(deadline_reset)
 
-            # Wait for first to complete
-            done, pending = await asyncio.wait(
-                {task, timeout_task}, return_when=asyncio.FIRST_COMPLETED
+            token.cancel()
+            TIMEOUTS_TOTAL.labels(operation=op_name, kind='async').inc()
+            elapsed = (datetime.now() - start_time).total_seconds()
+            logger.warning(
+                f"Async timeout: {op_name} exceeded {budget:.3f}s (elapsed: {elapsed:.2f}s)"
             )
-
-            # Cancel pending tasks
-            for p in pending:
-                p.cancel()
-
-            # Handle results
-            if task in done:
-                # Function completed
-                try:
-                    return task.result()
-                except Exception as e:
-                    raise e
-            else:
-                # Timeout occurred
-                elapsed = (datetime.now() - start_time).total_seconds()
-                logger.warning(
-                    f"Async timeout: {op_name} exceeded {seconds}s (elapsed: {elapsed:.2f}s)"
-                )
-                raise TimeoutError(op_name, seconds, start_time)
+            raise TimeoutError(op_name, seconds, start_time)
 
         return wrapper
 
@@ -182,47 +506,55 @@ def async_timeout(seconds: float, operation_name: Optional[str] = None):
 class TimeoutContext:
     """
     Context manager for timeout enforcement.
-    
-    Useful for wrapping blocks of code with timeout protection.
-    
+
+    Useful for wrapping blocks of code with timeout protection. The block
+    runs in the caller's thread, so the deadline is checked on exit and via
+    check_timeout(); decorated calls inside the block share its budget.
+
     Example:
         with TimeoutContext(seconds=5.0, operation="data_processing"):
             # Code here will timeout after 5 seconds
             process_data()
     """
-    
+
     def __init__(self, seconds: float, operation: str = "operation"):
         self.seconds = seconds
         self.operation = operation
         self.start_time: Optional[datetime] = None
-        self._timer: Optional[threading.Timer] = None
-        self._timed_out = False
-    
+        self.token: Optional[CancellationToken] = None
+        self._deadline: Optional[float] = None
+        self._resets: Optional[tuple] = None
+
+    @property
+    def _timed_out(self) -> bool:
+        return self._deadline is not None and time.monotonic() >= self._deadline
+
     def __enter__(self):
         self.start_time = datetime.now()
-        
-        def timeout_handler():
-            self._timed_out = True
-            logger.warning(
-                f"Context timeout: {self.operation} exceeded {self.seconds}s"
-            )
-        
-        self._timer = threading.Timer(self.seconds, timeout_handler)
-        self._timer.daemon = True
-        self._timer.start()
-        
+        self._deadline = time.monotonic() + _effective_budget(self.seconds)
+        self.token = CancellationToken(self.operation, self._deadline, self.seconds)
+        self._resets = (
+            _current_deadline.set(self._deadline),
+            _current_token.set(self.token),
+        )
         return self
-    
+
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if self._timer:
-            self._timer.cancel()
-        
+        if self._resets is not None:
+            deadline_reset, token_reset = self._resets
+            _current_token.reset(token_reset)
+            _current_deadline.reset(deadline_reset)
+            self._resets = None
+
         if self._timed_out and exc_type is None:
             # Timeout occurred but no exception was raised
+            logger.warning(
+                f"Context timeout: {self.operation} exceeded {self.seconds}s"
+            )
             raise TimeoutError(self.operation, self.seconds, self.start_time)
-        
+
         return False  # Don't suppress exceptions
-    
+
     def check_timeout(self):
         """Manually check if timeout has been exceeded"""
         if self._timed_out:
@@ -233,23 +565,29 @@ class TimeoutContext:
 class TimeoutConfig:
     """
     Global timeout configuration loaded from environment variables.
-    
+
     Provides centralized timeout values for different operations.
     """
-    
+
     def __init__(self):
-        import os
-        
         # Load from environment or use defaults
         self.model_load_timeout = float(get_secret('timeout_model_load', default='300') or '300')
         self.inference_timeout = float(get_secret('timeout_inference', default='60') or '60')
         self.redis_timeout = float(get_secret('timeout_redis', default='5') or '5')
         self.file_io_timeout = float(get_secret('timeout_file_io', default='30') or '30')
-        
+        self.executor_max_workers = int(
+            get_secret('timeout_executor_workers', default='16') or '16'
+        )
+        self.executor_max_queue_depth = int(
+            get_secret('timeout_executor_queue_depth', default='256') or '256'
+        )
+
         logger.info(
             f"Timeout config loaded: model={self.model_load_timeout}s, "
             f"inference={self.inference_timeout}s, redis={self.redis_timeout}s, "
-            f"file_io={self.file_io_timeout}s"
+            f"file_io={self.file_io_timeout}s, "
+            f"executor={self.executor_max_workers} workers/"
+            f"{self.executor_max_queue_depth} queued"
         )
 
 
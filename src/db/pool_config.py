@@ -5,9 +5,9 @@ Configuration management for database connection pooling.
 import json
 import logging
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +24,12 @@ class PoolConfig:
     retry_backoff: float = 0.5
     enable_pool: bool = True
     db_path: str = "data/contact_submissions.db"
+    # Skip the SELECT 1 health probe for connections used within this many seconds (0 = always probe)
+    validation_interval: float = 0.0
+    # Per-connection sqlite3 prepared statement cache
+    statement_cache_size: int = 128
+    # PRAGMAs applied to every new connection, e.g. {"journal_mode": "WAL"}
+    pragmas: Dict[str, Any] = field(default_factory=dict)
     
     @classmethod
     def from_file(cls, path: str = "config/database.json") -> "PoolConfig":
@@ -56,6 +62,9 @@ class PoolConfig:
                         retry_backoff=pool_config.get("retry_backoff", cls.retry_backoff),
                         enable_pool=pool_config.get("enable_pool", cls.enable_pool),
                         db_path=data.get("db_path", cls.db_path),
+                        validation_interval=pool_config.get("validation_interval", cls.validation_interval),
+                        statement_cache_size=pool_config.get("statement_cache_size", cls.statement_cache_size),
+                        pragmas=dict(pool_config.get("pragmas", {})),
                     )
                     
                     logger.info(f"Loaded pool configuration from {path}")
@@ -133,6 +142,16 @@ class PoolConfig:
         if self.retry_backoff < 0:
             errors.append("retry_backoff must be non-negative")
         
+        if self.validation_interval < 0:
+            errors.append("validation_interval must be non-negative")
+        
+        if self.statement_cache_size < 0:
+            errors.append("statement_cache_size must be non-negative")
+        
+        for name in self.pragmas:
+            if not str(name).isidentifier():
+                errors.append(f"invalid pragma name: {name!r}")
+        
         if errors:
             error_msg = "; ".join(errors)
             logger.error(f"Invalid pool configuration: {error_msg}")
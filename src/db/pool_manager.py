@@ -154,7 +154,7 @@ class AsyncConnectionPool:
             db_path = Path(self.config.db_path)
             db_path.parent.mkdir(parents=True, exist_ok=True)
             
-            conn = await aiosqlite.connect(self.config.db_path)
+            conn = await self._open()
             await self._metrics.record_connection_created()
             
             async with self._lock:
@@ -173,16 +173,42 @@ class AsyncConnectionPool:
             logger.error(f"Failed to create connection: {e}", exc_info=True)
             raise PoolConnectionError(f"Failed to create connection: {e}") from e
     
+    async def _open(self) -> aiosqlite.Connection:
+        """
+        Open a raw connection and apply the configured PRAGMAs.
+        
+        Returns:
+            aiosqlite.Connection
+        """
+        conn = await aiosqlite.connect(
+            self.config.db_path,
+            cached_statements=self.config.statement_cache_size,
+        )
+        try:
+            for name, value in self.config.pragmas.items():
+                # Names are validated identifiers from PoolConfig, never request data
+                await conn.execute(f"PRAGMA {name} = {value}")  # nosec B608
+        except Exception:
+            await conn.close()
+            raise
+        return conn
+    
     async def _validate_connection(self, pooled_conn: PooledConnection) -> bool:
         """
         Check connection health.
         
+        Connections used within ``validation_interval`` seconds are trusted
+        without a round trip to the database thread.
+        
         Args:
             pooled_conn: Connection to validate
             
         Returns:
             True if connection is valid
         """
+        interval = self.config.validation_interval
+        if interval > 0 and pooled_conn.is_valid and not pooled_conn.is_idle_expired(interval):
+            return True
         return await pooled_conn.validate()
     
     @asynccontextmanager
@@ -280,7 +306,7 @@ class AsyncConnectionPool:
             if can_create:
                 try:
                     # Create connection outside the lock
-                    conn = await aiosqlite.connect(self.config.db_path)
+                    conn = await self._open()
                     await self._metrics.record_connection_created()
                     
                     pooled_conn = PooledConnection(
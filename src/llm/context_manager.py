@@ -1,35 +1,317 @@
 """
 Context Manager for LLM Interactions.
 
-Handles conversation memory, token limits (via message count), and session management.
+Handles conversation memory, token budgets, and session management.
 Designed to be modular and isolated from core agent logic.
+
+- Messages are counted once, when added, with a pluggable TokenCounter
+  (see src/llm/tokenizer.py); sessions keep the per-message counts and a
+  running total, so fitting a context to the budget never re-tokenizes.
+- Leading system and few-shot messages are pinned: packing and trimming
+  only ever drop (or summarize) the oldest conversation turns.
+- Sessions live in an LRU store bounded by size and idle TTL. With a
+  SQLite path, sessions evicted for capacity are spilled to disk and loaded
+  back on the next access instead of being lost.
 """
-from typing import Dict, List, Any, Optional
-import time
+import json
 import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from src.llm.tokenizer import TokenCounter, get_token_counter
 
 logger = logging.getLogger(__name__)
 
+SUMMARY_PREFIX = "Summary of earlier conversation: "
+
+
+class LLMSession:
+    """Messages of one conversation with their cached token counts."""
+
+    __slots__ = (
+        "session_id", "messages", "token_counts", "total_tokens",
+        "pinned", "created_at", "last_access",
+    )
+
+    def __init__(
+        self,
+        session_id: str,
+        messages: List[Dict[str, str]],
+        token_counts: List[int],
+        pinned: int = 0,
+        created_at: Optional[float] = None,
+        last_access: Optional[float] = None,
+    ):
+        self.session_id = session_id
+        self.messages = messages
+        self.token_counts = token_counts
+        self.total_tokens = sum(token_counts)
+        self.pinned = pinned  # Number of leading messages never evicted
+        self.created_at = created_at if created_at is not None else time.time()
+        self.last_access = last_access if last_access is not None else self.created_at
+
+    def append(self, message: Dict[str, str], tokens: int) -> None:
+        self.messages.append(message)
+        self.token_counts.append(tokens)
+        self.total_tokens += tokens
+
+    def drop_range(self, start: int, end: int) -> None:
+        """Remove messages[start:end]."""
+        self.total_tokens -= sum(self.token_counts[start:end])
+        del self.messages[start:end]
+        del self.token_counts[start:end]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "messages": self.messages,
+            "token_counts": self.token_counts,
+            "pinned": self.pinned,
+            "created_at": self.created_at,
+        }
+
+    @classmethod
+    def from_dict(cls, session_id: str, data: Dict[str, Any], last_access: float) -> "LLMSession":
+        return cls(
+            session_id,
+            data["messages"],
+            data["token_counts"],
+            pinned=data["pinned"],
+            created_at=data["created_at"],
+            last_access=last_access,
+        )
+
+
+class SQLiteSessionSpill:
+    """SQLite table holding sessions evicted from memory."""
+
+    def __init__(self, db_path: Union[str, Path]):
+        self.db_path = str(db_path)
+        if self.db_path != ":memory:":
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_sessions (
+                session_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def save_many(self, sessions: List[LLMSession]) -> None:
+        if not sessions:
+            return
+        rows = [(s.session_id, json.dumps(s.to_dict()), s.last_access) for s in sessions]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO llm_sessions VALUES (?, ?, ?)", rows)
+            self._conn.commit()
+
+    def load(self, session_id: str) -> Optional[LLMSession]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, last_access FROM llm_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return LLMSession.from_dict(session_id, json.loads(row[0]), row[1])
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_sessions WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+    def delete_idle(self, before: float) -> int:
+        """Delete sessions last used before the given time."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM llm_sessions WHERE last_access < ?", (before,))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SessionStore:
+    """
+    LRU session store bounded by count and idle TTL.
+
+    Sessions are ordered by last access, so expired sessions are always at
+    the front and are swept in O(expired) on each insert.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 10_000,
+        ttl_seconds: Optional[float] = 3600.0,
+        sqlite_path: Optional[Union[str, Path]] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._sessions: "OrderedDict[str, LLMSession]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._spill = SQLiteSessionSpill(sqlite_path) if sqlite_path else None
+        self._stats = {"hits": 0, "misses": 0, "loaded": 0, "spilled": 0, "evicted": 0, "expired": 0}
+
+    def _expired(self, session: LLMSession, now: float) -> bool:
+        return self.ttl_seconds is not None and now - session.last_access > self.ttl_seconds
+
+    def get(self, session_id: str) -> Optional[LLMSession]:
+        """Fetch a live session (from memory or the spill) and mark it used."""
+        now = self._clock()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None and self._spill is not None:
+                session = self._spill.load(session_id)
+                if session is not None:
+                    self._spill.delete(session_id)
+                    if not self._expired(session, now):
+                        self._stats["loaded"] += 1
+                        session.last_access = now
+                        self._insert(session, now)
+                    else:
+                        session = None
+            if session is None:
+                self._stats["misses"] += 1
+                return None
+            if self._expired(session, now):
+                del self._sessions[session_id]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            session.last_access = now
+            self._sessions.move_to_end(session_id)
+            self._stats["hits"] += 1
+            return session
+
+    def put(self, session: LLMSession) -> None:
+        """Insert or replace a session, evicting idle and least recently used ones."""
+        now = self._clock()
+        with self._lock:
+            session.last_access = now
+            self._sessions.pop(session.session_id, None)
+            self._insert(session, now)
+
+    def _insert(self, session: LLMSession, now: float) -> None:
+        self._sessions[session.session_id] = session
+        self._sweep(now)
+
+        overflow = len(self._sessions) - self.max_sessions
+        if overflow > 0:
+            evicted = [self._sessions.popitem(last=False)[1] for _ in range(overflow)]
+            self._stats["evicted"] += overflow
+            if self._spill is not None:
+                self._spill.save_many(evicted)
+                self._stats["spilled"] += overflow
+
+    def _sweep(self, now: float) -> None:
+        """Drop expired sessions from the front of the LRU order."""
+        if self.ttl_seconds is None:
+            return
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if not self._expired(oldest, now):
+                break
+            self._sessions.popitem(last=False)
+            self._stats["expired"] += 1
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            if self._spill is not None:
+                self._spill.delete(session_id)
+
+    def flush(self) -> None:
+        """Persist all in-memory sessions to the spill (e.g. before shutdown)."""
+        if self._spill is None:
+            return
+        with self._lock:
+            self._spill.save_many(list(self._sessions.values()))
+            if self.ttl_seconds is not None:
+                self._spill.delete_idle(self._clock() - self.ttl_seconds)
+
+    def close(self) -> None:
+        self.flush()
+        if self._spill is not None:
+            self._spill.close()
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._sessions))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, sessions=len(self._sessions), max_sessions=self.max_sessions)
+
+
 class LLMContextManager:
     """
-    Manages LLM conversation context, sessions, and memory limits.
+    Manages LLM conversation context, sessions, and token budgets.
     """
-    def __init__(self, max_tokens: int = 4000):
+    def __init__(
+        self,
+        max_tokens: int = 4000,
+        token_counter: Optional[TokenCounter] = None,
+        summarizer: Optional[Callable[[List[Dict[str, str]]], str]] = None,
+        summary_reserve_tokens: int = 256,
+        max_sessions: int = 10_000,
+        session_ttl_seconds: Optional[float] = 3600.0,
+        sqlite_path: Optional[Union[str, Path]] = None,
+    ):
+        """
+        Args:
+            max_tokens: Token budget for the assembled context.
+            token_counter: Counter for message sizes (offline heuristic by default).
+            summarizer: Optional callable turning evicted messages into a summary;
+                without one, evicted turns are dropped.
+            summary_reserve_tokens: Budget kept free for the summary when summarizing.
+            max_sessions: Sessions kept in memory before LRU eviction.
+            session_ttl_seconds: Idle time after which a session expires (None = never).
+            sqlite_path: Optional SQLite file sessions are spilled to when evicted.
+        """
         self.max_tokens = max_tokens
-        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self.token_counter = token_counter or get_token_counter()
+        self.summarizer = summarizer
+        self.summary_reserve_tokens = summary_reserve_tokens
+        self.sessions = SessionStore(max_sessions, session_ttl_seconds, sqlite_path)
 
-    def create_session(self, session_id: str, initial_messages: Optional[List[Dict[str, str]]] = None) -> None:
+    def create_session(
+        self,
+        session_id: str,
+        initial_messages: Optional[List[Dict[str, str]]] = None,
+        pinned: Optional[int] = None,
+    ) -> None:
         """
         Create a new session with optional initial messages.
 
         Args:
             session_id: Unique identifier for the session.
             initial_messages: List of message dicts to initialize the session with.
+            pinned: Number of leading messages that are never evicted (system prompt,
+                few-shot examples). Defaults to the leading system messages.
         """
-        self.sessions[session_id] = {
-            "messages": initial_messages or [],
-            "created_at": time.time()
-        }
+        messages = list(initial_messages or [])
+        if pinned is None:
+            pinned = 0
+            while pinned < len(messages) and messages[pinned].get("role") == "system":
+                pinned += 1
+        counts = [self.token_counter.count_message(m) for m in messages]
+        self.sessions.put(LLMSession(session_id, messages, counts, pinned=min(pinned, len(messages))))
         logger.debug(f"Created LLM session: {session_id}")
 
     def add_message(self, session_id: str, role: str, content: str) -> None:
@@ -41,49 +323,150 @@ class LLMContextManager:
             role: Message role (system, user, assistant).
             content: Message content.
         """
-        if session_id not in self.sessions:
+        session = self.sessions.get(session_id)
+        if session is None:
             logger.warning(f"Attempted to add message to non-existent session: {session_id}")
             # Fallback: create session? No, strict failure for v1 to avoid hidden bugs.
             raise ValueError(f"Session {session_id} not found.")
 
-        self.sessions[session_id]["messages"].append({
-            "role": role,
-            "content": content
-        })
+        message = {"role": role, "content": content}
+        session.append(message, self.token_counter.count_message(message))
 
     def get_context(self, session_id: str) -> List[Dict[str, str]]:
         """
-        Retrieve the full message history for a session.
+        Retrieve the stored message history for a session.
+
+        Args:
+            session_id: Session identifier.
+
+        Returns:
+            List of message dictionaries.
+        """
+        session = self.sessions.get(session_id)
+        if session is None:
+            return []
+        return session.messages
+
+    def build_context(self, session_id: str, max_tokens: Optional[int] = None) -> List[Dict[str, str]]:
+        """
+        Assemble the messages to send: pinned messages plus the most recent
+        turns that fit in the token budget. The stored history is not changed.
 
         Args:
             session_id: Session identifier.
+            max_tokens: Budget override (defaults to max_tokens).
 
         Returns:
             List of message dictionaries.
         """
-        if session_id not in self.sessions:
+        session = self.sessions.get(session_id)
+        if session is None:
             return []
-        return self.sessions[session_id]["messages"]
+        budget = max_tokens or self.max_tokens
+        if session.total_tokens <= budget:
+            return list(session.messages)
 
-    def trim_context(self, session_id: str, max_messages: int = 20) -> None:
+        start = self._fit_start(session, budget)
+        return session.messages[:session.pinned] + session.messages[start:]
+
+    def get_token_count(self, session_id: str) -> int:
+        """Tokens in the stored history of a session."""
+        session = self.sessions.get(session_id)
+        return session.total_tokens if session else 0
+
+    def _fit_start(self, session: LLMSession, budget: int) -> int:
+        """
+        Index of the oldest unpinned message kept so the context fits in budget.
+
+        Whole turns are evicted (the window never opens on an assistant reply
+        to an evicted user message) and the latest message is always kept.
+        """
+        messages, counts = session.messages, session.token_counts
+        remaining = budget - sum(counts[:session.pinned])
+        start = len(messages)
+        while start > session.pinned and counts[start - 1] <= remaining:
+            start -= 1
+            remaining -= counts[start]
+
+        if start == len(messages) and start > session.pinned:
+            logger.warning(
+                f"Latest message of session {session.session_id} ({counts[-1]} tokens) "
+                f"exceeds the remaining budget; sending it anyway"
+            )
+            start -= 1
+        while (
+            start > session.pinned and start < len(messages) - 1
+            and messages[start].get("role") == "assistant"
+        ):
+            start += 1
+        return start
+
+    def trim_context(self, session_id: str, max_messages: Optional[int] = None) -> None:
         """
-        Keep only the last N messages to manage context window.
+        Evict the oldest turns from the stored history until it fits the token
+        budget (and, if given, max_messages). Pinned messages are never dropped;
+        with a summarizer, evicted turns are folded into a summary message.
 
         Args:
             session_id: Session identifier.
             max_messages: Maximum number of messages to retain.
         """
-        if session_id not in self.sessions:
+        session = self.sessions.get(session_id)
+        if session is None:
+            return
+
+        over_count = max_messages is not None and len(session.messages) > max_messages
+        if session.total_tokens <= self.max_tokens and not over_count:
+            return
+
+        budget = self.max_tokens
+        if self.summarizer is not None:
+            budget -= self.summary_reserve_tokens
+        start = self._fit_start(session, budget)
+        if max_messages is not None:
+            start = max(start, min(len(session.messages) - 1, len(session.messages) - max_messages + session.pinned))
+        if start <= session.pinned:
+            return
+
+        evicted = session.messages[session.pinned:start]
+        session.drop_range(session.pinned, start)
+
+        if self.summarizer is not None:
+            self._insert_summary(session, evicted, self.summarizer)
+
+        logger.debug(f"Trimmed context for session {session_id}: evicted {len(evicted)} messages")
+
+    def _insert_summary(
+        self,
+        session: LLMSession,
+        evicted: List[Dict[str, str]],
+        summarizer: Callable[[List[Dict[str, str]]], str],
+    ) -> None:
+        """Replace evicted messages (including any previous summary) with one summary message."""
+        try:
+            summary = summarizer(evicted)
+        except Exception as e:
+            logger.warning(f"Context summarizer failed, dropping {len(evicted)} messages: {e}")
+            return
+
+        message = {"role": "system", "content": SUMMARY_PREFIX + summary}
+        tokens = self.token_counter.count_message(message)
+        if session.total_tokens + tokens > self.max_tokens:
+            logger.warning(f"Summary for session {session.session_id} does not fit the budget; dropped")
             return
 
-        messages = self.sessions[session_id]["messages"]
-        if len(messages) > max_messages:
-            # Simple trimming: Keep last N messages.
-            # Note: This might drop the system prompt if it's old.
-            # For v2, we should preserve the first message if it's 'system'.
-            self.sessions[session_id]["messages"] = messages[-max_messages:]
-            logger.debug(f"Trimmed context for session {session_id} to {max_messages} messages.")
+        session.messages.insert(session.pinned, message)
+        session.token_counts.insert(session.pinned, tokens)
+        session.total_tokens += tokens
+
+    def delete_session(self, session_id: str) -> None:
+        """Remove a session from memory and the spill."""
+        self.sessions.delete(session_id)
 
     def has_session(self, session_id: str) -> bool:
         """Check if a session exists."""
         return session_id in self.sessions
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Session store statistics."""
+        return self.sessions.get_stats()
@@ -0,0 +1,149 @@
+"""
+Token Counting for LLM Context Budgets.
+
+Counts are produced by a pluggable TokenCounter:
+- HeuristicTokenCounter: offline approximation of byte-pair tokenizers
+  (pre-tokenizes like cl100k and charges long words per 4 characters)
+- EncodingTokenCounter: exact counts from any tokenizer exposing
+  ``encode(text)`` (a tiktoken Encoding, a Hugging Face Tokenizer loaded
+  from a local tokenizer.json, ...)
+
+Counters memoize recent texts, so identical system prompts and few-shot
+examples shared by many sessions are only tokenized once.
+"""
+import re
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Chat formats add a few tokens per message for the role and separators
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# cl100k-style pre-tokenizer: contractions, words, 1-3 digit groups, punctuation runs, whitespace
+_PRETOKENIZE = re.compile(
+    r"'(?:[sdmt]|ll|ve|re)| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+",
+    re.IGNORECASE,
+)
+
+
+class TokenCounter(ABC):
+    """Counts tokens in text and chat messages."""
+
+    def __init__(self, cache_size: int = 4096):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _count(self, text: str) -> int:
+        """Count tokens in text (uncached)."""
+
+    def count_text(self, text: str) -> int:
+        """Count tokens in text, memoizing recent results."""
+        if not text:
+            return 0
+        with self._lock:
+            cached = self._cache.get(text)
+            if cached is not None:
+                self._cache.move_to_end(text)
+                return cached
+        count = self._count(text)
+        with self._lock:
+            self._cache[text] = count
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return count
+
+    def count_message(self, message: Dict[str, Any]) -> int:
+        """Count tokens a chat message occupies in the context window."""
+        count = MESSAGE_OVERHEAD_TOKENS + self.count_text(message.get("content") or "")
+        if message.get("name"):
+            count += self.count_text(message["name"]) + 1
+        return count
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Longest prefix of text that fits in max_tokens."""
+        if self.count_text(text) <= max_tokens:
+            return text
+        low, high = 0, len(text)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if self._count(text[:mid]) <= max_tokens:
+                low = mid
+            else:
+                high = mid - 1
+        return text[:low]
+
+
+class HeuristicTokenCounter(TokenCounter):
+    """
+    Offline BPE approximation.
+
+    Each pre-token of up to 4 characters counts as one token and longer ones
+    as one token per 4 characters. Counts are an estimate; use an
+    EncodingTokenCounter where exact budgets matter.
+    """
+
+    def _count(self, text: str) -> int:
+        count = 0
+        for piece in _PRETOKENIZE.findall(text):
+            count += (len(piece) + 3) // 4
+        return count
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        count = 0
+        for match in _PRETOKENIZE.finditer(text):
+            piece = match.group()
+            cost = (len(piece) + 3) // 4
+            if count + cost > max_tokens:
+                return text[:match.start() + (max_tokens - count) * 4]
+            count += cost
+        return text
+
+
+class EncodingTokenCounter(TokenCounter):
+    """Exact counts from a tokenizer object with ``encode(text)``."""
+
+    def __init__(self, encoder: Any, cache_size: int = 4096):
+        super().__init__(cache_size)
+        self.encoder = encoder
+
+    def _count(self, text: str) -> int:
+        return len(self.encoder.encode(text))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        if not hasattr(self.encoder, "decode"):
+            return super().truncate(text, max_tokens)
+        tokens = self.encoder.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        ids = getattr(tokens, "ids", tokens)  # Hugging Face Encoding objects
+        return self.encoder.decode(list(ids[:max_tokens]))
+
+
+def tiktoken_counter(encoding_name: str = "cl100k_base") -> EncodingTokenCounter:
+    """
+    Exact counter backed by tiktoken.
+
+    tiktoken downloads its BPE ranks on first use unless they are already in
+    its cache (TIKTOKEN_CACHE_DIR), so offline deployments should pre-seed
+    the cache or keep the heuristic counter.
+    """
+    try:
+        import tiktoken
+    except ImportError as e:
+        raise ImportError("tiktoken is required for tiktoken_counter(); pip install tiktoken") from e
+    return EncodingTokenCounter(tiktoken.get_encoding(encoding_name))
+
+
+# Global instance
+_token_counter: Optional[TokenCounter] = None
+
+
+def get_token_counter() -> TokenCounter:
+    """Get the process-wide default (heuristic) token counter."""
+    global _token_counter
+    if _token_counter is None:
+        _token_counter = HeuristicTokenCounter()
+    return _token_counter
@@ -86,6 +86,15 @@ from .key_rotation import (
     emergency_rotate_all,
 )
 
+# Online re-encryption
+from .reencryption import (
+    ReencryptionStore,
+    ReencryptionJob,
+    ReencryptionCheckpoint,
+    FieldRecordStore,
+    admission_load_probe,
+)
+
 # Key recovery
 from .key_recovery import (
     KeyRecoveryManager,
@@ -121,11 +130,14 @@ from .field_encryption import (
     FieldEncryptionMapper,
     FieldEncryptionConfig,
     FieldEncryptionMode,
+    DEKCache,
     encrypted_field,
     init_field_encryption,
     get_field_encryption,
     encrypt_sensitive_fields,
     decrypt_sensitive_fields,
+    encrypt_sensitive_records,
+    decrypt_sensitive_records,
 )
 
 # Zero-knowledge
@@ -294,6 +306,7 @@ async def init_encryption_system(
         # Initialize field encryption
         field_encryption = init_field_encryption(
             encryption_engine=encryption_engine,
+            rotation_manager=rotation_manager,
         )
         results["field_encryption"] = {
             "status": "initialized",
@@ -413,6 +426,13 @@ __all__ = [
     "stop_automatic_rotation",
     "emergency_rotate_all",
     
+    # Online re-encryption
+    "ReencryptionStore",
+    "ReencryptionJob",
+    "ReencryptionCheckpoint",
+    "FieldRecordStore",
+    "admission_load_probe",
+    
     # Key recovery
     "KeyRecoveryManager",
     "KeyShare",
@@ -443,11 +463,14 @@ __all__ = [
     "FieldEncryptionMapper",
     "FieldEncryptionConfig",
     "FieldEncryptionMode",
+    "DEKCache",
     "encrypted_field",
     "init_field_encryption",
     "get_field_encryption",
     "encrypt_sensitive_fields",
     "decrypt_sensitive_fields",
+    "encrypt_sensitive_records",
+    "decrypt_sensitive_records",
     
     # Zero-knowledge
     "ZeroKnowledgeManager",
@@ -21,7 +21,10 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
 
 from .encryption import get_encryption_engine, EncryptedData
-from .field_encryption import get_field_encryption, encrypt_sensitive_fields, decrypt_sensitive_fields
+from .field_encryption import (
+    get_field_encryption, encrypt_sensitive_fields, decrypt_sensitive_fields,
+    encrypt_sensitive_records, decrypt_sensitive_records,
+)
 from .compliance import log_encryption_event
 
 logger = logging.getLogger(__name__)
@@ -116,8 +119,11 @@ class EncryptionMiddleware(BaseHTTPMiddleware):
             
             # Check if body contains encrypted fields
             if self._has_encrypted_fields(data):
-                # Decrypt fields
-                decrypted = decrypt_sensitive_fields(data)
+                # Decrypt fields (batches column-wise for list bodies)
+                if isinstance(data, list):
+                    decrypted = decrypt_sensitive_records(data)
+                else:
+                    decrypted = decrypt_sensitive_fields(data)
                 
                 # Replace request body
                 request._body = json.dumps(decrypted).encode()
@@ -152,11 +158,21 @@ class EncryptionMiddleware(BaseHTTPMiddleware):
             
             # Encrypt sensitive fields
             if self.config.field_level_encryption:
-                encrypted = encrypt_sensitive_fields(
-                    data,
-                    fields=self.config.sensitive_fields,
-                    auto_detect=self.config.auto_detect_sensitive,
-                )
+                if isinstance(data, list) and all(isinstance(item, dict) for item in data):
+                    # Batch list bodies column-wise under cached DEKs
+                    encrypted = encrypt_sensitive_records(
+                        data,
+                        fields=self.config.sensitive_fields,
+                        auto_detect=self.config.auto_detect_sensitive,
+                    )
+                elif isinstance(data, dict):
+                    encrypted = encrypt_sensitive_fields(
+                        data,
+                        fields=self.config.sensitive_fields,
+                        auto_detect=self.config.auto_detect_sensitive,
+                    )
+                else:
+                    encrypted = data
                 
                 # Check if any fields were encrypted
                 if encrypted != data:
@@ -183,8 +199,10 @@ class EncryptionMiddleware(BaseHTTPMiddleware):
         
         return response
     
-    def _has_encrypted_fields(self, data: Dict[str, Any]) -> bool:
-        """Check if data contains encrypted fields."""
+    def _has_encrypted_fields(self, data: Any) -> bool:
+        """Check if data (an object or a list of objects) contains encrypted fields."""
+        if isinstance(data, list):
+            return any(isinstance(item, dict) and self._has_encrypted_fields(item) for item in data)
         for value in data.values():
             if isinstance(value, dict) and value.get("__encrypted"):
                 return True
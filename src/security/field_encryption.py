@@ -6,18 +6,41 @@ Provides:
 - Searchable encryption (deterministic for exact match)
 - Format-preserving encryption
 - Automatic field detection and protection
+- Bulk column/record encryption with cached data keys
+
+Envelope format: each value is sealed with AES-256-GCM under a data
+encryption key (DEK); the DEK is wrapped with the engine key (KEK) and
+travels with the value. The AAD binds the value to its field name and the
+configured associated-data fields. Values are stored either as JSON
+containers (base64) or as compact binary envelopes:
+
+    b"AGF\x01" | wrapped DEK length (1 byte) | wrapped DEK | nonce | ciphertext
+
+encrypt_field() mints and wraps a fresh DEK per value. The bulk API
+(encrypt_column, encrypt_records and their decrypt counterparts) reuses one
+DEK per field from a bounded, TTL'd DEKCache, which also memoizes unwrapped
+DEKs on the decrypt side and is invalidated on key rotation.
 """
 
 import re
+import os
+import hmac
 import json
+import time
 import base64
+import hashlib
 import logging
-from typing import Dict, Any, Optional, List, Callable, Set, Union
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Callable, Set, Union, Sequence, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum, auto
 from functools import wraps
 
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
 from .encryption import (
     EncryptionEngine, EncryptedData, encrypt_data, decrypt_data,
     get_encryption_engine, init_encryption_engine,
@@ -26,6 +49,14 @@ from .compliance import log_encryption_event, get_compliance_manager
 
 logger = logging.getLogger(__name__)
 
+FIELD_AAD_PREFIX = b"astraguard-field:v1|"
+DEK_WRAP_AAD = b"astraguard-dek:v1"
+BLIND_INDEX_CONTEXT = b"astraguard-blind-index:v1"
+BINARY_MAGIC = b"AGF\x01"
+NONCE_SIZE = 12
+DEK_SIZE = 32
+_JSON_START_BYTES = frozenset(bytes([c]) for c in b'{["-0123456789tfn \t\r\n')
+
 
 class FieldEncryptionMode(Enum):
     """Encryption modes for different use cases."""
@@ -76,6 +107,35 @@ class FieldEncryptionMapper:
     def __init__(self):
         self._configs: Dict[str, FieldEncryptionConfig] = {}
         self._blind_index: Dict[str, Dict[str, str]] = {}  # For searchable encryption
+        self._index_key: Optional[bytes] = None
+    
+    def set_blind_index_key(self, key: bytes) -> None:
+        """Key blind indexes with HMAC-SHA256 (unkeyed SHA-256 until set)."""
+        self._index_key = key
+    
+    def _index_hasher(self, field_name: str) -> Any:
+        prefix = f"{field_name}:".encode()
+        if self._index_key is not None:
+            return hmac.new(self._index_key, prefix, hashlib.sha256)
+        return hashlib.sha256(prefix)
+    
+    def blind_indexes(self, field_name: str, values: Sequence[Any]) -> List[Optional[str]]:
+        """
+        Compute blind indexes for a column of values.
+        
+        The keyed hash state for the field prefix is built once and copied
+        per value. Non-string values get None.
+        """
+        base = self._index_hasher(field_name)
+        indexes: List[Optional[str]] = []
+        for value in values:
+            if isinstance(value, str):
+                hasher = base.copy()
+                hasher.update(value.encode())
+                indexes.append(hasher.hexdigest()[:32])
+            else:
+                indexes.append(None)
+        return indexes
     
     def register_field(
         self,
@@ -158,13 +218,25 @@ class FieldEncryptionMapper:
             return None
         
         # Create deterministic hash for search
-        import hashlib
-        index = hashlib.sha256(f"{field_name}:{plaintext}".encode()).hexdigest()[:32]
+        index = self.blind_indexes(field_name, [plaintext])[0]
         
         self._blind_index[field_name][index] = plaintext
         
         return index
     
+    def create_blind_indexes(self, field_name: str, values: Sequence[Any]) -> List[Optional[str]]:
+        """Create blind indexes for a column of values (None if not searchable)."""
+        if field_name not in self._blind_index:
+            return [None] * len(values)
+        
+        indexes = self.blind_indexes(field_name, values)
+        known = self._blind_index[field_name]
+        for index, value in zip(indexes, values):
+            if index is not None:
+                known[index] = value
+        
+        return indexes
+    
     def search_by_blind_index(self, field_name: str, plaintext: str) -> Optional[str]:
         """
         Search for encrypted field by plaintext value.
@@ -179,18 +251,139 @@ class FieldEncryptionMapper:
         if field_name not in self._blind_index:
             return None
         
-        import hashlib
-        index = hashlib.sha256(f"{field_name}:{plaintext}".encode()).hexdigest()[:32]
+        index = self.blind_indexes(field_name, [plaintext])[0]
         
         return index if index in self._blind_index[field_name] else None
 
 
+@dataclass
+class _ActiveDEK:
+    cipher: AESGCM
+    wrapped: bytes
+    wrapped_b64: str
+    created: float
+    uses: int = 0
+
+
+class DEKCache:
+    """
+    Bounded, TTL'd cache of data encryption keys.
+    
+    - Encrypt side: one active DEK per (KEK id, field), retired after
+      ``ttl_seconds`` or ``max_uses`` encryptions (well below the AES-GCM
+      random-nonce limit).
+    - Decrypt side: unwrapped DEKs keyed by their wrapped form (bytes, or the
+      base64 text of JSON containers), so a batch unwraps each DEK once.
+    
+    Both maps are LRU-bounded by ``max_entries``. Keys are scoped by a KEK
+    fingerprint, so a new engine key mints new DEKs; invalidate() can be
+    registered with KeyRotationManager.register_callback() to drop
+    everything on rotation.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 300.0,
+        max_uses: int = 1 << 24,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_uses = max_uses
+        self._clock = clock
+        self._active: "OrderedDict[Tuple[str, str], _ActiveDEK]" = OrderedDict()
+        self._unwrapped: "OrderedDict[Union[bytes, str], Tuple[AESGCM, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    def active(
+        self,
+        kek_id: str,
+        scope: str,
+        uses: int,
+        mint: Callable[[], Tuple[AESGCM, bytes]],
+    ) -> _ActiveDEK:
+        """Return the active DEK for a scope, reserving ``uses`` encryptions."""
+        key = (kek_id, scope)
+        now = self._clock()
+        with self._lock:
+            entry = self._active.get(key)
+            if (
+                entry is not None
+                and now - entry.created < self.ttl_seconds
+                and entry.uses + uses <= self.max_uses
+            ):
+                entry.uses += uses
+                self._active.move_to_end(key)
+                self.hits += 1
+                return entry
+        
+        cipher, wrapped = mint()
+        entry = _ActiveDEK(cipher, wrapped, base64.b64encode(wrapped).decode(), now, uses)
+        with self._lock:
+            self.misses += 1
+            self._active[key] = entry
+            self._active.move_to_end(key)
+            while len(self._active) > self.max_entries:
+                self._active.popitem(last=False)
+            # The encrypting side can decrypt its own values without unwrapping
+            self._remember(entry.wrapped, cipher, now)
+            self._remember(entry.wrapped_b64, cipher, now)
+        return entry
+    
+    def _remember(self, wrapped: Union[bytes, str], cipher: AESGCM, now: float) -> None:
+        self._unwrapped[wrapped] = (cipher, now)
+        self._unwrapped.move_to_end(wrapped)
+        while len(self._unwrapped) > self.max_entries:
+            self._unwrapped.popitem(last=False)
+    
+    def unwrap(self, wrapped: Union[bytes, str], unwrap: Callable[[bytes], AESGCM]) -> AESGCM:
+        """Return the cipher for a wrapped DEK, unwrapping it on a miss."""
+        now = self._clock()
+        with self._lock:
+            cached = self._unwrapped.get(wrapped)
+            if cached is not None and now - cached[1] < self.ttl_seconds:
+                self._unwrapped.move_to_end(wrapped)
+                self.hits += 1
+                return cached[0]
+        
+        raw = base64.b64decode(wrapped) if isinstance(wrapped, str) else wrapped
+        cipher = unwrap(raw)
+        with self._lock:
+            self.misses += 1
+            self._remember(wrapped, cipher, now)
+        return cipher
+    
+    def invalidate(self, event: Any = None) -> None:
+        """Drop every cached DEK (e.g. as a key rotation callback)."""
+        with self._lock:
+            self._active.clear()
+            self._unwrapped.clear()
+            self.invalidations += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics."""
+        with self._lock:
+            return {
+                "active_deks": len(self._active),
+                "unwrapped_deks": len(self._unwrapped),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+
 class FieldEncryptionEngine:
     """
     High-performance field-level encryption engine.
     
     Features:
     - Batch encryption for multiple fields
+    - Column-oriented bulk encryption with cached DEKs
     - Transparent encryption/decryption
     - Searchable encryption support
     - <5ms per field overhead
@@ -200,19 +393,107 @@ class FieldEncryptionEngine:
         self,
         encryption_engine: Optional[EncryptionEngine] = None,
         mapper: Optional[FieldEncryptionMapper] = None,
+        dek_cache: Optional[DEKCache] = None,
+        rotation_manager: Optional[Any] = None,
     ):
         """
         Initialize field encryption engine.
         
         Args:
-            encryption_engine: Underlying encryption engine
+            encryption_engine: Underlying encryption engine (its key is the KEK)
             mapper: Field configuration mapper
+            dek_cache: DEK cache for the bulk API
+            rotation_manager: KeyRotationManager whose rotations invalidate the cache
         """
         self.encryption_engine = encryption_engine or get_encryption_engine()
         self.mapper = mapper or FieldEncryptionMapper()
+        self.dek_cache = dek_cache or DEKCache()
+        self._kek_key: Optional[bytes] = None
+        self._kek_id = ""
+        self._kek: Optional[AESGCM] = None
+        self._current_kek()
+        
+        if rotation_manager is not None:
+            self.attach_rotation_manager(rotation_manager)
         
         logger.info("FieldEncryptionEngine initialized")
     
+    def attach_rotation_manager(self, rotation_manager: Any) -> None:
+        """Invalidate cached DEKs whenever the rotation manager rotates a key."""
+        rotation_manager.register_callback(self.dek_cache.invalidate)
+    
+    def _current_kek(self) -> Tuple[str, AESGCM]:
+        """Return (fingerprint, cipher) for the engine key, tracking key swaps."""
+        key = self.encryption_engine.key
+        if key != self._kek_key:
+            self._kek_key = key
+            self._kek_id = hashlib.sha256(key).hexdigest()[:16]
+            self._kek = AESGCM(key)
+            if self.mapper._index_key is None:
+                self.mapper.set_blind_index_key(
+                    hmac.new(key, BLIND_INDEX_CONTEXT, hashlib.sha256).digest()
+                )
+        return self._kek_id, self._kek
+    
+    def _mint_dek(self) -> Tuple[AESGCM, bytes]:
+        """Generate a DEK and wrap it under the KEK (nonce + ciphertext)."""
+        _, kek = self._current_kek()
+        dek = os.urandom(DEK_SIZE)
+        nonce = os.urandom(NONCE_SIZE)
+        return AESGCM(dek), nonce + kek.encrypt(nonce, dek, DEK_WRAP_AAD)
+    
+    def _unwrap_dek(self, wrapped: bytes) -> AESGCM:
+        _, kek = self._current_kek()
+        return AESGCM(kek.decrypt(wrapped[:NONCE_SIZE], wrapped[NONCE_SIZE:], DEK_WRAP_AAD))
+    
+    @staticmethod
+    def _encode_value(value: Any) -> bytes:
+        if isinstance(value, dict):
+            return json.dumps(value).encode()
+        if isinstance(value, str):
+            return value.encode()
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode()
+    
+    @staticmethod
+    def _decode_value(plaintext: bytes) -> Any:
+        # Only values that can start a JSON document are worth a parse attempt
+        if plaintext[:1] not in _JSON_START_BYTES:
+            return plaintext.decode()
+        try:
+            return json.loads(plaintext.decode())
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return plaintext.decode()
+    
+    @staticmethod
+    def _aad(
+        prefix: bytes,
+        config: Optional[FieldEncryptionConfig],
+        context: Optional[Dict[str, Any]],
+    ) -> bytes:
+        """AAD = field prefix, plus the associated-data fields when configured."""
+        if config and config.associated_data_fields and context:
+            aad_data = {f: context.get(f) for f in config.associated_data_fields}
+            return prefix + json.dumps(aad_data).encode()
+        return prefix
+    
+    @staticmethod
+    def _aad_prefix(field_name: str) -> bytes:
+        return FIELD_AAD_PREFIX + field_name.encode() + b"|"
+    
+    @staticmethod
+    def _is_encrypted(value: Any) -> bool:
+        if isinstance(value, dict):
+            return bool(value.get("__encrypted"))
+        return isinstance(value, bytes) and value.startswith(BINARY_MAGIC)
+    
+    def _require_config(self, field_name: str) -> FieldEncryptionConfig:
+        config = self.mapper.get_config(field_name)
+        if not config:
+            raise ValueError(f"Field {field_name} not configured for encryption")
+        return config
+    
     def encrypt_field(
         self,
         field_name: str,
@@ -220,7 +501,7 @@ class FieldEncryptionEngine:
         context: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
-        Encrypt a single field.
+        Encrypt a single field under its own freshly wrapped DEK.
         
         Args:
             field_name: Name of the field
@@ -230,31 +511,15 @@ class FieldEncryptionEngine:
         Returns:
             Encrypted field container
         """
-        config = self.mapper.get_config(field_name)
-        if not config:
-            raise ValueError(f"Field {field_name} not configured for encryption")
-        
-        # Convert value to string/bytes
-        if isinstance(value, dict):
-            plaintext = json.dumps(value).encode()
-        elif isinstance(value, str):
-            plaintext = value.encode()
-        elif isinstance(value, bytes):
-            plaintext = value
-        else:
-            plaintext = str(value).encode()
+        config = self._require_config(field_name)
         
-        # Build AAD from context
-        aad = None
-        if config.associated_data_fields and context:
-            aad_data = {f: context.get(f) for f in config.associated_data_fields}
-            aad = json.dumps(aad_data).encode()
+        plaintext = self._encode_value(value)
+        aad = self._aad(self._aad_prefix(field_name), config, context)
         
         # Encrypt
-        encrypted_data, encrypted_dek = self.encryption_engine.encrypt(
-            plaintext,
-            associated_data=aad,
-        )
+        dek, wrapped = self._mint_dek()
+        nonce = os.urandom(NONCE_SIZE)
+        sealed = nonce + dek.encrypt(nonce, plaintext, aad)
         
         # Create blind index if searchable
         blind_index = None
@@ -265,9 +530,10 @@ class FieldEncryptionEngine:
         result = {
             "__encrypted": True,
             "field": field_name,
-            "algorithm": encrypted_data.algorithm,
-            "data": encrypted_data.to_dict(),
-            "dek": base64.b64encode(encrypted_dek).decode(),
+            "algorithm": config.algorithm,
+            "v": 1,
+            "data": base64.b64encode(sealed).decode(),
+            "dek": base64.b64encode(wrapped).decode(),
         }
         
         if blind_index:
@@ -287,41 +553,32 @@ class FieldEncryptionEngine:
     
     def decrypt_field(
         self,
-        encrypted_container: Dict[str, Any],
+        encrypted_container: Union[Dict[str, Any], bytes],
         context: Optional[Dict[str, Any]] = None,
+        field_name: Optional[str] = None,
     ) -> Any:
         """
         Decrypt a field.
         
         Args:
-            encrypted_container: Encrypted field container
+            encrypted_container: Encrypted field container or binary envelope
             context: Additional context for AAD
+            field_name: Field name (required for binary envelopes)
         
         Returns:
             Decrypted value
         """
-        if not encrypted_container.get("__encrypted"):
+        if not self._is_encrypted(encrypted_container):
             return encrypted_container
         
-        field_name = encrypted_container.get("field")
-        config = self.mapper.get_config(field_name)
-        
-        # Reconstruct EncryptedData
-        encrypted_data = EncryptedData.from_dict(encrypted_container["data"])
-        encrypted_dek = base64.b64decode(encrypted_container["dek"])
-        
-        # Build AAD
-        aad = None
-        if config and config.associated_data_fields and context:
-            aad_data = {f: context.get(f) for f in config.associated_data_fields}
-            aad = json.dumps(aad_data).encode()
+        if isinstance(encrypted_container, dict):
+            field_name = encrypted_container.get("field")
+        if not field_name:
+            raise ValueError("field_name is required to decrypt a binary envelope")
         
-        # Decrypt
-        plaintext = self.encryption_engine.decrypt(
-            encrypted_data,
-            encrypted_dek,
-            associated_data=aad,
-        )
+        config = self.mapper.get_config(field_name)
+        aad = self._aad(self._aad_prefix(field_name), config, context)
+        plaintext = self._open(encrypted_container, aad)
         
         # Log
         log_encryption_event(
@@ -329,11 +586,318 @@ class FieldEncryptionEngine:
             details={"field": field_name},
         )
         
-        # Try to parse as JSON
-        try:
-            return json.loads(plaintext.decode())
-        except (json.JSONDecodeError, UnicodeDecodeError):
-            return plaintext.decode()
+        return self._decode_value(plaintext)
+    
+    def _open(self, envelope: Union[Dict[str, Any], bytes], aad: bytes) -> bytes:
+        """Unwrap the DEK (through the cache) and open one envelope."""
+        if isinstance(envelope, bytes):
+            size = envelope[len(BINARY_MAGIC)]
+            start = len(BINARY_MAGIC) + 1
+            wrapped = envelope[start:start + size]
+            dek = self.dek_cache.unwrap(wrapped, self._unwrap_dek)
+            sealed = memoryview(envelope)[start + size:]
+        else:
+            if envelope.get("v") != 1:
+                raise ValueError(f"Unsupported field container version: {envelope.get('v')}")
+            dek = self.dek_cache.unwrap(envelope["dek"], self._unwrap_dek)
+            sealed = base64.b64decode(envelope["data"])
+        return dek.decrypt(bytes(sealed[:NONCE_SIZE]), bytes(sealed[NONCE_SIZE:]), aad)
+    
+    def encrypt_column(
+        self,
+        field_name: str,
+        values: Sequence[Any],
+        contexts: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+        binary: bool = False,
+    ) -> List[Any]:
+        """
+        Encrypt a column of values for one field.
+        
+        All values share the field's cached DEK, nonces come from a single
+        os.urandom call and blind indexes are computed in one pass. None and
+        already encrypted values are passed through unchanged.
+        
+        Args:
+            field_name: Name of the field
+            values: Values to encrypt
+            contexts: Per-value AAD context (e.g. the owning records)
+            binary: Emit compact binary envelopes instead of JSON containers
+                (binary envelopes carry no blind index)
+        
+        Returns:
+            Encrypted values in input order
+        """
+        config = self._require_config(field_name)
+        results = list(values)
+        rows = [i for i, value in enumerate(results) if value is not None and not self._is_encrypted(value)]
+        if not rows:
+            return results
+        
+        kek_id, _ = self._current_kek()
+        active = self.dek_cache.active(kek_id, field_name, len(rows), self._mint_dek)
+        dek, wrapped = active.cipher, active.wrapped
+        nonces = os.urandom(NONCE_SIZE * len(rows))
+        prefix = self._aad_prefix(field_name)
+        per_row_aad = bool(config.associated_data_fields and contexts is not None)
+        
+        blind_indexes: List[Optional[str]] = [None] * len(rows)
+        if config.searchable and not binary:
+            blind_indexes = self.mapper.create_blind_indexes(field_name, [results[i] for i in rows])
+        
+        header = BINARY_MAGIC + bytes([len(wrapped)]) + wrapped
+        for n, i in enumerate(rows):
+            nonce = nonces[n * NONCE_SIZE:(n + 1) * NONCE_SIZE]
+            aad = self._aad(prefix, config, contexts[i]) if per_row_aad else prefix
+            sealed = nonce + dek.encrypt(nonce, self._encode_value(results[i]), aad)
+            if binary:
+                results[i] = header + sealed
+            else:
+                container = {
+                    "__encrypted": True,
+                    "field": field_name,
+                    "algorithm": config.algorithm,
+                    "v": 1,
+                    "data": base64.b64encode(sealed).decode(),
+                    "dek": active.wrapped_b64,
+                }
+                if blind_indexes[n]:
+                    container["__blind_index"] = blind_indexes[n]
+                results[i] = container
+        
+        log_encryption_event(
+            "encrypt_column",
+            details={
+                "field": field_name,
+                "mode": config.mode.name,
+                "algorithm": config.algorithm,
+                "count": len(rows),
+                "binary": binary,
+            },
+        )
+        
+        return results
+    
+    def decrypt_column(
+        self,
+        field_name: str,
+        values: Sequence[Any],
+        contexts: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+    ) -> List[Any]:
+        """
+        Decrypt a column of values for one field.
+        
+        Accepts JSON containers and binary envelopes; wrapped DEKs are
+        unwrapped once per batch through the DEK cache. Values that are not
+        encrypted are passed through unchanged.
+        
+        Args:
+            field_name: Name of the field
+            values: Encrypted values
+            contexts: Per-value AAD context, as given to encrypt_column()
+        
+        Returns:
+            Decrypted values in input order
+        """
+        config = self.mapper.get_config(field_name)
+        prefix = self._aad_prefix(field_name)
+        per_row_aad = bool(config and config.associated_data_fields and contexts is not None)
+        
+        results = list(values)
+        count = 0
+        for i, value in enumerate(results):
+            if not self._is_encrypted(value):
+                continue
+            aad = self._aad(prefix, config, contexts[i]) if per_row_aad else prefix
+            results[i] = self._decode_value(self._open(value, aad))
+            count += 1
+        
+        if count:
+            log_encryption_event(
+                "decrypt_column",
+                details={"field": field_name, "count": count},
+            )
+        
+        return results
+    
+    def encrypt_records(
+        self,
+        records: Sequence[Dict[str, Any]],
+        fields_to_encrypt: Optional[List[str]] = None,
+        auto_detect: bool = False,
+        binary: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Encrypt fields across a batch of records, one column at a time.
+        
+        Args:
+            records: Data records
+            fields_to_encrypt: Specific fields to encrypt
+            auto_detect: Auto-detect sensitive fields
+            binary: Emit binary envelopes instead of JSON containers
+        
+        Returns:
+            Records with encrypted fields
+        """
+        results = [dict(record) for record in records]
+        
+        # Determine fields to encrypt
+        if auto_detect or fields_to_encrypt is None:
+            names: Dict[str, None] = {}
+            for record in records:
+                for field_name in record:
+                    names.setdefault(field_name)
+            if auto_detect:
+                fields_to_encrypt = self.mapper.auto_detect_fields(names)
+            else:
+                fields_to_encrypt = [f for f in names if self.mapper.is_encrypted_field(f)]
+        
+        for field_name in fields_to_encrypt:
+            if not self.mapper.is_encrypted_field(field_name):
+                logger.warning(f"Field {field_name} not configured for encryption")
+                continue
+            
+            rows = [i for i, record in enumerate(records) if field_name in record]
+            if not rows:
+                continue
+            
+            try:
+                encrypted = self.encrypt_column(
+                    field_name,
+                    [records[i][field_name] for i in rows],
+                    contexts=[records[i] for i in rows],
+                    binary=binary,
+                )
+            except Exception as e:
+                logger.error(f"Failed to encrypt field {field_name}: {e}")
+                raise
+            
+            for i, value in zip(rows, encrypted):
+                results[i][field_name] = value
+        
+        return results
+    
+    def decrypt_records(
+        self,
+        records: Sequence[Dict[str, Any]],
+        encrypted_fields: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Decrypt fields across a batch of records, one column at a time.
+        
+        Args:
+            records: Records with encrypted fields
+            encrypted_fields: Fields to decrypt (auto-detect if None)
+        
+        Returns:
+            Records with decrypted fields
+        """
+        results = [dict(record) for record in records]
+        
+        if encrypted_fields is None:
+            names: Dict[str, None] = {}
+            for record in records:
+                for field_name, value in record.items():
+                    if self._is_encrypted(value):
+                        names.setdefault(field_name)
+            encrypted_fields = list(names)
+        
+        for field_name in encrypted_fields:
+            rows = [i for i, record in enumerate(records) if self._is_encrypted(record.get(field_name))]
+            if not rows:
+                continue
+            
+            try:
+                decrypted = self.decrypt_column(
+                    field_name,
+                    [records[i][field_name] for i in rows],
+                    contexts=[records[i] for i in rows],
+                )
+            except Exception as e:
+                logger.error(f"Failed to decrypt field {field_name}: {e}")
+                raise
+            
+            for i, value in zip(rows, decrypted):
+                results[i][field_name] = value
+        
+        return results
+    
+    def rewrap_records(
+        self,
+        records: Sequence[Dict[str, Any]],
+        previous_engine: EncryptionEngine,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Move encrypted fields from a previous engine key (KEK) to the current one.
+        
+        Only the wrapped DEKs change; each distinct DEK is unwrapped and
+        re-wrapped once. Values whose DEK is already wrapped under the
+        current key are left as they are, so replaying a batch is safe.
+        
+        Args:
+            records: Records with encrypted fields
+            previous_engine: Engine holding the retiring key
+        
+        Returns:
+            (records with re-wrapped fields, number of records changed)
+        """
+        _, current = self._current_kek()
+        previous = AESGCM(previous_engine.key)
+        rewrapped: Dict[bytes, Optional[bytes]] = {}
+        
+        def rewrap(wrapped: bytes) -> Optional[bytes]:
+            if wrapped not in rewrapped:
+                nonce, body = wrapped[:NONCE_SIZE], wrapped[NONCE_SIZE:]
+                try:
+                    dek = previous.decrypt(nonce, body, DEK_WRAP_AAD)
+                except InvalidTag:
+                    # Already under the current key (replayed batch)
+                    current.decrypt(nonce, body, DEK_WRAP_AAD)
+                    rewrapped[wrapped] = None
+                else:
+                    new_nonce = os.urandom(NONCE_SIZE)
+                    rewrapped[wrapped] = new_nonce + current.encrypt(new_nonce, dek, DEK_WRAP_AAD)
+            return rewrapped[wrapped]
+        
+        rewrapped_b64: Dict[str, Optional[str]] = {}
+        
+        def rewrap_b64(wrapped_b64: str) -> Optional[str]:
+            if wrapped_b64 not in rewrapped_b64:
+                new_wrapped = rewrap(base64.b64decode(wrapped_b64))
+                rewrapped_b64[wrapped_b64] = (
+                    base64.b64encode(new_wrapped).decode() if new_wrapped is not None else None
+                )
+            return rewrapped_b64[wrapped_b64]
+        
+        results = []
+        changed = 0
+        for record in records:
+            result = None
+            for field_name, value in record.items():
+                if isinstance(value, dict) and value.get("__encrypted"):
+                    new_dek = rewrap_b64(value["dek"])
+                    if new_dek is not None:
+                        result = result or dict(record)
+                        result[field_name] = dict(value, dek=new_dek)
+                elif isinstance(value, bytes) and value.startswith(BINARY_MAGIC):
+                    start = len(BINARY_MAGIC) + 1
+                    end = start + value[len(BINARY_MAGIC)]
+                    new_wrapped = rewrap(value[start:end])
+                    if new_wrapped is not None:
+                        result = result or dict(record)
+                        result[field_name] = (
+                            BINARY_MAGIC + bytes([len(new_wrapped)]) + new_wrapped + value[end:]
+                        )
+            if result is not None:
+                changed += 1
+            results.append(result if result is not None else record)
+        
+        if changed:
+            log_encryption_event(
+                "rewrap_records",
+                details={"records": changed, "deks": sum(v is not None for v in rewrapped.values())},
+            )
+        
+        return results, changed
     
     def encrypt_record(
         self,
@@ -375,7 +939,7 @@ class FieldEncryptionEngine:
             value = record[field_name]
             
             # Skip already encrypted or None values
-            if value is None or (isinstance(value, dict) and value.get("__encrypted")):
+            if value is None or self._is_encrypted(value):
                 continue
             
             try:
@@ -408,18 +972,18 @@ class FieldEncryptionEngine:
         if encrypted_fields is None:
             encrypted_fields = [
                 f for f, v in record.items()
-                if isinstance(v, dict) and v.get("__encrypted")
+                if self._is_encrypted(v)
             ]
         
         # Decrypt each field
         for field_name in encrypted_fields:
             value = record.get(field_name)
             
-            if not isinstance(value, dict) or not value.get("__encrypted"):
+            if not self._is_encrypted(value):
                 continue
             
             try:
-                decrypted = self.decrypt_field(value, context=record)
+                decrypted = self.decrypt_field(value, context=record, field_name=field_name)
                 result[field_name] = decrypted
             except Exception as e:
                 logger.error(f"Failed to decrypt field {field_name}: {e}")
@@ -485,10 +1049,11 @@ _field_engine: Optional[FieldEncryptionEngine] = None
 def init_field_encryption(
     encryption_engine: Optional[EncryptionEngine] = None,
     mapper: Optional[FieldEncryptionMapper] = None,
+    rotation_manager: Optional[Any] = None,
 ) -> FieldEncryptionEngine:
     """Initialize global field encryption engine."""
     global _field_engine
-    _field_engine = FieldEncryptionEngine(encryption_engine, mapper)
+    _field_engine = FieldEncryptionEngine(encryption_engine, mapper, rotation_manager=rotation_manager)
     return _field_engine
 
 
@@ -511,3 +1076,18 @@ def encrypt_sensitive_fields(
 def decrypt_sensitive_fields(record: Dict[str, Any]) -> Dict[str, Any]:
     """Decrypt sensitive fields in a record."""
     return get_field_encryption().decrypt_record(record)
+
+
+def encrypt_sensitive_records(
+    records: List[Dict[str, Any]],
+    fields: Optional[List[str]] = None,
+    auto_detect: bool = False,
+    binary: bool = False,
+) -> List[Dict[str, Any]]:
+    """Encrypt sensitive fields across a batch of records."""
+    return get_field_encryption().encrypt_records(records, fields, auto_detect, binary)
+
+
+def decrypt_sensitive_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Decrypt sensitive fields across a batch of records."""
+    return get_field_encryption().decrypt_records(records)
@@ -4,8 +4,10 @@ Key Management Module
 Handles key hierarchy, metadata, and lifecycle.
 """
 
+import os
+import secrets
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
 from typing import Dict, Optional, List, Any
 
@@ -16,11 +18,16 @@ class KeyType(str, Enum):
     DEK = "dek"  # Data Encryption Key
     RSA = "rsa"
     ECC = "ecc"
+    # Long-form aliases used by rotation policies
+    KEY_ENCRYPTION = "kek"
+    DATA_ENCRYPTION = "dek"
 
 class KeyStatus(str, Enum):
     """Status of a cryptographic key."""
     ACTIVE = "active"
+    ROTATING = "rotating"
     ROTATED = "rotated"
+    RETIRED = "retired"
     REVOKED = "revoked"
     DESTROYED = "destroyed"
 
@@ -35,6 +42,16 @@ class KeyMetadata:
     rotation_date: Optional[datetime] = None
     status: KeyStatus = KeyStatus.ACTIVE
     tags: Dict[str, str] = None
+    key_type: KeyType = KeyType.DEK
+    rotated_at: Optional[datetime] = None
+    usage_count: int = 0
+    hsm_key_handle: Optional[str] = None
+
+    def is_active(self) -> bool:
+        """Whether the key may still be used for new encryptions."""
+        if self.status != KeyStatus.ACTIVE:
+            return False
+        return self.expires_at is None or self.expires_at > datetime.now()
 
 @dataclass
 class ManagedKey:
@@ -47,6 +64,52 @@ class KeyHierarchy:
 
     def __init__(self):
         self._current_kek: Optional[ManagedKey] = None
+        self._keys: Dict[str, ManagedKey] = {}
+
+    def _new_key(self, key_type: KeyType, version: int, expires_in_days: Optional[int] = None) -> ManagedKey:
+        now = datetime.now()
+        key = ManagedKey(
+            key_material=os.urandom(32),
+            metadata=KeyMetadata(
+                key_id=f"{key_type.value}-{now.strftime('%Y%m%d%H%M%S')}-{secrets.token_hex(4)}",
+                version=version,
+                algorithm="AES-256-GCM",
+                created_at=now,
+                expires_at=now + timedelta(days=expires_in_days) if expires_in_days else None,
+                key_type=key_type,
+            ),
+        )
+        self._keys[key.metadata.key_id] = key
+        return key
+
+    def rotate_kek(self) -> str:
+        """Create a new KEK, mark the current one rotated and return the new key ID."""
+        version = 1
+        if self._current_kek:
+            self._current_kek.metadata.status = KeyStatus.ROTATED
+            self._current_kek.metadata.rotated_at = datetime.now()
+            version = self._current_kek.metadata.version + 1
+        self._current_kek = self._new_key(KeyType.KEK, version)
+        return self._current_kek.metadata.key_id
+
+    def generate_dek(
+        self,
+        purpose: str = "general",
+        expires_in_days: Optional[int] = None,
+        hsm_backed: bool = False,
+    ) -> ManagedKey:
+        """Generate a new data encryption key."""
+        key = self._new_key(KeyType.DEK, 1, expires_in_days)
+        key.metadata.tags = {"purpose": purpose}
+        return key
+
+    def get_key(self, key_id: str) -> Optional[ManagedKey]:
+        """Look up a key by ID."""
+        return self._keys.get(key_id)
+
+    def list_keys(self) -> List[KeyMetadata]:
+        """Metadata of all known keys."""
+        return [key.metadata for key in self._keys.values()]
 
     def health_check(self) -> Dict[str, Any]:
         """Check health of key hierarchy."""
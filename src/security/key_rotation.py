@@ -7,14 +7,17 @@ Provides:
 - Key lineage tracking
 - Automated rotation triggers (time-based, usage-based)
 - Emergency rotation capabilities
+- Online re-encryption of registered stores (see reencryption.py)
+- Append-only rotation journal
 """
 
 import os
 import json
 import logging
 import asyncio
+import secrets
 import threading
-from typing import Optional, Dict, List, Any, Callable, Set
+from typing import Optional, Dict, List, Any, Callable, Set, Iterator
 from dataclasses import dataclass, field, asdict
 from datetime import datetime, timedelta
 from enum import Enum, auto
@@ -27,6 +30,7 @@ from .key_management import (
     get_key_hierarchy, init_key_hierarchy,
 )
 from .hsm_client import HSMClient, get_hsm_client, init_hsm_client, HSMProvider
+from .reencryption import ReencryptionJob, ReencryptionStore
 
 logger = logging.getLogger(__name__)
 
@@ -101,6 +105,74 @@ class RotationEvent:
             "old_key_retires_at": self.old_key_retires_at.isoformat(),
             "status": self.status,
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RotationEvent":
+        return cls(
+            event_id=data["event_id"],
+            key_id=data["key_id"],
+            old_key_id=data.get("old_key_id"),
+            new_key_id=data["new_key_id"],
+            trigger=RotationTrigger[data["trigger"]],
+            rotated_at=datetime.fromisoformat(data["rotated_at"]),
+            grace_period_ends=datetime.fromisoformat(data["grace_period_ends"]),
+            old_key_retires_at=datetime.fromisoformat(data["old_key_retires_at"]),
+            status=data["status"],
+        )
+
+
+class RotationJournal:
+    """
+    Append-only JSON-lines journal of rotation event records.
+    
+    Every change to an event appends its full record; on replay the last
+    record per event ID wins. A torn final line (crash mid-write) is skipped.
+    """
+    
+    def __init__(self, path: Path, fsync: bool = True):
+        self.path = Path(path)
+        self.fsync = fsync
+        self.entries = 0
+        self._file = None
+    
+    def replay(self) -> Iterator[Dict[str, Any]]:
+        """Yield journal records in append order."""
+        self.entries = 0
+        if not self.path.exists():
+            return
+        with open(self.path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping torn rotation journal record in {self.path}")
+                    continue
+                self.entries += 1
+                yield record
+    
+    def append(self, record: Dict[str, Any]) -> None:
+        """Durably append one record."""
+        if self._file is None:
+            self._file = open(self.path, "a")
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.entries += 1
+    
+    def truncate(self) -> None:
+        """Drop all records (after they were compacted into a snapshot)."""
+        self.close()
+        with open(self.path, "w"):
+            pass
+        self.entries = 0
+    
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
 
 
 class KeyRotationManager:
@@ -113,6 +185,10 @@ class KeyRotationManager:
     - Grace periods for seamless transitions
     - Emergency rotation capabilities
     - Audit logging of all rotation events
+    - Online re-encryption of registered stores after KEK rotation
+    
+    Rotation events are appended to a journal (rotation_journal.jsonl) and
+    compacted into rotation_history.json every ``compact_every`` records.
     """
     
     def __init__(
@@ -121,6 +197,8 @@ class KeyRotationManager:
         hsm_client: Optional[HSMClient] = None,
         storage_path: Optional[str] = None,
         check_interval_minutes: int = 60,
+        compact_every: int = 1000,
+        reencryption_options: Optional[Dict[str, Any]] = None,
     ):
         """
         Initialize key rotation manager.
@@ -130,9 +208,17 @@ class KeyRotationManager:
             hsm_client: HSM client for HSM-backed keys
             storage_path: Path for rotation event storage
             check_interval_minutes: How often to check for rotations needed
+            compact_every: Journal records between history compactions
+            reencryption_options: ReencryptionJob keyword arguments
+                (batch_size, max_records_per_second, load_probe, ...)
         """
         self.key_hierarchy = key_hierarchy or get_key_hierarchy()
-        self.hsm_client = hsm_client or get_hsm_client()
+        if hsm_client is None:
+            try:
+                hsm_client = get_hsm_client()
+            except RuntimeError:
+                hsm_client = None  # Software keys only
+        self.hsm_client = hsm_client
         self.storage_path = Path(storage_path) if storage_path else Path(".key_rotations")
         self.storage_path.mkdir(parents=True, exist_ok=True)
         
@@ -142,6 +228,12 @@ class KeyRotationManager:
         self._active_rotations: Dict[str, RotationEvent] = {}
         self._callbacks: List[Callable[[RotationEvent], None]] = []
         
+        self.compact_every = compact_every
+        self._journal = RotationJournal(self.storage_path / "rotation_journal.jsonl")
+        self._stores: Dict[str, ReencryptionStore] = {}
+        self._reencryption_jobs: Dict[str, List[ReencryptionJob]] = {}
+        self.reencryption_options = reencryption_options or {}
+        
         self._lock = threading.Lock()
         self._stop_event = threading.Event()
         self._scheduler_thread: Optional[threading.Thread] = None
@@ -169,39 +261,42 @@ class KeyRotationManager:
         )
     
     def _load_history(self) -> None:
-        """Load rotation history from storage."""
+        """Load rotation history: the compacted snapshot, then the journal."""
+        events: Dict[str, RotationEvent] = {}
         history_file = self.storage_path / "rotation_history.json"
-        if history_file.exists():
-            try:
+        try:
+            if history_file.exists():
                 with open(history_file, "r") as f:
-                    data = json.load(f)
-                    for event_data in data:
-                        event = RotationEvent(
-                            event_id=event_data["event_id"],
-                            key_id=event_data["key_id"],
-                            old_key_id=event_data.get("old_key_id"),
-                            new_key_id=event_data["new_key_id"],
-                            trigger=RotationTrigger[event_data["trigger"]],
-                            rotated_at=datetime.fromisoformat(event_data["rotated_at"]),
-                            grace_period_ends=datetime.fromisoformat(event_data["grace_period_ends"]),
-                            old_key_retires_at=datetime.fromisoformat(event_data["old_key_retires_at"]),
-                            status=event_data["status"],
-                        )
-                        self._rotation_history.append(event)
-                        if event.status == "active":
-                            self._active_rotations[event.key_id] = event
-            except Exception as e:
-                logger.error(f"Failed to load rotation history: {e}")
+                    for event_data in json.load(f):
+                        events[event_data["event_id"]] = RotationEvent.from_dict(event_data)
+            for event_data in self._journal.replay():
+                events[event_data["event_id"]] = RotationEvent.from_dict(event_data)
+        except Exception as e:
+            logger.error(f"Failed to load rotation history: {e}")
+        
+        self._rotation_history = list(events.values())
+        for event in self._rotation_history:
+            if event.status == "active":
+                self._active_rotations[event.key_id] = event
     
-    def _save_history(self) -> None:
-        """Save rotation history to storage."""
-        history_file = self.storage_path / "rotation_history.json"
+    def _record_event(self, event: RotationEvent) -> None:
+        """Append an event record to the journal (caller holds the lock)."""
         try:
-            data = [event.to_dict() for event in self._rotation_history]
-            with open(history_file, "w") as f:
-                json.dump(data, f, indent=2)
+            self._journal.append(event.to_dict())
+            if self._journal.entries >= self.compact_every:
+                self._compact_history()
         except Exception as e:
-            logger.error(f"Failed to save rotation history: {e}")
+            logger.error(f"Failed to journal rotation event {event.event_id}: {e}")
+    
+    def _compact_history(self) -> None:
+        """Fold the journal into the history snapshot and truncate it."""
+        history_file = self.storage_path / "rotation_history.json"
+        temp_file = history_file.with_suffix(".tmp")
+        with open(temp_file, "w") as f:
+            json.dump([event.to_dict() for event in self._rotation_history], f, indent=2)
+        os.replace(temp_file, history_file)
+        self._journal.truncate()
+        logger.debug(f"Compacted rotation history ({len(self._rotation_history)} events)")
     
     def set_policy(self, policy: RotationPolicy) -> None:
         """Set rotation policy for a key type."""
@@ -292,12 +387,16 @@ class KeyRotationManager:
             
             self._rotation_history.append(event)
             self._active_rotations["kek"] = event
-            self._save_history()
+            self._record_event(event)
             
             self._notify_callbacks(event)
             
             logger.info(f"Rotated KEK: {old_kek_id} -> {new_kek_id} ({trigger.name})")
-            return event
+        
+        # Data wrapped under the old KEK moves over in the background
+        if self._stores:
+            self.start_reencryption(event)
+        return event
     
     def rotate_dek(
         self,
@@ -347,7 +446,7 @@ class KeyRotationManager:
             
             self._rotation_history.append(event)
             self._active_rotations[key_id] = event
-            self._save_history()
+            self._record_event(event)
             
             self._notify_callbacks(event)
             
@@ -397,6 +496,12 @@ class KeyRotationManager:
             if not event:
                 return False
             
+            # The old key must stay available until its data has moved
+            pending = self._pending_reencryption(event)
+            if pending:
+                logger.warning(f"Not completing rotation for {key_id}: re-encryption pending ({pending})")
+                return False
+            
             # Retire old key
             if event.old_key_id:
                 old_key = self.key_hierarchy.get_key(event.old_key_id)
@@ -405,11 +510,96 @@ class KeyRotationManager:
             
             event.status = "completed"
             del self._active_rotations[key_id]
-            self._save_history()
+            self._record_event(event)
             
             logger.info(f"Completed rotation for {key_id}")
             return True
     
+    def _pending_reencryption(self, event: RotationEvent) -> List[str]:
+        """
+        Re-encryption jobs of a rotation that have not completed (caller holds the lock).
+        
+        Jobs of this process are checked in memory; the checkpoints on disk
+        cover jobs started before a restart and not resumed yet, and a
+        registered store without a completed checkpoint still holds data
+        under the old KEK.
+        """
+        done = {job.job_id: job.done for job in self._reencryption_jobs.get(event.event_id, [])}
+        for path in (self.storage_path / "reencryption").glob(f"{event.event_id}-*.json"):
+            job_id = path.stem
+            if job_id in done:
+                continue
+            try:
+                with open(path, "r") as f:
+                    done[job_id] = json.load(f).get("status") == "completed"
+            except Exception as e:
+                logger.error(f"Failed to read re-encryption checkpoint {path}: {e}")
+                done[job_id] = False
+        if event.key_id == "kek":
+            for name in self._stores:
+                done.setdefault(f"{event.event_id}-{name}", False)
+        return sorted(job_id for job_id, finished in done.items() if not finished)
+    
+    def register_store(self, store: ReencryptionStore) -> None:
+        """Register an encrypted store to re-encrypt after KEK rotations."""
+        with self._lock:
+            self._stores[store.name] = store
+    
+    def start_reencryption(
+        self,
+        event: RotationEvent,
+        stores: Optional[List[ReencryptionStore]] = None,
+    ) -> List[ReencryptionJob]:
+        """
+        Start (or resume) background re-encryption jobs for a rotation.
+        
+        Args:
+            event: Rotation whose old key is being replaced
+            stores: Stores to process (all registered stores if None)
+        
+        Returns:
+            The started jobs
+        """
+        with self._lock:
+            stores = list(stores if stores is not None else self._stores.values())
+            known = {job.job_id: job for job in self._reencryption_jobs.get(event.event_id, [])}
+            jobs = []
+            for store in stores:
+                job = known.get(f"{event.event_id}-{store.name}")
+                if job is None:
+                    # Picks up an existing checkpoint for this (event, store)
+                    job = ReencryptionJob(
+                        store,
+                        event,
+                        checkpoint_dir=str(self.storage_path / "reencryption"),
+                        **self.reencryption_options,
+                    )
+                    known[job.job_id] = job
+                jobs.append(job)
+            self._reencryption_jobs[event.event_id] = list(known.values())
+        
+        for job in jobs:
+            if not job.done:
+                job.start()
+        logger.info(f"Re-encryption started for {event.event_id}: {[job.job_id for job in jobs]}")
+        return jobs
+    
+    def resume_reencryption(self) -> List[ReencryptionJob]:
+        """Resume re-encryption for active rotations (e.g. after a restart)."""
+        jobs = []
+        for event in list(self._active_rotations.values()):
+            if event.key_id == "kek" and self._stores:
+                jobs.extend(self.start_reencryption(event))
+        return jobs
+    
+    def get_reencryption_status(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Progress of re-encryption jobs by rotation event."""
+        with self._lock:
+            return {
+                event_id: [job.get_progress() for job in jobs]
+                for event_id, jobs in self._reencryption_jobs.items()
+            }
+    
     def get_active_rotations(self) -> List[RotationEvent]:
         """Get all active (in grace period) rotations."""
         return list(self._active_rotations.values())
@@ -484,11 +674,14 @@ class KeyRotationManager:
         logger.info("Key rotation scheduler started")
     
     def stop_scheduler(self) -> None:
-        """Stop the automatic rotation scheduler."""
+        """Stop the automatic rotation scheduler and pause re-encryption jobs."""
         self._stop_event.set()
         if self._scheduler_thread:
             self._scheduler_thread.join(timeout=5)
             logger.info("Key rotation scheduler stopped")
+        for jobs in list(self._reencryption_jobs.values()):
+            for job in jobs:
+                job.stop()
     
     def _scheduler_loop(self) -> None:
         """Main scheduler loop."""
@@ -509,6 +702,10 @@ class KeyRotationManager:
             "total_rotations": len(self._rotation_history),
             "policies": {k.value: v.to_dict() for k, v in self._policies.items()},
             "next_check_seconds": self.check_interval.total_seconds(),
+            "registered_stores": sorted(self._stores),
+            "reencryption_jobs_running": sum(
+                job.is_running() for jobs in self._reencryption_jobs.values() for job in jobs
+            ),
         }
 
 
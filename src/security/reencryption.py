@@ -0,0 +1,327 @@
+"""
+Online Re-encryption
+
+Moves data encrypted under a retiring key onto the current key in the
+background, so a rotation (including an emergency one) does not need
+downtime:
+
+- ReencryptionStore: adapter over an encrypted store, read in cursor-ordered
+  batches and rewritten batch by batch
+- ReencryptionJob: resumable, rate-limited worker for one (rotation, store)
+  pair that checkpoints its cursor after every batch and backs off while live
+  traffic is above a load threshold
+- FieldRecordStore: re-wraps the DEKs of field-encrypted records
+
+Jobs are started by KeyRotationManager for its registered stores; the old key
+must not be retired until they have completed.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, MutableSequence, Optional, Tuple
+
+from prometheus_client import Counter, Gauge
+
+from astraguard.observability import _safe_create_metric
+
+logger = logging.getLogger(__name__)
+
+REENCRYPTION_RECORDS_TOTAL = _safe_create_metric(
+    Counter,
+    'astra_reencryption_records_total',
+    'Records visited by re-encryption jobs',
+    labelnames=['store', 'outcome']  # rewritten, unchanged
+)
+
+REENCRYPTION_PROGRESS = _safe_create_metric(
+    Gauge,
+    'astra_reencryption_progress_ratio',
+    'Fraction of the store processed by the current re-encryption job',
+    labelnames=['store']
+)
+
+REENCRYPTION_THROTTLED_SECONDS = _safe_create_metric(
+    Counter,
+    'astra_reencryption_throttled_seconds_total',
+    'Seconds re-encryption jobs spent backing off for rate limits or live load',
+    labelnames=['store', 'reason']  # rate, load
+)
+
+
+class ReencryptionStore(ABC):
+    """
+    An encrypted store that can be re-encrypted in batches.
+
+    Cursors are opaque to the job but must be JSON-serializable so they can
+    be checkpointed. reencrypt_batch() must be idempotent: after a crash the
+    last batch is replayed from the previous checkpoint.
+    """
+
+    name: str = "store"
+
+    @abstractmethod
+    def fetch_batch(self, cursor: Any, limit: int) -> Tuple[List[Any], Any]:
+        """Return up to ``limit`` items after ``cursor`` and the next cursor (None when done)."""
+
+    @abstractmethod
+    def reencrypt_batch(self, items: List[Any], event: Any) -> int:
+        """Re-encrypt and persist a batch; return the number of items rewritten."""
+
+    def estimate_total(self) -> Optional[int]:
+        """Total number of items, if cheaply known (used for progress)."""
+        return None
+
+
+class FieldRecordStore(ReencryptionStore):
+    """
+    Field-encrypted records held in a mutable sequence.
+
+    Only the wrapped DEKs are rewritten (unwrapped with the previous engine
+    key, wrapped with the current one); ciphertexts are untouched, so the
+    cost is one unwrap/wrap per distinct DEK plus a copy per record.
+    ``on_batch(start, records)`` can persist each rewritten batch.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        records: MutableSequence[Dict[str, Any]],
+        field_engine: Any,
+        previous_engine: Any,
+        on_batch: Optional[Callable[[int, List[Dict[str, Any]]], None]] = None,
+    ):
+        self.name = name
+        self.records = records
+        self.field_engine = field_engine
+        self.previous_engine = previous_engine
+        self.on_batch = on_batch
+        self._start = 0
+
+    def fetch_batch(self, cursor: Any, limit: int) -> Tuple[List[Any], Any]:
+        start = cursor or 0
+        end = min(start + limit, len(self.records))
+        self._start = start
+        return list(self.records[start:end]), (end if end < len(self.records) else None)
+
+    def reencrypt_batch(self, items: List[Any], event: Any) -> int:
+        rewrapped, count = self.field_engine.rewrap_records(items, self.previous_engine)
+        self.records[self._start:self._start + len(rewrapped)] = rewrapped
+        if self.on_batch:
+            self.on_batch(self._start, rewrapped)
+        return count
+
+    def estimate_total(self) -> Optional[int]:
+        return len(self.records)
+
+
+@dataclass
+class ReencryptionCheckpoint:
+    """Persisted progress of a re-encryption job."""
+    job_id: str
+    store: str
+    event_id: str
+    cursor: Any = None
+    processed: int = 0
+    rewritten: int = 0
+    status: str = "pending"  # pending, running, paused, completed, failed
+    error: Optional[str] = None
+    updated_at: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ReencryptionCheckpoint":
+        return cls(**data)
+
+
+class ReencryptionJob:
+    """
+    Resumable background re-encryption of one store for one rotation.
+
+    Each batch is fetched, re-encrypted and followed by an atomic checkpoint
+    write, so a restarted job continues after the last completed batch.
+    Throughput is capped at ``max_records_per_second``; while ``load_probe()``
+    reports load above ``max_load`` (0..1, e.g. in-flight/limit from the
+    admission controller) the job pauses between batches.
+    """
+
+    def __init__(
+        self,
+        store: ReencryptionStore,
+        event: Any,
+        checkpoint_dir: str,
+        batch_size: int = 500,
+        max_records_per_second: Optional[float] = None,
+        load_probe: Optional[Callable[[], float]] = None,
+        max_load: float = 0.8,
+        load_backoff_seconds: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Optional[Callable[[float], None]] = None,
+    ):
+        self.store = store
+        self.event = event
+        self.batch_size = batch_size
+        self.max_records_per_second = max_records_per_second
+        self.load_probe = load_probe
+        self.max_load = max_load
+        self.load_backoff_seconds = load_backoff_seconds
+        self._clock = clock
+        self._stop_event = threading.Event()
+        self._sleep = sleep or self._stop_event.wait
+        self._thread: Optional[threading.Thread] = None
+
+        self.job_id = f"{event.event_id}-{store.name}"
+        self.checkpoint_path = Path(checkpoint_dir) / f"{self.job_id}.json"
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        self.checkpoint = self._load_checkpoint()
+
+    def _load_checkpoint(self) -> ReencryptionCheckpoint:
+        if self.checkpoint_path.exists():
+            try:
+                with open(self.checkpoint_path, "r") as f:
+                    checkpoint = ReencryptionCheckpoint.from_dict(json.load(f))
+                logger.info(f"Resuming re-encryption {self.job_id} after {checkpoint.processed} records")
+                return checkpoint
+            except Exception as e:
+                logger.error(f"Failed to load re-encryption checkpoint {self.checkpoint_path}: {e}")
+        return ReencryptionCheckpoint(self.job_id, self.store.name, self.event.event_id)
+
+    def _save_checkpoint(self) -> None:
+        self.checkpoint.updated_at = datetime.now().isoformat()
+        temp_path = self.checkpoint_path.with_suffix(".tmp")
+        with open(temp_path, "w") as f:
+            json.dump(self.checkpoint.to_dict(), f)
+        os.replace(temp_path, self.checkpoint_path)
+
+    @property
+    def done(self) -> bool:
+        return self.checkpoint.status == "completed"
+
+    def _throttle(self, started: float, processed: int) -> None:
+        """Pause for the rate limit and for live load before the next batch."""
+        if self.max_records_per_second:
+            ahead = processed / self.max_records_per_second - (self._clock() - started)
+            if ahead > 0:
+                REENCRYPTION_THROTTLED_SECONDS.labels(store=self.store.name, reason="rate").inc(ahead)
+                self._sleep(ahead)
+
+        while self.load_probe and not self._stop_event.is_set():
+            try:
+                load = self.load_probe()
+            except Exception as e:
+                logger.debug(f"Re-encryption load probe failed: {e}")
+                return
+            if load <= self.max_load:
+                return
+            REENCRYPTION_THROTTLED_SECONDS.labels(store=self.store.name, reason="load").inc(
+                self.load_backoff_seconds
+            )
+            self._sleep(self.load_backoff_seconds)
+
+    def run(self) -> ReencryptionCheckpoint:
+        """Run (or resume) the job in the calling thread until done or stopped."""
+        checkpoint = self.checkpoint
+        if checkpoint.status == "completed":
+            return checkpoint
+
+        checkpoint.status = "running"
+        checkpoint.error = None
+        total = self.store.estimate_total()
+        started = self._clock()
+        processed_here = 0
+
+        try:
+            while not self._stop_event.is_set():
+                items, next_cursor = self.store.fetch_batch(checkpoint.cursor, self.batch_size)
+                rewritten = self.store.reencrypt_batch(items, self.event) if items else 0
+
+                checkpoint.cursor = next_cursor
+                checkpoint.processed += len(items)
+                checkpoint.rewritten += rewritten
+                processed_here += len(items)
+                if next_cursor is None:
+                    checkpoint.status = "completed"
+                self._save_checkpoint()
+
+                REENCRYPTION_RECORDS_TOTAL.labels(store=self.store.name, outcome="rewritten").inc(rewritten)
+                REENCRYPTION_RECORDS_TOTAL.labels(store=self.store.name, outcome="unchanged").inc(
+                    len(items) - rewritten
+                )
+                if total:
+                    REENCRYPTION_PROGRESS.labels(store=self.store.name).set(
+                        min(1.0, checkpoint.processed / total)
+                    )
+
+                if checkpoint.status == "completed":
+                    logger.info(
+                        f"Re-encryption {self.job_id} completed: "
+                        f"{checkpoint.processed} records, {checkpoint.rewritten} rewritten"
+                    )
+                    break
+                self._throttle(started, processed_here)
+            else:
+                checkpoint.status = "paused"
+                self._save_checkpoint()
+        except Exception as e:
+            checkpoint.status = "failed"
+            checkpoint.error = str(e)
+            self._save_checkpoint()
+            logger.error(f"Re-encryption {self.job_id} failed at cursor {checkpoint.cursor}: {e}")
+
+        return checkpoint
+
+    def start(self) -> None:
+        """Run the job on a daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run, name=f"reencrypt-{self.job_id}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Stop after the current batch (the checkpoint allows resuming later)."""
+        self._stop_event.set()
+        self.wait(timeout)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the background thread; True if it is no longer running."""
+        if self._thread:
+            self._thread.join(timeout)
+            return not self._thread.is_alive()
+        return True
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def get_progress(self) -> Dict[str, Any]:
+        """Progress snapshot for status endpoints."""
+        total = self.store.estimate_total()
+        progress = self.checkpoint.to_dict()
+        progress["total"] = total
+        progress["ratio"] = round(self.checkpoint.processed / total, 4) if total else None
+        return progress
+
+
+def admission_load_probe(controller: Any = None) -> Callable[[], float]:
+    """
+    Load probe reading in-flight/limit from an admission controller.
+
+    Defaults to the global controller, looked up on every call so the one
+    the API installs with set_admission_controller() is seen even if it is
+    installed after the probe was created.
+    """
+    from core.connection_limiter import get_admission_controller
+
+    def probe() -> float:
+        stats = (controller or get_admission_controller()).get_stats()
+        return stats["inflight"] / max(stats["limit"], 1)
+
+    return probe
@@ -2,88 +2,282 @@
 WAF (Web Application Firewall) Rules for AstraGuard
 
 Implements security rules for SQL injection, XSS, and rate limiting.
+
+Rules are compiled once. A scan first checks the input (lowercased, ASCII
+only) for each rule's literal anchors and only runs the regexes of rules
+whose anchors are present, so benign input skips the regex engine for most
+rules. Separate per-rule searches keep the regex module's literal-prefix
+scan, which a combined alternation would lose. Request bodies are
+prefiltered once over all their string leaves, capped at
+``max_scan_length`` characters; a candidate rule's regex then runs on each
+leaf separately, so a match never spans two leaves.
 """
 
 import re
+import time
 import logging
-from typing import Optional
-from datetime import datetime, timedelta
-from collections import defaultdict
+from typing import Optional, Any, Dict, Iterator, List, Tuple, Callable
+from dataclasses import dataclass
+from collections import Counter as HitCounter
+
+from prometheus_client import Counter
+
+from astraguard.observability import _safe_create_metric
 
 logger = logging.getLogger(__name__)
 
+WAF_RULE_HITS_TOTAL = _safe_create_metric(
+    Counter,
+    'astra_waf_rule_hits_total',
+    'WAF rule matches',
+    labelnames=['rule', 'category']
+)
+
+WAF_SCAN_TRUNCATED_TOTAL = _safe_create_metric(
+    Counter,
+    'astra_waf_scan_truncated_total',
+    'Inputs only partially scanned because they exceeded max_scan_length'
+)
+
+
+@dataclass(frozen=True)
+class WAFRule:
+    """A detection rule: a regex plus literals one of which any match must contain."""
+    name: str
+    category: str  # sql, xss
+    pattern: str
+    anchors: Tuple[str, ...] = ()  # Lowercase; empty = always confirm with the regex
+
+
+DEFAULT_RULES = (
+    WAFRule("sql_union_select", "sql", r"(\bunion\b.*\bselect\b)", ("union",)),
+    WAFRule("sql_or_condition", "sql", r"(\bor\b.*=.*)"),
+    WAFRule("sql_drop_table", "sql", r"(;.*drop\b.*table)", ("drop",)),
+    WAFRule("sql_exec_call", "sql", r"(exec\s*\()", ("exec",)),
+    WAFRule("sql_script_tag", "sql", r"(script.*>)", ("script",)),
+    WAFRule("xss_script_block", "xss", r"<script[^>]*>.*?</script>", ("<script",)),
+    WAFRule("xss_javascript_uri", "xss", r"javascript:", ("javascript:",)),
+    WAFRule("xss_onerror_handler", "xss", r"onerror\s*=", ("onerror",)),
+    WAFRule("xss_onload_handler", "xss", r"onload\s*=", ("onload",)),
+)
+
+
+@dataclass
+class WAFMatch:
+    """A rule match in a scanned request."""
+    rule: str
+    category: str
+    path: str  # Location of the matching string leaf, e.g. "$.items[3].name"
+
 
 class WAFRules:
     """
     Web Application Firewall rules.
-    
+
     Features:
     - SQL injection detection
     - XSS prevention
-    - Rate limiting
+    - Rate limiting (sliding-window counter, O(1) per request)
     - Request validation
+    - Per-rule hit counters
     """
-    
-    def __init__(self, rate_limit_per_minute: int = 60):
+
+    def __init__(
+        self,
+        rate_limit_per_minute: int = 60,
+        max_scan_length: int = 1_000_000,
+        rules: Optional[Tuple[WAFRule, ...]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
         """Initialize WAF rules."""
         self.rate_limit = rate_limit_per_minute
-        self._request_counts = defaultdict(list)
-        
-        # SQL injection patterns
-        self.sql_patterns = [
-            r"(\bunion\b.*\bselect\b)",
-            r"(\bor\b.*=.*)",
-            r"(;.*drop\b.*table)",
-            r"(exec\s*\()",
-            r"(script.*>)",
-        ]
-        
-        # XSS patterns
-        self.xss_patterns = [
-            r"<script[^>]*>.*?</script>",
-            r"javascript:",
-            r"onerror\s*=",
-            r"onload\s*=",
-        ]
-        
+        self.max_scan_length = max_scan_length
+        self.rules = tuple(rules or DEFAULT_RULES)
+        self._clock = clock
+
+        # client -> [window index, count in window, count in previous window]
+        self._windows: Dict[str, List[int]] = {}
+        self._window_seconds = 60.0
+        self._pruned_window = 0
+
+        self.rule_hits: HitCounter = HitCounter()
+        self._compiled = {rule: re.compile(rule.pattern, re.IGNORECASE) for rule in self.rules}
+        # Anchored rules first: they are cheap to rule out and likely hits once their anchor is seen
+        ordered = sorted(self.rules, key=lambda rule: not rule.anchors)
+        self._by_category: Dict[Optional[str], Tuple[WAFRule, ...]] = {None: tuple(ordered)}
+        for rule in ordered:
+            self._by_category[rule.category] = self._by_category.get(rule.category, ()) + (rule,)
+
+        # Pattern lists kept for callers that inspect them
+        self.sql_patterns = [rule.pattern for rule in self._by_category.get("sql", ())]
+        self.xss_patterns = [rule.pattern for rule in self._by_category.get("xss", ())]
+
         logger.info("WAF rules initialized")
-    
+
+    def _search(self, text: str, category: Optional[str]) -> Optional[WAFRule]:
+        """Prefilter on rule anchors, then confirm candidates with their regexes."""
+        if len(text) > self.max_scan_length:
+            WAF_SCAN_TRUNCATED_TOTAL.inc()
+            text = text[:self.max_scan_length]
+
+        for rule in self._candidates(text, category):
+            if self._compiled[rule].search(text):
+                self._record_hit(rule)
+                return rule
+        return None
+
+    def _candidates(self, text: str, category: Optional[str]) -> Iterator[WAFRule]:
+        """Rules of a category whose anchors occur in text (all rules for non-ASCII text)."""
+        # Unicode case folding differs from re.IGNORECASE ("ſ" matches "s"),
+        # so the literal prefilter is only sound for ASCII text
+        lowered = text.lower() if text.isascii() else None
+        for rule in self._by_category.get(category, ()):
+            if lowered is not None and rule.anchors and not any(a in lowered for a in rule.anchors):
+                continue
+            yield rule
+
+    def _record_hit(self, rule: WAFRule) -> None:
+        """Count a rule match."""
+        self.rule_hits[rule.name] += 1
+        WAF_RULE_HITS_TOTAL.labels(rule=rule.name, category=rule.category).inc()
+
     def check_sql_injection(self, input_str: str) -> bool:
         """Check for SQL injection patterns."""
-        for pattern in self.sql_patterns:
-            if re.search(pattern, input_str, re.IGNORECASE):
-                logger.warning(f"SQL injection detected: {pattern}")
-                return True
+        rule = self._search(input_str, "sql")
+        if rule:
+            logger.warning(f"SQL injection detected: {rule.name}")
+            return True
         return False
-    
+
     def check_xss(self, input_str: str) -> bool:
         """Check for XSS patterns."""
-        for pattern in self.xss_patterns:
-            if re.search(pattern, input_str, re.IGNORECASE):
-                logger.warning(f"XSS detected: {pattern}")
-                return True
+        rule = self._search(input_str, "xss")
+        if rule:
+            logger.warning(f"XSS detected: {rule.name}")
+            return True
         return False
-    
+
+    def inspect(self, payload: Any, category: Optional[str] = None) -> Optional[WAFMatch]:
+        """
+        Scan a request body (parsed JSON, str or bytes) in one pass.
+
+        Dict keys and string values (up to max_scan_length characters) are
+        prefiltered together; candidate rules are then matched leaf by leaf.
+
+        Args:
+            payload: Body to scan
+            category: Only apply rules of this category (all if None)
+
+        Returns:
+            The first match, or None if the body is clean
+        """
+        leaves: List[str] = []
+        budget = self._collect(payload, leaves, self.max_scan_length)
+        if budget < 0:
+            WAF_SCAN_TRUNCATED_TOTAL.inc()
+
+        for rule in self._candidates("\n".join(leaves), category):
+            search = self._compiled[rule].search
+            for index, leaf in enumerate(leaves):
+                if search(leaf):
+                    self._record_hit(rule)
+                    path = self._leaf_path(payload, index)
+                    logger.warning(f"WAF rule {rule.name} matched at {path}")
+                    return WAFMatch(rule=rule.name, category=rule.category, path=path)
+        return None
+
+    def _collect(self, value: Any, leaves: List[str], budget: int) -> int:
+        """Append string leaves depth-first; return the remaining budget (<0 if truncated)."""
+        if budget <= 0:
+            return -1
+        if isinstance(value, bytes):
+            value = value.decode("utf-8", errors="replace")
+        if isinstance(value, str):
+            leaves.append(value[:budget])
+            return budget - len(value) - 1
+        if isinstance(value, dict):
+            for key, item in value.items():
+                budget = self._collect(str(key), leaves, budget)
+                budget = self._collect(item, leaves, budget)
+            return budget
+        if isinstance(value, (list, tuple)):
+            for item in value:
+                budget = self._collect(item, leaves, budget)
+        return budget
+
+    def _leaf_path(self, payload: Any, index: int) -> str:
+        """Path of the index-th leaf in _collect() order."""
+        remaining = index
+        keys: List[Any] = []
+
+        def walk(value: Any) -> bool:
+            nonlocal remaining
+            if isinstance(value, (str, bytes)):
+                remaining -= 1
+                return remaining < 0
+            if isinstance(value, dict):
+                for key, item in value.items():
+                    keys.append(key)
+                    remaining -= 1
+                    if remaining < 0 or walk(item):
+                        return True
+                    keys.pop()
+            elif isinstance(value, (list, tuple)):
+                for i, item in enumerate(value):
+                    keys.append(i)
+                    if walk(item):
+                        return True
+                    keys.pop()
+            return False
+
+        walk(payload)
+        return "$" + "".join(f"[{key}]" if isinstance(key, int) else f".{key}" for key in keys)
+
     def check_rate_limit(self, client_id: str) -> bool:
-        """Check if client exceeds rate limit."""
-        now = datetime.now()
-        cutoff = now - timedelta(minutes=1)
-        
-        # Clean old requests
-        self._request_counts[client_id] = [
-            ts for ts in self._request_counts[client_id]
-            if ts > cutoff
-        ]
-        
-        # Check limit
-        if len(self._request_counts[client_id]) >= self.rate_limit:
+        """
+        Check if client exceeds rate limit.
+
+        Sliding-window counter: the previous minute's count, weighted by how
+        much of it still overlaps the trailing minute, plus the current
+        minute's count.
+        """
+        now = self._clock()
+        window = int(now // self._window_seconds)
+        state = self._windows.get(client_id)
+        if state is None:
+            state = self._windows[client_id] = [window, 0, 0]
+        elif state[0] != window:
+            state[2] = state[1] if state[0] == window - 1 else 0
+            state[1] = 0
+            state[0] = window
+
+        if window > self._pruned_window:
+            self._prune(window)
+
+        overlap = 1.0 - (now % self._window_seconds) / self._window_seconds
+        if state[2] * overlap + state[1] >= self.rate_limit:
             logger.warning(f"Rate limit exceeded: {client_id}")
             return True
-        
+
         # Record request
-        self._request_counts[client_id].append(now)
+        state[1] += 1
         return False
 
+    def _prune(self, window: int) -> None:
+        """Forget clients idle for two windows (once per window)."""
+        self._pruned_window = window
+        stale = [client for client, state in self._windows.items() if state[0] < window - 1]
+        for client in stale:
+            del self._windows[client]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Rule hit counts and rate limiter size."""
+        return {
+            "rule_hits": dict(self.rule_hits),
+            "rate_limited_clients_tracked": len(self._windows),
+            "max_scan_length": self.max_scan_length,
+        }
+
 
 # Global instance
 _waf_rules: Optional[WAFRules] = None
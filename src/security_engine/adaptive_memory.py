@@ -28,7 +28,10 @@ class FeedbackPinner:
     }
 
     def __init__(
-        self, memory: Optional[Any] = None, processed_path: Optional[Path] = None
+        self,
+        memory: Optional[Any] = None,
+        processed_path: Optional[Path] = None,
+        learner: Optional[Any] = None,
     ):
         """
         Initialize feedback pinner.
@@ -36,9 +39,13 @@ class FeedbackPinner:
         Args:
             memory: AdaptiveMemoryStore instance (optional for testing)
             processed_path: Path to feedback_processed.json (defaults to cwd)
+            learner: FeedbackLearner fed with each pinned event; when set,
+                policies are updated incrementally instead of by reprocessing
+                all pinned feedback
         """
         self.memory = memory
         self.processed_path = processed_path or Path("feedback_processed.json")
+        self.learner = learner
 
     def pin_all_feedback(self) -> Dict[str, int]:
         """Process ALL pending feedback → pinned memory."""
@@ -90,6 +97,9 @@ class FeedbackPinner:
                     # Update resonance scoring for pattern matches
                     self._update_resonance(event, weight)
 
+                if self.learner is not None:
+                    self.learner.observe(event)
+
                 stats["pinned"] += 1
                 stats[event.label.value] += 1
             except Exception as e:
@@ -98,6 +108,10 @@ class FeedbackPinner:
                     context={"event_id": event.fault_id, "label": event.label.value, "operation": "pin_event"}
                 )
 
+        # Observed counts must be durable before their source file goes away
+        if self.learner is not None:
+            self.learner.checkpoint()
+
         # Atomic cleanup
         try:
             self.processed_path.unlink(missing_ok=True)
@@ -107,8 +121,12 @@ class FeedbackPinner:
 
         # Trigger policy updates from pinned feedback (#54)
         try:
-            from security_engine.policy_engine import process_policy_updates
-            process_policy_updates(self.memory)
+            if self.learner is not None:
+                self.learner.apply_updates()
+                self.learner.checkpoint()
+            else:
+                from security_engine.policy_engine import process_policy_updates
+                process_policy_updates(self.memory)
         except (ImportError, ModuleNotFoundError, AttributeError) as e:
             # Non-blocking: policy update errors don't block feedback pinning
             logger.debug(f"Policy update failed (non-blocking): {type(e).__name__}: {e}")
@@ -147,8 +165,35 @@ class FeedbackPinner:
             )
 
 
+def load_feedback_learner(memory: Any, checkpoint_path: Optional[Path] = None) -> Any:
+    """
+    Checkpointed FeedbackLearner for a memory store.
+
+    Without a checkpoint yet, the learner is seeded once from the feedback
+    already pinned in memory and checkpointed, so later runs only fold in
+    new feedback.
+    """
+    from security_engine.policy_engine import FeedbackLearner
+
+    checkpoint_path = checkpoint_path or Path("feedback_learner.json")
+    seeded = checkpoint_path.exists()
+    learner = FeedbackLearner(memory, checkpoint_path=checkpoint_path)
+    if not seeded and memory is not None and hasattr(memory, "query_feedback_events"):
+        try:
+            history = memory.query_feedback_events()
+        except Exception as e:
+            raise handle_memory_operation_error(
+                e, "Failed to query pinned feedback to seed the learner",
+                context={"operation": "query_feedback_events", "checkpoint_path": str(checkpoint_path)}
+            )
+        if isinstance(history, (list, tuple)):
+            learner.observe_many(history)
+        learner.checkpoint()
+    return learner
+
+
 # Global integration hook (called post-CLI #52)
-def process_feedback_after_review(memory: Any) -> Dict[str, int]:
+def process_feedback_after_review(memory: Any, checkpoint_path: Optional[Path] = None) -> Dict[str, int]:
     """Public API for #52 CLI integration."""
-    pinner = FeedbackPinner(memory)
+    pinner = FeedbackPinner(memory, learner=load_feedback_learner(memory, checkpoint_path))
     return pinner.pin_all_feedback()
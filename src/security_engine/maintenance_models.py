@@ -0,0 +1,231 @@
+"""
+Predictive Maintenance Models
+
+Versioned model bundles for the predictive maintenance engine:
+- fit_model_bundle() trains the per-failure-type models from buffer rows,
+  either from scratch or incrementally: the previous Random Forest is
+  warm-started with trees fitted on the new rows only, and the oldest
+  trees are retired once the forest reaches its size.
+- StackedForestScorer scores every failure type's forest for a batch of
+  windows in one call, evaluating the fitted trees directly instead of
+  going through one validated, parallel-dispatched predict() per model.
+
+A bundle is never modified after it is built; the engine publishes a new
+version by swapping its reference.
+"""
+
+import copy
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sklearn.ensemble import IsolationForest, RandomForestRegressor
+from sklearn.metrics import r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from security_engine.contracts import FailureType, PredictionModel
+from security_engine.telemetry_buffer import build_feature_matrix, feature_indices, target_index
+
+# Value above which each failure type's target metric indicates a failure
+FAILURE_THRESHOLDS: Dict[FailureType, float] = {
+    FailureType.CPU_SPIKE: 75.0,  # CPU usage > 75%
+    FailureType.MEMORY_LEAK: 80.0,  # Memory usage > 80%
+    FailureType.NETWORK_LATENCY: 100.0,  # Latency > 100ms
+    FailureType.DISK_IO_BURST: 200.0,  # Disk I/O > 200 ops/sec
+    FailureType.SERVICE_CRASH: 1.0,  # Error rate > 1%
+    FailureType.RESOURCE_EXHAUSTION: 1.0,  # Error rate > 1%
+}
+# Scale of the sigmoid mapping (predicted - threshold) to a probability
+PROBABILITY_SCALE = 10.0
+MIN_FEATURE_ROWS = 50
+
+
+class StackedForestScorer:
+    """
+    Random Forest predictions for all failure types in one pass.
+
+    Inputs are FEATURE_COLUMNS rows; each failure type's columns are
+    selected and scaled with its scaler in a single vectorized step, then
+    the trees are evaluated on float32 rows exactly as the forest would.
+    """
+
+    def __init__(self, models: Dict[FailureType, Dict[PredictionModel, Any]], scalers: Dict[FailureType, StandardScaler]):
+        self.failure_types: List[FailureType] = [
+            ft for ft in FailureType
+            if models.get(ft, {}).get(PredictionModel.RANDOM_FOREST) is not None
+            and hasattr(scalers.get(ft), "scale_")
+        ]
+        width = len(feature_indices(FailureType.CPU_SPIKE))
+        count = len(self.failure_types)
+        self._columns = np.array([feature_indices(ft) for ft in self.failure_types], dtype=int).reshape(count, width)
+        self._mean = np.zeros((count, width))
+        self._scale = np.ones((count, width))
+        for i, ft in enumerate(self.failure_types):
+            scaler = scalers[ft]
+            if scaler.with_mean:
+                self._mean[i] = scaler.mean_
+            if scaler.with_std:
+                self._scale[i] = scaler.scale_
+        self._trees = [
+            [tree.tree_ for tree in models[ft][PredictionModel.RANDOM_FOREST].estimators_]
+            for ft in self.failure_types
+        ]
+        self._thresholds = np.array([FAILURE_THRESHOLDS[ft] for ft in self.failure_types])
+
+    def predict(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Predicted target values.
+
+        Args:
+            rows: FEATURE_COLUMNS rows, shape (n, len(FEATURE_COLUMNS))
+
+        Returns:
+            Array of shape (n, len(failure_types))
+        """
+        rows = np.atleast_2d(rows)
+        scaled = ((rows[:, self._columns] - self._mean) / self._scale).astype(np.float32)
+        predicted = np.empty((len(rows), len(self.failure_types)))
+        for i, trees in enumerate(self._trees):
+            inputs = np.ascontiguousarray(scaled[:, i])
+            total = np.zeros(len(rows))
+            for tree in trees:
+                total += tree.predict(inputs)[:, 0]
+            predicted[:, i] = total / len(trees)
+        return predicted
+
+    def failure_probabilities(self, rows: np.ndarray) -> np.ndarray:
+        """Sigmoid of (predicted value - failure threshold), shape (n, len(failure_types))."""
+        return 1 / (1 + np.exp(-(self.predict(rows) - self._thresholds) / PROBABILITY_SCALE))
+
+
+@dataclass
+class ModelBundle:
+    """One immutable version of the trained models."""
+    version: int = 0
+    models: Dict[FailureType, Dict[PredictionModel, Any]] = field(default_factory=dict)
+    scalers: Dict[FailureType, StandardScaler] = field(default_factory=dict)
+    trained_through: int = 0  # Buffer sequence number of the first row not trained on
+    trained_at: Optional[datetime] = None
+    scorer: StackedForestScorer = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.scorer = StackedForestScorer(self.models, self.scalers)
+
+    def to_state(self) -> Dict[str, Any]:
+        """Picklable state (buffer positions are process-local and not kept)."""
+        return {
+            "version": self.version,
+            "models": self.models,
+            "scalers": self.scalers,
+            "trained_at": self.trained_at,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "ModelBundle":
+        return cls(
+            version=state.get("version", 0),
+            models=state.get("models", {}),
+            scalers=state.get("scalers", {}),
+            trained_at=state.get("trained_at"),
+        )
+
+
+def grow_forest(
+    forest: RandomForestRegressor,
+    X: np.ndarray,
+    y: np.ndarray,
+    new_trees: int,
+    max_trees: int,
+    random_state: int,
+) -> RandomForestRegressor:
+    """
+    Copy of a fitted forest with new_trees more trees fitted on (X, y).
+
+    The oldest trees are dropped beyond max_trees. The given forest is left
+    untouched (fitted trees are shared, not copied).
+    """
+    grown = copy.copy(forest)
+    grown.estimators_ = list(forest.estimators_)
+    grown.set_params(
+        warm_start=True,
+        n_estimators=len(grown.estimators_) + new_trees,
+        random_state=random_state,
+    )
+    grown.fit(X, y)
+    if len(grown.estimators_) > max_trees:
+        grown.estimators_ = grown.estimators_[-max_trees:]
+        grown.set_params(n_estimators=max_trees)
+    return grown
+
+
+def fit_model_bundle(
+    values: np.ndarray,
+    version: int,
+    previous: Optional[ModelBundle] = None,
+    trained_through: int = 0,
+    n_estimators: int = 100,
+    trees_per_update: int = 10,
+) -> Tuple[ModelBundle, Dict[str, Dict[str, float]]]:
+    """
+    Train a new bundle version.
+
+    Without a previous bundle, every failure type gets a new scaler,
+    Random Forest (n_estimators trees) and Isolation Forest. With one, its
+    scalers are kept (so existing trees stay valid) and trees_per_update
+    trees fitted on values are added to its forests; Isolation Forests are
+    only refitted by full training.
+
+    Args:
+        values: Time-ordered buffer rows; for an update, the new rows
+            preceded by WARMUP_ROWS rows of history
+        version: Version number of the new bundle
+        previous: Bundle to update incrementally (None = train from scratch)
+        trained_through: Buffer sequence number after the last row of values
+        n_estimators: Forest size (trees of a new forest, cap for updates)
+        trees_per_update: Trees added per incremental update
+
+    Returns:
+        (bundle, R² of each failure type's Random Forest on held-out rows)
+    """
+    features = build_feature_matrix(values)
+    models = dict(previous.models) if previous else {}
+    scalers = dict(previous.scalers) if previous else {}
+    metrics: Dict[str, Dict[str, float]] = {}
+    if len(features) < MIN_FEATURE_ROWS:
+        return ModelBundle(version, models, scalers, trained_through, datetime.now()), metrics
+
+    for failure_type in FailureType:
+        X = features[:, feature_indices(failure_type)]
+        y = features[:, target_index(failure_type)]
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+        previous_models = models.get(failure_type, {}) if previous else {}
+        forest = previous_models.get(PredictionModel.RANDOM_FOREST)
+        isolation = previous_models.get(PredictionModel.ISOLATION_FOREST)
+        scaler = scalers.get(failure_type) if forest is not None else None
+        if scaler is None:
+            forest = isolation = None
+            scaler = StandardScaler().fit(X_train)
+        X_train_scaled = scaler.transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
+
+        if forest is None:
+            forest = RandomForestRegressor(n_estimators=n_estimators, random_state=42)
+            forest.fit(X_train_scaled, y_train)
+        else:
+            forest = grow_forest(forest, X_train_scaled, y_train, trees_per_update, n_estimators, version)
+
+        if isolation is None:
+            isolation = IsolationForest(contamination=0.1, random_state=42)
+            isolation.fit(X_train_scaled)
+
+        models[failure_type] = {
+            PredictionModel.RANDOM_FOREST: forest,
+            PredictionModel.ISOLATION_FOREST: isolation,
+        }
+        scalers[failure_type] = scaler
+        metrics[failure_type.value] = {"random_forest": r2_score(y_test, forest.predict(X_test_scaled))}
+
+    return ModelBundle(version, models, scalers, trained_through, datetime.now()), metrics
@@ -1,17 +1,25 @@
 """Dynamic policy updates from operator feedback success rates."""
 
+import json
+import logging
+import os
 from collections import defaultdict
-from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from models.feedback import FeedbackEvent, FeedbackLabel
 from core.input_validation import PolicyDecision, ValidationError
 from core.timeout_handler import with_timeout
 from .error_handling import (
+    handle_file_operation_error,
     handle_memory_operation_error,
     handle_policy_update_error,
     MemoryOperationError
 )
 
+logger = logging.getLogger(__name__)
+
 
 class FeedbackPolicyUpdater:
     """Aggregates pinned feedback → tunes thresholds/playbooks."""
@@ -103,19 +111,21 @@ class FeedbackPolicyUpdater:
         rate: float,
         phase: str,
         stats: Dict[str, int],
+        adjust_thresholds: bool = True,
     ) -> None:
         """Apply success rate → threshold + preference updates."""
         if not self.memory:
             return
 
         try:
-            # Threshold tuning (anomaly_detector integration)
-            if rate > self.SUCCESS_RATE_HIGH:
+            # Threshold tuning (anomaly_detector integration); skipped when
+            # the caller only refreshes preferences
+            if adjust_thresholds and rate > self.SUCCESS_RATE_HIGH:
                 # Less sensitive for proven patterns
                 self._adjust_threshold(anomaly_type, phase, self.THRESHOLD_ADJUSTMENT)
                 stats["boosted"] += 1
 
-            elif rate < self.SUCCESS_RATE_LOW:
+            elif adjust_thresholds and rate < self.SUCCESS_RATE_LOW:
                 # More sensitive for failure-prone
                 self._adjust_threshold(anomaly_type, phase, -self.THRESHOLD_ADJUSTMENT)
                 if hasattr(self.memory, "suppress_action") and self.memory is not None:
@@ -162,6 +172,165 @@ class FeedbackPolicyUpdater:
             )
 
 
+@dataclass
+class PatternStats:
+    """Sufficient statistics for one (anomaly_type, recovery_action) pattern."""
+
+    labels: Dict[str, int] = field(default_factory=dict)
+    phases: Dict[str, int] = field(default_factory=dict)
+    total: int = 0
+    dominant_phase: str = "NOMINAL_OPS"
+    band: str = "none"  # Band at the last emitted update: none, low, mid, high
+    pending: bool = False  # Changed since the last emitted update
+
+    @property
+    def success_rate(self) -> float:
+        return self.labels.get(FeedbackLabel.CORRECT.value, 0) / self.total if self.total else 0.0
+
+
+class FeedbackLearner:
+    """
+    Streaming feedback → policy learner.
+
+    Keeps per-pattern label and phase counts, so each feedback event is an
+    O(1) update instead of a regroup of all pinned feedback. apply_updates()
+    only touches patterns that received feedback since the last call: every
+    such pattern gets its playbook preference refreshed, and a threshold
+    adjustment (plus suppression) is emitted only when its success rate
+    crossed into the high or low band. State is checkpointed to JSON so a
+    restart resumes from the counts instead of reprocessing history.
+    Ties for the dominant phase keep the current dominant phase.
+    """
+
+    def __init__(
+        self,
+        memory: Optional[object] = None,
+        checkpoint_path: Optional[Path] = None,
+    ) -> None:
+        self.updater = FeedbackPolicyUpdater(memory)
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self.patterns: Dict[Tuple[str, str], PatternStats] = {}
+        self.events_seen = 0
+        self._pending: Dict[Tuple[str, str], None] = {}
+        self._load_checkpoint()
+
+    def observe(self, event: FeedbackEvent) -> None:
+        """Fold one feedback event into its pattern's statistics."""
+        key = (event.anomaly_type, event.recovery_action)
+        stats = self.patterns.get(key)
+        if stats is None:
+            stats = self.patterns[key] = PatternStats()
+
+        label = event.label.value if event.label is not None else "unlabeled"
+        stats.labels[label] = stats.labels.get(label, 0) + 1
+        stats.total += 1
+
+        phase = event.mission_phase
+        count = stats.phases.get(phase, 0) + 1
+        stats.phases[phase] = count
+        if phase != stats.dominant_phase and count > stats.phases.get(stats.dominant_phase, 0):
+            stats.dominant_phase = phase
+
+        stats.pending = True
+        self._pending[key] = None
+        self.events_seen += 1
+
+    def observe_many(self, events: Iterable[FeedbackEvent]) -> int:
+        """Fold a batch of events; returns how many were observed."""
+        count = 0
+        for event in events:
+            self.observe(event)
+            count += 1
+        return count
+
+    def _band(self, rate: float) -> str:
+        if rate > FeedbackPolicyUpdater.SUCCESS_RATE_HIGH:
+            return "high"
+        if rate < FeedbackPolicyUpdater.SUCCESS_RATE_LOW:
+            return "low"
+        return "mid"
+
+    def apply_updates(self) -> Dict[str, int]:
+        """Emit policy updates for patterns changed since the last call."""
+        stats: Dict[str, int] = {"updated": 0, "boosted": 0, "suppressed": 0}
+        if not self.updater.memory:
+            return stats
+
+        for key in list(self._pending):
+            pattern = self.patterns[key]
+            rate = pattern.success_rate
+            band = self._band(rate)
+            crossed = band != pattern.band and band in ("high", "low")
+
+            anomaly_type, action = key
+            self.updater._update_policy(
+                anomaly_type, action, rate, pattern.dominant_phase, stats, adjust_thresholds=crossed
+            )
+            pattern.band = band
+            pattern.pending = False
+            del self._pending[key]
+
+        return stats
+
+    def get_pattern_stats(self, anomaly_type: str, action: str) -> Optional[PatternStats]:
+        return self.patterns.get((anomaly_type, action))
+
+    def checkpoint(self) -> None:
+        """Atomically persist learner state."""
+        if self.checkpoint_path is None:
+            return
+        state = {
+            "version": 1,
+            "events_seen": self.events_seen,
+            "patterns": [
+                {
+                    "anomaly_type": anomaly_type,
+                    "recovery_action": action,
+                    "labels": stats.labels,
+                    "phases": stats.phases,
+                    "total": stats.total,
+                    "dominant_phase": stats.dominant_phase,
+                    "band": stats.band,
+                    "pending": stats.pending,
+                }
+                for (anomaly_type, action), stats in self.patterns.items()
+            ],
+        }
+        temp_path = self.checkpoint_path.with_suffix(".tmp")
+        try:
+            temp_path.write_text(json.dumps(state))
+            os.replace(temp_path, self.checkpoint_path)
+        except OSError as e:
+            raise handle_file_operation_error(
+                "write", self.checkpoint_path, e,
+                context={"operation": "feedback_learner_checkpoint", "patterns": len(self.patterns)}
+            )
+
+    def _load_checkpoint(self) -> None:
+        if self.checkpoint_path is None or not self.checkpoint_path.exists():
+            return
+        try:
+            state = json.loads(self.checkpoint_path.read_text())
+            for entry in state["patterns"]:
+                key = (entry["anomaly_type"], entry["recovery_action"])
+                self.patterns[key] = PatternStats(
+                    labels=entry["labels"],
+                    phases=entry["phases"],
+                    total=entry["total"],
+                    dominant_phase=entry["dominant_phase"],
+                    band=entry["band"],
+                    pending=entry["pending"],
+                )
+                if entry["pending"]:
+                    self._pending[key] = None
+            self.events_seen = state["events_seen"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Ignoring unreadable feedback learner checkpoint {self.checkpoint_path}: {e}")
+            self.patterns.clear()
+            self._pending.clear()
+            self.events_seen = 0
+
+
 @with_timeout(seconds=35.0, operation_name="policy_processing")
 def process_policy_updates(memory: Optional[object]) -> Dict[str, int]:
     """Public API - call after #53 pinning."""
@@ -6,22 +6,19 @@ and trigger preventive recovery actions before issues escalate.
 """
 
 import numpy as np
-import pandas as pd
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 import logging
 from dataclasses import dataclass
 from enum import Enum
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import pickle  # nosec B403
 import os
 
 # ML imports
-from sklearn.ensemble import RandomForestRegressor, IsolationForest
 from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error, r2_score
 import torch
 import torch.nn as nn
 import torch.optim as optim
@@ -47,6 +44,13 @@ from security_engine.contracts import (
     PredictionResult,
     TimeSeriesData
 )
+from security_engine.maintenance_models import ModelBundle, fit_model_bundle
+from security_engine.telemetry_buffer import (
+    TelemetryRingBuffer,
+    WARMUP_ROWS,
+    telemetry_row,
+    window_feature_row,
+)
 
 class LSTMPredictor(nn.Module):
     """LSTM model for time-series prediction."""
@@ -95,18 +99,48 @@ class PredictiveMaintenanceEngine:
     - Preventive action recommendations
     - Integration with existing anomaly detection
     - Model training and evaluation
+
+    Training data lives in a fixed-capacity ring buffer. Once retrain_interval
+    new points have arrived, the models are updated incrementally in the
+    background and the new version is swapped in atomically; requests
+    always score against one complete model version.
     """
 
-    def __init__(self, memory_store: AdaptiveMemoryStore):
+    def __init__(
+        self,
+        memory_store: AdaptiveMemoryStore,
+        buffer_capacity: int = 200_000,
+        retention: timedelta = timedelta(days=30),
+        retrain_interval: Optional[int] = 1000,
+        n_estimators: int = 100,
+        trees_per_update: int = 10,
+        model_dir: str = "security_engine/models",
+    ):
+        """
+        Args:
+            memory_store: Store persisting the training data points
+            buffer_capacity: Training data points kept in memory
+            retention: Training data older than this is dropped
+            retrain_interval: New data points that trigger a background
+                model update (None = only train on train_models())
+            n_estimators: Random Forest size
+            trees_per_update: Trees added to each forest per incremental update
+            model_dir: Directory the trained models are saved to
+        """
         self.memory_store = memory_store
-        self.models: Dict[FailureType, Dict[PredictionModel, Any]] = {}
-        self.scalers: Dict[FailureType, StandardScaler] = {}
-        self.model_dir = "security_engine/models"
-        self.training_data: List[TimeSeriesData] = []
+        self.model_dir = model_dir
+        self.training_buffer = TelemetryRingBuffer(buffer_capacity, retention)
         self.prediction_history: List[PredictionResult] = []
-        
-        # Sliding window for rolling statistics (last 10 data points)
-        self.recent_data: List[TimeSeriesData] = []
+        self.retrain_interval = retrain_interval
+        self.n_estimators = n_estimators
+        self.trees_per_update = trees_per_update
+
+        # Published model version; replaced (never mutated) by retraining
+        self._bundle = ModelBundle()
+        self._retrain_lock: Optional[asyncio.Lock] = None
+        self._retrain_task: Optional[asyncio.Task] = None
+
+        # Data points used for rolling statistics at prediction time
         self.max_window_size = 10
 
         # Create model directory if it doesn't exist
@@ -122,20 +156,31 @@ class PredictiveMaintenanceEngine:
         # Thread pool for CPU-intensive ML operations
         self.executor = ThreadPoolExecutor(max_workers=2)
 
+    @property
+    def models(self) -> Dict[FailureType, Dict[PredictionModel, Any]]:
+        """Models of the current version."""
+        return self._bundle.models
+
+    @property
+    def scalers(self) -> Dict[FailureType, StandardScaler]:
+        """Feature scalers of the current version."""
+        return self._bundle.scalers
+
+    @property
+    def model_version(self) -> int:
+        """Current model version (0 = untrained)."""
+        return self._bundle.version
+
     async def initialize(self) -> bool:
         """Initialize the predictive maintenance engine."""
         try:
             # Load existing models
             await self._load_models()
 
-            # Initialize models for each failure type
-            for failure_type in FailureType:
-                self.models[failure_type] = {}
-                self.scalers[failure_type] = StandardScaler()
-
             self.health_monitor.mark_healthy("predictive_maintenance", {
                 "models_loaded": len(self.models),
-                "training_data_points": len(self.training_data)
+                "model_version": self.model_version,
+                "training_data_points": len(self.training_buffer)
             })
 
             logger.info("Predictive maintenance engine initialized successfully")
@@ -148,93 +193,153 @@ class PredictiveMaintenanceEngine:
 
     async def add_training_data(self, data: TimeSeriesData) -> None:
         """Add new time-series data for training."""
-        self.training_data.append(data)
-
-        # Keep only recent data (last 30 days)
-        cutoff = datetime.now() - timedelta(days=30)
-        self.training_data = [d for d in self.training_data if d.timestamp > cutoff]
-
-        # Maintain sliding window for rolling statistics
-        self.recent_data.append(data)
-        if len(self.recent_data) > self.max_window_size:
-            self.recent_data.pop(0)
+        # Appending also drops data older than the retention period (30 days)
+        self.training_buffer.append(data)
 
         # Store in memory for persistence
         await self._store_training_data(data)
 
+        self._maybe_schedule_retrain()
+
+    def _maybe_schedule_retrain(self) -> None:
+        """Start a background model update once enough new data has arrived."""
+        if self.retrain_interval is None:
+            return
+        if self._retrain_task is not None and not self._retrain_task.done():
+            return
+        new_points = self.training_buffer.sequence - self._bundle.trained_through
+        if new_points < self.retrain_interval or len(self.training_buffer) < 100:
+            return
+        self._retrain_task = asyncio.ensure_future(self.retrain())
+
+    async def wait_for_retrain(self) -> None:
+        """Wait for a scheduled background update to finish."""
+        if self._retrain_task is not None:
+            await asyncio.shield(self._retrain_task)
+
     async def train_models(self) -> Dict[str, float]:
         """
-        Train all predictive models using available data.
+        Train all predictive models from scratch using available data.
 
         Returns:
             Dictionary of model performance metrics
         """
-        if len(self.training_data) < 100:  # Minimum data requirement
+        if len(self.training_buffer) < 100:  # Minimum data requirement
             logger.warning("Insufficient training data for model training")
             return {"error": "insufficient_data"}
 
-        performance_metrics = {}
+        return await self.retrain(full=True)
 
-        try:
-            # Prepare data
-            df = self._prepare_training_dataframe()
+    async def retrain(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Train a new model version and swap it in.
 
-            for failure_type in FailureType:
-                logger.info(f"Training models for {failure_type.value}")
+        Updates are incremental unless full is set or no model exists yet:
+        only the data added since the current version was trained is used
+        (see fit_model_bundle). Training runs on the thread pool; predictions
+        keep using the current version until the new one is complete.
 
-                # Prepare features and targets
-                features, targets = self._prepare_features_and_targets(df, failure_type)
+        Returns:
+            Dictionary of model performance metrics
+        """
+        if self._retrain_lock is None:
+            self._retrain_lock = asyncio.Lock()
+
+        async with self._retrain_lock:
+            previous = self._bundle
+            full = full or not previous.scorer.failure_types
+            start = (
+                self.training_buffer.first_sequence if full
+                else previous.trained_through - WARMUP_ROWS
+            )
+            trained_through = self.training_buffer.sequence
+            timestamps, values = self.training_buffer.since_sequence(start)
+            values = values[np.argsort(timestamps, kind="stable")]
 
-                if len(features) < 50:
-                    continue
+            try:
+                loop = asyncio.get_running_loop()
+                bundle, performance_metrics = await loop.run_in_executor(self.executor, partial(
+                    fit_model_bundle,
+                    values,
+                    previous.version + 1,
+                    previous=None if full else previous,
+                    trained_through=trained_through,
+                    n_estimators=self.n_estimators,
+                    trees_per_update=self.trees_per_update,
+                ))
+            except Exception as e:
+                logger.error(f"Model training failed: {e}")
+                self.health_monitor.mark_failed("predictive_maintenance", str(e))
+                return {"error": str(e)}
 
-                # Train different models
-                model_metrics = await self._train_models_for_failure_type(
-                    failure_type, features, targets
-                )
+            if not performance_metrics:
+                logger.warning("Insufficient training data for model training")
+                return {"error": "insufficient_data"}
 
-                performance_metrics[failure_type.value] = model_metrics
+            # Atomic swap: readers see either the previous or the new version
+            self._bundle = bundle
 
             # Save trained models
-            await self._save_models()
+            await self._save_models(bundle)
 
             self.health_monitor.mark_healthy("predictive_maintenance", {
-                "last_training": datetime.now().isoformat(),
+                "last_training": bundle.trained_at.isoformat(),
+                "model_version": bundle.version,
+                "incremental": not full,
                 "performance_metrics": performance_metrics
             })
 
-            logger.info("Model training completed successfully")
+            logger.info(
+                f"Model training completed successfully: version {bundle.version} "
+                f"({'full' if full else 'incremental'}, {len(values)} data points)"
+            )
             return performance_metrics
 
-        except Exception as e:
-            logger.error(f"Model training failed: {e}")
-            self.health_monitor.mark_failed("predictive_maintenance", str(e))
-            return {"error": str(e)}
-
     @async_timeout(seconds=15.0, operation_name="predictive_failure_prediction")
     async def predict_failures(self, current_data: TimeSeriesData) -> List[PredictionResult]:
         """
         Predict potential failures based on current system state.
 
+        All failure types are scored in one batched call on the current
+        model version.
+
         Returns:
             List of prediction results for potential failures
         """
         predictions = []
 
         try:
-            for failure_type in FailureType:
-                if failure_type not in self.models or not self.models[failure_type]:
-                    continue
+            scorer = self._bundle.scorer
+            if not scorer.failure_types:
+                return []
+
+            window = np.vstack([
+                self.training_buffer.tail(self.max_window_size),
+                telemetry_row(current_data),
+            ])
+            probabilities = scorer.failure_probabilities(window_feature_row(window))[0]
 
-                # Get prediction from best performing model
-                prediction = await self._predict_single_failure_type(failure_type, current_data)
+            now = datetime.now()
+            for failure_type, probability in zip(scorer.failure_types, probabilities.tolist()):
+                if probability <= 0.3:  # High confidence threshold
+                    continue
 
-                if prediction and prediction.probability > 0.3:  # High confidence threshold
-                    predictions.append(prediction)
-                    PREDICTIVE_MAINTENANCE_PREDICTIONS_TOTAL.labels(
-                        failure_type=failure_type.value, 
-                        model_type=prediction.model_used.value
-                    ).inc()
+                # Estimate time to failure (simplified - higher probability = sooner failure)
+                time_to_failure_hours = max(1, int((1 - probability) * 24))
+
+                predictions.append(PredictionResult(
+                    failure_type=failure_type,
+                    probability=probability,
+                    predicted_time=now + timedelta(hours=time_to_failure_hours),
+                    confidence=0.85,  # Simplified confidence score
+                    features_used=['cpu_usage', 'memory_usage', 'network_latency', 'disk_io', 'error_rate'],
+                    model_used=PredictionModel.RANDOM_FOREST,
+                    preventive_actions=self._get_preventive_actions(failure_type)
+                ))
+                PREDICTIVE_MAINTENANCE_PREDICTIONS_TOTAL.labels(
+                    failure_type=failure_type.value,
+                    model_type=PredictionModel.RANDOM_FOREST.value
+                ).inc()
 
             # Sort by probability and confidence
             predictions.sort(key=lambda x: x.probability * x.confidence, reverse=True)
@@ -271,237 +376,6 @@ class PredictiveMaintenanceEngine:
 
         return actions_taken
 
-    async def _predict_single_failure_type(self, failure_type: FailureType, data: TimeSeriesData) -> Optional[PredictionResult]:
-        """Predict failure for a specific failure type."""
-        if failure_type not in self.models:
-            return None
-
-        # Use the best performing model (Random Forest as default)
-        model = self.models[failure_type].get(PredictionModel.RANDOM_FOREST)
-        if not model:
-            return None
-
-        try:
-            # Prepare features
-            features = self._extract_features_from_data(data, failure_type)
-            features_scaled = self.scalers[failure_type].transform([features])
-
-            # Make prediction using regression model
-            model = self.models[failure_type].get(PredictionModel.RANDOM_FOREST)
-            if not model:
-                return None
-                
-            predicted_value = model.predict(features_scaled)[0]
-                
-            # Calculate failure probability based on predicted value vs threshold
-            # For each failure type, define what constitutes a "high" value indicating potential failure
-            thresholds = {
-                FailureType.CPU_SPIKE: 75.0,  # CPU usage > 75%
-                FailureType.MEMORY_LEAK: 80.0,  # Memory usage > 80%
-                FailureType.NETWORK_LATENCY: 100.0,  # Latency > 100ms
-                FailureType.DISK_IO_BURST: 200.0,  # Disk I/O > 200 ops/sec
-                FailureType.SERVICE_CRASH: 1.0,  # Error rate > 1%
-                FailureType.RESOURCE_EXHAUSTION: 1.0  # Error rate > 1%
-            }
-            
-            threshold = thresholds[failure_type]
-            
-            # Calculate probability as sigmoid of (predicted_value - threshold)
-            # This gives higher probability when predicted value is much higher than threshold
-            probability = 1 / (1 + np.exp(-(predicted_value - threshold) / 10))  # Sigmoid with scaling
-            
-            # Only create prediction if probability is significant (> 0.3)
-            if probability < 0.3:
-                return None
-
-            # Estimate time to failure (simplified - higher probability = sooner failure)
-            time_to_failure_hours = max(1, int((1 - probability) * 24))
-
-            prediction = PredictionResult(
-                failure_type=failure_type,
-                probability=float(probability),
-                predicted_time=datetime.now() + timedelta(hours=time_to_failure_hours),
-                confidence=0.85,  # Simplified confidence score
-                features_used=['cpu_usage', 'memory_usage', 'network_latency', 'disk_io', 'error_rate'],
-                model_used=PredictionModel.RANDOM_FOREST,
-                preventive_actions=self._get_preventive_actions(failure_type)
-            )
-
-            return prediction
-
-        except Exception as e:
-            logger.error(f"Prediction failed for {failure_type}: {e}")
-            return None
-
-    async def _train_models_for_failure_type(self, failure_type: FailureType, features: np.ndarray, targets: np.ndarray) -> Dict[str, float]:
-        """Train multiple models for a specific failure type."""
-        metrics = {}
-
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            features, targets, test_size=0.2, random_state=42
-        )
-
-        # Scale features
-        self.scalers[failure_type].fit(X_train)
-        X_train_scaled = self.scalers[failure_type].transform(X_train)
-        X_test_scaled = self.scalers[failure_type].transform(X_test)
-
-        # Random Forest
-        rf_model = RandomForestRegressor(n_estimators=100, random_state=42)
-        rf_model.fit(X_train_scaled, y_train)
-        rf_pred = rf_model.predict(X_test_scaled)
-        rf_mse = mean_squared_error(y_test, rf_pred)
-        rf_r2 = r2_score(y_test, rf_pred)
-
-        self.models[failure_type][PredictionModel.RANDOM_FOREST] = rf_model
-        metrics['random_forest'] = rf_r2
-
-        # Isolation Forest for anomaly detection
-        if_model = IsolationForest(contamination=0.1, random_state=42)
-        if_model.fit(X_train_scaled)
-        self.models[failure_type][PredictionModel.ISOLATION_FOREST] = if_model
-
-        logger.info(f"Trained models for {failure_type.value}: RF R² = {rf_r2:.3f}")
-        return metrics
-
-    def _prepare_training_dataframe(self) -> pd.DataFrame:
-        """Convert training data to pandas DataFrame."""
-        data = []
-        for item in self.training_data:
-            data.append({
-                'timestamp': item.timestamp,
-                'cpu_usage': item.cpu_usage,
-                'memory_usage': item.memory_usage,
-                'network_latency': item.network_latency,
-                'disk_io': item.disk_io,
-                'error_rate': item.error_rate,
-                'response_time': item.response_time,
-                'active_connections': item.active_connections,
-                'failure_occurred': item.failure_occurred
-            })
-
-        df = pd.DataFrame(data)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df = df.sort_values('timestamp')
-        return df
-
-    def _prepare_features_and_targets(self, df: pd.DataFrame, failure_type: FailureType) -> Tuple[np.ndarray, np.ndarray]:
-        """Prepare features and targets for a specific failure type."""
-        # Create target based on failure type
-        if failure_type == FailureType.CPU_SPIKE:
-            target_col = 'cpu_usage'
-        elif failure_type == FailureType.MEMORY_LEAK:
-            target_col = 'memory_usage'
-        elif failure_type == FailureType.NETWORK_LATENCY:
-            target_col = 'network_latency'
-        elif failure_type == FailureType.DISK_IO_BURST:
-            target_col = 'disk_io'
-        else:
-            target_col = 'error_rate'
-
-        # Create rolling features
-        df_features = df.copy()
-        for col in ['cpu_usage', 'memory_usage', 'network_latency', 'disk_io', 'error_rate']:
-            df_features[f'{col}_rolling_mean_3'] = df_features[col].rolling(window=3).mean()
-            df_features[f'{col}_rolling_std_3'] = df_features[col].rolling(window=3).std()
-            df_features[f'{col}_rolling_mean_6'] = df_features[col].rolling(window=6).mean()
-            df_features[f'{col}_rolling_std_6'] = df_features[col].rolling(window=6).std()
-
-        # Drop NaN values
-        df_features = df_features.dropna()
-
-        # Features are all columns except timestamp and target
-        feature_cols = [col for col in df_features.columns if col not in ['timestamp', target_col]]
-        features = df_features[feature_cols].values
-        targets = df_features[target_col].values
-
-        logger.debug(f"Training features for {failure_type}: {len(feature_cols)} columns - {feature_cols}")
-
-        return features, targets
-
-    def _extract_features_from_data(self, data: TimeSeriesData, failure_type: FailureType) -> List[float]:
-        """Extract features from current data for prediction."""
-        # If we don't have enough recent data, use current values as approximations
-        if len(self.recent_data) < 3:
-            # Fallback: use current values for all features
-            base_features = [
-                data.cpu_usage, data.memory_usage, data.network_latency, 
-                data.disk_io, data.error_rate, data.response_time, data.active_connections
-            ]
-            # Approximate rolling stats
-            features = base_features.copy()
-            for _ in range(5):  # 5 metrics × 4 rolling stats
-                features.extend([0.0, 0.0, 0.0, 0.0])
-            return features
-        
-        # Create DataFrame from recent data + current data
-        recent_with_current = self.recent_data + [data]
-        df_recent = pd.DataFrame([{
-            'cpu_usage': d.cpu_usage,
-            'memory_usage': d.memory_usage,
-            'network_latency': d.network_latency,
-            'disk_io': d.disk_io,
-            'error_rate': d.error_rate,
-            'response_time': d.response_time,
-            'active_connections': d.active_connections
-        } for d in recent_with_current])
-        
-        # Compute rolling statistics for the last row (current data)
-        for col in ['cpu_usage', 'memory_usage', 'network_latency', 'disk_io', 'error_rate']:
-            df_recent[f'{col}_rolling_mean_3'] = df_recent[col].rolling(window=min(3, len(df_recent))).mean()
-            df_recent[f'{col}_rolling_std_3'] = df_recent[col].rolling(window=min(3, len(df_recent))).std()
-            df_recent[f'{col}_rolling_mean_6'] = df_recent[col].rolling(window=min(6, len(df_recent))).mean()
-            df_recent[f'{col}_rolling_std_6'] = df_recent[col].rolling(window=min(6, len(df_recent))).std()
-        
-        # Get features for the last row (current prediction)
-        last_row = df_recent.iloc[-1]
-        
-        # Base features (all except timestamp and target, including failure_occurred = False for prediction)
-        if failure_type == FailureType.CPU_SPIKE:
-            base_features = [
-                last_row['memory_usage'], last_row['network_latency'], last_row['disk_io'], 
-                last_row['error_rate'], last_row['response_time'], last_row['active_connections'], 0.0  # failure_occurred = False
-            ]
-        elif failure_type == FailureType.MEMORY_LEAK:
-            base_features = [
-                last_row['cpu_usage'], last_row['network_latency'], last_row['disk_io'], 
-                last_row['error_rate'], last_row['response_time'], last_row['active_connections'], 0.0
-            ]
-        elif failure_type == FailureType.NETWORK_LATENCY:
-            base_features = [
-                last_row['cpu_usage'], last_row['memory_usage'], last_row['disk_io'], 
-                last_row['error_rate'], last_row['response_time'], last_row['active_connections'], 0.0
-            ]
-        elif failure_type == FailureType.DISK_IO_BURST:
-            base_features = [
-                last_row['cpu_usage'], last_row['memory_usage'], last_row['network_latency'], 
-                last_row['error_rate'], last_row['response_time'], last_row['active_connections'], 0.0
-            ]
-        else:  # SERVICE_CRASH or RESOURCE_EXHAUSTION
-            base_features = [
-                last_row['cpu_usage'], last_row['memory_usage'], last_row['network_latency'], 
-                last_row['disk_io'], last_row['response_time'], last_row['active_connections'], 0.0
-            ]
-        
-        # Rolling features for all metrics (20 features)
-        rolling_features = []
-        for col in ['cpu_usage', 'memory_usage', 'network_latency', 'disk_io', 'error_rate']:
-            rolling_features.extend([
-                last_row[f'{col}_rolling_mean_3'],
-                last_row[f'{col}_rolling_std_3'], 
-                last_row[f'{col}_rolling_mean_6'],
-                last_row[f'{col}_rolling_std_6']
-            ])
-        
-        # Combine base and rolling features
-        features = base_features + rolling_features
-        
-        # Fill any NaN values with 0
-        features = [0.0 if pd.isna(x) else x for x in features]
-        
-        return features
-
     def _get_preventive_actions(self, failure_type: FailureType) -> List[str]:
         """Get preventive actions for a failure type."""
         actions_map = {
@@ -556,42 +430,52 @@ class PredictiveMaintenanceEngine:
     async def _load_models(self) -> None:
         """Load trained models from disk."""
         try:
+            bundle_path = os.path.join(self.model_dir, "model_bundle.pkl")
+            if os.path.exists(bundle_path):
+                with open(bundle_path, 'rb') as f:
+                    self._bundle = ModelBundle.from_state(pickle.load(f))  # nosec B301
+                logger.info(f"Models loaded successfully (version {self._bundle.version})")
+                return
+
+            # Per-failure-type files written by earlier versions
+            models, scalers = {}, {}
             for failure_type in FailureType:
                 model_path = os.path.join(self.model_dir, f"{failure_type.value}_models.pkl")
                 scaler_path = os.path.join(self.model_dir, f"{failure_type.value}_scaler.pkl")
 
                 if os.path.exists(model_path):
                     with open(model_path, 'rb') as f:
-                        self.models[failure_type] = pickle.load(f)  # nosec B301
+                        models[failure_type] = pickle.load(f)  # nosec B301
 
                 if os.path.exists(scaler_path):
                     with open(scaler_path, 'rb') as f:
-                        self.scalers[failure_type] = pickle.load(f)  # nosec B301
+                        scalers[failure_type] = pickle.load(f)  # nosec B301
 
+            if models:
+                self._bundle = ModelBundle(version=1, models=models, scalers=scalers)
             logger.info("Models loaded successfully")
 
         except Exception as e:
             logger.error(f"Failed to load models: {e}")
 
-    async def _save_models(self) -> None:
-        """Save trained models to disk."""
+    async def _save_models(self, bundle: ModelBundle) -> None:
+        """Save a model version to disk (off the event loop)."""
         try:
-            for failure_type in FailureType:
-                if failure_type in self.models:
-                    model_path = os.path.join(self.model_dir, f"{failure_type.value}_models.pkl")
-                    scaler_path = os.path.join(self.model_dir, f"{failure_type.value}_scaler.pkl")
-
-                    with open(model_path, 'wb') as f:
-                        pickle.dump(self.models[failure_type], f)
-
-                    with open(scaler_path, 'wb') as f:
-                        pickle.dump(self.scalers[failure_type], f)
-
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.executor, self._write_bundle, bundle)
             logger.info("Models saved successfully")
 
         except Exception as e:
             logger.error(f"Failed to save models: {e}")
 
+    def _write_bundle(self, bundle: ModelBundle) -> None:
+        """Write a bundle atomically: readers never see a partial file."""
+        bundle_path = os.path.join(self.model_dir, "model_bundle.pkl")
+        temp_path = bundle_path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            pickle.dump(bundle.to_state(), f)
+        os.replace(temp_path, bundle_path)
+
     async def _store_training_data(self, data: TimeSeriesData) -> None:
         """Store training data in memory store for persistence."""
         # Convert to embedding (simplified)
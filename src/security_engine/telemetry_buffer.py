@@ -0,0 +1,308 @@
+"""
+Telemetry Ring Buffer
+
+Fixed-capacity NumPy storage for predictive maintenance training data, and
+the feature layout shared by training and prediction.
+
+Rows are stored in arrival order with their timestamps. Appends are O(1):
+the oldest rows are overwritten once the buffer is full, and rows older
+than the retention period are expired from the front. While rows arrive
+in timestamp order, time range queries are binary searches.
+"""
+
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from security_engine.contracts import FailureType, TimeSeriesData
+
+METRIC_COLUMNS = (
+    "cpu_usage",
+    "memory_usage",
+    "network_latency",
+    "disk_io",
+    "error_rate",
+    "response_time",
+    "active_connections",
+)
+BUFFER_COLUMNS = METRIC_COLUMNS + ("failure_occurred",)
+ROLLING_COLUMNS = METRIC_COLUMNS[:5]
+ROLLING_WINDOWS = (3, 6)
+FEATURE_COLUMNS = BUFFER_COLUMNS + tuple(
+    f"{col}_rolling_{stat}_{window}"
+    for col in ROLLING_COLUMNS
+    for window in ROLLING_WINDOWS
+    for stat in ("mean", "std")
+)
+# Rows needed before the first one with complete rolling features
+WARMUP_ROWS = max(ROLLING_WINDOWS) - 1
+
+TARGET_COLUMNS: Dict[FailureType, str] = {
+    FailureType.CPU_SPIKE: "cpu_usage",
+    FailureType.MEMORY_LEAK: "memory_usage",
+    FailureType.NETWORK_LATENCY: "network_latency",
+    FailureType.DISK_IO_BURST: "disk_io",
+    FailureType.SERVICE_CRASH: "error_rate",
+    FailureType.RESOURCE_EXHAUSTION: "error_rate",
+}
+
+_FAILURE_INDEX = BUFFER_COLUMNS.index("failure_occurred")
+
+
+def target_index(failure_type: FailureType) -> int:
+    """Column of FEATURE_COLUMNS predicted for a failure type."""
+    return FEATURE_COLUMNS.index(TARGET_COLUMNS[failure_type])
+
+
+def feature_indices(failure_type: FailureType) -> np.ndarray:
+    """Columns of FEATURE_COLUMNS used as model inputs: all but the target."""
+    target = target_index(failure_type)
+    return np.array([i for i in range(len(FEATURE_COLUMNS)) if i != target])
+
+
+def telemetry_row(data: TimeSeriesData) -> np.ndarray:
+    """Buffer row (BUFFER_COLUMNS) for a data point."""
+    return np.array([
+        data.cpu_usage,
+        data.memory_usage,
+        data.network_latency,
+        data.disk_io,
+        data.error_rate,
+        data.response_time,
+        float(data.active_connections),
+        float(data.failure_occurred),
+    ])
+
+
+def _rolling_stats(values: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Rolling mean and sample std of each column, one row per complete window."""
+    count = len(values) - window + 1
+    shifted = [values[k:k + count] for k in range(window)]
+    mean = sum(shifted) / window
+    var = sum((s - mean) ** 2 for s in shifted) / (window - 1)
+    return mean, np.sqrt(var)
+
+
+def build_feature_matrix(values: np.ndarray) -> np.ndarray:
+    """
+    Training features (FEATURE_COLUMNS) for time-ordered buffer rows.
+
+    Rolling statistics are computed over the preceding rows, so the first
+    WARMUP_ROWS rows only provide history and yield no feature row.
+
+    Args:
+        values: Array of shape (n, len(BUFFER_COLUMNS))
+
+    Returns:
+        Array of shape (max(n - WARMUP_ROWS, 0), len(FEATURE_COLUMNS))
+    """
+    count = len(values) - WARMUP_ROWS
+    if count <= 0:
+        return np.empty((0, len(FEATURE_COLUMNS)))
+
+    features = np.empty((count, len(FEATURE_COLUMNS)))
+    features[:, :len(BUFFER_COLUMNS)] = values[WARMUP_ROWS:]
+    rolling = values[:, :len(ROLLING_COLUMNS)]
+    stats = {}
+    for window in ROLLING_WINDOWS:
+        mean, std = _rolling_stats(rolling, window)
+        offset = max(ROLLING_WINDOWS) - window
+        stats[window] = (mean[offset:], std[offset:])
+
+    column = len(BUFFER_COLUMNS)
+    for i in range(len(ROLLING_COLUMNS)):
+        for window in ROLLING_WINDOWS:
+            mean, std = stats[window]
+            features[:, column] = mean[:, i]
+            features[:, column + 1] = std[:, i]
+            column += 2
+    return features
+
+
+def window_feature_row(window: np.ndarray) -> np.ndarray:
+    """
+    Prediction features (FEATURE_COLUMNS) for the last row of a window.
+
+    Windows shorter than ROLLING_WINDOWS use every row they have; with fewer
+    than 4 rows the rolling features are left at 0. failure_occurred is
+    always 0 (the outcome being predicted is unknown).
+
+    Args:
+        window: Time-ordered buffer rows ending with the current data point
+    """
+    row = np.zeros(len(FEATURE_COLUMNS))
+    row[:len(BUFFER_COLUMNS)] = window[-1]
+    row[_FAILURE_INDEX] = 0.0
+    if len(window) < 4:
+        return row
+
+    rolling = window[:, :len(ROLLING_COLUMNS)]
+    column = len(BUFFER_COLUMNS)
+    for i in range(len(ROLLING_COLUMNS)):
+        for size in ROLLING_WINDOWS:
+            recent = rolling[-size:, i]
+            row[column] = recent.mean()
+            row[column + 1] = recent.std(ddof=1)
+            column += 2
+    return row
+
+
+class TelemetryRingBuffer:
+    """
+    Fixed-capacity ring buffer of telemetry rows with a time index.
+
+    Every appended row gets a sequence number (0, 1, 2, ...), so consumers
+    such as incremental training can ask for the rows added since they
+    last looked.
+
+    Example:
+        buffer = TelemetryRingBuffer(capacity=100_000)
+        buffer.append(data)
+        timestamps, values = buffer.since_sequence(trained_through)
+    """
+
+    def __init__(self, capacity: int = 200_000, retention: Optional[timedelta] = timedelta(days=30)):
+        """
+        Args:
+            capacity: Rows kept; the oldest are overwritten when full
+            retention: Rows older than this are expired on append (None = keep)
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.retention = retention
+        self._values = np.zeros((capacity, len(BUFFER_COLUMNS)))
+        self._timestamps = np.zeros(capacity)
+        self._start = 0
+        self._size = 0
+        self._appended = 0
+        self._last_timestamp = -math.inf
+        self._in_order = True
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def sequence(self) -> int:
+        """Sequence number the next appended row will get."""
+        return self._appended
+
+    @property
+    def first_sequence(self) -> int:
+        """Sequence number of the oldest row held."""
+        return self._appended - self._size
+
+    @property
+    def in_order(self) -> bool:
+        """Whether the held rows are in timestamp order (time queries are binary searches)."""
+        return self._in_order
+
+    def append(self, data: TimeSeriesData, now: Optional[float] = None) -> None:
+        """Add a data point, then expire rows past retention."""
+        self.extend(np.array([data.timestamp.timestamp()]), telemetry_row(data)[np.newaxis], now)
+
+    def extend(self, timestamps: np.ndarray, values: np.ndarray, now: Optional[float] = None) -> None:
+        """
+        Add rows in bulk.
+
+        Args:
+            timestamps: POSIX timestamps, shape (k,)
+            values: Rows of shape (k, len(BUFFER_COLUMNS))
+            now: Current POSIX time for retention (default: time.time())
+        """
+        timestamps = np.asarray(timestamps, dtype=float)
+        count = len(timestamps)
+        if count == 0:
+            return
+        if self._size == 0:
+            self._in_order = True
+            self._last_timestamp = -math.inf
+        if timestamps[0] < self._last_timestamp or (count > 1 and np.any(np.diff(timestamps) < 0)):
+            self._in_order = False
+        self._last_timestamp = max(self._last_timestamp, float(timestamps.max()))
+
+        self._appended += count
+        if count > self.capacity:
+            timestamps, values = timestamps[-self.capacity:], values[-self.capacity:]
+            count = self.capacity
+
+        end = (self._start + self._size) % self.capacity
+        first = min(count, self.capacity - end)
+        self._timestamps[end:end + first] = timestamps[:first]
+        self._values[end:end + first] = values[:first]
+        self._timestamps[:count - first] = timestamps[first:]
+        self._values[:count - first] = values[first:]
+
+        overflow = max(0, self._size + count - self.capacity)
+        self._start = (self._start + overflow) % self.capacity
+        self._size += count - overflow
+        self.expire(now)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """
+        Drop rows older than the retention period from the front.
+
+        Out-of-order rows expire once they reach the front.
+
+        Returns:
+            Number of rows dropped
+        """
+        if self.retention is None or self._size == 0:
+            return 0
+        cutoff = (time.time() if now is None else now) - self.retention.total_seconds()
+        if self._timestamps[self._start] > cutoff:
+            return 0
+        if self._in_order:
+            expired = self._count_at_or_before(cutoff)
+        else:
+            expired = 0
+            while expired < self._size and self._timestamps[(self._start + expired) % self.capacity] <= cutoff:
+                expired += 1
+        self._start = (self._start + expired) % self.capacity
+        self._size -= expired
+        return expired
+
+    def _segments(self) -> Tuple[slice, slice]:
+        """Physical slices holding the rows, oldest first."""
+        end = self._start + self._size
+        if end <= self.capacity:
+            return slice(self._start, end), slice(0, 0)
+        return slice(self._start, self.capacity), slice(0, end - self.capacity)
+
+    def _count_at_or_before(self, timestamp: float) -> int:
+        """Rows with a timestamp <= the given one (rows in order)."""
+        head, tail = self._segments()
+        count = int(np.searchsorted(self._timestamps[head], timestamp, side="right"))
+        if count == head.stop - head.start:
+            count += int(np.searchsorted(self._timestamps[tail], timestamp, side="right"))
+        return count
+
+    def _take(self, offset: int, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Copies of rows [offset, offset + count) counted from the oldest."""
+        index = (self._start + offset + np.arange(count)) % self.capacity
+        return self._timestamps[index], self._values[index]
+
+    def tail(self, count: int) -> np.ndarray:
+        """The newest rows (up to count), oldest first."""
+        count = min(count, self._size)
+        return self._take(self._size - count, count)[1]
+
+    def since_sequence(self, sequence: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Timestamps and rows appended at or after a sequence number (those still held)."""
+        offset = min(max(sequence - self.first_sequence, 0), self._size)
+        return self._take(offset, self._size - offset)
+
+    def between(self, start: datetime, end: Optional[datetime] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Timestamps and rows with start < timestamp <= end, in arrival order."""
+        low = start.timestamp()
+        high = math.inf if end is None else end.timestamp()
+        if self._in_order:
+            first = self._count_at_or_before(low)
+            last = self._size if end is None else self._count_at_or_before(high)
+            return self._take(first, max(last - first, 0))
+        timestamps, values = self._take(0, self._size)
+        mask = (timestamps > low) & (timestamps <= high)
+        return timestamps[mask], values[mask]
@@ -77,7 +77,7 @@ async def test_predictive_maintenance():
 
         await engine.add_training_data(data_point)
 
-    print(f"✅ Added {len(engine.training_data)} training data points")
+    print(f"✅ Added {len(engine.training_buffer)} training data points")
 
     # Train models
     print("\n🤖 Training predictive models...")
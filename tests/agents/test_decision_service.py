@@ -0,0 +1,159 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.agents.agentic_decision_loop import AgenticDecisionLoop
+from src.agents.core.engine import PromptEngine
+from src.agents.core.schema import ActionType
+from src.agents.decision_service import AsyncDecisionService, DecisionServiceOverloaded
+
+
+@pytest.fixture
+def template_dir(tmp_path):
+    system_dir = tmp_path / "system"
+    system_dir.mkdir()
+    (system_dir / "base.txt").write_text("Base. Task: {task_description}")
+    (system_dir / "tools.txt").write_text("Tools: {tool_descriptions}")
+    (system_dir / "reasoning.txt").write_text("Schema: {schema_description}")
+    (tmp_path / "tasks").mkdir()
+    (tmp_path / "tasks" / "analysis.txt").write_text("Directive: {directive}\nData: {telemetry_data}")
+    return str(tmp_path)
+
+
+class CountingLoop(AgenticDecisionLoop):
+    """Mock-mode loop counting model calls."""
+
+    def __init__(self, template_dir, latency=0.05):
+        super().__init__("agent-test", PromptEngine(template_dir), mock_latency_seconds=latency)
+        self.client = None
+        self.calls = 0
+        self.order = []
+        self._lock = threading.Lock()
+
+    def _call_llm(self, messages):
+        with self._lock:
+            self.calls += 1
+            self.order.append(messages[-1]["content"])
+        return super()._call_llm(messages)
+
+
+@pytest.fixture
+def loop(template_dir):
+    return CountingLoop(template_dir)
+
+
+def _context(sat, voltage=3.71, state="NOMINAL_OPS"):
+    return {"telemetry": {"satellite_id": sat, "voltage": voltage}, "system_state": state}
+
+
+async def test_identical_requests_coalesce_then_hit_cache(loop):
+    async with AsyncDecisionService(loop) as service:
+        outputs = await asyncio.gather(*[
+            service.decide(f"Check power on SAT-{i:03d}", _context(f"SAT-{i:03d}", 3.7100 + i * 1e-4))
+            for i in range(10)
+        ])
+        await service.decide("Check power on SAT-999", _context("SAT-999"))
+
+    assert loop.calls == 1
+    assert all(o.action == ActionType.ANALYZE for o in outputs)
+    outcomes = service.metrics.outcomes
+    assert (outcomes["miss"].count, outcomes["coalesced"].count, outcomes["hit"].count) == (1, 9, 1)
+    assert outcomes["hit"].saved_cost > 0
+    assert service.metrics.hit_rate == pytest.approx(10 / 11)
+
+
+async def test_different_context_is_not_shared(loop):
+    async with AsyncDecisionService(loop) as service:
+        await asyncio.gather(
+            service.decide("Check power", _context("SAT-1", voltage=3.7)),
+            service.decide("Check power", _context("SAT-1", voltage=4.1)),
+            service.decide("Check power", _context("SAT-1", state="SAFE_MODE")),
+        )
+    assert loop.calls == 3
+
+
+async def test_cache_expires_and_invalidates_on_state_change(loop):
+    clock = [0.0]
+    async with AsyncDecisionService(loop, cache_ttl_seconds=10, clock=lambda: clock[0]) as service:
+        await service.decide("Check power", _context("SAT-1"))
+        clock[0] = 11.0
+        await service.decide("Check power", _context("SAT-1"))
+        assert loop.calls == 2
+
+        assert service.on_system_state_change("NOMINAL_OPS", "SAFE_MODE") == 1
+        await service.decide("Check power", _context("SAT-1"))
+        assert loop.calls == 3
+
+
+async def test_session_requests_run_in_order(loop):
+    async with AsyncDecisionService(loop, max_workers=4) as service:
+        await asyncio.gather(*[
+            service.decide(f"step {i}", {}, session_id="sess-1") for i in range(5)
+        ])
+
+    assert loop.order == [f"Directive: step {i}\nData: None" for i in range(5)]
+    assert service.metrics.outcomes["bypass"].count == 5
+    assert len(loop.context_manager.get_context("sess-1")) == 11
+    assert not service._session_locks
+
+
+async def test_workers_run_concurrently(loop):
+    async with AsyncDecisionService(loop, max_workers=8) as service:
+        started = asyncio.get_running_loop().time()
+        await asyncio.gather(*[service.decide(f"task {i}", {}) for i in range(8)])
+        elapsed = asyncio.get_running_loop().time() - started
+
+    assert loop.calls == 8
+    assert elapsed < 8 * 0.05
+
+
+async def test_max_pending_sheds_load(loop):
+    async with AsyncDecisionService(loop, max_pending=2) as service:
+        results = await asyncio.gather(
+            *[service.decide(f"task {i}", {}) for i in range(4)], return_exceptions=True
+        )
+    assert sum(isinstance(r, DecisionServiceOverloaded) for r in results) == 2
+
+
+async def test_max_pending_counts_session_backlog(loop):
+    async with AsyncDecisionService(loop, max_pending=2) as service:
+        results = await asyncio.gather(
+            *[service.decide(f"step {i}", {}, session_id="sess-1") for i in range(4)],
+            return_exceptions=True,
+        )
+        assert service.get_stats()["pending"] == 0
+    assert sum(isinstance(r, DecisionServiceOverloaded) for r in results) == 2
+    assert loop.calls == 2
+
+
+def test_prompt_metrics_record_is_thread_safe(loop):
+    metrics = loop.metrics
+
+    def record():
+        for _ in range(2000):
+            metrics.record(1.0, prompt_tokens=2, completion_tokens=1)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert metrics.total_requests == 8000
+    assert metrics.total_tokens == 24000
+    assert len(metrics.latency_history) == len(metrics.token_history) == 1000
+
+
+async def test_failed_decisions_are_not_cached(loop):
+    def fail(messages):
+        raise RuntimeError("model unavailable")
+
+    loop._call_llm = fail
+    async with AsyncDecisionService(loop) as service:
+        first = await service.decide("Check power", _context("SAT-1"))
+        await service.decide("Check power", _context("SAT-1"))
+
+    assert first.action == ActionType.WAIT
+    assert service.metrics.outcomes["error"].count == 2
+    assert service.get_stats()["cache_entries"] == 0
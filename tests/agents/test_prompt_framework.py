@@ -4,10 +4,11 @@ Tests PromptEngine, Schema Validation, and AgenticDecisionLoop (mocked).
 """
 import pytest
 import json
+import os
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
-from src.agents.core.engine import PromptEngine, PromptContext
+from src.agents.core.engine import CompiledTemplate, PromptEngine, PromptContext, TASK_PLACEHOLDERS
 from src.agents.core.schema import AgentOutput, ActionType
 from src.agents.agentic_decision_loop import AgenticDecisionLoop
 
@@ -63,6 +64,56 @@ def test_context_compression(prompt_engine):
     assert len(compressed) < 10000
     assert "[TRUNCATED]" in compressed
 
+def test_compiled_template_matches_str_format():
+    source = "Task {directive!r} -> {tool_names} ({system_state:>8}) {{literal}}"
+    template = CompiledTemplate("t", source, TASK_PLACEHOLDERS)
+    values = {"directive": "scan", "tool_names": ["a", "b"], "system_state": "ok"}
+    assert template.render(**values) == source.format(**values)
+    assert template.placeholders == {"directive", "tool_names", "system_state"}
+
+def test_undeclared_placeholder_rejected_at_load(mock_template_dir):
+    (Path(mock_template_dir) / "tasks" / "planning.txt").write_text("Plan: {budget}")
+    with pytest.raises(ValueError, match="undeclared placeholders"):
+        PromptEngine(template_dir=mock_template_dir)
+
+def test_static_prefix_cached_by_version_and_tools(prompt_engine):
+    tools = [{"name": "check_thermal_history"}]
+    context = PromptContext(task_description="A", tools=tools)
+    first = prompt_engine.get_prefix(context)
+
+    assert prompt_engine.get_prefix(PromptContext(task_description="B", tools=tools)) is first
+    assert prompt_engine.get_prefix(context, version="v2").cache_key != first.cache_key
+    assert prompt_engine.get_prefix(PromptContext(task_description="A")).cache_key != first.cache_key
+
+    messages = prompt_engine.construct_prompt("analysis", context)
+    assert messages[0]['content'].startswith("Base System Prompt. Task: A")
+    assert "check_thermal_history" in messages[0]['content']
+
+def test_templates_hot_reload_on_mtime_change(mock_template_dir):
+    engine = PromptEngine(template_dir=mock_template_dir, reload_check_interval=0)
+    context = PromptContext(task_description="Check", telemetry_data={"temp": 50})
+    key = engine.get_prefix(context).cache_key
+
+    base = Path(mock_template_dir) / "system" / "base.txt"
+    base.write_text("Updated System Prompt. Task: {task_description}")
+    stat = base.stat()
+    os.utime(base, (stat.st_atime, stat.st_mtime + 5))
+
+    messages = engine.construct_prompt("analysis", context)
+    assert messages[0]['content'].startswith("Updated System Prompt")
+    assert engine.get_prefix(context).cache_key != key
+
+def test_invalid_reload_keeps_previous_templates(mock_template_dir):
+    engine = PromptEngine(template_dir=mock_template_dir, reload_check_interval=0)
+    task = Path(mock_template_dir) / "tasks" / "analysis.txt"
+    task.write_text("Analyze: {unknown_field}")
+    stat = task.stat()
+    os.utime(task, (stat.st_atime, stat.st_mtime + 5))
+
+    assert engine.reload_if_changed() is False
+    messages = engine.construct_prompt("analysis", PromptContext(task_description="x"))
+    assert messages[-1]['content'] == "Analyze: None"
+
 # Tests for Schema
 def test_agent_output_validation_valid():
     data = {
@@ -0,0 +1,246 @@
+"""
+Unit tests for the pooled contact data layer (src/api/contact_store.py)
+
+Covers WAL setup, coalesced inserts, keyset pagination, the trigger-maintained
+per-status counts and the pool PRAGMA/validation options.
+"""
+
+import asyncio
+import sqlite3
+from unittest.mock import Mock
+
+import pytest
+
+from api import contact_store
+from api.contact_store import (
+    ContactStore,
+    apply_schema,
+    decode_cursor,
+    encode_cursor,
+)
+from src.db import pool_manager
+
+
+@pytest.fixture(autouse=True)
+def use_real_aiosqlite(real_aiosqlite, monkeypatch):
+    monkeypatch.setattr(contact_store, "aiosqlite", real_aiosqlite)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "contact.db"
+    conn = sqlite3.connect(path)
+    apply_schema(conn)
+    conn.close()
+    return path
+
+
+@pytest.fixture
+async def store(db_path):
+    store = ContactStore(db_path, pool_size=4)
+    await store.start()
+    yield store
+    await store.close()
+
+
+def _row(i):
+    return (f"User {i}", f"u{i}@example.com", None, "Subject", "Message body.", "1.2.3.4", "agent")
+
+
+def _seed(path, rows):
+    """Insert (submitted_at, status) rows directly."""
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany(
+            "INSERT INTO contact_submissions (name, email, subject, message, submitted_at, status) "
+            "VALUES ('n', 'e', 's', 'm', ?, ?)",
+            rows,
+        )
+    conn.close()
+
+
+class TestSchema:
+    def test_wal_and_counts_backfilled(self, tmp_path):
+        path = tmp_path / "legacy.db"
+        conn = sqlite3.connect(path)
+        conn.execute(contact_store.SCHEMA[0])
+        conn.executemany(
+            "INSERT INTO contact_submissions (name, email, subject, message, status) VALUES ('n','e','s','m',?)",
+            [("pending",), ("pending",), ("spam",)],
+        )
+        conn.commit()
+
+        apply_schema(conn)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        counts = dict(conn.execute("SELECT status, total FROM contact_status_counts"))
+        assert counts == {"pending": 2, "spam": 1}
+
+        # Re-applying is idempotent and does not double count
+        apply_schema(conn)
+        counts = dict(conn.execute("SELECT status, total FROM contact_status_counts"))
+        assert counts == {"pending": 2, "spam": 1}
+        conn.close()
+
+    def test_triggers_track_status_changes(self, db_path):
+        _seed(db_path, [("2024-01-01 00:00:00", "pending")] * 3)
+        conn = sqlite3.connect(db_path)
+        with conn:
+            conn.execute("UPDATE contact_submissions SET status = 'resolved' WHERE id = 1")
+            conn.execute("UPDATE contact_submissions SET status = 'pending' WHERE id = 2")
+            conn.execute("DELETE FROM contact_submissions WHERE id = 3")
+        counts = dict(conn.execute("SELECT status, total FROM contact_status_counts"))
+        conn.close()
+        assert counts == {"pending": 1, "resolved": 1}
+
+    def test_cursor_round_trip(self):
+        token = encode_cursor("2024-01-01 10:00:00", 42)
+        assert decode_cursor(token) == ("2024-01-01 10:00:00", 42)
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+
+class TestContactStore:
+    async def test_pooled_connections_use_wal(self, store):
+        async with store.pool.acquire() as conn:
+            async with conn.execute("PRAGMA journal_mode") as cur:
+                assert (await cur.fetchone())[0] == "wal"
+            async with conn.execute("PRAGMA busy_timeout") as cur:
+                assert (await cur.fetchone())[0] == 5000
+
+    async def test_concurrent_inserts_coalesced(self, store, db_path):
+        batches = []
+        original = store._write_batch
+
+        async def record(batch):
+            batches.append(len(batch))
+            await original(batch)
+
+        store._write_batch = record
+        ids = await asyncio.gather(*(store.insert(_row(i)) for i in range(100)))
+
+        assert sorted(ids) == list(range(1, 101))
+        assert len(batches) < 100
+        conn = sqlite3.connect(db_path)
+        names = dict(conn.execute("SELECT id, name FROM contact_submissions"))
+        conn.close()
+        assert all(names[sid] == f"User {i}" for i, sid in enumerate(ids))
+        assert await store.count() == 100
+
+    async def test_bad_row_does_not_fail_batch(self, store):
+        rows = [_row(0), (None, "x@example.com", None, "s", "m", None, None), _row(2)]
+        results = await asyncio.gather(*(store.insert(r) for r in rows), return_exceptions=True)
+        assert isinstance(results[1], sqlite3.IntegrityError)
+        assert isinstance(results[0], int) and isinstance(results[2], int)
+        assert await store.count() == 2
+
+    async def test_keyset_pagination_walks_all_rows(self, store, db_path):
+        # Ties on submitted_at are broken by id
+        _seed(db_path, [(f"2024-01-01 00:00:{i // 3:02d}", "spam" if i % 4 == 0 else "pending")
+                        for i in range(25)])
+
+        seen, cursor = [], None
+        while True:
+            rows, total, cursor = await store.fetch_page(7, cursor=cursor)
+            seen.extend((r["submitted_at"], r["id"]) for r in rows)
+            assert total == 25
+            if cursor is None:
+                break
+        assert len(seen) == 25
+        assert seen == sorted(seen, reverse=True)
+
+        rows, total, cursor = await store.fetch_page(4, status="spam")
+        assert total == 7 and len(rows) == 4 and cursor is not None
+        rows, _, cursor = await store.fetch_page(4, status="spam", cursor=cursor)
+        assert len(rows) == 3 and cursor is None
+        assert all(r["status"] == "spam" for r in rows)
+
+    async def test_offset_pagination_still_supported(self, store, db_path):
+        _seed(db_path, [(f"2024-01-01 00:00:{i:02d}", "pending") for i in range(10)])
+        rows, total, _ = await store.fetch_page(3, offset=8)
+        assert total == 10
+        assert [r["id"] for r in rows] == [2, 1]
+
+    async def test_fetch_page_leaves_connection_row_factory(self, store, db_path):
+        _seed(db_path, [(f"2024-01-01 00:00:{i:02d}", "pending") for i in range(3)])
+        rows, _, _ = await store.fetch_page(3)
+        assert rows[0]["id"] == 3
+        async with store.pool.acquire() as conn:
+            assert conn.row_factory is None
+
+    async def test_update_status_and_counts(self, store):
+        sid = await store.insert(_row(1))
+        assert await store.update_status(sid, "resolved") is True
+        assert await store.update_status(999, "resolved") is False
+        assert await store.status_counts() == {"resolved": 1}
+        assert await store.count("pending") == 0
+
+    async def test_close_flushes_pending_writes(self, db_path):
+        store = ContactStore(db_path)
+        await store.start()
+        pending = [asyncio.ensure_future(store.insert(_row(i))) for i in range(5)]
+        await asyncio.sleep(0)
+        await store.close()
+        assert [p.result() for p in pending] == [1, 2, 3, 4, 5]
+        with pytest.raises(RuntimeError):
+            await store.insert(_row(6))
+
+
+class TestPoolOptions:
+    async def test_recently_used_connection_skips_probe(self, db_path):
+        config = pool_manager.PoolConfig(
+            db_path=str(db_path), min_size=1, max_size=1, validation_interval=60.0,
+            pragmas={"synchronous": "NORMAL"},
+        )
+        pool = pool_manager.AsyncConnectionPool(config)
+        await pool.initialize()
+        try:
+            async with pool.acquire() as conn:
+                async with conn.execute("PRAGMA synchronous") as cur:
+                    assert (await cur.fetchone())[0] == 1
+            pooled = pool._pool.get_nowait()
+            pooled.validate = Mock(side_effect=AssertionError("probe not expected"))
+            assert await pool._validate_connection(pooled) is True
+            pool._pool.put_nowait(pooled)
+        finally:
+            await pool.close()
+
+    def test_invalid_pragma_name_rejected(self):
+        config = pool_manager.PoolConfig(pragmas={"journal_mode; DROP": "WAL"})
+        with pytest.raises(ValueError):
+            config.validate()
+
+
+class TestContactRoutes:
+    @pytest.fixture
+    async def contact(self, db_path, real_aiosqlite, monkeypatch):
+        from api import contact
+        monkeypatch.setattr(contact, "DB_PATH", db_path)
+        monkeypatch.setattr(contact, "aiosqlite", real_aiosqlite)
+        yield contact
+        await contact.close_contact_store()
+
+    async def test_submit_then_page_with_cursor(self, contact):
+        submission = contact.ContactSubmission(
+            name="Jane Doe", email="jane@example.com",
+            subject="Hello", message="A long enough message here please.",
+        )
+        ids = await asyncio.gather(*(
+            contact.save_submission(submission, "1.2.3.4", "agent") for _ in range(3)
+        ))
+        assert sorted(ids) == [1, 2, 3]
+
+        page = await contact.get_submissions(
+            limit=2, offset=0, status_filter=None, cursor=None, current_user=None
+        )
+        assert page.total == 3 and len(page.submissions) == 2
+        page = await contact.get_submissions(
+            limit=2, offset=0, status_filter=None, cursor=page.next_cursor, current_user=None
+        )
+        assert [s.id for s in page.submissions] == [1] and page.next_cursor is None
+
+    async def test_malformed_cursor_rejected(self, contact):
+        with pytest.raises(contact.HTTPException) as exc:
+            await contact.get_submissions(
+                limit=2, offset=0, status_filter=None, cursor="%%%", current_user=None
+            )
+        assert exc.value.status_code == 400
@@ -0,0 +1,302 @@
+"""
+Unit tests for the pure-ASGI request pipeline (src/api/middleware/pipeline.py)
+
+The pipeline is driven directly through the ASGI interface so the tests do
+not depend on an HTTP client.
+"""
+
+import asyncio
+import gzip
+import json
+
+import pytest
+import zstandard as zstd
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+
+from core.connection_limiter import AdmissionController, GradientLimit, Priority, PriorityPolicy
+
+from api.middleware.pipeline import (
+    AdmissionControlStage,
+    CorrelationIdStage,
+    LatencyStage,
+    RateLimitStage,
+    RequestPipeline,
+    ResponseCompressionStage,
+    SampledLoggingStage,
+    ZstdDecompressionStage,
+    stage,
+)
+
+
+def build_app(stages, skip=None, cors_origins=None):
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        body = await request.body()
+        return {"size": len(body), "correlation_id": request.state.correlation_id
+                if hasattr(request.state, "correlation_id") else None}
+
+    @app.get("/big")
+    async def big():
+        return {"data": "x" * 5000}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(5):
+                yield b"y" * 1000
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    if cors_origins:
+        app.add_middleware(CORSMiddleware, allow_origins=cors_origins, allow_credentials=True)
+    app.add_middleware(RequestPipeline, stages=stages, skip=skip)
+    return app
+
+
+def call(app, method, path, body=b"", headers=None, chunk_size=None):
+    """Invoke an ASGI app and return (status, headers dict, body)."""
+    return asyncio.run(call_async(app, method, path, body, headers, chunk_size))
+
+
+async def call_async(app, method, path, body=b"", headers=None, chunk_size=None):
+    """call() on the running event loop; body chunks yield to other tasks."""
+    headers = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    chunks = [body] if not chunk_size else [
+        body[i:i + chunk_size] for i in range(0, len(body), chunk_size)
+    ] or [b""]
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "path": path, "raw_path": path.encode(), "query_string": b"",
+        "headers": headers, "client": ("127.0.0.1", 1234), "server": ("test", 80),
+        "scheme": "http", "root_path": "",
+    }
+    pending = list(chunks)
+    messages = []
+
+    async def receive():
+        await asyncio.sleep(0)
+        if pending:
+            chunk = pending.pop(0)
+            return {"type": "http.request", "body": chunk, "more_body": bool(pending)}
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    start = next(m for m in messages if m["type"] == "http.response.start")
+    response_headers = {k.decode(): v.decode() for k, v in start["headers"]}
+    payload = b"".join(m.get("body", b"") for m in messages if m["type"] == "http.response.body")
+    return start["status"], response_headers, payload
+
+
+class FakeLimiter:
+    def __init__(self, allowed):
+        self.allowed = allowed
+        self.calls = 0
+
+    async def is_allowed(self):
+        self.calls += 1
+        return self.allowed
+
+    def get_retry_after(self):
+        return 3
+
+
+class TestRequestPipeline:
+    def test_correlation_id_generated_and_echoed(self):
+        app = build_app([stage(CorrelationIdStage)])
+        status, headers, body = call(app, "POST", "/echo", b"{}")
+        assert status == 200
+        assert headers["x-correlation-id"] == json.loads(body)["correlation_id"]
+
+    def test_correlation_id_propagated(self):
+        app = build_app([stage(CorrelationIdStage)])
+        _, headers, _ = call(app, "POST", "/echo", b"", {"X-Correlation-ID": "abc-123"})
+        assert headers["x-correlation-id"] == "abc-123"
+
+        _, headers, _ = call(app, "POST", "/echo", b"", {"X-Correlation-ID": "bad value\n"})
+        assert headers["x-correlation-id"] != "bad value\n"
+
+    def test_latency_histogram_observed(self):
+        observed = []
+
+        class Histogram:
+            def observe(self, value):
+                observed.append(value)
+
+        completions = []
+        app = build_app([stage(
+            LatencyStage, histogram=Histogram(),
+            on_complete=lambda scope, status, duration: completions.append(status)
+        )])
+        call(app, "GET", "/health")
+        assert len(observed) == 1 and observed[0] >= 0
+        assert completions == [200]
+
+    def test_rate_limit_blocks_and_skips_per_route(self):
+        limiter = FakeLimiter(allowed=False)
+        app = build_app(
+            [stage(RateLimitStage, resolve_limiter=lambda path: (limiter, "api"))],
+            skip={"/health": {"rate_limit"}},
+        )
+        status, headers, body = call(app, "GET", "/big")
+        assert status == 429
+        assert headers["retry-after"] == "3"
+        assert json.loads(body)["retry_after"] == 3
+
+        status, _, _ = call(app, "GET", "/health")
+        assert status == 200
+        assert limiter.calls == 1
+
+    def test_unknown_skip_stage_rejected(self):
+        with pytest.raises(ValueError):
+            RequestPipeline(FastAPI(), [stage(LatencyStage)], skip={"/x": {"nope"}})
+
+    def test_sampled_logging_passes_through(self):
+        app = build_app([stage(SampledLoggingStage, sample_rate=0.0)])
+        assert call(app, "GET", "/health")[0] == 200
+        assert call(app, "GET", "/big")[0] == 200
+
+
+class TestAdmissionControl:
+    @staticmethod
+    def controller(limit=1):
+        return AdmissionController(
+            limit=GradientLimit(initial_limit=limit, min_limit=1, max_limit=limit),
+            policies={Priority.BACKGROUND: PriorityPolicy(1.0, max_queue=0, queue_timeout=0.1)},
+        )
+
+    def test_admits_and_releases(self):
+        controller = self.controller()
+        app = build_app([stage(AdmissionControlStage, controller=controller)])
+        assert call(app, "GET", "/big")[0] == 200
+        stats = controller.get_stats()
+        assert stats["inflight"] == 0
+        assert stats["by_priority"]["normal"]["admitted"] == 1
+
+    def test_sheds_with_503_and_retry_after(self):
+        controller = self.controller()
+        asyncio.run(controller.acquire(Priority.CRITICAL, "ingest"))
+        app = build_app(
+            [stage(AdmissionControlStage, controller=controller,
+                   route_priorities={"/big": Priority.BACKGROUND})],
+            skip={"/health": {"admission"}},
+        )
+        status, headers, body = call(app, "GET", "/big", headers={"X-API-Key": "k1"})
+        assert status == 503
+        assert int(headers["retry-after"]) >= 1
+        assert json.loads(body)["reason"] == "queue_full"
+
+        assert call(app, "GET", "/health")[0] == 200
+
+    def test_route_priority_and_tenant(self):
+        admission = AdmissionControlStage(
+            FastAPI(), controller=self.controller(),
+            route_priorities={"/api/v1/telemetry": Priority.CRITICAL, "/api/v1": Priority.BACKGROUND},
+        )
+        assert admission.priority_for("/api/v1/telemetry/batch") is Priority.CRITICAL
+        assert admission.priority_for("/api/v1/history/anomalies") is Priority.BACKGROUND
+        assert admission.priority_for("/other") is Priority.NORMAL
+
+        scope = {"headers": [(b"x-api-key", b"abc")], "client": ("10.0.0.1", 1)}
+        assert admission.tenant_for(scope) == "key:abc"
+        assert admission.tenant_for({"headers": [], "client": ("10.0.0.1", 1)}) == "ip:10.0.0.1"
+
+
+class TestZstdDecompression:
+    def test_streaming_decompression(self):
+        payload = json.dumps({"values": list(range(5000))}).encode()
+        compressed = zstd.ZstdCompressor().compress(payload)
+        app = build_app([stage(ZstdDecompressionStage)])
+
+        status, _, body = call(
+            app, "POST", "/echo", compressed, {"Content-Encoding": "zstd"}, chunk_size=1000
+        )
+        assert status == 200
+        assert json.loads(body)["size"] == len(payload)
+
+    def test_concurrent_streams_do_not_share_state(self):
+        payloads = [json.dumps({"values": list(range(start, start + 5000))}).encode() for start in (0, 10**6)]
+        app = build_app([stage(ZstdDecompressionStage)])
+
+        async def both():
+            return await asyncio.gather(*(
+                call_async(app, "POST", "/echo", zstd.ZstdCompressor().compress(payload),
+                           {"Content-Encoding": "zstd"}, chunk_size=500)
+                for payload in payloads
+            ))
+
+        for (status, _, body), payload in zip(asyncio.run(both()), payloads):
+            assert status == 200
+            assert json.loads(body)["size"] == len(payload)
+
+    def test_max_size_guard(self):
+        compressed = zstd.ZstdCompressor().compress(b"a" * 200_000)
+        app = build_app([stage(ZstdDecompressionStage, max_size=50_000, write_size=4096)])
+
+        status, _, body = call(app, "POST", "/echo", compressed, {"Content-Encoding": "zstd"})
+        assert status == 413
+        assert body == b"Request body too large"
+
+    def test_corrupt_body_rejected(self):
+        app = build_app([stage(ZstdDecompressionStage)])
+        status, _, _ = call(app, "POST", "/echo", b"not zstd at all", {"Content-Encoding": "zstd"})
+        assert status == 400
+
+    def test_plain_body_untouched(self):
+        app = build_app([stage(ZstdDecompressionStage)])
+        status, _, body = call(app, "POST", "/echo", b"hello")
+        assert status == 200 and json.loads(body)["size"] == 5
+
+
+class TestResponseCompression:
+    def test_prefers_zstd(self):
+        app = build_app([stage(ResponseCompressionStage)])
+        status, headers, body = call(app, "GET", "/big", headers={"Accept-Encoding": "gzip, zstd"})
+        assert status == 200
+        assert headers["content-encoding"] == "zstd"
+        assert int(headers["content-length"]) == len(body)
+        assert json.loads(zstd.ZstdDecompressor().decompress(body))["data"] == "x" * 5000
+
+    def test_vary_keeps_cors_origin(self):
+        app = build_app([stage(ResponseCompressionStage)], cors_origins=["https://a.example"])
+        _, headers, _ = call(
+            app, "GET", "/big", headers={"Accept-Encoding": "gzip", "Origin": "https://a.example"}
+        )
+        assert headers["content-encoding"] == "gzip"
+        assert headers["access-control-allow-origin"] == "https://a.example"
+        tokens = [t.strip().lower() for t in headers["vary"].split(",")]
+        assert tokens == ["origin", "accept-encoding"]
+
+    def test_gzip_and_q_zero(self):
+        app = build_app([stage(ResponseCompressionStage)])
+        _, headers, body = call(app, "GET", "/big", headers={"Accept-Encoding": "zstd;q=0, gzip"})
+        assert headers["content-encoding"] == "gzip"
+        assert json.loads(gzip.decompress(body))["data"] == "x" * 5000
+
+    def test_small_and_unaccepted_responses_untouched(self):
+        app = build_app([stage(ResponseCompressionStage)])
+        _, headers, _ = call(app, "GET", "/health", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in headers
+        _, headers, _ = call(app, "GET", "/big")
+        assert "content-encoding" not in headers
+
+    def test_streaming_response_compressed(self):
+        app = build_app([stage(ResponseCompressionStage)])
+        _, headers, body = call(app, "GET", "/stream", headers={"Accept-Encoding": "gzip"})
+        assert headers["content-encoding"] == "gzip"
+        assert "content-length" not in headers
+        assert gzip.decompress(body) == b"y" * 5000
+
+    def test_skip_compression_per_route(self):
+        app = build_app([stage(ResponseCompressionStage)], skip={"/big": {"compression"}})
+        _, headers, _ = call(app, "GET", "/big", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in headers
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for anomaly detection model scoring
+
+An IsolationForest (100 trees) fitted on synthetic 5-feature telemetry,
+scored the way detect_anomaly() scores it:
+
+- the previous path: predict() and score_samples() of the estimator, run
+  concurrently in worker threads;
+- the compiled ensemble (anomaly.tree_scoring), scored inline.
+
+Single rows (ROWS_SINGLE calls) and one BATCH_ROWS (10k) batch each;
+the batch is also run end to end through detect_anomaly_batch(), which
+validates every record and scores batches above INLINE_SCORING_MAX_ROWS
+with the compiled ensemble in a worker thread.
+Run with: pytest tests/benchmarks/bench_anomaly_scoring.py --benchmark-only
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+from sklearn.ensemble import IsolationForest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from anomaly import anomaly_detector
+from anomaly.tree_scoring import compile_and_verify
+
+ROWS_SINGLE = 200
+BATCH_ROWS = 10_000
+FEATURES = ["voltage", "temperature", "gyro", "current", "wheel_speed"]
+
+_rng = np.random.default_rng(11)
+
+
+def _telemetry(count):
+    return np.column_stack([
+        _rng.normal(8.0, 0.3, count),
+        _rng.normal(25.0, 3.0, count),
+        np.abs(_rng.normal(0.0, 0.03, count)),
+        _rng.normal(1.0, 0.1, count),
+        _rng.normal(5.0, 0.5, count),
+    ])
+
+
+MODEL = IsolationForest(n_estimators=100, random_state=0).fit(_telemetry(5_000))
+COMPILED, DEVIATION = compile_and_verify(MODEL)
+SINGLE = [[row.tolist()] for row in _telemetry(ROWS_SINGLE)]
+BATCH = _telemetry(BATCH_ROWS).tolist()
+
+
+async def _estimator_scores(rows):
+    return await asyncio.gather(
+        asyncio.to_thread(MODEL.predict, rows),
+        asyncio.to_thread(MODEL.score_samples, rows),
+    )
+
+
+def test_estimator_single_row(benchmark):
+    async def run():
+        for rows in SINGLE:
+            await _estimator_scores(rows)
+
+    benchmark.pedantic(lambda: asyncio.run(run()), rounds=3, iterations=1)
+    benchmark.extra_info["ms_per_row"] = round(benchmark.stats.stats.median / ROWS_SINGLE * 1000, 3)
+
+
+def test_compiled_single_row(benchmark):
+    def run():
+        for rows in SINGLE:
+            COMPILED.predict_with_scores(rows)
+
+    benchmark.pedantic(run, rounds=3, iterations=1)
+    benchmark.extra_info["ms_per_row"] = round(benchmark.stats.stats.median / ROWS_SINGLE * 1000, 3)
+    benchmark.extra_info["max_deviation"] = DEVIATION
+
+
+def test_estimator_batch_10k(benchmark):
+    benchmark.pedantic(lambda: asyncio.run(_estimator_scores(BATCH)), rounds=3, iterations=1)
+    benchmark.extra_info["rows"] = BATCH_ROWS
+
+
+def test_compiled_batch_10k(benchmark):
+    benchmark.pedantic(COMPILED.predict_with_scores, args=(BATCH,), rounds=3, iterations=1)
+    benchmark.extra_info["rows"] = BATCH_ROWS
+
+
+def test_detect_anomaly_batch_10k(benchmark):
+    records = [dict(zip(FEATURES, row)) for row in BATCH]
+    anomaly_detector._install_model(MODEL, COMPILED, None)
+    try:
+        with patch.object(anomaly_detector, "_get_resource_status_cached", AsyncMock(return_value={"overall": "ok"})):
+            results = benchmark.pedantic(
+                lambda: asyncio.run(anomaly_detector.detect_anomaly_batch(records)), rounds=3, iterations=1
+            )
+    finally:
+        anomaly_detector._MODEL = anomaly_detector._COMPILED_MODEL = None
+        anomaly_detector._MODEL_LOADED = False
+    assert len(results) == BATCH_ROWS
+    benchmark.extra_info["rows"] = BATCH_ROWS
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: calls/sec through a CLOSED circuit breaker
+
+64 concurrent asyncio tasks each make 2,000 calls to a trivial coroutine,
+through the consecutive-failure CircuitBreaker (RLock on every state read
+and record) and the SlidingWindowCircuitBreaker (lock-free closed path).
+A threaded variant drives the synchronous allow_request()/record_success()
+gate from 64 threads. Calls/sec is reported in extra_info.
+Run with: pytest tests/benchmarks/bench_circuit_breaker.py --benchmark-only
+"""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.circuit_breaker import CircuitBreaker, SlidingWindowCircuitBreaker
+
+TASKS = 64
+CALLS_PER_TASK = 2_000
+
+
+async def _noop():
+    return None
+
+
+def _drive_async(breaker):
+    async def worker():
+        call = breaker.call
+        for _ in range(CALLS_PER_TASK):
+            await call(_noop)
+
+    async def run():
+        await asyncio.gather(*(worker() for _ in range(TASKS)))
+
+    asyncio.run(run())
+
+
+def _drive_threads(breaker):
+    def worker():
+        for _ in range(CALLS_PER_TASK):
+            if breaker.allow_request():
+                breaker.record_success()
+
+    threads = [threading.Thread(target=worker) for _ in range(TASKS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def _calls_per_second(benchmark):
+    benchmark.extra_info["calls_per_second"] = round(TASKS * CALLS_PER_TASK / benchmark.stats.stats.median)
+
+
+def test_consecutive_breaker_async(benchmark):
+    breaker = CircuitBreaker(name="bench_consecutive")
+    benchmark.pedantic(_drive_async, args=(breaker,), rounds=3, iterations=1)
+    _calls_per_second(benchmark)
+
+
+def test_sliding_window_breaker_async(benchmark):
+    breaker = SlidingWindowCircuitBreaker(name="bench_sliding")
+    benchmark.pedantic(_drive_async, args=(breaker,), rounds=3, iterations=1)
+    _calls_per_second(benchmark)
+
+
+def test_consecutive_breaker_threads(benchmark):
+    breaker = CircuitBreaker(name="bench_consecutive_threads")
+    benchmark.pedantic(_drive_threads, args=(breaker,), rounds=3, iterations=1)
+    _calls_per_second(benchmark)
+
+
+def test_sliding_window_breaker_threads(benchmark):
+    breaker = SlidingWindowCircuitBreaker(name="bench_sliding_threads")
+    benchmark.pedantic(_drive_threads, args=(breaker,), rounds=3, iterations=1)
+    _calls_per_second(benchmark)
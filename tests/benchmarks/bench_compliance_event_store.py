@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the compliance event store
+
+Seeds EVENTS audit/access events for USERS users (about 100 each) and
+compares subject-access and erasure requests against the previous approach:
+a linear scan over the in-memory event list. Store lookups are index range
+scans, so their cost follows the size of one user's history rather than the
+size of the table. Retention enforcement (one indexed range delete) is
+timed on its own; events/sec and rows touched are reported in extra_info.
+Run with: pytest tests/benchmarks/bench_compliance_event_store.py --benchmark-only
+"""
+
+import asyncio
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.compliance.data_retention import DataRetentionPolicy, DataType
+from src.compliance.event_store import INSERT_SQL, SCHEMA, ComplianceEventStore
+
+EVENTS = 1_000_000
+USERS = 10_000
+NOW = datetime(2024, 6, 1)
+
+random.seed(11)
+_TMP = tempfile.TemporaryDirectory()
+DB_PATH = Path(_TMP.name) / "events.db"
+
+
+def _events():
+    for i in range(EVENTS):
+        when = NOW - timedelta(seconds=(EVENTS - i) * 30)  # ~1 year of history, oldest first
+        user = f"user{random.randrange(USERS)}"
+        data_type = DataType.USER_DATA if i % 4 == 0 else DataType.AUDIT_LOGS
+        yield {
+            "event_id": f"EVT-{i:08d}", "timestamp": when.isoformat(),
+            "event_type": "login" if data_type is DataType.USER_DATA else "data_access",
+            "user_id": user, "action": "benchmark",
+        }, data_type
+
+
+LEGACY_EVENTS = []
+
+
+def _seed():
+    conn = sqlite3.connect(DB_PATH)
+    for statement in SCHEMA:
+        conn.execute(statement)
+    rows = []
+    for event, data_type in _events():
+        LEGACY_EVENTS.append(event)
+        rows.append((
+            event["event_id"], "audit", data_type.value, event["event_type"], event["user_id"],
+            datetime.fromisoformat(event["timestamp"]).timestamp(), json.dumps(event),
+        ))
+    with conn:
+        conn.executemany(INSERT_SQL, rows)
+    conn.close()
+
+
+_seed()
+SUBJECTS = [f"user{random.randrange(USERS)}" for _ in range(20)]
+
+
+def _with_store(operation):
+    async def run():
+        store = ComplianceEventStore(DB_PATH)
+        await store.start()
+        try:
+            return await operation(store)
+        finally:
+            await store.close()
+
+    return asyncio.run(run())
+
+
+def test_legacy_subject_access(benchmark):
+    """Previous approach: filter every in-memory event per request."""
+    def run():
+        return sum(len([e for e in LEGACY_EVENTS if e.get("user_id") == user]) for user in SUBJECTS)
+
+    found = benchmark.pedantic(run, rounds=3, iterations=1)
+    benchmark.extra_info["requests"] = len(SUBJECTS)
+    benchmark.extra_info["events_returned"] = found
+
+
+def test_store_subject_access(benchmark):
+    """Indexed (user_id, ts) lookups through ComplianceEventStore.query_events."""
+    async def operation(store):
+        return sum([len(await store.query_events(user_id=user)) for user in SUBJECTS])
+
+    found = benchmark.pedantic(lambda: _with_store(operation), rounds=3, iterations=1)
+    benchmark.extra_info["requests"] = len(SUBJECTS)
+    benchmark.extra_info["events_returned"] = found
+
+
+def test_store_subject_export(benchmark):
+    """Streaming NDJSON export of one user's history per request."""
+    async def operation(store):
+        written = 0
+        for user in SUBJECTS:
+            async for chunk in store.export_chunks("ndjson", user_id=user):
+                written += len(chunk)
+        return written
+
+    written = benchmark.pedantic(lambda: _with_store(operation), rounds=3, iterations=1)
+    benchmark.extra_info["bytes_exported"] = written
+
+
+def test_legacy_erasure(benchmark):
+    """Previous approach: rebuild the event list without the user."""
+    def run():
+        events = LEGACY_EVENTS
+        for user in SUBJECTS:
+            events = [e for e in events if e.get("user_id") != user]
+        return len(LEGACY_EVENTS) - len(events)
+
+    removed = benchmark.pedantic(run, rounds=1, iterations=1)
+    benchmark.extra_info["events_erased"] = removed
+
+
+def test_store_erasure(benchmark):
+    """Indexed batched deletes through ComplianceEventStore.erase_user."""
+    async def operation(store):
+        return sum([await store.erase_user(user) for user in SUBJECTS])
+
+    removed = benchmark.pedantic(lambda: _with_store(operation), rounds=1, iterations=1)
+    benchmark.extra_info["events_erased"] = removed
+
+
+def test_store_retention(benchmark):
+    """Range delete of user_data events older than 90 days."""
+    policy = DataRetentionPolicy()
+    policy.set_retention_period(DataType.USER_DATA, 90)
+
+    deleted = benchmark.pedantic(
+        lambda: _with_store(lambda store: store.enforce_retention(policy, now=NOW)), rounds=1, iterations=1
+    )
+    benchmark.extra_info["deleted"] = deleted
+    benchmark.extra_info["rows_per_second"] = round(
+        sum(deleted.values()) / benchmark.stats.stats.median
+    )
@@ -3,17 +3,24 @@
 Microbenchmarks for Safe Condition Parser
 
 Benchmarks expression parsing and evaluation performance.
-Run with: pytest benchmarks/bench_condition_parser.py --benchmark-only
+Run with: pytest tests/benchmarks/bench_condition_parser.py --benchmark-only
 """
 
 import pytest
 import sys
 from pathlib import Path
 
-# Add project root to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+import numpy as np
 
-from backend.safe_condition_parser import safe_evaluate_condition as evaluate, SafeConditionParser
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from backend.safe_condition_parser import (
+    safe_evaluate_condition as evaluate,
+    SafeConditionParser,
+    compile_condition,
+    evaluate_conditions,
+)
 
 
 # Sample conditions of varying complexity
@@ -168,3 +175,44 @@ def test_evaluate_inequality(benchmark):
     
     result = benchmark(eval_inequality)
     assert result is True
+
+
+def test_compile_uncached_complex_condition(benchmark):
+    """Benchmark a cold parse + fold + compile (cache bypassed)."""
+
+    def compile_cold():
+        return compile_condition.__wrapped__(COMPLEX_CONDITION)
+
+    result = benchmark(compile_cold)
+    assert result.evaluate(CONTEXT) is True
+
+
+def test_evaluate_precompiled_complex_condition(benchmark):
+    """Benchmark evaluating an already compiled condition."""
+    condition = compile_condition(COMPLEX_CONDITION)
+
+    result = benchmark(condition.evaluate, CONTEXT)
+    assert result is True
+
+
+def test_evaluate_100_rules_one_snapshot(benchmark):
+    """Benchmark batch evaluation of 100 rules against one snapshot."""
+    rules = [f"severity >= 0.{i % 10} and step < {i % 12}" for i in range(100)]
+
+    result = benchmark(evaluate_conditions, rules, CONTEXT)
+    assert len(result) == 100
+
+
+def test_evaluate_rule_over_100k_snapshots(benchmark):
+    """Benchmark backtesting one rule over a NumPy column of 100k snapshots."""
+    rng = np.random.default_rng(0)
+    columns = {
+        "severity": rng.random(100_000),
+        "confidence": rng.random(100_000),
+        "recurrence_count": rng.integers(0, 6, 100_000),
+        "step": rng.integers(0, 12, 100_000),
+    }
+    condition = compile_condition(COMPLEX_CONDITION)
+
+    result = benchmark(condition.evaluate_columns, columns)
+    assert result.shape == (100_000,)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for ConfidenceScorer
+
+Scores DECISIONS decisions (random factors, all mission phases):
+
+- calculate_confidence() once per decision (previous path);
+- calculate_confidence_batch() on NumPy columns with phase names;
+- calculate_confidence_batch() with phases pre-encoded by encode_phases().
+
+decisions/sec is reported in extra_info.
+Run with: pytest tests/benchmarks/bench_confidence_scorer.py --benchmark-only
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.anomaly_agent.confidence_scorer import ConfidenceScorer
+
+DECISIONS = 100_000
+
+_rng = np.random.default_rng(4)
+COLUMNS = {
+    "anomaly_scores": _rng.random(DECISIONS),
+    "recurrence_counts": _rng.integers(0, 30, DECISIONS),
+    "mission_phases": _rng.choice(list(ConfidenceScorer.PHASE_RISK), DECISIONS),
+    "policy_allowed": _rng.random(DECISIONS) > 0.2,
+    "temporal_decay": _rng.random(DECISIONS),
+}
+ROWS = list(zip(
+    COLUMNS["anomaly_scores"].tolist(),
+    COLUMNS["recurrence_counts"].tolist(),
+    COLUMNS["mission_phases"].tolist(),
+    COLUMNS["policy_allowed"].tolist(),
+    COLUMNS["temporal_decay"].tolist(),
+))
+
+
+def _report(benchmark):
+    benchmark.extra_info["decisions"] = DECISIONS
+    benchmark.extra_info["decisions_per_second"] = round(DECISIONS / benchmark.stats.stats.median)
+
+
+def test_scalar_scoring(benchmark):
+    scorer = ConfidenceScorer()
+
+    def run():
+        return [scorer.calculate_confidence(*row) for row in ROWS]
+
+    benchmark.pedantic(run, rounds=3, iterations=1)
+    _report(benchmark)
+
+
+def test_batch_scoring(benchmark):
+    scorer = ConfidenceScorer()
+    result = benchmark.pedantic(lambda: scorer.calculate_confidence_batch(**COLUMNS), rounds=10, iterations=1)
+    assert result.shape == (DECISIONS,)
+    _report(benchmark)
+
+
+def test_batch_scoring_encoded_phases(benchmark):
+    scorer = ConfidenceScorer()
+    columns = dict(COLUMNS, mission_phases=scorer.encode_phases(COLUMNS["mission_phases"]))
+    benchmark.pedantic(lambda: scorer.calculate_confidence_batch(**columns), rounds=10, iterations=1)
+    _report(benchmark)
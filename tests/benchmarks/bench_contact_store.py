@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the contact submission data layer
+
+- 1000 concurrent submits: a fresh aiosqlite connection per insert (previous
+  save_submission) vs the pooled, WAL-mode ContactStore with coalesced writes.
+- Deep pagination at 1M rows: COUNT(*) + LIMIT/OFFSET (previous
+  get_submissions) vs keyset pagination on (submitted_at, id) with the
+  maintained counts table.
+Run with: pytest tests/benchmarks/bench_contact_store.py --benchmark-only
+"""
+
+import asyncio
+import sqlite3
+import sys
+from pathlib import Path
+
+import aiosqlite
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.contact_store import (
+    COUNT_ALL_SQL,
+    INSERT_SQL,
+    PAGE_SQL,
+    SCHEMA,
+    ContactStore,
+    apply_schema,
+)
+
+SUBMITS = 1000
+ROWS = 1_000_000
+PAGE = 50
+DEPTH = 900_000
+ROW = ("Jane Doe", "jane@example.com", None, "Subject", "A long enough message body.", "1.2.3.4", "agent")
+
+LEGACY_COUNT_SQL = "SELECT COUNT(*) AS total FROM contact_submissions"
+LEGACY_PAGE_SQL = """
+    SELECT id, name, email, phone, subject, message,
+           ip_address, user_agent, submitted_at, status
+    FROM contact_submissions
+    ORDER BY submitted_at DESC
+    LIMIT ? OFFSET ?
+"""
+
+
+def _fresh_db(directory: Path, name: str) -> Path:
+    path = directory / name
+    if path.exists():
+        path.unlink()
+    conn = sqlite3.connect(path)
+    conn.execute(SCHEMA[0])
+    conn.close()
+    return path
+
+
+async def _legacy_submit(path: Path) -> int:
+    async with aiosqlite.connect(path) as conn:
+        cursor = await conn.execute(INSERT_SQL, ROW)
+        await conn.commit()
+        return cursor.lastrowid
+
+
+def _submits_legacy(path: Path) -> int:
+    """Returns the number of submits that failed (e.g. "database is locked")."""
+    async def run():
+        return await asyncio.gather(*(_legacy_submit(path) for _ in range(SUBMITS)), return_exceptions=True)
+
+    return sum(isinstance(result, sqlite3.Error) for result in asyncio.run(run()))
+
+
+def _submits_store(path: Path) -> None:
+    async def run():
+        store = ContactStore(path)
+        await store.start()
+        try:
+            await asyncio.gather(*(store.insert(ROW) for _ in range(SUBMITS)))
+        finally:
+            await store.close()
+
+    asyncio.run(run())
+
+
+@pytest.fixture(scope="module")
+def million_rows(tmp_path_factory):
+    """1M submissions spread over ~11 days, ten rows per second."""
+    path = tmp_path_factory.mktemp("contact") / "million.db"
+    conn = sqlite3.connect(path)
+    conn.execute(SCHEMA[0])
+    with conn:
+        conn.executemany(
+            "INSERT INTO contact_submissions (name, email, subject, message, submitted_at, status) "
+            "VALUES ('n', 'e@x.io', 's', 'message', datetime(1700000000 + ? / 10, 'unixepoch'), ?)",
+            ((i, "spam" if i % 7 == 0 else "pending") for i in range(ROWS)),
+        )
+    # Indices, WAL and the counts table are built after the bulk load
+    apply_schema(conn)
+    cursor_row = conn.execute(
+        "SELECT submitted_at, id FROM contact_submissions "
+        "ORDER BY submitted_at DESC, id DESC LIMIT 1 OFFSET ?",
+        (DEPTH - 1,),
+    ).fetchone()
+    yield conn, cursor_row
+    conn.close()
+
+
+def test_concurrent_submits_legacy(benchmark, tmp_path):
+    """1000 concurrent submits, one connection per insert (previous path)."""
+    failed = benchmark.pedantic(
+        _submits_legacy, setup=lambda: ((_fresh_db(tmp_path, "legacy.db"),), {}),
+        rounds=3, iterations=1,
+    )
+    benchmark.extra_info["failed_submits"] = failed
+
+
+def test_concurrent_submits_store(benchmark, tmp_path):
+    """1000 concurrent submits through the pooled store with write coalescing."""
+    benchmark.pedantic(
+        _submits_store, setup=lambda: ((_fresh_db(tmp_path, "store.db"),), {}),
+        rounds=3, iterations=1,
+    )
+
+
+def test_deep_page_offset(benchmark, million_rows):
+    """COUNT(*) + OFFSET 900k on 1M rows (previous get_submissions)."""
+    conn, _ = million_rows
+
+    def page():
+        conn.execute(LEGACY_COUNT_SQL).fetchone()
+        return conn.execute(LEGACY_PAGE_SQL, (PAGE, DEPTH)).fetchall()
+
+    assert len(benchmark(page)) == PAGE
+
+
+def test_deep_page_keyset(benchmark, million_rows):
+    """Keyset page at the same depth plus the maintained total."""
+    conn, (submitted_at, last_id) = million_rows
+    query = PAGE_SQL[(False, True)]
+
+    def page():
+        conn.execute(COUNT_ALL_SQL).fetchone()
+        return conn.execute(query, (submitted_at, last_id, PAGE + 1)).fetchall()
+
+    assert len(benchmark(page)) == PAGE + 1
+
+
+def test_first_page_keyset(benchmark, million_rows):
+    """First page for comparison: keyset cost does not depend on depth."""
+    conn, _ = million_rows
+    query = PAGE_SQL[(False, False)]
+
+    def page():
+        conn.execute(COUNT_ALL_SQL).fetchone()
+        return conn.execute(query, (PAGE + 1, 0)).fetchall()
+
+    assert len(benchmark(page)) == PAGE + 1
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for deadlock detection with 100k tasks
+
+100k tasks in wait chains of 100 (each task holds one resource and waits for
+the next task's resource):
+- Previous detector: every check rebuilds the owner map and wait-for graph
+  and runs a recursive DFS. Fed the same graph, it cannot recurse down a
+  single 100k-deep chain at all (reported as recursion_error in extra_info).
+- Incremental detector: registering all 100k dependencies (each insert checks
+  only the chain its edge extends), the latency of detecting the closing
+  edge of a cycle, and a full Tarjan scan.
+Run with: pytest tests/benchmarks/bench_deadlock_detector.py --benchmark-only
+"""
+
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.deadlock_detector import DeadlockDetector, DeadlockStatus
+
+TASKS = 100_000
+CHAIN = 100
+
+
+def _chains(detector: DeadlockDetector) -> None:
+    """Register TASKS tasks in wait chains of CHAIN; the chain tails wait on nothing held."""
+    for i in range(TASKS):
+        waiting = f"r{i + 1}" if (i + 1) % CHAIN else f"free{i}"
+        detector.register_dependency(f"t{i}", f"r{i}", waiting_for=waiting)
+
+
+def _legacy_graph(edges):
+    """Wait-for graph as the previous detect_deadlock built it each check."""
+    graph = defaultdict(set)
+    owners = {resource: task for task, resource, _ in edges}
+    for task, _, waiting in edges:
+        owner = owners.get(waiting)
+        if owner:
+            graph[task].add(owner)
+    return graph
+
+
+def _legacy_find_cycle(graph):
+    """The previous recursive DFS (first cycle only)."""
+    visited, rec_stack, path = set(), set(), []
+
+    def dfs(node):
+        visited.add(node)
+        rec_stack.add(node)
+        path.append(node)
+        for neighbor in graph.get(node, set()):
+            if neighbor not in visited:
+                result = dfs(neighbor)
+                if result:
+                    return result
+            elif neighbor in rec_stack:
+                return path[path.index(neighbor):] + [neighbor]
+        path.pop()
+        rec_stack.remove(node)
+        return None
+
+    for node in list(graph):
+        if node not in visited:
+            result = dfs(node)
+            if result:
+                return result
+    return []
+
+
+EDGES = [(f"t{i}", f"r{i}", f"r{i + 1}" if (i + 1) % CHAIN else f"free{i}") for i in range(TASKS)]
+
+
+def test_legacy_periodic_check(benchmark):
+    """Previous check: rebuild graph + recursive DFS over 100k tasks."""
+    benchmark(lambda: _legacy_find_cycle(_legacy_graph(EDGES)))
+    deep = [(f"t{i}", f"r{i}", f"r{i + 1}") for i in range(TASKS)]
+    try:
+        _legacy_find_cycle(_legacy_graph(deep))
+        benchmark.extra_info["recursion_error"] = False
+    except RecursionError:
+        benchmark.extra_info["recursion_error"] = True
+
+
+def test_incremental_register(benchmark):
+    """Registering 100k dependencies with per-insert cycle checks."""
+    benchmark.pedantic(lambda: _chains(DeadlockDetector()), rounds=3, iterations=1)
+    benchmark.extra_info["per_insert_us"] = round(benchmark.stats.stats.median / TASKS * 1e6, 2)
+
+
+def test_closing_edge_detection(benchmark):
+    """Latency from the cycle-closing edge to the report, with 100k tasks tracked."""
+    detector = DeadlockDetector()
+    _chains(detector)
+    tail = CHAIN - 1
+
+    def close_and_reopen():
+        report = detector.register_dependency(f"t{tail}", f"r{tail}", waiting_for="r0")
+        detector.register_dependency(f"t{tail}", f"r{tail}", waiting_for=f"free{tail}")
+        return report
+
+    assert benchmark(close_and_reopen).status == DeadlockStatus.DEADLOCK_DETECTED
+
+
+def test_full_tarjan_scan(benchmark):
+    """Full scan over 100k tasks (all cycles, iterative)."""
+    detector = DeadlockDetector()
+    _chains(detector)
+    assert benchmark(detector.detect_deadlock).status == DeadlockStatus.NO_DEADLOCK
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the async decision service
+
+REQUESTS decision requests arrive as a burst from many satellites, covering
+SITUATIONS distinct (anomaly, phase) situations. The model is the mock
+response with MODEL_LATENCY seconds of injected latency:
+
+- sequential AgenticDecisionLoop.run() calls (previous behaviour);
+- AsyncDecisionService with the cache disabled (worker pool only);
+- AsyncDecisionService with caching and single-flight coalescing.
+
+decisions/sec and model calls are reported in extra_info.
+Run with: pytest tests/benchmarks/bench_decision_service.py --benchmark-only
+"""
+
+import asyncio
+import itertools
+import logging
+import random
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.agents.agentic_decision_loop import AgenticDecisionLoop
+from src.agents.core.engine import PromptEngine
+from src.agents.decision_service import AsyncDecisionService
+
+TEMPLATE_DIR = str(Path(__file__).parent.parent.parent / "src" / "agents" / "prompts")
+REQUESTS = 200
+SITUATIONS = 10
+MODEL_LATENCY = 0.02
+WORKERS = 8
+
+random.seed(21)
+logging.getLogger("src.agents.agentic_decision_loop").setLevel(logging.WARNING)
+
+_KINDS = list(itertools.product(
+    ["thermal", "power", "attitude", "comms", "payload"], ["NOMINAL_OPS", "SAFE_MODE"]
+))[:SITUATIONS]
+
+WORKLOAD = []
+for i in range(REQUESTS):
+    anomaly, phase = random.choice(_KINDS)
+    sat = f"SAT-{random.randrange(200):03d}"
+    WORKLOAD.append((
+        f"Investigate {anomaly} anomaly on {sat}",
+        {"telemetry": {"satellite_id": sat, "anomaly": anomaly, "severity": 0.8}, "system_state": phase},
+    ))
+
+
+def _loop():
+    loop = AgenticDecisionLoop("bench", PromptEngine(TEMPLATE_DIR), mock_latency_seconds=MODEL_LATENCY)
+    loop.client = None
+    return loop
+
+
+def _report(benchmark, model_calls):
+    benchmark.extra_info["requests"] = REQUESTS
+    benchmark.extra_info["model_calls"] = model_calls
+    benchmark.extra_info["decisions_per_second"] = round(REQUESTS / benchmark.stats.stats.median)
+
+
+def test_sequential_loop(benchmark):
+    loop = _loop()
+
+    def run():
+        for task, context in WORKLOAD:
+            loop.run(task, context)
+
+    benchmark.pedantic(run, rounds=1, iterations=1)
+    _report(benchmark, REQUESTS)
+
+
+def _service_run(cached):
+    loop = _loop()
+    unique = itertools.count()
+    normalizer = None if cached else (lambda *args: {"request": next(unique)})
+
+    async def burst():
+        async with AsyncDecisionService(loop, max_workers=WORKERS, normalizer=normalizer) as service:
+            await asyncio.gather(*[service.decide(task, context) for task, context in WORKLOAD])
+            return service.metrics.to_dict()
+
+    return asyncio.run(burst())
+
+
+def test_service_pool_only(benchmark):
+    stats = benchmark.pedantic(lambda: _service_run(cached=False), rounds=3, iterations=1)
+    _report(benchmark, stats["outcomes"]["miss"]["count"])
+
+
+def test_service_cached(benchmark):
+    stats = benchmark.pedantic(lambda: _service_run(cached=True), rounds=3, iterations=1)
+    assert stats["outcomes"]["miss"]["count"] == SITUATIONS
+    _report(benchmark, stats["outcomes"]["miss"]["count"])
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for feedback → policy learning
+
+With HISTORY feedback events already pinned, a new batch of BATCH events
+arrives and policies are updated:
+
+- the previous path: FeedbackPolicyUpdater.update_from_feedback() regroups
+  every pinned event and recomputes each pattern's rate and phase;
+- FeedbackLearner: the new batch is folded into per-pattern counts and only
+  the touched patterns are updated.
+
+Memory is an in-process stub, so only the update computation is measured.
+Run with: pytest tests/benchmarks/bench_feedback_learner.py --benchmark-only
+"""
+
+import random
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from models.feedback import FeedbackEvent, FeedbackLabel
+from security_engine.policy_engine import FeedbackLearner, FeedbackPolicyUpdater
+
+HISTORY = 1_000_000
+BATCH = 100
+ANOMALIES = ["power", "thermal", "attitude", "comms", "payload"]
+ACTIONS = ["cycle", "reset", "safe_mode", "reroute"]
+PHASES = ["NOMINAL_OPS", "SAFE_MODE", "PAYLOAD_OPS"]
+LABELS = list(FeedbackLabel)
+
+random.seed(11)
+
+
+def _events(count, offset=0):
+    return [
+        FeedbackEvent.model_construct(
+            fault_id=f"fault_{offset + i}",
+            anomaly_type=random.choice(ANOMALIES),
+            recovery_action=random.choice(ACTIONS),
+            mission_phase=random.choice(PHASES),
+            label=random.choice(LABELS),
+            confidence_score=0.9,
+        )
+        for i in range(count)
+    ]
+
+
+HISTORY_EVENTS = _events(HISTORY)
+NEW_EVENTS = _events(BATCH, offset=HISTORY)
+
+
+class StubMemory:
+    """Dict-backed policy store."""
+
+    def __init__(self, events):
+        self.events = events
+        self.thresholds = {}
+        self.preferences = {}
+
+    def query_feedback_events(self):
+        return self.events
+
+    def get_threshold(self, anomaly_type, phase):
+        return self.thresholds.get((anomaly_type, phase), 1.0)
+
+    def set_threshold(self, anomaly_type, phase, value):
+        self.thresholds[(anomaly_type, phase)] = value
+
+    def set_action_preference(self, action, weight, phase):
+        self.preferences[(action, phase)] = weight
+
+    def suppress_action(self, action, phase):
+        pass
+
+
+def test_full_reprocessing(benchmark):
+    """Previous behaviour: regroup all pinned feedback on every update."""
+    updater = FeedbackPolicyUpdater(StubMemory(HISTORY_EVENTS + NEW_EVENTS))
+
+    stats = benchmark.pedantic(updater.update_from_feedback, rounds=3, iterations=1)
+    assert stats["updated"] == len(ANOMALIES) * len(ACTIONS)
+    benchmark.extra_info["history_events"] = HISTORY
+
+
+def test_incremental_learner(benchmark):
+    """Fold only the new batch into sufficient statistics, update touched patterns."""
+    learner = FeedbackLearner(StubMemory([]))
+    learner.observe_many(HISTORY_EVENTS)
+    learner.apply_updates()
+
+    def update():
+        learner.observe_many(NEW_EVENTS)
+        return learner.apply_updates()
+
+    stats = benchmark.pedantic(update, rounds=20, iterations=1)
+    assert 0 < stats["updated"] <= len(ANOMALIES) * len(ACTIONS)
+    benchmark.extra_info["history_events"] = HISTORY
+    benchmark.extra_info["batch_events"] = BATCH
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for bulk field encryption
+
+Encrypts and decrypts a RECORDS-record batch with three sensitive fields
+(two searchable, one bound to user_id as associated data) through:
+
+- the per-field path (encrypt_record/decrypt_record), which mints, wraps and
+  audit-logs a DEK for every value;
+- the bulk API (encrypt_records/decrypt_records), which reuses one cached DEK
+  per field, draws all nonces at once, computes blind indexes per column and
+  logs once per column;
+- the bulk API with binary envelopes.
+
+records/sec is reported in extra_info.
+Run with: pytest tests/benchmarks/bench_field_encryption.py --benchmark-only
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.security.compliance import init_compliance_manager
+from src.security.encryption import DataEncryption
+from src.security.field_encryption import FieldEncryptionEngine, FieldEncryptionMapper
+
+RECORDS = 10_000
+
+_TMP = tempfile.TemporaryDirectory()
+os.chdir(_TMP.name)  # Audit log files land under ./logs/audit
+init_compliance_manager()
+
+MAPPER = FieldEncryptionMapper()
+MAPPER.register_field("ssn", searchable=True)
+MAPPER.register_field("email", searchable=True)
+MAPPER.register_field("notes", associated_data_fields=["user_id"])
+ENGINE = FieldEncryptionEngine(DataEncryption(master_key="benchmark-master-key"), MAPPER)
+
+BATCH = [
+    {"user_id": f"u{i}", "ssn": f"123-45-{i % 10000:04d}", "email": f"user{i}@example.com",
+     "notes": f"account note {i}", "status": "active"}
+    for i in range(RECORDS)
+]
+
+
+def _report(benchmark):
+    benchmark.extra_info["records"] = RECORDS
+    benchmark.extra_info["records_per_second"] = round(RECORDS / benchmark.stats.stats.median)
+
+
+def test_per_field_encrypt(benchmark):
+    """encrypt_record() per record: one DEK and one audit entry per value."""
+    benchmark.pedantic(lambda: [ENGINE.encrypt_record(r) for r in BATCH], rounds=3, iterations=1)
+    _report(benchmark)
+
+
+def test_bulk_encrypt(benchmark):
+    """encrypt_records(): cached DEK per field, JSON containers."""
+    benchmark.pedantic(lambda: ENGINE.encrypt_records(BATCH), rounds=3, iterations=1)
+    _report(benchmark)
+
+
+def test_bulk_encrypt_binary(benchmark):
+    """encrypt_records(binary=True): cached DEK per field, binary envelopes."""
+    benchmark.pedantic(lambda: ENGINE.encrypt_records(BATCH, binary=True), rounds=3, iterations=1)
+    _report(benchmark)
+
+
+def test_per_field_decrypt(benchmark):
+    """decrypt_record() per record over per-field containers."""
+    encrypted = [ENGINE.encrypt_record(r) for r in BATCH]
+    benchmark.pedantic(lambda: [ENGINE.decrypt_record(r) for r in encrypted], rounds=3, iterations=1)
+    _report(benchmark)
+
+
+def test_bulk_decrypt(benchmark):
+    """decrypt_records() over bulk JSON containers."""
+    encrypted = ENGINE.encrypt_records(BATCH)
+    benchmark.pedantic(lambda: ENGINE.decrypt_records(encrypted), rounds=3, iterations=1)
+    _report(benchmark)
+
+
+def test_bulk_decrypt_binary(benchmark):
+    """decrypt_records() over binary envelopes."""
+    encrypted = ENGINE.encrypt_records(BATCH, binary=True)
+    benchmark.pedantic(lambda: ENGINE.decrypt_records(encrypted), rounds=3, iterations=1)
+    _report(benchmark)
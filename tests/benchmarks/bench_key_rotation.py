@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for key rotation bookkeeping and online re-encryption
+
+- Recording one rotation with HISTORY events already on file: the previous
+  full rewrite of rotation_history.json vs appending to the rotation journal.
+- Moving RECORDS field-encrypted records (two fields, bulk-encrypted) to a new
+  engine key: decrypt + re-encrypt every record vs a ReencryptionJob over a
+  FieldRecordStore, which only re-wraps the shared DEKs and checkpoints after
+  every batch.
+
+records/sec is reported in extra_info.
+Run with: pytest tests/benchmarks/bench_key_rotation.py --benchmark-only
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.security.compliance import init_compliance_manager
+from src.security.encryption import DataEncryption
+from src.security.field_encryption import FieldEncryptionEngine, FieldEncryptionMapper
+from src.security.key_rotation import KeyRotationManager
+from src.security.reencryption import FieldRecordStore, ReencryptionJob
+
+HISTORY = 10_000
+RECORDS = 100_000
+BATCH = 1_000
+
+_TMP = tempfile.TemporaryDirectory()
+os.chdir(_TMP.name)  # Audit log files land under ./logs/audit
+init_compliance_manager()
+
+MAPPER = FieldEncryptionMapper()
+MAPPER.register_field("ssn")
+MAPPER.register_field("email")
+OLD_ENGINE = DataEncryption(master_key="retiring-master-key")
+NEW_ENGINE = DataEncryption(master_key="replacement-master-key")
+
+_SOURCE = FieldEncryptionEngine(OLD_ENGINE, MAPPER)
+ENCRYPTED = []
+for start in range(0, RECORDS, 10_000):
+    ENCRYPTED.extend(_SOURCE.encrypt_records([
+        {"id": i, "ssn": f"123-45-{i % 10000:04d}", "email": f"user{i}@example.com"}
+        for i in range(start, start + 10_000)
+    ]))
+
+
+def _seeded_manager(path):
+    manager = KeyRotationManager(storage_path=path, compact_every=HISTORY * 2)
+    event = manager.rotate_kek()
+    template = event.to_dict()
+    manager._rotation_history = [
+        type(event).from_dict(dict(template, event_id=f"rot-{i}", status="completed"))
+        for i in range(HISTORY)
+    ]
+    return manager
+
+
+def test_full_history_rewrite(benchmark):
+    """Previous behaviour: dump the whole history on every rotation."""
+    manager = _seeded_manager(os.path.join(_TMP.name, "rewrite"))
+    history_file = manager.storage_path / "rotation_history.json"
+
+    def record():
+        with open(history_file, "w") as f:
+            json.dump([event.to_dict() for event in manager._rotation_history], f, indent=2)
+
+    benchmark.pedantic(record, rounds=10, iterations=1)
+    benchmark.extra_info["history_events"] = HISTORY
+
+
+def test_journal_append(benchmark):
+    """Append one rotation record to the journal (fsync included)."""
+    manager = _seeded_manager(os.path.join(_TMP.name, "journal"))
+    event = manager._rotation_history[-1]
+
+    benchmark.pedantic(lambda: manager._record_event(event), rounds=10, iterations=1)
+    benchmark.extra_info["history_events"] = HISTORY
+
+
+def _report(benchmark):
+    benchmark.extra_info["records"] = RECORDS
+    benchmark.extra_info["records_per_second"] = round(RECORDS / benchmark.stats.stats.median)
+
+
+def test_full_reencryption(benchmark):
+    """Decrypt under the old key and re-encrypt under the new one."""
+    def run():
+        old = FieldEncryptionEngine(OLD_ENGINE, MAPPER)
+        new = FieldEncryptionEngine(NEW_ENGINE, MAPPER)
+        return [
+            record
+            for start in range(0, RECORDS, BATCH)
+            for record in new.encrypt_records(old.decrypt_records(ENCRYPTED[start:start + BATCH]))
+        ]
+
+    benchmark.pedantic(run, rounds=1, iterations=1)
+    _report(benchmark)
+
+
+def test_rewrap_job(benchmark):
+    """ReencryptionJob over a FieldRecordStore: re-wrap DEKs, checkpoint per batch."""
+    class Event:
+        event_id = "rot-bench"
+
+    def run():
+        engine = FieldEncryptionEngine(NEW_ENGINE, MAPPER)
+        store = FieldRecordStore("users", list(ENCRYPTED), engine, OLD_ENGINE)
+        checkpoints = tempfile.mkdtemp(dir=_TMP.name)
+        return ReencryptionJob(store, Event(), checkpoints, batch_size=BATCH).run()
+
+    checkpoint = benchmark.pedantic(run, rounds=1, iterations=1)
+    assert checkpoint.status == "completed" and checkpoint.rewritten == RECORDS
+    _report(benchmark)
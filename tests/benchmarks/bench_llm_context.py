@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for LLM context assembly
+
+SESSIONS concurrent sessions, each with a shared system prompt, two pinned
+few-shot pairs and TURNS conversation turns, larger than the token budget:
+
+- re-tokenizing every message on each assembly and keeping the most recent
+  messages that fit (what budgeted packing costs without cached counts);
+- LLMContextManager.build_context(), which packs from the per-message
+  counts cached when messages were added.
+
+Time per assembly and the memory held by the session store (tracemalloc)
+are reported in extra_info.
+Run with: pytest tests/benchmarks/bench_llm_context.py --benchmark-only
+"""
+
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.llm.context_manager import LLMContextManager
+from src.llm.tokenizer import HeuristicTokenCounter
+
+SESSIONS = 10_000
+TURNS = 15
+BUDGET = 2_000
+WORDS = (
+    "battery voltage thermal attitude sensor reading nominal drift corrected "
+    "downlink orbit pass anomaly detected recovery action payload safe mode"
+).split()
+
+random.seed(3)
+
+SYSTEM = {"role": "system", "content": " ".join(random.choices(WORDS, k=250))}
+FEW_SHOT = [
+    {"role": "user", "content": " ".join(random.choices(WORDS, k=60))},
+    {"role": "assistant", "content": " ".join(random.choices(WORDS, k=60))},
+] * 2
+
+
+def _turns():
+    return [
+        {"role": role, "content": " ".join(random.choices(WORDS, k=40))}
+        for _ in range(TURNS)
+        for role in ("user", "assistant")
+    ]
+
+
+TURNS_BY_SESSION = [_turns() for _ in range(SESSIONS)]
+
+
+def _populate():
+    manager = LLMContextManager(max_tokens=BUDGET, max_sessions=SESSIONS)
+    for i, turns in enumerate(TURNS_BY_SESSION):
+        manager.create_session(f"s{i}", [SYSTEM] + FEW_SHOT, pinned=5)
+        for message in turns:
+            manager.add_message(f"s{i}", message["role"], message["content"])
+    return manager
+
+
+tracemalloc.start()
+_before = tracemalloc.get_traced_memory()[0]
+MANAGER = _populate()
+STORE_BYTES = tracemalloc.get_traced_memory()[0] - _before
+tracemalloc.stop()
+
+
+def _recount_pack(counter, messages, pinned, budget):
+    counts = [4 + counter._count(m["content"]) for m in messages]
+    remaining = budget - sum(counts[:pinned])
+    start = len(messages)
+    while start > pinned and counts[start - 1] <= remaining:
+        start -= 1
+        remaining -= counts[start]
+    return messages[:pinned] + messages[start:]
+
+
+def _report(benchmark):
+    benchmark.extra_info["sessions"] = SESSIONS
+    benchmark.extra_info["us_per_assembly"] = round(benchmark.stats.stats.median / SESSIONS * 1e6, 2)
+    benchmark.extra_info["store_mb"] = round(STORE_BYTES / 1e6, 1)
+
+
+def test_recount_assembly(benchmark):
+    """Budgeted packing that re-tokenizes every message on each assembly."""
+    counter = HeuristicTokenCounter()
+
+    def assemble():
+        for i in range(SESSIONS):
+            _recount_pack(counter, MANAGER.get_context(f"s{i}"), 5, BUDGET)
+
+    benchmark.pedantic(assemble, rounds=3, iterations=1)
+    _report(benchmark)
+
+
+def test_cached_assembly(benchmark):
+    """build_context() from cached per-message counts."""
+    def assemble():
+        for i in range(SESSIONS):
+            MANAGER.build_context(f"s{i}")
+
+    benchmark.pedantic(assemble, rounds=3, iterations=1)
+    context = MANAGER.build_context("s0")
+    assert context[:5] == [SYSTEM] + FEW_SHOT
+    assert sum(MANAGER.token_counter.count_message(m) for m in context) <= BUDGET
+    _report(benchmark)
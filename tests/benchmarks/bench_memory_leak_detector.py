@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for memory leak detection over a day-long window
+
+One sample per minute with a 1440-sample (24h) window:
+- Previous check: copy the deque and refit least squares from datetime deltas.
+- Streaming check: slope from running sums.
+- Per-sample cost of add_sample() (includes the change-point test).
+Run with: pytest tests/benchmarks/bench_memory_leak_detector.py --benchmark-only
+"""
+
+import sys
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.memory_leak_detector import MemoryLeakDetector, MemorySample
+
+WINDOW = 1440
+
+
+def _legacy_growth_rate(samples):
+    """The previous _calculate_growth_rate."""
+    first_time = samples[0].timestamp
+    times = [(s.timestamp - first_time).total_seconds() / 3600.0 for s in samples]
+    memories = [s.memory_mb for s in samples]
+    n = len(samples)
+    sum_x = sum(times)
+    sum_y = sum(memories)
+    sum_xy = sum(t * m for t, m in zip(times, memories))
+    sum_x2 = sum(t * t for t in times)
+    if n * sum_x2 - sum_x * sum_x == 0:
+        return 0.0
+    return (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x * sum_x)
+
+
+def _filled_detector():
+    detector = MemoryLeakDetector(max_samples=WINDOW)
+    for i in range(WINDOW):
+        detector.add_sample(500 + 0.01 * i, monotonic_time=i * 60.0)
+    return detector
+
+
+def test_legacy_detect(benchmark):
+    """Previous check: list copy + full refit."""
+    start = datetime(2024, 1, 1)
+    samples = [MemorySample(start + timedelta(minutes=i), 500 + 0.01 * i) for i in range(WINDOW)]
+    window = deque(samples, maxlen=WINDOW)
+    benchmark(lambda: _legacy_growth_rate(list(window)))
+
+
+def test_streaming_detect(benchmark):
+    """Streaming check: O(1) slope."""
+    detector = _filled_detector()
+    assert benchmark(detector.detect_leak).growth_rate_mb_per_hour > 0
+
+
+def test_add_sample(benchmark):
+    """Per-sample cost with a full window."""
+    detector = _filled_detector()
+    clock = iter(range(WINDOW * 60, 10 ** 9, 60))
+    benchmark(lambda: detector.add_sample(600.0, monotonic_time=next(clock)))
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for PredictiveMaintenanceEngine
+
+Per-request overhead: with HISTORY training points held, each API request
+adds one point and asks for failure predictions (REQUESTS requests):
+
+- the previous path: the training list is re-filtered by age on every add,
+  the rolling window is a list queue, and each failure type's features are
+  rebuilt with pandas and scored with its own RandomForest.predict();
+- the ring buffer, with all failure types scored in one batched call.
+
+Retraining with the buffer holding BUFFER_ROWS (1M) points:
+
+- the previous data preparation for one training run: the point list is
+  turned into a DataFrame and rolling features are computed per failure
+  type (fitting 100-tree forests on all 1M rows is not practical to time);
+- one incremental update after UPDATE_ROWS new points: warm-started
+  forests grow by trees_per_update trees fitted on the new points only.
+
+Both paths score the same trained models; memory is an in-process stub.
+Run with: pytest tests/benchmarks/bench_predictive_maintenance.py --benchmark-only
+"""
+
+import asyncio
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from security_engine.contracts import FailureType, PredictionModel, TimeSeriesData
+from security_engine.predictive_maintenance import PredictiveMaintenanceEngine
+from security_engine.telemetry_buffer import BUFFER_COLUMNS, TARGET_COLUMNS
+
+HISTORY = 100_000
+REQUESTS = 200
+BUFFER_ROWS = 1_000_000
+UPDATE_ROWS = 1_000
+INITIAL_TRAINING_ROWS = 20_000
+ROLLING = ['cpu_usage', 'memory_usage', 'network_latency', 'disk_io', 'error_rate']
+THRESHOLDS = {
+    FailureType.CPU_SPIKE: 75.0,
+    FailureType.MEMORY_LEAK: 80.0,
+    FailureType.NETWORK_LATENCY: 100.0,
+    FailureType.DISK_IO_BURST: 200.0,
+    FailureType.SERVICE_CRASH: 1.0,
+    FailureType.RESOURCE_EXHAUSTION: 1.0,
+}
+
+_rng = np.random.default_rng(5)
+_NOW = datetime.now()
+
+
+class _MemoryStub:
+    def write(self, embedding, metadata, timestamp):
+        return None
+
+
+def _values(count):
+    return np.column_stack([
+        _rng.normal(45, 10, count),
+        _rng.normal(60, 15, count),
+        _rng.normal(50, 20, count),
+        _rng.normal(100, 30, count),
+        _rng.normal(0.1, 0.05, count),
+        _rng.normal(200, 50, count),
+        _rng.integers(10, 50, count),
+        _rng.random(count) < 0.05,
+    ]).astype(float)
+
+
+def _points(values, start):
+    return [
+        TimeSeriesData(start + timedelta(seconds=i), *row[:6].tolist(), int(row[6]), bool(row[7]))
+        for i, row in enumerate(values)
+    ]
+
+
+def _engine(rows, model_dir):
+    engine = PredictiveMaintenanceEngine(
+        _MemoryStub(), buffer_capacity=BUFFER_ROWS, retrain_interval=None, model_dir=model_dir
+    )
+    timestamps = _NOW.timestamp() - rows + np.arange(rows, dtype=float)
+    engine.training_buffer.extend(timestamps, _values(rows))
+    return engine
+
+
+def _trained_engine(rows, model_dir):
+    engine = _engine(INITIAL_TRAINING_ROWS, model_dir)
+    asyncio.run(engine.train_models())
+    if rows > INITIAL_TRAINING_ROWS:
+        extra = rows - INITIAL_TRAINING_ROWS
+        engine.training_buffer.extend(_NOW.timestamp() + np.arange(extra, dtype=float), _values(extra))
+        engine._bundle.trained_through = engine.training_buffer.sequence
+    return engine
+
+
+REQUEST_POINTS = _points(_values(REQUESTS), _NOW)
+
+
+def _legacy_features(recent, data, failure_type):
+    """Previous _extract_features_from_data (window of >= 3 recent points)."""
+    df = pd.DataFrame([{col: getattr(d, col) for col in BUFFER_COLUMNS[:7]} for d in recent + [data]])
+    for col in ROLLING:
+        df[f'{col}_rolling_mean_3'] = df[col].rolling(window=min(3, len(df))).mean()
+        df[f'{col}_rolling_std_3'] = df[col].rolling(window=min(3, len(df))).std()
+        df[f'{col}_rolling_mean_6'] = df[col].rolling(window=min(6, len(df))).mean()
+        df[f'{col}_rolling_std_6'] = df[col].rolling(window=min(6, len(df))).std()
+    last = df.iloc[-1]
+    base = [last[c] for c in BUFFER_COLUMNS[:7] if c != TARGET_COLUMNS[failure_type]] + [0.0]
+    rolling = []
+    for col in ROLLING:
+        rolling.extend(last[f'{col}_rolling_{s}'] for s in ('mean_3', 'std_3', 'mean_6', 'std_6'))
+    return [0.0 if pd.isna(x) else x for x in base + rolling]
+
+
+def test_legacy_request(benchmark):
+    with tempfile.TemporaryDirectory() as model_dir:
+        engine = _trained_engine(INITIAL_TRAINING_ROWS, model_dir)
+    training_data = _points(_values(HISTORY), _NOW - timedelta(seconds=HISTORY))
+    recent = training_data[-10:]
+
+    def run():
+        nonlocal training_data
+        for data in REQUEST_POINTS:
+            training_data.append(data)
+            cutoff = datetime.now() - timedelta(days=30)
+            training_data = [d for d in training_data if d.timestamp > cutoff]
+            recent.append(data)
+            if len(recent) > 10:
+                recent.pop(0)
+            for failure_type in FailureType:
+                features = engine.scalers[failure_type].transform([_legacy_features(recent, data, failure_type)])
+                value = engine.models[failure_type][PredictionModel.RANDOM_FOREST].predict(features)[0]
+                1 / (1 + np.exp(-(value - THRESHOLDS[failure_type]) / 10))
+
+    benchmark.pedantic(run, rounds=1, iterations=1)
+    benchmark.extra_info["ms_per_request"] = round(benchmark.stats.stats.median / REQUESTS * 1000, 3)
+
+
+def test_ring_buffer_request(benchmark):
+    with tempfile.TemporaryDirectory() as model_dir:
+        engine = _trained_engine(HISTORY, model_dir)
+
+    async def requests():
+        for data in REQUEST_POINTS:
+            await engine.add_training_data(data)
+            await engine.predict_failures(data)
+
+    benchmark.pedantic(lambda: asyncio.run(requests()), rounds=3, iterations=1)
+    benchmark.extra_info["ms_per_request"] = round(benchmark.stats.stats.median / REQUESTS * 1000, 3)
+
+
+def test_legacy_training_preparation_1m(benchmark):
+    points = _points(_values(BUFFER_ROWS), _NOW - timedelta(seconds=BUFFER_ROWS))
+
+    def run():
+        cutoff = datetime.now() - timedelta(days=30)
+        kept = [d for d in points if d.timestamp > cutoff]
+        df = pd.DataFrame([{
+            'timestamp': d.timestamp, **{col: getattr(d, col) for col in BUFFER_COLUMNS}
+        } for d in kept]).sort_values('timestamp')
+        for failure_type in FailureType:
+            df_features = df.copy()
+            for col in ROLLING:
+                df_features[f'{col}_rolling_mean_3'] = df_features[col].rolling(window=3).mean()
+                df_features[f'{col}_rolling_std_3'] = df_features[col].rolling(window=3).std()
+                df_features[f'{col}_rolling_mean_6'] = df_features[col].rolling(window=6).mean()
+                df_features[f'{col}_rolling_std_6'] = df_features[col].rolling(window=6).std()
+            df_features = df_features.dropna()
+            feature_cols = [c for c in df_features.columns if c not in ('timestamp', TARGET_COLUMNS[failure_type])]
+            df_features[feature_cols].values
+
+    benchmark.pedantic(run, rounds=1, iterations=1)
+    benchmark.extra_info["rows"] = BUFFER_ROWS
+
+
+def test_incremental_retrain_1m(benchmark):
+    with tempfile.TemporaryDirectory() as model_dir:
+        engine = _trained_engine(BUFFER_ROWS, model_dir)
+
+        def add_points():
+            start = engine.training_buffer.sequence
+            engine.training_buffer.extend(_NOW.timestamp() + start + np.arange(UPDATE_ROWS, dtype=float), _values(UPDATE_ROWS))
+            return (), {}
+
+        result = benchmark.pedantic(lambda: asyncio.run(engine.retrain()), setup=add_points, rounds=5, iterations=1)
+        assert "cpu_spike" in result
+
+    benchmark.extra_info["rows"] = len(engine.training_buffer)
+    benchmark.extra_info["model_version"] = engine.model_version
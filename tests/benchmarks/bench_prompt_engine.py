@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for PromptEngine prompt assembly
+
+Builds CALLS prompts for a mix of task types (analysis, planning, execution),
+complexity tiers and two tool sets, from the shipped templates:
+
+- the previous assembly: str.format on the raw templates, the output schema
+  dumped and few-shot examples rebuilt on every call;
+- PromptEngine.construct_prompt(): compiled templates plus the cached static
+  prefix (mtime checks at the default 1 s interval).
+
+prompts/sec is reported in extra_info.
+Run with: pytest tests/benchmarks/bench_prompt_engine.py --benchmark-only
+"""
+
+import json
+import random
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.agents.core.engine import COMPLEXITY_THRESHOLD, PromptContext, PromptEngine
+from src.agents.core.schema import AgentOutput
+
+TEMPLATE_DIR = str(Path(__file__).parent.parent.parent / "src" / "agents" / "prompts")
+CALLS = 5_000
+TOOL_SETS = [
+    [{"name": "check_thermal_history"}, {"name": "query_power_bus"}],
+    [{"name": "schedule_maneuver"}, {"name": "query_orbit"}, {"name": "send_command"}],
+]
+
+random.seed(8)
+
+WORKLOAD = [
+    (
+        random.choice(["analysis", "planning", "execution"]),
+        PromptContext(
+            task_description=f"Investigate event {i} on SAT-{i % 40:03d}",
+            telemetry_data={"voltage": round(random.uniform(3.0, 4.2), 3), "temp": random.randint(-20, 60)},
+            system_state=random.choice(["NOMINAL_OPS", "SAFE_MODE", "PAYLOAD_OPS"]),
+            tools=random.choice(TOOL_SETS),
+            memory_context="Previous anomaly resolved by power cycle. " * 5,
+            complexity_score=random.random(),
+        ),
+    )
+    for i in range(CALLS)
+]
+
+
+def _legacy_construct(engine, task_type, context):
+    """Previous construct_prompt: format raw templates on every call."""
+    parts = [engine.system_templates['base'].format(task_description=context.task_description)]
+    if context.tools:
+        tool_desc = json.dumps([t['name'] for t in context.tools], indent=2)
+        parts.append(engine.system_templates['tools'].format(tool_descriptions=tool_desc))
+    if context.complexity_score > COMPLEXITY_THRESHOLD:
+        parts.append(engine.system_templates['reasoning'].format(
+            schema_description=json.dumps(AgentOutput.model_json_schema(), indent=2)
+        ))
+    else:
+        parts.append("Provide a concise JSON response strictly adhering to the schema.")
+    messages = [{"role": "system", "content": "\n\n".join(parts)}]
+
+    for ex in engine.examples[:2]:
+        messages.append({"role": "user", "content": ex['input']})
+        messages.append({"role": "assistant", "content": json.dumps(ex['output'])})
+
+    template = engine.task_templates[task_type]
+    messages.append({"role": "user", "content": template.format(
+        telemetry_data=json.dumps(context.telemetry_data, indent=2) if context.telemetry_data else "None",
+        system_state=context.system_state or "Unknown",
+        directive=context.task_description,
+        tool_names=[t['name'] for t in (context.tools or [])],
+        memory_context=engine._compress_context(context.memory_context),
+    )})
+    return messages
+
+
+def _report(benchmark):
+    benchmark.extra_info["prompts"] = CALLS
+    benchmark.extra_info["prompts_per_second"] = round(CALLS / benchmark.stats.stats.median)
+
+
+def test_legacy_assembly(benchmark):
+    engine = PromptEngine(template_dir=TEMPLATE_DIR)
+
+    def run():
+        for task_type, context in WORKLOAD:
+            _legacy_construct(engine, task_type, context)
+
+    benchmark.pedantic(run, rounds=3, iterations=1)
+    _report(benchmark)
+
+
+def test_cached_assembly(benchmark):
+    engine = PromptEngine(template_dir=TEMPLATE_DIR)
+
+    def run():
+        for task_type, context in WORKLOAD:
+            engine.construct_prompt(task_type, context)
+
+    benchmark.pedantic(run, rounds=3, iterations=1)
+    for task_type, context in WORKLOAD[:50]:
+        assert engine.construct_prompt(task_type, context) == _legacy_construct(engine, task_type, context)
+    _report(benchmark)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the in-process rate limiters
+
+Drives 100k distinct keys through the previous contact InMemoryRateLimiter
+(global asyncio.Lock, deque of datetimes per key, 5-minute sweeps) and the
+sharded GCRA limiter, both through the async contact API and the raw
+ShardedRateLimiter.hit(). Decisions/sec and bytes per tracked key are
+reported in extra_info; the target is 50k decisions/sec.
+Run with: pytest tests/benchmarks/bench_rate_limiter.py --benchmark-only
+"""
+
+import asyncio
+import random
+import sys
+import tracemalloc
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.local_rate_limiter import ShardedRateLimiter
+
+KEYS = 100_000
+DECISIONS = 200_000
+LIMIT = 5
+WINDOW = 3600
+
+random.seed(7)
+KEY_STREAM = [f"contact:10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"
+              for i in (random.randrange(KEYS) for _ in range(DECISIONS))]
+
+
+class LegacyInMemoryRateLimiter:
+    """The previous api.contact.InMemoryRateLimiter, kept for comparison."""
+
+    def __init__(self):
+        self.requests = {}
+        self._lock = asyncio.Lock()
+        self._last_cleanup = datetime.now()
+        self._cleanup_interval = 300
+
+    async def _periodic_cleanup(self, window):
+        now = datetime.now()
+        if (now - self._last_cleanup).total_seconds() < self._cleanup_interval:
+            return
+        cutoff = now - timedelta(seconds=window)
+        for key in [k for k, ts in self.requests.items() if not ts or ts[-1] <= cutoff]:
+            del self.requests[key]
+        self._last_cleanup = now
+
+    async def is_allowed(self, key, limit, window):
+        async with self._lock:
+            now = datetime.now()
+            cutoff = now - timedelta(seconds=window)
+            if key in self.requests:
+                while self.requests[key] and self.requests[key][0] <= cutoff:
+                    self.requests[key].popleft()
+                if not self.requests[key]:
+                    del self.requests[key]
+            if key not in self.requests:
+                self.requests[key] = deque()
+            current = len(self.requests[key])
+            allowed = current < limit
+            reset_at = None
+            if self.requests[key]:
+                reset_at = (self.requests[key][0] + timedelta(seconds=window)).isoformat()
+            metadata = {"limit": limit, "remaining": max(0, limit - current - (1 if allowed else 0)),
+                        "reset_at": reset_at, "window_seconds": window}
+            if allowed:
+                self.requests[key].append(now)
+            await self._periodic_cleanup(window)
+            return allowed, metadata
+
+
+class ShardedContactLimiter:
+    """Async adapter with the same shape as api.contact.InMemoryRateLimiter."""
+
+    def __init__(self):
+        self.limiter = ShardedRateLimiter(LIMIT, WINDOW, max_keys=KEYS * 2)
+
+    async def is_allowed(self, key, limit, window):
+        decision = self.limiter.hit(key, limit=limit, window=window)
+        return decision.allowed, {"limit": limit, "remaining": decision.remaining}
+
+
+def _drive_async(limiter):
+    async def run():
+        for key in KEY_STREAM:
+            await limiter.is_allowed(key, LIMIT, WINDOW)
+
+    asyncio.run(run())
+
+
+def _drive_sync(limiter):
+    hit = limiter.hit
+    for key in KEY_STREAM:
+        hit(key)
+
+
+def _bytes_per_key(factory, drive):
+    tracemalloc.start()
+    limiter = factory()
+    before = tracemalloc.get_traced_memory()[0]
+    drive(limiter)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    tracked = len(limiter.requests) if hasattr(limiter, "requests") else len(getattr(limiter, "limiter", limiter))
+    return round((after - before) / max(tracked, 1))
+
+
+def _report(benchmark, factory, drive):
+    benchmark.extra_info["decisions_per_second"] = round(DECISIONS / benchmark.stats.stats.median)
+    benchmark.extra_info["bytes_per_key"] = _bytes_per_key(factory, drive)
+
+
+def test_legacy_contact_limiter(benchmark):
+    """Previous limiter: 200k decisions over 100k keys."""
+    benchmark.pedantic(lambda: _drive_async(LegacyInMemoryRateLimiter()), rounds=3, iterations=1)
+    _report(benchmark, LegacyInMemoryRateLimiter, _drive_async)
+
+
+def test_sharded_contact_limiter(benchmark):
+    """Sharded GCRA limiter behind the async contact API."""
+    benchmark.pedantic(lambda: _drive_async(ShardedContactLimiter()), rounds=3, iterations=1)
+    _report(benchmark, ShardedContactLimiter, _drive_async)
+
+
+def test_sharded_limiter_hit(benchmark):
+    """Raw ShardedRateLimiter.hit()."""
+    factory = lambda: ShardedRateLimiter(LIMIT, WINDOW, max_keys=KEYS * 2)  # noqa: E731
+    benchmark.pedantic(lambda: _drive_sync(factory()), rounds=3, iterations=1)
+    _report(benchmark, factory, _drive_sync)
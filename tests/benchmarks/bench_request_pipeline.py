@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the API request middleware stack
+
+Compares the previous stack (ZstdMiddleware, RequestLoggingMiddleware,
+@app.middleware monitoring, RateLimitMiddleware) with the pure-ASGI
+RequestPipeline: requests/sec for the full stack, and added p50/p99
+latency per layer over a bare FastAPI app (reported in extra_info).
+Run with: pytest tests/benchmarks/bench_request_pipeline.py --benchmark-only
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import structlog
+import zstandard as zstd
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from api.logging_middleware import RequestLoggingMiddleware
+from api.middleware.network_optimization import ZstdMiddleware
+from api.middleware.pipeline import (
+    CorrelationIdStage,
+    LatencyStage,
+    RateLimitStage,
+    RequestPipeline,
+    ResponseCompressionStage,
+    SampledLoggingStage,
+    ZstdDecompressionStage,
+    stage,
+)
+from core.rate_limiter import RateLimitMiddleware
+
+# Keep log formatting out of the measurement for both stacks
+structlog.configure(processors=[], logger_factory=structlog.ReturnLoggerFactory())
+
+REQUESTS = 2000
+PAYLOAD = zstd.ZstdCompressor().compress(b'{"voltage": 5.0, "temperature": 25.0}' * 20)
+
+
+class _Limiter:
+    async def is_allowed(self):
+        return True
+
+    def get_retry_after(self):
+        return 0
+
+
+class _Histogram:
+    def observe(self, value):
+        pass
+
+
+def _bare_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/api/v1/telemetry")
+    async def telemetry(request: Request):
+        body = await request.body()
+        return {"size": len(body)}
+
+    return app
+
+
+def _legacy_layers():
+    """Previous layers, innermost first."""
+    async def monitoring(request, call_next):
+        return await call_next(request)
+
+    return [
+        ("zstd", lambda app: app.add_middleware(ZstdMiddleware)),
+        ("logging", lambda app: app.add_middleware(RequestLoggingMiddleware, sample_rate=0.1)),
+        ("monitoring", lambda app: app.add_middleware(BaseHTTPMiddleware, dispatch=monitoring)),
+        ("rate_limit", lambda app: app.add_middleware(
+            RateLimitMiddleware, telemetry_limiter=_Limiter(), api_limiter=_Limiter())),
+    ]
+
+
+PIPELINE_STAGES = [
+    ("correlation", stage(CorrelationIdStage)),
+    ("logging", stage(SampledLoggingStage, sample_rate=0.1)),
+    ("latency", stage(LatencyStage, histogram=_Histogram())),
+    ("rate_limit", stage(RateLimitStage, resolve_limiter=lambda path: (_Limiter(), "api"))),
+    ("compression", stage(ResponseCompressionStage)),
+    ("decompression", stage(ZstdDecompressionStage)),
+]
+
+
+def _legacy_app(layer_count: int) -> FastAPI:
+    app = _bare_app()
+    for _, install in _legacy_layers()[:layer_count]:
+        install(app)
+    return app
+
+
+def _pipeline_app(stage_count: int) -> FastAPI:
+    app = _bare_app()
+    if stage_count:
+        # Stages are outermost first; keep the innermost N
+        app.add_middleware(RequestPipeline, stages=[s for _, s in PIPELINE_STAGES[-stage_count:]])
+    return app
+
+
+async def _request(app) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "path": "/api/v1/telemetry", "raw_path": b"/api/v1/telemetry",
+        "query_string": b"", "client": ("127.0.0.1", 1234), "server": ("bench", 80),
+        "scheme": "http", "root_path": "",
+        "headers": [(b"content-encoding", b"zstd"), (b"content-type", b"application/json"),
+                    (b"accept-encoding", b"gzip")],
+    }
+    sent = False
+    status = 0
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": PAYLOAD, "more_body": False}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+def _latencies(app, count: int = REQUESTS) -> list:
+    async def run():
+        samples = []
+        for _ in range(count):
+            start = time.perf_counter()
+            assert await _request(app) == 200
+            samples.append(time.perf_counter() - start)
+        return samples
+
+    return asyncio.run(run())
+
+
+def _percentiles(samples) -> tuple:
+    cuts = statistics.quantiles(samples, n=100)
+    return cuts[49], cuts[98]
+
+
+def _layer_report(build, names) -> dict:
+    """Added p50/p99 (microseconds) as each layer is stacked on."""
+    report = {}
+    base_p50, base_p99 = _percentiles(_latencies(build(0)))
+    for count, name in enumerate(names, start=1):
+        p50, p99 = _percentiles(_latencies(build(count)))
+        report[name] = {
+            "added_p50_us": round((p50 - base_p50) * 1e6, 1),
+            "added_p99_us": round((p99 - base_p99) * 1e6, 1),
+        }
+        base_p50, base_p99 = p50, p99
+    return report
+
+
+def test_requests_legacy_stack(benchmark):
+    """Benchmark 2000 requests through the previous middleware stack."""
+    app = _legacy_app(len(_legacy_layers()))
+    samples = benchmark.pedantic(_latencies, args=(app,), rounds=3, iterations=1)
+    benchmark.extra_info["requests_per_second"] = round(len(samples) / sum(samples))
+
+
+def test_requests_pipeline(benchmark):
+    """Benchmark 2000 requests through the pure-ASGI pipeline (all stages)."""
+    app = _pipeline_app(len(PIPELINE_STAGES))
+    samples = benchmark.pedantic(_latencies, args=(app,), rounds=3, iterations=1)
+    benchmark.extra_info["requests_per_second"] = round(len(samples) / sum(samples))
+
+
+def test_per_layer_overhead_legacy(benchmark):
+    """Record added p50/p99 per legacy layer."""
+    names = [name for name, _ in _legacy_layers()]
+    report = benchmark.pedantic(_layer_report, args=(_legacy_app, names), rounds=1, iterations=1)
+    benchmark.extra_info.update(report)
+
+
+def test_per_layer_overhead_pipeline(benchmark):
+    """Record added p50/p99 per pipeline stage (innermost first)."""
+    names = [name for name, _ in reversed(PIPELINE_STAGES)]
+    report = benchmark.pedantic(_layer_report, args=(_pipeline_app, names), rounds=1, iterations=1)
+    benchmark.extra_info.update(report)
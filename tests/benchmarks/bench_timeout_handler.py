@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for Timeout Handler
+
+Measures the per-call overhead of the timeout decorators against the
+previous thread-per-call implementation.
+Run with: pytest tests/benchmarks/bench_timeout_handler.py --benchmark-only
+"""
+
+import asyncio
+import functools
+import sys
+import threading
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from core.timeout_handler import async_timeout, with_timeout
+
+
+def _legacy_with_timeout(seconds: float):
+    """Previous implementation: spawn and join a fresh thread per call."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            result = {}
+
+            def target():
+                result["value"] = func(*args, **kwargs)
+
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            thread.join(timeout=seconds)
+            return result["value"]
+        return wrapper
+    return decorator
+
+
+def _legacy_async_timeout(seconds: float):
+    """Previous implementation: race the call against a sleep task."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            task = asyncio.create_task(func(*args, **kwargs))
+            timer = asyncio.create_task(asyncio.sleep(seconds))
+            done, pending = await asyncio.wait(
+                {task, timer}, return_when=asyncio.FIRST_COMPLETED
+            )
+            for p in pending:
+                p.cancel()
+            return task.result()
+        return wrapper
+    return decorator
+
+
+def _work(x: int) -> int:
+    return x * 2
+
+
+async def _async_work(x: int) -> int:
+    return x * 2
+
+
+def test_sync_baseline_undecorated(benchmark):
+    """Benchmark the undecorated call as a floor."""
+    assert benchmark(_work, 21) == 42
+
+
+def test_sync_legacy_thread_per_call(benchmark):
+    """Benchmark the old thread-per-call decorator."""
+    decorated = _legacy_with_timeout(5.0)(_work)
+    assert benchmark(decorated, 21) == 42
+
+
+def test_sync_shared_pool(benchmark):
+    """Benchmark the bounded shared-pool decorator."""
+    decorated = with_timeout(5.0)(_work)
+    assert benchmark(decorated, 21) == 42
+
+
+def test_sync_nested_shared_budget(benchmark):
+    """Benchmark a nested call that runs inline under the outer deadline."""
+    inner = with_timeout(5.0)(_work)
+    outer = with_timeout(5.0)(lambda x: inner(x))
+    assert benchmark(outer, 21) == 42
+
+
+def test_async_legacy_task_race(benchmark):
+    """Benchmark the old create_task + asyncio.wait decorator."""
+    decorated = _legacy_async_timeout(5.0)(_async_work)
+    loop = asyncio.new_event_loop()
+    try:
+        assert benchmark(lambda: loop.run_until_complete(decorated(21))) == 42
+    finally:
+        loop.close()
+
+
+def test_async_timeout_scope(benchmark):
+    """Benchmark the asyncio.timeout based decorator."""
+    decorated = async_timeout(5.0)(_async_work)
+    loop = asyncio.new_event_loop()
+    try:
+        assert benchmark(lambda: loop.run_until_complete(decorated(21))) == 42
+    finally:
+        loop.close()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the WAF rule engine
+
+Scans realistic JSON request bodies (telemetry batches of 1 KB, 64 KB and
+1 MB; benign, and with an XSS payload in the last record) with:
+
+- the previous engine: every string leaf searched once per pattern with
+  re.search(pattern, leaf, re.IGNORECASE);
+- WAFRules.inspect(): one anchor prefilter over all leaves, then each
+  candidate rule's compiled regex run leaf by leaf.
+
+MB/sec is reported in extra_info.
+Run with: pytest tests/benchmarks/bench_waf_rules.py --benchmark-only
+"""
+
+import json
+import random
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.security.waf_rules import WAFRules
+
+SIZES = {"1KB": 1_000, "64KB": 64_000, "1MB": 1_000_000}
+WORDS = (
+    "nominal battery voltage for orbit pass telemetry report more thermal "
+    "attitude sensor reading information downlink normal drift corrected"
+).split()
+
+random.seed(5)
+
+
+def _payload(size, attack=False):
+    records = []
+    while len(json.dumps(records)) < size:
+        records.append({
+            "satellite_id": f"SAT-{random.randrange(100):03d}",
+            "timestamp": f"2024-06-01T12:{random.randrange(60):02d}:00Z",
+            "voltage": round(random.uniform(3.0, 4.2), 3),
+            "temperature": round(random.uniform(-20, 60), 2),
+            "status": random.choice(["nominal", "degraded", "safe_mode"]),
+            "notes": " ".join(random.choices(WORDS, k=10)),
+            "tags": random.choices(WORDS, k=3),
+        })
+    if attack:
+        records[-1]["notes"] = "<img src=x onerror=alert(1)>"
+    return {"batch_id": "b-1", "records": records}
+
+
+PAYLOADS = {(name, attack): _payload(size, attack) for name, size in SIZES.items() for attack in (False, True)}
+
+
+def _leaves(value, out):
+    if isinstance(value, str):
+        out.append(value)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            out.append(key)
+            _leaves(item, out)
+    elif isinstance(value, list):
+        for item in value:
+            _leaves(item, out)
+    return out
+
+
+def _legacy_inspect(waf, payload):
+    """Previous engine: per-leaf, per-pattern re.search."""
+    for leaf in _leaves(payload, []):
+        for pattern in waf.sql_patterns + waf.xss_patterns:
+            if re.search(pattern, leaf, re.IGNORECASE):
+                return pattern
+    return None
+
+
+def _report(benchmark, name, payload):
+    size = len(json.dumps(payload))
+    benchmark.extra_info["payload_bytes"] = size
+    benchmark.extra_info["mb_per_second"] = round(size / benchmark.stats.stats.median / 1e6, 2)
+
+
+@pytest.mark.parametrize("attack", [False, True], ids=["benign", "attack"])
+@pytest.mark.parametrize("name", list(SIZES))
+def test_legacy_engine(benchmark, name, attack):
+    waf = WAFRules()
+    payload = PAYLOADS[(name, attack)]
+    found = benchmark.pedantic(lambda: _legacy_inspect(waf, payload), rounds=5, iterations=1)
+    assert (found is not None) is attack
+    _report(benchmark, name, payload)
+
+
+@pytest.mark.parametrize("attack", [False, True], ids=["benign", "attack"])
+@pytest.mark.parametrize("name", list(SIZES))
+def test_compiled_engine(benchmark, name, attack):
+    waf = WAFRules()
+    payload = PAYLOADS[(name, attack)]
+    found = benchmark.pedantic(lambda: waf.inspect(payload), rounds=5, iterations=1)
+    assert (found is not None) is attack
+    _report(benchmark, name, payload)
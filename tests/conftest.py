@@ -1,7 +1,11 @@
 """Pytest configuration and fixtures for AstraGuard-AI test suite."""
 import pytest
 import sys
+import os
 import asyncio
+import atexit
+import shutil
+import tempfile
 from pathlib import Path
 from datetime import datetime
 
@@ -16,6 +20,11 @@ except ImportError:
 # Ensure project modules are importable
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
+# api.contact creates its database on import; keep it out of the working tree
+if "CONTACT_DATA_DIR" not in os.environ:
+    os.environ["CONTACT_DATA_DIR"] = tempfile.mkdtemp(prefix="astraguard-contact-")
+    atexit.register(shutil.rmtree, os.environ["CONTACT_DATA_DIR"], ignore_errors=True)
+
 
 # ============================================================================
 # PYTEST ASYNCIO CONFIGURATION
@@ -33,6 +42,41 @@ def event_loop():
     policy.set_event_loop(None)
 
 
+# ============================================================================
+# DATABASE FIXTURES
+# ============================================================================
+
+_REAL_AIOSQLITE = None
+
+
+@pytest.fixture
+def real_aiosqlite(monkeypatch):
+    """
+    The real aiosqlite module, installed in the shared connection pool.
+
+    Some test modules replace sys.modules["aiosqlite"] with a MagicMock at
+    import time; tests that run queries against SQLite need the real one.
+    """
+    global _REAL_AIOSQLITE
+    if _REAL_AIOSQLITE is None:
+        import importlib
+        from unittest.mock import Mock
+
+        module = sys.modules.get("aiosqlite")
+        if module is None or isinstance(module, Mock):
+            saved = sys.modules.pop("aiosqlite", None)
+            try:
+                module = importlib.import_module("aiosqlite")
+            finally:
+                if saved is not None:
+                    sys.modules["aiosqlite"] = saved
+        _REAL_AIOSQLITE = module
+
+    from src.db import pool_manager
+    monkeypatch.setattr(pool_manager, "aiosqlite", _REAL_AIOSQLITE)
+    return _REAL_AIOSQLITE
+
+
 # ============================================================================
 # TELEMETRY DATA FIXTURES
 # ============================================================================
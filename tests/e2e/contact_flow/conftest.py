@@ -169,13 +169,13 @@ def e2e_client(e2e_test_app, tmp_path: Path, monkeypatch):
     init_database()
     
     # Reset rate limiter
-    _in_memory_limiter.requests.clear()
+    _in_memory_limiter.clear()
     
     with TestClient(e2e_test_app) as client:
         yield client
     
     # Cleanup
-    _in_memory_limiter.requests.clear()
+    _in_memory_limiter.clear()
 
 
 @pytest.fixture
@@ -214,9 +214,9 @@ def db_connection(tmp_path: Path, e2e_client) -> Generator[sqlite3.Connection, N
 @pytest.fixture
 def reset_rate_limiter():
     """Reset the rate limiter before and after test."""
-    _in_memory_limiter.requests.clear()
+    _in_memory_limiter.clear()
     yield
-    _in_memory_limiter.requests.clear()
+    _in_memory_limiter.clear()
 
 
 # ============================================================================
@@ -0,0 +1,202 @@
+"""Tests for the asynchronous alert notification pipeline (#695) and bounded alert state"""
+
+import threading
+import time
+
+import pytest
+from src.core.alerts.alert_manager import (
+    AlertGroup,
+    AlertManager,
+    AlertSeverity,
+    AlertStatus,
+    AlertType,
+)
+
+
+class SlowHandler:
+    """Fake notification handler that injects latency and records deliveries."""
+
+    def __init__(self, latency=0.0, fail=False):
+        self.latency = latency
+        self.fail = fail
+        self.calls = []
+        self.__name__ = f"slow_handler_{id(self)}"
+        self._lock = threading.Lock()
+
+    def __call__(self, payload):
+        time.sleep(self.latency)
+        if self.fail:
+            raise RuntimeError("webhook down")
+        with self._lock:
+            self.calls.append(payload)
+
+
+@pytest.fixture
+def manager():
+    manager = AlertManager(dedup_window_minutes=1, group_wait_seconds=0.05)
+    yield manager
+    manager.close()
+
+
+def _raise(manager, n, alert_type=AlertType.ANOMALY, severity=AlertSeverity.WARNING, prefix="A"):
+    return [manager.create_alert(alert_type, severity, f"{prefix}{i}", "msg") for i in range(n)]
+
+
+class TestDispatch:
+    def test_create_alert_does_not_wait_for_handlers(self, manager):
+        handler = SlowHandler(latency=0.05)
+        manager.register_notification_handler(handler, timeout=5.0)
+
+        start = time.perf_counter()
+        _raise(manager, 20)
+        assert time.perf_counter() - start < 0.2
+
+        assert manager.flush()
+        assert len(handler.calls) == 20
+
+    def test_alerts_grouped_into_batches(self, manager):
+        handler = SlowHandler()
+        manager.register_notification_handler(handler, batched=True)
+
+        _raise(manager, 5, AlertType.ANOMALY)
+        _raise(manager, 3, AlertType.SECURITY, AlertSeverity.CRITICAL, prefix="S")
+        time.sleep(0.3)
+
+        assert all(isinstance(group, AlertGroup) for group in handler.calls)
+        sizes = {group.group_key: len(group.alerts) for group in handler.calls}
+        assert sizes == {"anomaly:warning": 5, "security:critical": 3}
+
+    def test_group_dispatched_early_at_max_size(self):
+        manager = AlertManager(group_wait_seconds=30, max_group_size=4)
+        handler = SlowHandler()
+        manager.register_notification_handler(handler, batched=True)
+        try:
+            _raise(manager, 8)
+            deadline = time.monotonic() + 2
+            while len(handler.calls) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert [len(g.alerts) for g in handler.calls] == [4, 4]
+        finally:
+            manager.close()
+
+    def test_slow_handler_times_out_and_opens_circuit(self, manager):
+        slow = SlowHandler(latency=0.3)
+        fast = SlowHandler()
+        manager.register_notification_handler(slow, batched=True, timeout=0.05, failure_threshold=2)
+        manager.register_notification_handler(fast, batched=True)
+
+        for batch in range(4):
+            _raise(manager, 1, prefix=f"batch{batch}-")
+            assert manager.flush()
+
+        stats = manager.get_statistics()["notifications"]["handlers"]
+        assert stats[slow.__name__]["timed_out"] == 2
+        assert stats[slow.__name__]["skipped"] == 2
+        assert stats[slow.__name__]["circuit_state"] == "OPEN"
+        assert stats[fast.__name__]["delivered"] == 4
+        assert len(fast.calls) == 4
+
+    def test_failing_handler_isolated(self, manager):
+        broken = SlowHandler(fail=True)
+        ok = SlowHandler()
+        manager.register_notification_handler(broken)
+        manager.register_notification_handler(ok)
+        _raise(manager, 3)
+        assert manager.flush()
+        assert len(ok.calls) == 3
+        assert manager.get_statistics()["notifications"]["handlers"][broken.__name__]["failed"] == 1
+
+    def test_slow_handler_does_not_hold_up_other_groups(self, manager):
+        entered, gate = threading.Event(), threading.Event()
+        fast = SlowHandler()
+
+        def blocking_handler(group):
+            entered.set()
+            gate.wait(5)
+
+        manager.register_notification_handler(blocking_handler, batched=True, timeout=10)
+        manager.register_notification_handler(fast, batched=True)
+        try:
+            _raise(manager, 1, prefix="first")
+            assert entered.wait(2)
+            _raise(manager, 1, prefix="second")
+            deadline = time.monotonic() + 2
+            while len(fast.calls) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert len(fast.calls) == 2  # Delivered while the first group is still in flight
+        finally:
+            gate.set()
+        assert manager.flush()
+        assert manager.get_statistics()["notifications"]["handlers"]["blocking_handler"]["delivered"] == 2
+
+    def test_full_queue_drops_notifications(self):
+        entered, gate = threading.Event(), threading.Event()
+
+        def blocking_group_by(alert):
+            entered.set()
+            gate.wait(5)
+            return alert.alert_type.value
+
+        manager = AlertManager(group_wait_seconds=0.01, max_queue_size=2, group_by=blocking_group_by)
+        manager.register_notification_handler(SlowHandler(), timeout=10)
+        try:
+            _raise(manager, 1, prefix="first")
+            assert entered.wait(2)  # Dispatcher is now stuck grouping the first alert
+
+            _raise(manager, 50)
+            stats = manager.get_statistics()
+            assert stats["notifications"]["queued"] == 2
+            assert stats["notifications"]["dropped"] == 48
+            assert stats["total_alerts"] == 51
+        finally:
+            gate.set()
+            manager.close()
+
+
+class TestBoundedState:
+    def test_dedup_entries_expire(self):
+        manager = AlertManager(dedup_window_minutes=0.001)  # 60ms
+        assert manager.create_alert(AlertType.ANOMALY, AlertSeverity.INFO, "dup", "m")
+        assert manager.create_alert(AlertType.ANOMALY, AlertSeverity.INFO, "dup", "m") is None
+        time.sleep(0.1)
+        assert manager.create_alert(AlertType.ANOMALY, AlertSeverity.INFO, "other", "m")
+        assert len(manager._dedup_cache) == 1
+        assert manager.create_alert(AlertType.ANOMALY, AlertSeverity.INFO, "dup", "m")
+
+    def test_retention_rings(self):
+        manager = AlertManager(max_active_alerts=10, max_resolved_alerts=5)
+        ids = _raise(manager, 30)
+        assert len(manager.list_alerts()) == 10
+        assert manager.get_alert(ids[0]) is None
+
+        for alert_id in ids[-10:]:
+            manager.resolve_alert(alert_id)
+        assert len(manager.list_alerts(status=AlertStatus.RESOLVED)) == 5
+        assert manager.list_alerts(status=AlertStatus.ACTIVE) == []
+
+        stats = manager.get_statistics()
+        assert stats["retained_alerts"] == 5
+        assert stats["evicted_alerts"] == 25
+
+    def test_counters_track_transitions(self):
+        manager = AlertManager()
+        ids = _raise(manager, 4)
+        _raise(manager, 2, AlertType.SECURITY, AlertSeverity.CRITICAL, prefix="S")
+        manager.acknowledge_alert(ids[0])
+        manager.resolve_alert(ids[1])
+        manager.resolve_alert(ids[0])
+
+        stats = manager.get_statistics()
+        assert stats["total_alerts"] == 6
+        assert stats["by_type"] == {"anomaly": 4, "security": 2}
+        assert stats["by_severity"] == {"warning": 4, "critical": 2}
+        assert stats["by_status"] == {"active": 4, "resolved": 2}
+
+    def test_resolved_alert_cannot_be_acknowledged(self):
+        manager = AlertManager()
+        [alert_id] = _raise(manager, 1)
+        manager.resolve_alert(alert_id)
+
+        assert manager.acknowledge_alert(alert_id) is False
+        assert manager.get_alert(alert_id)["status"] == "resolved"
+        assert manager.get_statistics()["by_status"] == {"resolved": 1}
@@ -0,0 +1,288 @@
+"""Compiled tree-ensemble scoring, versioned model files and hot swap."""
+
+import os
+import threading
+from unittest.mock import AsyncMock, Mock, patch
+
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesRegressor, IsolationForest, RandomForestRegressor
+
+from anomaly import anomaly_detector
+from anomaly.tree_scoring import compile_and_verify, compile_tree_ensemble, parity_probe_rows, verify_parity
+from core.error_handling import AnomalyEngineError, ModelLoadError
+
+
+def _telemetry(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.normal(8.0, 0.3, count),
+        rng.normal(25.0, 3.0, count),
+        np.abs(rng.normal(0.0, 0.03, count)),
+        rng.normal(1.0, 0.1, count),
+        rng.normal(5.0, 0.5, count),
+    ])
+
+
+def _forest(seed=0, **kwargs):
+    return IsolationForest(n_estimators=20, random_state=seed, **kwargs).fit(_telemetry(300, seed))
+
+
+def _record(row):
+    return dict(zip(["voltage", "temperature", "gyro", "current", "wheel_speed"], map(float, row)))
+
+
+@pytest.fixture(autouse=True)
+def reset_module_state(tmp_path):
+    with patch.object(anomaly_detector, "MODEL_PATH", str(tmp_path / "anomaly_if.pkl")), \
+         patch.object(anomaly_detector, "_get_resource_status_cached", AsyncMock(return_value={"overall": "ok"})):
+        anomaly_detector._MODEL = None
+        anomaly_detector._COMPILED_MODEL = None
+        anomaly_detector._MODEL_VERSION = None
+        anomaly_detector._MODEL_LOADED = False
+        anomaly_detector._USING_HEURISTIC_MODE = False
+        anomaly_detector._SHADOW = None
+        yield
+    anomaly_detector._SHADOW_TASKS.clear()
+    anomaly_detector._MODEL = None
+    anomaly_detector._COMPILED_MODEL = None
+    anomaly_detector._MODEL_LOADED = False
+    anomaly_detector._USING_HEURISTIC_MODE = False
+    anomaly_detector._SHADOW = None
+
+
+class TestCompiledEnsemble:
+    @pytest.mark.parametrize("max_features", [1.0, 0.6])
+    def test_isolation_forest_parity(self, max_features):
+        model = _forest(max_features=max_features)
+        compiled = compile_tree_ensemble(model)
+        X = np.vstack([_telemetry(200, seed=5), parity_probe_rows(compiled)])
+
+        np.testing.assert_allclose(compiled.score_samples(X), model.score_samples(X), rtol=0, atol=1e-12)
+        np.testing.assert_allclose(compiled.decision_function(X), model.decision_function(X), rtol=0, atol=1e-12)
+        labels, scores = compiled.predict_with_scores(X)
+        assert np.array_equal(labels, model.predict(X))
+        assert compiled.n_trees == 20
+
+    @pytest.mark.parametrize("estimator", [RandomForestRegressor, ExtraTreesRegressor])
+    def test_regression_forest_parity(self, estimator):
+        X = _telemetry(200)
+        model = estimator(n_estimators=10, random_state=0).fit(X, X[:, 0] * 2 + X[:, 1])
+        compiled, deviation = compile_and_verify(model)
+
+        assert deviation < 1e-9
+        np.testing.assert_allclose(compiled.predict(X), model.predict(X), rtol=0, atol=1e-9)
+        assert compiled.predict_with_scores(X[:3])[1] is None
+
+    def test_rejects_unsupported_models(self):
+        with pytest.raises(TypeError):
+            compile_tree_ensemble(Mock())
+        with pytest.raises(TypeError):
+            compile_tree_ensemble(IsolationForest())
+
+    def test_rejects_bad_input(self):
+        compiled = compile_tree_ensemble(_forest())
+        with pytest.raises(ValueError):
+            compiled.score_samples([[1.0, 2.0]])
+        with pytest.raises(ValueError):
+            compiled.score_samples([[np.nan] * 5])
+
+    def test_parity_failure_raises(self):
+        compiled = compile_tree_ensemble(_forest())
+        compiled.offset += 1.0
+        compiled._leaf_value = compiled._leaf_value * 2
+        with pytest.raises(ModelLoadError):
+            verify_parity(compiled)
+
+
+class TestVersionedModels:
+    async def test_load_prefers_newest_version(self):
+        anomaly_detector.save_model_version(_forest(seed=1))
+        version, path = anomaly_detector.save_model_version(_forest(seed=2))
+        assert version == 2 and os.path.basename(path) == "anomaly_if.v2.pkl"
+        with pytest.raises(ValueError):
+            anomaly_detector.save_model_version(_forest(), version=2)
+
+        assert await anomaly_detector.load_model() is True
+        info = anomaly_detector.get_model_info()
+        assert info["version"] == 2
+        assert info["compiled"]["trees"] == 20
+
+    async def test_corrupt_newest_version_falls_back(self):
+        anomaly_detector.save_model_version(_forest(seed=1))
+        with open(os.path.join(os.path.dirname(anomaly_detector.MODEL_PATH), "anomaly_if.v2.pkl"), "wb") as f:
+            f.write(b"not a pickle")
+
+        assert await anomaly_detector.load_model() is True
+        assert anomaly_detector.get_model_info()["version"] == 1
+        assert anomaly_detector._USING_HEURISTIC_MODE is False
+
+    async def test_unversioned_model_is_last_resort(self):
+        with open(os.path.join(os.path.dirname(anomaly_detector.MODEL_PATH), "anomaly_if.v1.pkl"), "wb") as f:
+            f.write(b"not a pickle")
+        with open(anomaly_detector.MODEL_PATH, "wb") as f:
+            import pickle
+            pickle.dump(_forest(), f)
+
+        assert await anomaly_detector.load_model() is True
+        assert anomaly_detector.get_model_info()["version"] is None
+        assert anomaly_detector._MODEL_LOADED is True
+
+    async def test_hot_swap_and_failed_swap(self):
+        anomaly_detector.save_model_version(_forest(seed=1))
+        await anomaly_detector.load_model()
+        first = anomaly_detector._MODEL
+        assert await anomaly_detector.reload_model_if_newer() is False
+
+        anomaly_detector.save_model_version(_forest(seed=2))
+        assert await anomaly_detector.reload_model_if_newer() is True
+        assert anomaly_detector._MODEL is not first
+        assert anomaly_detector._COMPILED_MODEL.model is anomaly_detector._MODEL
+
+        with pytest.raises(ModelLoadError):
+            await anomaly_detector.hot_swap_model(7)
+        with open(os.path.join(os.path.dirname(anomaly_detector.MODEL_PATH), "anomaly_if.v3.pkl"), "wb") as f:
+            f.write(b"not a pickle")
+        with pytest.raises(ModelLoadError):
+            await anomaly_detector.hot_swap_model(3)
+        assert anomaly_detector._MODEL_VERSION == 2
+
+        assert await anomaly_detector.hot_swap_model(1) == 1
+
+    async def test_uncompilable_model_served_by_estimator(self):
+        model = Mock()
+        model.predict.return_value = [1]
+        model.score_samples.return_value = [0.4]
+        anomaly_detector._install_model(model, anomaly_detector._compile_for_serving(model), None)
+
+        assert anomaly_detector._COMPILED_MODEL is None
+        assert await anomaly_detector.detect_anomaly(_record(_telemetry(1)[0])) == (True, 0.4)
+
+
+class TestDetection:
+    async def test_compiled_matches_estimator(self):
+        model = _forest(seed=3)
+        rows = np.vstack([_telemetry(20, seed=9), [[6.0, 60.0, 0.5, 4.0, 50.0]]])
+        records = [_record(row) for row in rows]
+
+        anomaly_detector._install_model(model, None, None)
+        expected = [await anomaly_detector.detect_anomaly(r) for r in records]
+
+        anomaly_detector._install_model(model, anomaly_detector._compile_for_serving(model), None)
+        assert anomaly_detector._COMPILED_MODEL is not None
+        assert [await anomaly_detector.detect_anomaly(r) for r in records] == expected
+        assert await anomaly_detector.detect_anomaly_batch(records) == expected
+
+    async def test_batch_handles_invalid_records_and_large_batches(self):
+        model = _forest(seed=4)
+        anomaly_detector._install_model(model, anomaly_detector._compile_for_serving(model), None)
+        rows = _telemetry(anomaly_detector.INLINE_SCORING_MAX_ROWS + 10, seed=6)
+        records = [_record(row) for row in rows]
+        records[3] = {"voltage": "bad"}
+
+        expected_first = (bool(model.predict(rows[:1])[0]), 0.0)
+
+        with patch.object(model, "predict") as estimator_predict, \
+             patch("anomaly.anomaly_detector.asyncio.to_thread", wraps=anomaly_detector.asyncio.to_thread) as to_thread:
+            results = await anomaly_detector.detect_anomaly_batch(records)
+        estimator_predict.assert_not_called()
+        assert to_thread.call_args[0][0] == anomaly_detector._COMPILED_MODEL.predict_with_scores
+
+        assert len(results) == len(records)
+        assert results[3][0] is True  # Heuristic: invalid data is treated as anomalous
+        assert results[0] == expected_first
+
+    async def test_batch_without_model_uses_heuristic(self):
+        records = [{"voltage": 6.5, "temperature": 45.0, "gyro": 0.15, "current": 1.0, "wheel_speed": 5.0}]
+        [(is_anomalous, score)] = await anomaly_detector.detect_anomaly_batch(records)
+        assert is_anomalous is True and score > 0.5
+        assert await anomaly_detector.detect_anomaly_batch([]) == []
+
+
+class TestShadow:
+    async def test_shadow_scoring_and_promotion(self):
+        anomaly_detector.save_model_version(_forest(seed=1))
+        anomaly_detector.save_model_version(_forest(seed=2))
+        await anomaly_detector.hot_swap_model(1)
+        serving = anomaly_detector._MODEL
+
+        assert await anomaly_detector.set_shadow_model() == 2
+        records = [_record(row) for row in _telemetry(5, seed=8)]
+        results = await anomaly_detector.detect_anomaly_batch(records)
+        await anomaly_detector.detect_anomaly(records[0])
+        await anomaly_detector.drain_shadow_scoring()
+
+        stats = anomaly_detector.get_shadow_stats()
+        assert stats["version"] == 2 and stats["rows"] == 6 and stats["errors"] == 0
+        assert anomaly_detector._MODEL is serving
+        assert results == [await anomaly_detector.detect_anomaly(r) for r in records]
+
+        assert anomaly_detector.promote_shadow_model() == 2
+        assert anomaly_detector._MODEL_VERSION == 2
+        assert anomaly_detector.get_shadow_stats() is None
+        with pytest.raises(AnomalyEngineError):
+            anomaly_detector.promote_shadow_model()
+
+    async def test_shadow_counts_disagreements(self):
+        serving = _forest(seed=1)
+        shifted = _telemetry(300, seed=2)
+        shifted[:, 0] += 3.0  # Candidate trained on a different voltage regime
+        candidate = IsolationForest(n_estimators=20, random_state=2).fit(shifted)
+        anomaly_detector.save_model_version(serving)
+        anomaly_detector.save_model_version(candidate)
+        await anomaly_detector.hot_swap_model(1)
+        await anomaly_detector.set_shadow_model(2)
+
+        rows = _telemetry(20, seed=8)
+        await anomaly_detector.detect_anomaly_batch([_record(row) for row in rows])
+        await anomaly_detector.drain_shadow_scoring()
+
+        stats = anomaly_detector.get_shadow_stats()
+        expected = int(np.sum(serving.predict(rows) != candidate.predict(rows)))
+        assert expected > 0
+        assert stats["disagreements"] == expected
+        assert stats["agreement_rate"] == 1.0 - expected / 20
+        assert stats["max_score_diff"] == pytest.approx(
+            np.max(np.abs(serving.score_samples(rows) - candidate.score_samples(rows)))
+        )
+
+    async def test_shadow_errors_do_not_affect_detection(self):
+        model = _forest(seed=1)
+        anomaly_detector._install_model(model, anomaly_detector._compile_for_serving(model), None)
+        broken = Mock()
+        broken.predict.side_effect = RuntimeError("shadow failed")
+        anomaly_detector._SHADOW = anomaly_detector.ShadowModel(9, broken, None)
+
+        record = _record(_telemetry(1)[0])
+        result = await anomaly_detector.detect_anomaly(record)
+        assert result == (bool(model.predict([list(record.values())])[0]), 0.0)
+        await anomaly_detector.drain_shadow_scoring()
+        assert anomaly_detector.get_shadow_stats()["errors"] == 1
+        anomaly_detector.clear_shadow_model()
+        assert anomaly_detector.get_model_info()["shadow"] is None
+
+    async def test_detection_does_not_wait_for_shadow(self):
+        model = _forest(seed=1)
+        anomaly_detector._install_model(model, anomaly_detector._compile_for_serving(model), None)
+        release = threading.Event()
+        slow = Mock(spec=["predict"])
+        slow.predict.side_effect = lambda rows: release.wait(5) and model.predict(rows)
+        anomaly_detector._SHADOW = anomaly_detector.ShadowModel(9, slow, None)
+
+        record = _record(_telemetry(1)[0])
+        await anomaly_detector.detect_anomaly(record)
+        assert anomaly_detector.get_shadow_stats()["rows"] == 0  # Still scoring in the background
+
+        release.set()
+        await anomaly_detector.drain_shadow_scoring()
+        assert anomaly_detector.get_shadow_stats()["rows"] == 1
+
+    async def test_shadow_skipped_when_backlogged(self):
+        model = _forest(seed=1)
+        anomaly_detector._install_model(model, anomaly_detector._compile_for_serving(model), None)
+        anomaly_detector._SHADOW = anomaly_detector.ShadowModel(2, model, None)
+
+        with patch.object(anomaly_detector, "SHADOW_MAX_PENDING", 0):
+            await anomaly_detector.detect_anomaly_batch([_record(row) for row in _telemetry(3)])
+        stats = anomaly_detector.get_shadow_stats()
+        assert stats["skipped"] == 3 and stats["rows"] == 0
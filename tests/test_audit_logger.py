@@ -0,0 +1,212 @@
+"""Tests for the segmented, indexed core audit logger"""
+
+import json
+import pytest
+from datetime import datetime, timedelta
+
+from core.audit_logger import AuditLogger, AuditEventType
+from core.audit_segments import (
+    GENESIS_HASH,
+    SEAL_PREFIX,
+    merkle_root,
+    read_last_line,
+)
+
+
+@pytest.fixture
+def make_logger(tmp_path):
+    loggers = []
+
+    def factory(**kwargs):
+        kwargs.setdefault("max_bytes", 4000)
+        audit = AuditLogger(log_dir=str(tmp_path / "audit"), **kwargs)
+        loggers.append(audit)
+        return audit
+
+    yield factory
+    for audit in loggers:
+        audit.close()
+
+
+def _log_many(audit, count):
+    for i in range(count):
+        audit.log_event(
+            AuditEventType.DATA_ACCESS if i % 2 else AuditEventType.AUTHENTICATION_SUCCESS,
+            user_id=f"user{i % 3}",
+            resource=f"res{i % 4}",
+            details={"i": i},
+        )
+
+
+class TestSegmentHelpers:
+    def test_read_last_line(self, tmp_path):
+        path = tmp_path / "f.log"
+        path.write_text("".join(f"line{i}\n" for i in range(5000)))
+        assert read_last_line(path) == "line4999"
+
+    def test_merkle_root_stable(self):
+        leaves = ["aa" * 32, "bb" * 32, "cc" * 32]
+        assert merkle_root(leaves) == merkle_root(list(leaves))
+        assert merkle_root(leaves) != merkle_root(leaves[:2])
+        assert merkle_root([]) == GENESIS_HASH
+
+
+class TestAuditLogger:
+    def test_segments_rotate_and_seal(self, make_logger):
+        audit = make_logger()
+        _log_many(audit, 60)
+        audit.flush()
+
+        segments = sorted(audit.segment_dir.glob("segment-*.log"))
+        assert len(segments) > 1
+        seal = json.loads(read_last_line(segments[0])[len(SEAL_PREFIX):])
+        assert seal["prev_hash"] == GENESIS_HASH
+        assert seal["count"] > 0
+        assert seal["start"] <= seal["end"]
+
+    def test_verify_integrity_incremental_and_full(self, make_logger):
+        audit = make_logger()
+        _log_many(audit, 60)
+        assert audit.index.checkpoints()
+        assert audit.verify_integrity()
+        assert audit.verify_integrity(full=True)
+
+    def test_tampering_after_checkpoint_detected(self, make_logger):
+        audit = make_logger()
+        _log_many(audit, 60)
+        audit.flush()
+        covered = audit.index.checkpoints()[-1]["upto_segment"]
+        active = sorted(audit.segment_dir.glob("segment-*.log"))[-1]
+        assert int(active.stem.split("-")[1]) > covered
+
+        content = active.read_text().replace('"i": ', '"i": 9', 1)
+        active.write_text(content)
+        assert not audit.verify_integrity()
+
+    def test_tampered_seal_fails_checkpoint(self, make_logger):
+        audit = make_logger()
+        _log_many(audit, 60)
+        audit.flush()
+        first = sorted(audit.segment_dir.glob("segment-*.log"))[0]
+        lines = first.read_text().splitlines()
+        seal = json.loads(lines[-1][len(SEAL_PREFIX):])
+        seal["count"] += 1
+        lines[-1] = SEAL_PREFIX + json.dumps(seal, sort_keys=True)
+        first.write_text("\n".join(lines) + "\n")
+        assert not audit.verify_integrity()
+        assert not audit.verify_integrity(full=True)
+
+    def test_chain_continues_across_restart(self, make_logger):
+        audit = make_logger()
+        _log_many(audit, 20)
+        last_hash = audit._last_hash
+        audit.close()
+
+        reopened = make_logger()
+        assert reopened._last_hash == last_hash
+        _log_many(reopened, 5)
+        assert reopened.verify_integrity(full=True)
+        assert reopened.get_audit_stats()["total_entries"] == 25
+
+    def test_recovers_unsealed_segment(self, make_logger):
+        audit = make_logger(max_bytes=10 * 1024 * 1024)
+        _log_many(audit, 10)
+        audit.flush()
+        last_hash = audit._last_hash
+        # Simulate a crash: stop without sealing and with an empty index
+        audit.listener.stop()
+        audit.integrity_handler._file.close()
+        audit.integrity_handler._file = None
+        audit.index._conn.execute("DELETE FROM entries")
+        audit.index.commit()
+        audit._closed = True
+        audit.index.close()
+
+        reopened = make_logger(max_bytes=10 * 1024 * 1024)
+        assert reopened._last_hash == last_hash
+        assert reopened.index.has_seal(1)
+        assert len(reopened.query_audit_logs(limit=100)) == 10
+        assert reopened.verify_integrity(full=True)
+
+    def test_query_uses_filters_and_limit(self, make_logger):
+        audit = make_logger()
+        _log_many(audit, 40)
+
+        results = audit.query_audit_logs(user_id="user1", limit=100)
+        assert results and all(r["user_id"] == "user1" for r in results)
+        assert len(results) == sum(1 for i in range(40) if i % 3 == 1)
+
+        typed = audit.query_audit_logs(
+            event_type=AuditEventType.DATA_ACCESS, resource="res1", limit=100
+        )
+        assert all(r["event_type"] == "data_access" and r["resource"] == "res1" for r in typed)
+        assert len(audit.query_audit_logs(limit=7)) == 7
+
+        timestamps = [r["timestamp"] for r in audit.query_audit_logs(limit=100)]
+        assert timestamps == sorted(timestamps)
+
+    def test_query_time_range(self, make_logger):
+        audit = make_logger()
+        _log_many(audit, 5)
+        now = datetime.utcnow()
+        assert len(audit.query_audit_logs(start_time=now - timedelta(minutes=1))) == 5
+        assert audit.query_audit_logs(start_time=now + timedelta(minutes=1)) == []
+        assert audit.query_audit_logs(end_time=now - timedelta(minutes=1)) == []
+
+    def test_iter_audit_logs_streams_newest_first(self, make_logger):
+        audit = make_logger()
+        _log_many(audit, 12)
+        stream = audit.iter_audit_logs(newest_first=True)
+        first = next(stream)
+        assert first["details"]["i"] == 11
+        stream.close()
+
+    def test_get_audit_stats(self, make_logger):
+        audit = make_logger()
+        _log_many(audit, 9)
+        stats = audit.get_audit_stats()
+        assert stats["total_entries"] == 9
+        assert stats["unique_users"] == 3
+        assert stats["event_type_counts"]["data_access"] == 4
+        assert stats["integrity_verified"] is True
+        assert [e["details"]["i"] for e in stats["recent_entries"]] == [4, 5, 6, 7, 8]
+
+    def test_legacy_integrity_log_seeds_chain(self, tmp_path, make_logger):
+        from core.audit_segments import chain_hash
+
+        log_dir = tmp_path / "audit"
+        log_dir.mkdir()
+        entry_json = json.dumps({"event_type": "legacy", "timestamp": "2020-01-01T00:00:00"})
+        legacy_hash = chain_hash(GENESIS_HASH, entry_json)
+        (log_dir / "audit_integrity.log").write_text(f"{legacy_hash}|{entry_json}\n")
+
+        audit = make_logger()
+        assert audit._last_hash == legacy_hash
+        _log_many(audit, 3)
+        assert audit.verify_integrity(full=True)
+
+    def test_legacy_entries_backfilled_into_index(self, tmp_path, make_logger):
+        from core.audit_segments import chain_hash
+
+        log_dir = tmp_path / "audit"
+        log_dir.mkdir()
+        lines, previous = [], GENESIS_HASH
+        for i in range(3):
+            entry_json = json.dumps({
+                "event_type": "authentication_failure", "user_id": "old_user",
+                "timestamp": f"2020-01-0{i + 1}T00:00:00Z", "details": {"i": i},
+            })
+            previous = chain_hash(previous, entry_json)
+            lines.append(f"{previous}|{entry_json}\n")
+        (log_dir / "audit_integrity.log").write_text("".join(lines))
+
+        audit = make_logger()
+        _log_many(audit, 2)
+        results = audit.query_audit_logs(limit=100)
+        assert [r["details"]["i"] for r in results] == [0, 1, 2, 0, 1]
+        assert len(audit.query_audit_logs(user_id="old_user", end_time=datetime(2020, 1, 2, 12))) == 2
+        assert audit.get_audit_stats()["total_entries"] == 5
+        audit.close()
+
+        restarted = make_logger()
+        assert restarted.get_audit_stats()["total_entries"] == 5
@@ -3,6 +3,8 @@
 import pytest
 import tempfile
 import os
+import csv
+import json
 from typing import Optional
 from datetime import datetime, timedelta
 from src.compliance.data_retention import DataRetentionPolicy, DataType
@@ -12,6 +14,7 @@ from src.compliance.gdpr import GDPRCompliance
 from src.compliance.access_logging import AccessControlLogger
 from src.compliance.data_export import DataExport
 from src.compliance.integrity_checks import IntegrityChecker
+from src.compliance.event_store import ComplianceEventStore
 
 
 class TestDataRetention:
@@ -117,3 +120,140 @@ class TestIntegrityChecker:
         
         assert checker.verify_integrity("test1", data) is True
         assert checker.verify_integrity("test1", b"modified") is False
+
+
+class TestIndexedQueries:
+    def test_query_by_user_type_and_time(self):
+        trail = AuditTrail()
+        for i in range(30):
+            trail.record_event("login" if i % 2 else "data_access", f"user{i % 3}", "action")
+        
+        assert len(trail.query_events(user_id="user1")) == 10
+        assert len(trail.query_events(user_id="user1", event_type="login")) == 5
+        assert trail.query_events(user_id="nobody") == []
+        
+        middle = datetime.fromisoformat(trail._events[15]["timestamp"])
+        later = trail.query_events(start_date=middle)
+        assert later[0]["timestamp"] >= trail._events[15]["timestamp"]
+        assert len(trail.query_events(user_id="user0", end_date=middle)) == len(
+            [e for e in trail._events[:16] if e["user_id"] == "user0"
+             and datetime.fromisoformat(e["timestamp"]) <= middle]
+        )
+    
+    def test_unsorted_times_fall_back_to_filtering(self):
+        trail = AuditTrail()
+        trail.record_event("login", "u", "a")
+        trail.record_event("login", "u", "b")
+        trail._times[1] = trail._times[0] - 100
+        trail._times_sorted = False
+        start = datetime.fromtimestamp(trail._times[0])
+        assert [e["action"] for e in trail.query_events(user_id="u", start_date=start)] == ["a"]
+    
+    def test_streaming_export_formats(self, tmp_path):
+        trail = AuditTrail()
+        trail.record_event("login", "user1", "Login", {"ip": "10.0.0.1"})
+        trail.record_event("logout", "user1", "Logout")
+        
+        trail.export_audit_trail(str(tmp_path / "trail.json"))
+        assert [e["event_type"] for e in json.loads((tmp_path / "trail.json").read_text())] == ["login", "logout"]
+        
+        trail.export_audit_trail(str(tmp_path / "trail.ndjson"), format="ndjson")
+        lines = (tmp_path / "trail.ndjson").read_text().splitlines()
+        assert json.loads(lines[0])["details"] == {"ip": "10.0.0.1"}
+        
+        AuditTrail().export_audit_trail(str(tmp_path / "empty.json"))
+        assert json.loads((tmp_path / "empty.json").read_text()) == []
+    
+    def test_right_to_access_collects_activity(self):
+        trail, access = AuditTrail(), AccessControlLogger()
+        trail.record_event("data_access", "user123", "Viewed report")
+        access.log_login("user123", "10.0.0.1", True)
+        access.log_login("someone", "10.0.0.2", True)
+        
+        data = GDPRCompliance(audit_trail=trail, access_logger=access).right_to_access("user123")
+        assert [e["event_type"] for e in data["activity_logs"]] == ["data_access", "login"]
+
+
+@pytest.mark.usefixtures("real_aiosqlite")
+class TestComplianceEventStore:
+    @pytest.fixture
+    async def store(self, tmp_path):
+        store = ComplianceEventStore(tmp_path / "events.db", max_batch=50, delete_batch=7)
+        await store.start()
+        yield store
+        await store.close()
+    
+    @staticmethod
+    def _event(i, user, when):
+        return {"event_id": f"EVT-{i:08d}", "timestamp": when.isoformat(), "event_type": "login",
+                "user_id": user, "action": "Login"}
+    
+    async def test_write_through_and_user_query(self, store):
+        trail = AuditTrail(store=store)
+        access = AccessControlLogger(store=store)
+        for i in range(120):
+            trail.record_event("data_access", f"user{i % 4}", "Viewed")
+        access.log_login("user1", "10.0.0.1", True)
+        await store.flush()
+        
+        assert await store.count() == 121
+        events = await store.query_events(user_id="user1")
+        assert len(events) == 31
+        assert events[-1]["event_type"] == "login"
+        assert events[0] == trail.query_events(user_id="user1")[0]
+        assert len(await store.query_events(user_id="user1", source="access")) == 1
+        assert len(await store.query_events(limit=5)) == 5
+    
+    async def test_time_range_keyset_pagination(self, store):
+        base = datetime(2024, 1, 1)
+        for i in range(100):
+            await store.append(self._event(i, "u", base + timedelta(minutes=i // 2)), source="audit")
+        rows = [row async for chunk in store.iter_rows(chunk_size=7) for row in chunk]
+        assert [row[1] for row in rows] == [f"EVT-{i:08d}" for i in range(100)]
+        
+        window = await store.query_events(start=base + timedelta(minutes=10), end=base + timedelta(minutes=19))
+        assert len(window) == 20
+    
+    async def test_streaming_export(self, store, tmp_path):
+        base = datetime(2024, 1, 1)
+        for i in range(25):
+            store.submit(self._event(i, "u1" if i % 5 else "u2", base + timedelta(seconds=i)), source="audit")
+        await store.flush()
+        
+        await store.export(tmp_path / "u1.ndjson", user_id="u1", chunk_size=6)
+        lines = (tmp_path / "u1.ndjson").read_text().splitlines()
+        assert len(lines) == 20 and all(json.loads(line)["user_id"] == "u1" for line in lines)
+        
+        await store.export(tmp_path / "u2.csv", format="csv", user_id="u2")
+        with open(tmp_path / "u2.csv", newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 5
+        assert json.loads(rows[0]["payload"])["event_id"] == "EVT-00000000"
+        
+        with pytest.raises(ValueError):
+            await store.export(tmp_path / "x.xml", format="xml")
+    
+    async def test_erasure(self, store, tmp_path):
+        gdpr = GDPRCompliance(event_store=store)
+        for i in range(40):
+            store.submit(self._event(i, "gone" if i % 2 else "kept", datetime.now()), source="audit")
+        
+        assert await gdpr.erase_stored_events("gone") == 20
+        assert await store.count(user_id="gone") == 0
+        assert await store.count() == 20
+        assert await gdpr.export_stored_events("gone", str(tmp_path / "gone.ndjson")) == 0
+    
+    async def test_retention_range_delete(self, store):
+        now = datetime(2024, 6, 1)
+        policy = DataRetentionPolicy()
+        policy.set_retention_period(DataType.USER_DATA, 30)
+        for i, age in enumerate((10, 29, 31, 45, 400)):
+            when = now - timedelta(days=age)
+            await store.append(self._event(i, "u", when), source="access", data_type=DataType.USER_DATA)
+            await store.append(self._event(i, "u", when), source="audit", data_type=DataType.AUDIT_LOGS)
+        
+        deleted = await store.enforce_retention(policy, now=now)
+        assert deleted == {"user_data": 3}
+        remaining = await store.query_events(source="access")
+        assert [(now - datetime.fromisoformat(e["timestamp"])).days for e in remaining] == [29, 10]
+        assert await store.count() == 7
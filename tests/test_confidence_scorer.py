@@ -10,6 +10,7 @@ Tests cover:
 - Weight normalization
 """
 
+import numpy as np
 import pytest
 from src.anomaly_agent.confidence_scorer import (
     ConfidenceScorer,
@@ -456,3 +457,79 @@ class TestEdgeCases:
         )
         assert 0.0 <= high_confidence <= 1.0
         assert 0.0 <= low_confidence <= 1.0
+
+
+class TestBatchScoring:
+    """Test the vectorized batch API."""
+
+    @pytest.fixture
+    def columns(self):
+        rng = np.random.default_rng(7)
+        n = 500
+        phases = list(ConfidenceScorer.PHASE_RISK) + ["UNKNOWN_PHASE"]
+        return {
+            "anomaly_scores": rng.uniform(-0.2, 1.2, n),
+            "recurrence_counts": rng.integers(-1, 20, n),
+            "mission_phases": rng.choice(phases, n),
+            "policy_allowed": rng.random(n) > 0.3,
+            "temporal_decay": rng.uniform(0.0, 1.2, n),
+        }
+
+    def test_batch_matches_scalar(self, columns):
+        scorer = ConfidenceScorer(weight_anomaly=0.5, weight_recurrence=0.1)
+        batch = scorer.calculate_confidence_batch(**columns)
+
+        scalar = [
+            scorer.calculate_confidence(
+                anomaly_score=float(a), recurrence_count=int(r), mission_phase=str(p),
+                policy_allowed=bool(pol), temporal_decay=float(t),
+            )
+            for a, r, p, pol, t in zip(*columns.values())
+        ]
+        np.testing.assert_allclose(batch, scalar, atol=1e-12)
+
+    def test_encoded_phases_and_scalar_defaults(self, columns):
+        scorer = ConfidenceScorer()
+        codes = scorer.encode_phases(columns["mission_phases"])
+        by_name = scorer.calculate_confidence_batch(columns["anomaly_scores"], mission_phases=columns["mission_phases"])
+        by_code = scorer.calculate_confidence_batch(columns["anomaly_scores"], mission_phases=codes)
+        np.testing.assert_array_equal(by_name, by_code)
+
+        launch = scorer.calculate_confidence_batch(np.array([0.8, 0.8]), mission_phases="LAUNCH")
+        assert launch[0] == pytest.approx(scorer.calculate_confidence(0.8, mission_phase="LAUNCH"))
+
+    def test_invalid_inputs(self):
+        scorer = ConfidenceScorer()
+        scores = np.array([0.9, np.nan, 0.9])
+        decay = np.array([1.0, 1.0, np.inf])
+
+        result = scorer.calculate_confidence_batch(scores, temporal_decay=decay)
+        assert result[0] > 0 and result[1] == 0.0 and result[2] == 0.0
+        assert np.isnan(scorer.calculate_confidence_batch(scores, on_invalid="nan")[1])
+        with pytest.raises(ValueError, match="first at row 1"):
+            scorer.calculate_confidence_batch(scores, on_invalid="raise")
+        with pytest.raises(ValueError):
+            scorer.calculate_confidence_batch(scores, temporal_decay=np.ones(2))
+
+    def test_fit_recovers_weights(self, columns):
+        true = ConfidenceScorer(0.6, 0.1, 0.1, 0.1, 0.1)
+        labels = true.calculate_confidence_batch(**columns)
+
+        fitted = ConfidenceScorer.fit(labels, **columns, iterations=2000)
+
+        assert fitted.weights.sum() == pytest.approx(1.0)
+        np.testing.assert_allclose(fitted.weights, true.weights, atol=0.02)
+
+    def test_fit_from_binary_feedback_improves_brier_score(self, columns):
+        rng = np.random.default_rng(3)
+        # Outcomes driven by the anomaly score alone
+        labels = (rng.random(len(columns["anomaly_scores"])) < np.clip(columns["anomaly_scores"], 0, 1)).astype(float)
+
+        default = ConfidenceScorer()
+        fitted = ConfidenceScorer.fit(labels, **columns)
+
+        def brier(scorer):
+            return np.mean((scorer.calculate_confidence_batch(**columns) - labels) ** 2)
+
+        assert brier(fitted) < brier(default)
+        assert fitted.weight_anomaly > default.weight_anomaly
@@ -1,11 +1,19 @@
 """Tests for Connection Limit Enforcement (#678)"""
 
+import asyncio
+
 import pytest
 from src.core.connection_limiter import (
+    AdmissionController,
+    AdmissionRejected,
     ConnectionLimiter,
     ConnectionType,
+    GradientLimit,
+    Priority,
+    PriorityPolicy,
     get_connection_limiter
 )
+from src.core.timeout_handler import TimeoutContext
 
 
 class TestConnectionLimiter:
@@ -42,3 +50,152 @@ class TestConnectionLimiter:
         limiter1 = get_connection_limiter()
         limiter2 = get_connection_limiter()
         assert limiter1 is limiter2
+
+    def test_reacquire_same_id_keeps_count(self, limiter):
+        limiter.acquire_connection("conn1", ConnectionType.DATABASE)
+        limiter.acquire_connection("conn1", ConnectionType.DATABASE)
+        limiter.acquire_connection("conn2", ConnectionType.DATABASE)
+        assert limiter.get_connection_stats()["by_type"]["database"]["active"] == 2
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def make_controller(limit=4, policies=None, **kwargs):
+    return AdmissionController(
+        limit=GradientLimit(initial_limit=limit, min_limit=1, max_limit=limit),
+        policies=policies,
+        **kwargs
+    )
+
+
+class TestGradientLimit:
+    def test_grows_while_latency_is_flat(self):
+        limit = GradientLimit(initial_limit=10, max_limit=100)
+        for _ in range(50):
+            limit.update(0.01, inflight=int(limit.limit))
+        assert limit.limit > 20
+
+    def test_shrinks_when_latency_inflates(self):
+        limit = GradientLimit(initial_limit=50, max_limit=100)
+        for _ in range(20):
+            limit.update(0.01, inflight=50)
+        grown = limit.limit
+        for _ in range(50):
+            limit.update(0.1, inflight=int(limit.limit))
+        assert limit.limit < grown / 2
+
+    def test_does_not_grow_when_underused(self):
+        limit = GradientLimit(initial_limit=20)
+        for _ in range(50):
+            limit.update(0.01, inflight=2)
+        assert limit.limit == 20
+
+    def test_drops_back_off_to_min(self):
+        limit = GradientLimit(initial_limit=10, min_limit=4)
+        for _ in range(50):
+            limit.update(0.01, inflight=10, dropped=True)
+        assert limit.limit == 4
+
+    def test_invalid_bounds(self):
+        with pytest.raises(ValueError):
+            GradientLimit(initial_limit=2, min_limit=4)
+
+
+class TestAdmissionController:
+    async def test_admits_up_to_limit_then_queues(self):
+        controller = make_controller(limit=2)
+        first = await controller.acquire(Priority.CRITICAL, "a")
+        await controller.acquire(Priority.CRITICAL, "a")
+        waiter = asyncio.ensure_future(controller.acquire(Priority.CRITICAL, "a"))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        assert controller.get_stats()["by_priority"]["critical"]["queued"] == 1
+
+        controller.release(first)
+        ticket = await waiter
+        assert ticket.priority is Priority.CRITICAL
+        assert controller.inflight == 2
+
+    async def test_queue_full_sheds_with_retry_after(self):
+        controller = make_controller(
+            limit=1, policies={Priority.BACKGROUND: PriorityPolicy(1.0, max_queue=0, queue_timeout=1.0)}
+        )
+        await controller.acquire(Priority.BACKGROUND, "a")
+        with pytest.raises(AdmissionRejected) as exc:
+            await controller.acquire(Priority.BACKGROUND, "a")
+        assert exc.value.reason == "queue_full"
+        assert exc.value.retry_after >= 1
+        assert controller.get_stats()["by_priority"]["background"]["shed_queue_full"] == 1
+
+    async def test_queue_deadline_sheds(self):
+        controller = make_controller(
+            limit=1, policies={Priority.NORMAL: PriorityPolicy(1.0, max_queue=10, queue_timeout=0.01)}
+        )
+        await controller.acquire(Priority.NORMAL, "a")
+        with pytest.raises(AdmissionRejected, match="timeout"):
+            await controller.acquire(Priority.NORMAL, "a")
+        stats = controller.get_stats()
+        assert stats["by_priority"]["normal"]["queued"] == 0
+        assert stats["active_tenants"] == 1
+
+    async def test_enclosing_deadline_bounds_the_wait(self):
+        controller = make_controller(limit=1)
+        await controller.acquire(Priority.CRITICAL, "a")
+        with pytest.raises(AdmissionRejected):
+            with TimeoutContext(seconds=0.01):
+                await controller.acquire(Priority.CRITICAL, "a")
+
+    async def test_background_share_keeps_headroom_for_critical(self):
+        controller = make_controller(
+            limit=10, fair_share=False,
+            policies={Priority.BACKGROUND: PriorityPolicy(0.3, max_queue=0, queue_timeout=0.1)}
+        )
+        for _ in range(3):
+            await controller.acquire(Priority.BACKGROUND, "batch")
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire(Priority.BACKGROUND, "batch")
+        for _ in range(7):
+            await controller.acquire(Priority.CRITICAL, "sensor")
+        assert controller.inflight == 10
+
+    async def test_higher_priority_is_granted_first(self):
+        controller = make_controller(limit=1, fair_share=False)
+        held = await controller.acquire(Priority.NORMAL, "a")
+        background = asyncio.ensure_future(controller.acquire(Priority.NORMAL, "b"))
+        await asyncio.sleep(0)
+        critical = asyncio.ensure_future(controller.acquire(Priority.CRITICAL, "c"))
+        await asyncio.sleep(0)
+
+        controller.release(held)
+        ticket = await critical
+        assert ticket.tenant == "c"
+        assert not background.done()
+        controller.release(ticket)
+        assert (await background).tenant == "b"
+
+    async def test_tenants_share_fairly(self):
+        controller = make_controller(limit=4)
+        noisy = [await controller.acquire(Priority.CRITICAL, "noisy") for _ in range(4)]
+        waiters = [asyncio.ensure_future(controller.acquire(Priority.CRITICAL, "noisy")) for _ in range(4)]
+        quiet = [asyncio.ensure_future(controller.acquire(Priority.CRITICAL, "quiet")) for _ in range(2)]
+        await settle()
+
+        # Two tenants share a limit of 4: freed slots go to the quiet tenant
+        # until each holds its fair share of 2
+        for ticket in noisy[:2]:
+            controller.release(ticket)
+        await settle()
+        assert all(w.done() for w in quiet)
+        assert not any(w.done() for w in waiters)
+
+        for ticket in noisy[2:]:
+            controller.release(ticket)
+        await settle()
+        assert sum(w.done() for w in waiters) == 2
+        for w in waiters:
+            w.cancel()
+        await settle()
+        assert controller.get_stats()["by_priority"]["critical"]["queued"] == 0
@@ -51,7 +51,7 @@ def setup_test_db(tmp_path, monkeypatch):
     
     # Clear the in-memory rate limiter between tests
     from api.contact import _in_memory_limiter
-    _in_memory_limiter.requests.clear()
+    _in_memory_limiter.clear()
     
     # Initialize database
     init_database()
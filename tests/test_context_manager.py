@@ -2,7 +2,8 @@
 Tests for LLM Context Manager.
 """
 import pytest
-from src.llm.context_manager import LLMContextManager
+from src.llm.context_manager import LLMContextManager, LLMSession, SessionStore
+from src.llm.tokenizer import EncodingTokenCounter, HeuristicTokenCounter
 
 @pytest.fixture
 def context_manager():
@@ -72,3 +73,111 @@ def test_session_isolation(context_manager):
 
 def test_get_context_nonexistent(context_manager):
     assert context_manager.get_context("nonexistent") == []
+
+def test_trim_context_keeps_system_prompt(context_manager):
+    session_id = "test-session-4"
+    context_manager.create_session(session_id, [{"role": "system", "content": "Be precise."}])
+    for i in range(25):
+        context_manager.add_message(session_id, "user", f"Message {i}")
+
+    context_manager.trim_context(session_id, max_messages=20)
+
+    context = context_manager.get_context(session_id)
+    assert len(context) == 20
+    assert context[0]["role"] == "system"
+    assert context[1]["content"] == "Message 6"
+
+def test_token_counts_cached_per_message(context_manager):
+    session_id = "test-session-5"
+    context_manager.create_session(session_id, [{"role": "system", "content": "Be precise."}])
+    context_manager.add_message(session_id, "user", "Battery voltage is nominal")
+
+    counter = context_manager.token_counter
+    expected = sum(counter.count_message(m) for m in context_manager.get_context(session_id))
+    assert context_manager.get_token_count(session_id) == expected
+
+def test_build_context_fits_budget_and_pins_prefix():
+    manager = LLMContextManager(max_tokens=60)
+    pinned = [
+        {"role": "system", "content": "You are a flight controller."},
+        {"role": "user", "content": "example input"},
+        {"role": "assistant", "content": "example output"},
+    ]
+    manager.create_session("s", pinned, pinned=3)
+    for i in range(10):
+        manager.add_message("s", "user", f"question number {i}")
+        manager.add_message("s", "assistant", f"answer number {i}")
+
+    context = manager.build_context("s")
+
+    counter = manager.token_counter
+    assert sum(counter.count_message(m) for m in context) <= 60
+    assert context[:3] == pinned
+    assert context[3]["role"] == "user"  # Whole turns evicted
+    assert context[-1]["content"] == "answer number 9"
+    assert len(manager.get_context("s")) == 23  # History untouched
+
+def test_trim_context_summarizes_evicted_turns():
+    summaries = []
+
+    def summarize(messages):
+        summaries.append(messages)
+        return f"{len(messages)} earlier messages"
+
+    manager = LLMContextManager(max_tokens=60, summarizer=summarize, summary_reserve_tokens=20)
+    manager.create_session("s", [{"role": "system", "content": "Be precise."}])
+    for i in range(10):
+        manager.add_message("s", "user", f"question number {i}")
+
+    manager.trim_context("s")
+
+    context = manager.get_context("s")
+    assert manager.get_token_count("s") <= 60
+    assert context[0]["content"] == "Be precise."
+    assert context[1]["content"].startswith("Summary of earlier conversation:")
+    assert summaries[0][0]["content"] == "question number 0"
+
+def test_session_store_lru_and_ttl():
+    clock = [0.0]
+    store = SessionStore(max_sessions=2, ttl_seconds=10, clock=lambda: clock[0])
+    for name in ("a", "b"):
+        store.put(LLMSession(name, [], []))
+    store.get("a")
+    store.put(LLMSession("c", [], []))
+
+    assert "b" not in store  # Least recently used
+    assert "a" in store and "c" in store
+
+    clock[0] = 11.0
+    assert store.get("a") is None
+    assert store.get_stats()["expired"] == 1
+
+def test_session_store_spills_to_sqlite(tmp_path):
+    manager = LLMContextManager(max_sessions=1, sqlite_path=tmp_path / "sessions.db")
+    manager.create_session("first", [{"role": "system", "content": "Be precise."}])
+    manager.add_message("first", "user", "hello")
+    manager.create_session("second")
+
+    assert len(manager.sessions) == 1
+    context = manager.get_context("first")  # Loaded back from SQLite
+    assert [m["content"] for m in context] == ["Be precise.", "hello"]
+    assert manager.get_stats()["loaded"] == 1
+
+def test_truncate_to_token_budget():
+    counter = HeuristicTokenCounter()
+    text = "telemetry reading nominal " * 200
+    truncated = counter.truncate(text, 50)
+    assert counter.count_text(truncated) <= 50
+    assert text.startswith(truncated)
+
+def test_encoding_token_counter():
+    class WhitespaceEncoder:
+        def encode(self, text):
+            return text.split()
+
+        def decode(self, tokens):
+            return " ".join(tokens)
+
+    counter = EncodingTokenCounter(WhitespaceEncoder())
+    assert counter.count_text("one two three") == 3
+    assert counter.truncate("one two three", 2) == "one two"
@@ -17,6 +17,7 @@ from core.circuit_breaker import (
     CircuitState,
     CircuitOpenError,
     CircuitBreakerRegistry,
+    SlidingWindowCircuitBreaker,
     register_circuit_breaker,
     get_circuit_breaker,
     get_all_circuit_breakers,
@@ -353,3 +354,146 @@ class TestConcurrentCalls:
         # Circuit should eventually open
         # (may not be exactly at failure_threshold due to timing)
         assert breaker.metrics.failures_total == 10
+
+
+class TestSlidingWindowCircuitBreaker:
+    """Test the failure-rate / slow-call-rate breaker"""
+
+    @staticmethod
+    async def ok():
+        return "ok"
+
+    @staticmethod
+    async def boom():
+        raise ValueError("boom")
+
+    async def _run(self, breaker, outcomes):
+        for success in outcomes:
+            try:
+                await breaker.call(self.ok if success else self.boom)
+            except (ValueError, CircuitOpenError):
+                pass
+
+    @pytest.mark.asyncio
+    async def test_minimum_calls_before_tripping(self):
+        breaker = SlidingWindowCircuitBreaker(name="sw_min", minimum_calls=10)
+        await self._run(breaker, [False] * 9)
+        assert breaker.state == CircuitState.CLOSED
+        await self._run(breaker, [False])
+        assert breaker.state == CircuitState.OPEN
+
+    @pytest.mark.asyncio
+    async def test_flapping_dependency_trips_on_rate(self):
+        """Alternating outcomes never reach a consecutive threshold but do reach 50%"""
+        consecutive = CircuitBreaker(name="cb_flap", failure_threshold=3)
+        windowed = SlidingWindowCircuitBreaker(
+            name="sw_flap", failure_rate_threshold=0.5, minimum_calls=10
+        )
+        pattern = [True, False] * 10
+        await self._run(consecutive, pattern)
+        await self._run(windowed, pattern)
+        assert consecutive.state == CircuitState.CLOSED
+        assert windowed.state == CircuitState.OPEN
+        assert windowed.get_metrics().trips_total == 1
+
+    @pytest.mark.asyncio
+    async def test_low_failure_rate_stays_closed(self):
+        breaker = SlidingWindowCircuitBreaker(name="sw_low", failure_rate_threshold=0.5, minimum_calls=10)
+        await self._run(breaker, ([True] * 3 + [False]) * 25)
+        stats = breaker.get_stats()
+        assert stats["state"] == "CLOSED"
+        assert stats["window_calls"] == 100
+        assert stats["failure_rate"] == pytest.approx(0.25)
+
+    @pytest.mark.asyncio
+    async def test_slow_calls_trip(self):
+        breaker = SlidingWindowCircuitBreaker(
+            name="sw_slow", slow_call_seconds=0.01, slow_call_rate_threshold=0.5, minimum_calls=4
+        )
+
+        async def slow():
+            await asyncio.sleep(0.02)
+
+        for _ in range(4):
+            await breaker.call(slow)
+        assert breaker.state == CircuitState.OPEN
+
+    @pytest.mark.asyncio
+    async def test_old_buckets_leave_the_window(self):
+        breaker = SlidingWindowCircuitBreaker(
+            name="sw_expire", minimum_calls=4, window_seconds=0.2, buckets=4
+        )
+        await self._run(breaker, [False] * 3)
+        await asyncio.sleep(0.25)
+        await self._run(breaker, [False])
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.get_stats()["window_calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_half_open_limits_concurrent_probes(self):
+        breaker = SlidingWindowCircuitBreaker(
+            name="sw_probe", minimum_calls=2, recovery_timeout=0,
+            half_open_max_calls=2, success_threshold=2,
+        )
+        await self._run(breaker, [False, False])
+        assert breaker.metrics.state == CircuitState.OPEN
+
+        release = asyncio.Event()
+
+        async def probe():
+            await release.wait()
+            return "ok"
+
+        probes = [asyncio.create_task(breaker.call(probe)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert breaker.state == CircuitState.HALF_OPEN
+        with pytest.raises(CircuitOpenError) as exc:
+            await breaker.call(self.ok)
+        assert exc.value.state == CircuitState.HALF_OPEN
+
+        release.set()
+        await asyncio.gather(*probes)
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.get_stats()["window_calls"] == 0
+
+    @pytest.mark.asyncio
+    async def test_half_open_probe_failure_reopens(self):
+        breaker = SlidingWindowCircuitBreaker(name="sw_reopen", minimum_calls=2, recovery_timeout=0)
+        await self._run(breaker, [False, False, False])
+        assert breaker.get_stats()["half_open_in_flight"] == 0
+        assert breaker.metrics.trips_total == 2
+
+    @pytest.mark.asyncio
+    async def test_uncounted_exception_releases_probe(self):
+        breaker = SlidingWindowCircuitBreaker(
+            name="sw_cancel", minimum_calls=1, recovery_timeout=0,
+            half_open_max_calls=1, expected_exceptions=(ValueError,),
+        )
+        await self._run(breaker, [False])
+
+        async def unexpected():
+            raise KeyError("not a failure")
+
+        with pytest.raises(KeyError):
+            await breaker.call(unexpected)
+        assert await breaker.call(self.ok) == "ok"
+
+    def test_sync_gate(self):
+        breaker = SlidingWindowCircuitBreaker(name="sw_sync", minimum_calls=2)
+        for _ in range(2):
+            assert breaker.allow_request()
+            breaker.record_failure()
+        assert not breaker.allow_request()
+
+    def test_registry_exports_window_stats(self):
+        registry = CircuitBreakerRegistry()
+        registry.register(CircuitBreaker(name="plain"))
+        windowed = SlidingWindowCircuitBreaker(name="windowed")
+        windowed.record_success()
+        registry.register(windowed)
+
+        stats = registry.get_stats()
+        assert stats["plain"]["state"] == "CLOSED"
+        assert "failure_rate" not in stats["plain"]
+        assert stats["windowed"]["window_calls"] == 1
+        assert stats["windowed"]["failure_rate"] == 0.0
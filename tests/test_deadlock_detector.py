@@ -4,11 +4,16 @@ Tests for Deadlock Detection (Issue #676)
 
 import pytest
 import asyncio
+import threading
 from src.core.deadlock_detector import (
     DeadlockDetector,
+    DeadlockError,
     DeadlockStatus,
     ResourceDependency,
-    get_deadlock_detector
+    TrackedAsyncLock,
+    TrackedLock,
+    get_deadlock_detector,
+    strongly_connected_components
 )
 
 
@@ -130,6 +135,132 @@ class TestDeadlockDetector:
             pass
 
 
+class TestIncrementalDetection:
+    """Cycle detection at edge-insert time"""
+    
+    @pytest.fixture
+    def detector(self):
+        return DeadlockDetector()
+    
+    def test_cycle_reported_when_closing_edge_inserted(self, detector):
+        """Two tasks each holding one resource and waiting for the other"""
+        reports = []
+        detector.on_deadlock(reports.append)
+        
+        assert detector.register_dependency("t1", "r1", waiting_for="r2") is None
+        report = detector.register_dependency("t2", "r2", waiting_for="r1")
+        
+        assert report.status == DeadlockStatus.DEADLOCK_DETECTED
+        assert report.cycle == ["t2", "t1", "t2"]
+        assert reports == [report]
+        assert detector.get_statistics()["deadlocks_detected"] == 1
+    
+    def test_acquisition_closing_cycle_detected(self, detector):
+        """A cycle can also be closed by an owner taking a contended resource"""
+        detector.acquired("t1", "r1")
+        detector.wait_for("t2", "r1")
+        detector.wait_for("t1", "r2")
+        report = detector.acquired("t2", "r2")
+        assert report is not None and report.affected_tasks == {"t1", "t2"}
+    
+    def test_reregistration_replaces_previous_state(self, detector):
+        """A task that acquired what it waited for no longer waits or holds the old resource"""
+        assert detector.register_dependency("A", "R1", waiting_for="R2") is None
+        assert detector.register_dependency("A", "R2") is None
+        assert detector.detect_deadlock().status == DeadlockStatus.NO_DEADLOCK
+        assert detector.wait_for_graph() == {}
+
+        # R1 was given up, so another task can own it without a cycle
+        assert detector.register_dependency("B", "R1", waiting_for="R2") is None
+        assert detector.wait_for_graph() == {"B": {"A"}}
+
+    def test_release_breaks_cycle(self, detector):
+        detector.register_dependency("t1", "r1", waiting_for="r2")
+        detector.register_dependency("t2", "r2", waiting_for="r1")
+        detector.release_dependency("t2")
+        assert detector.detect_deadlock().status == DeadlockStatus.NO_DEADLOCK
+        assert detector.wait_for_graph() == {}
+    
+    def test_long_chain_without_recursion(self, detector):
+        n = 20_000
+        for i in range(n):
+            assert detector.register_dependency(f"t{i}", f"r{i}", waiting_for=f"r{i + 1}") is None
+        report = detector.register_dependency(f"t{n}", f"r{n}", waiting_for="r0")
+        assert len(report.cycle) == n + 2
+        assert len(detector.detect_deadlock().cycle) == n + 2
+    
+    def test_full_scan_reports_all_cycles(self, detector):
+        for a, b in [("a", "b"), ("b", "a"), ("c", "d"), ("d", "e"), ("e", "c"), ("x", "y")]:
+            detector.register_dependency(a, f"r_{a}", waiting_for=f"r_{b}")
+        report = detector.detect_deadlock()
+        assert sorted(len(c) for c in report.cycles) == [3, 4]
+        assert report.affected_tasks == {"a", "b", "c", "d", "e"}
+    
+    def test_tarjan_components(self):
+        graph = {"a": {"b"}, "b": {"c"}, "c": {"a", "d"}, "d": {"e"}, "e": {"d"}, "f": set()}
+        components = sorted(sorted(c) for c in strongly_connected_components(graph))
+        assert components == [["a", "b", "c"], ["d", "e"], ["f"]]
+
+
+class TestTrackedLocks:
+    """Lock instrumentation feeding the detector"""
+    
+    def test_threading_lock_ab_ba_raises(self):
+        detector = DeadlockDetector()
+        lock_a = TrackedLock("A", detector, raise_on_deadlock=True)
+        lock_b = TrackedLock("B", detector, raise_on_deadlock=True)
+        holding = threading.Barrier(2)
+        errors = []
+        
+        def worker(first, second):
+            with first:
+                holding.wait()
+                try:
+                    with second:
+                        pass
+                except DeadlockError as e:
+                    errors.append(e)
+        
+        threads = [
+            threading.Thread(target=worker, args=(lock_a, lock_b)),
+            threading.Thread(target=worker, args=(lock_b, lock_a)),
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=5)
+        
+        assert not any(t.is_alive() for t in threads)
+        assert len(errors) >= 1
+        assert detector.get_statistics()["deadlocks_detected"] >= 1
+        assert detector.get_statistics()["held_resources"] == 0
+    
+    async def test_asyncio_lock_ab_ba_raises(self):
+        detector = DeadlockDetector()
+        lock_a = TrackedAsyncLock("A", detector, raise_on_deadlock=True)
+        lock_b = TrackedAsyncLock("B", detector, raise_on_deadlock=True)
+        
+        async def worker(first, second):
+            async with first:
+                await asyncio.sleep(0.01)
+                async with second:
+                    pass
+        
+        results = await asyncio.wait_for(
+            asyncio.gather(worker(lock_a, lock_b), worker(lock_b, lock_a), return_exceptions=True),
+            timeout=5,
+        )
+        assert any(isinstance(r, DeadlockError) for r in results)
+        assert detector.get_dependencies() == []
+    
+    def test_uncontended_lock_tracks_ownership(self):
+        detector = DeadlockDetector()
+        lock = TrackedLock("A", detector)
+        with lock:
+            assert detector.get_statistics()["held_resources"] == 1
+        assert detector.get_statistics()["total_dependencies"] == 0
+
+
 class TestDeadlockDetectorSingleton:
     """Test singleton pattern"""
     
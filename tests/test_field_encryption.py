@@ -0,0 +1,187 @@
+"""Tests for field-level encryption and the bulk DEK-cached API"""
+
+import pytest
+
+from src.security.compliance import init_compliance_manager
+from src.security.encryption import DataEncryption
+from src.security.field_encryption import (
+    BINARY_MAGIC,
+    DEKCache,
+    FieldEncryptionEngine,
+    FieldEncryptionMapper,
+)
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # Audit log files land under ./logs/audit
+    init_compliance_manager()
+    mapper = FieldEncryptionMapper()
+    mapper.register_field("ssn", searchable=True)
+    mapper.register_field("email", searchable=True)
+    mapper.register_field("notes", associated_data_fields=["user_id"])
+    return FieldEncryptionEngine(DataEncryption(master_key="field-test-master-key"), mapper)
+
+
+def _records(count):
+    return [
+        {"user_id": f"u{i}", "ssn": f"123-45-{i:04d}", "email": f"user{i}@example.com",
+         "notes": {"visits": i}, "plain": i}
+        for i in range(count)
+    ]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestFieldEncryption:
+    def test_encrypt_decrypt_field_roundtrip(self, engine):
+        container = engine.encrypt_field("ssn", "123-45-6789")
+
+        assert container["__encrypted"] and container["v"] == 1
+        assert "123-45-6789" not in str(container)
+        assert engine.decrypt_field(container) == "123-45-6789"
+
+    def test_encrypt_field_uses_fresh_dek(self, engine):
+        first = engine.encrypt_field("ssn", "same")
+        second = engine.encrypt_field("ssn", "same")
+
+        assert first["dek"] != second["dek"]
+        assert first["__blind_index"] == second["__blind_index"]
+
+    def test_unconfigured_field_rejected(self, engine):
+        with pytest.raises(ValueError):
+            engine.encrypt_field("unknown", "value")
+
+    def test_ciphertext_bound_to_field_name(self, engine):
+        container = engine.encrypt_field("ssn", "123-45-6789")
+        container["field"] = "email"
+
+        with pytest.raises(Exception):
+            engine.decrypt_field(container)
+
+    def test_associated_data_must_match(self, engine):
+        record = engine.encrypt_record({"user_id": "u1", "notes": "private"})
+
+        assert engine.decrypt_record(record)["notes"] == "private"
+        with pytest.raises(Exception):
+            engine.decrypt_record(dict(record, user_id="u2"))
+
+
+class TestBlindIndex:
+    def test_blind_index_is_keyed(self, engine):
+        unkeyed = FieldEncryptionMapper()
+        unkeyed.register_field("ssn", searchable=True)
+
+        keyed = engine.mapper.create_blind_index("ssn", "123-45-6789")
+        assert keyed != unkeyed.create_blind_index("ssn", "123-45-6789")
+        assert engine.search_encrypted_field("ssn", "123-45-6789") == keyed
+
+    def test_column_indexes_match_single_value_indexes(self, engine):
+        values = ["a", "b", None, "c"]
+        column = engine.mapper.blind_indexes("ssn", values)
+
+        assert column[2] is None
+        assert column[0] == engine.mapper.blind_indexes("ssn", ["a"])[0]
+        assert len(set(column)) == 4
+
+
+class TestBulkEncryption:
+    def test_records_roundtrip(self, engine):
+        records = _records(50)
+        encrypted = engine.encrypt_records(records)
+
+        assert all(r["ssn"]["__encrypted"] for r in encrypted)
+        assert all(r["plain"] == i for i, r in enumerate(encrypted))
+        assert engine.decrypt_records(encrypted) == records
+
+    def test_records_share_cached_dek_per_field(self, engine):
+        encrypted = engine.encrypt_records(_records(20))
+
+        assert len({r["ssn"]["dek"] for r in encrypted}) == 1
+        assert encrypted[0]["ssn"]["dek"] != encrypted[0]["email"]["dek"]
+        assert len({r["ssn"]["data"] for r in encrypted}) == 20
+
+    def test_bulk_output_readable_by_per_field_path(self, engine):
+        records = _records(5)
+        encrypted = engine.encrypt_records(records)
+
+        assert [engine.decrypt_record(r) for r in encrypted] == records
+        assert encrypted[3]["email"]["__blind_index"] == engine.search_encrypted_field(
+            "email", "user3@example.com"
+        )
+
+    def test_binary_envelopes(self, engine):
+        records = _records(10)
+        encrypted = engine.encrypt_records(records, binary=True)
+
+        assert all(r["ssn"].startswith(BINARY_MAGIC) for r in encrypted)
+        assert len(encrypted[0]["ssn"]) < len(str(engine.encrypt_field("ssn", records[0]["ssn"])))
+        assert engine.decrypt_records(encrypted) == records
+        assert engine.decrypt_field(encrypted[0]["ssn"], field_name="ssn") == records[0]["ssn"]
+
+    def test_column_skips_none_and_encrypted(self, engine):
+        already = engine.encrypt_field("ssn", "x")
+        column = engine.encrypt_column("ssn", [None, already, "y"])
+
+        assert column[0] is None
+        assert column[1] is already
+        assert engine.decrypt_column("ssn", column) == [None, "x", "y"]
+
+    def test_decrypt_uses_cached_unwrap(self, engine):
+        encrypted = engine.encrypt_records(_records(30))
+        fresh = FieldEncryptionEngine(engine.encryption_engine, engine.mapper)
+
+        fresh.decrypt_records(encrypted)
+        assert fresh.dek_cache.get_stats()["misses"] == 3  # One unwrap per field DEK
+
+    def test_new_kek_mints_new_deks(self, engine):
+        before = engine.encrypt_column("ssn", ["a"])[0]["dek"]
+        engine.encryption_engine = DataEncryption(master_key="rotated-master-key")
+
+        assert engine.encrypt_column("ssn", ["a"])[0]["dek"] != before
+
+
+class TestDEKCache:
+    def test_ttl_and_use_limit_retire_active_dek(self):
+        clock = FakeClock()
+        cache = DEKCache(ttl_seconds=10, max_uses=5, clock=clock)
+        minted = []
+
+        def mint():
+            minted.append(object())
+            return minted[-1], bytes([len(minted)]) * 4
+
+        first = cache.active("kek", "ssn", 3, mint)
+        assert cache.active("kek", "ssn", 2, mint) is first
+        assert cache.active("kek", "ssn", 1, mint) is not first  # Use limit reached
+
+        clock.now = 11
+        cache.active("kek", "ssn", 1, mint)
+        assert len(minted) == 3
+
+    def test_bounded_entries(self):
+        cache = DEKCache(max_entries=2)
+        for scope in ("a", "b", "c"):
+            cache.active("kek", scope, 1, lambda: (object(), scope.encode()))
+
+        assert cache.get_stats()["active_deks"] == 2
+
+    def test_rotation_callback_invalidates(self, engine):
+        class Rotations:
+            def register_callback(self, callback):
+                self.callback = callback
+
+        rotations = Rotations()
+        engine.attach_rotation_manager(rotations)
+        before = engine.encrypt_column("ssn", ["a"])[0]["dek"]
+
+        rotations.callback(None)
+
+        assert engine.dek_cache.get_stats()["invalidations"] == 1
+        assert engine.encrypt_column("ssn", ["a"])[0]["dek"] != before
@@ -3,6 +3,7 @@
 import pytest
 import time
 from src.core.job_queue import JobQueue, QueueStatus, get_job_queue
+from src.core.job_scheduler import JobPriority
 
 
 class TestJobQueue:
@@ -46,3 +47,35 @@ class TestJobQueue:
         q1 = get_job_queue()
         q2 = get_job_queue()
         assert q1 is q2
+
+    def test_priority_dequeue_order(self, queue):
+        queue.enqueue("low", priority=3)
+        queue.enqueue("normal1")
+        queue.enqueue("urgent", priority=0)
+        queue.enqueue("normal2")
+
+        order = [queue.dequeue()["id"] for _ in range(4)]
+        assert order == ["urgent", "normal1", "normal2", "low"]
+        assert queue.dequeue() is None
+        assert queue.get_metrics().queue_depth == 0
+
+    def test_default_priority_is_normal(self, queue):
+        queue.enqueue("job1")
+        assert queue.dequeue()["priority"] == JobPriority.NORMAL
+
+    def test_returned_job_has_no_internal_keys(self, queue):
+        queue.enqueue("job1", metadata={"k": "v"})
+        job = queue.dequeue()
+        assert set(job) == {"id", "enqueued_at", "priority", "metadata"}
+
+    def test_clear_resets_wait_accounting(self, queue):
+        queue.enqueue("job1")
+        queue.enqueue("job2", priority=0)
+        assert queue.clear() == 2
+        assert len(queue) == 0
+        assert queue.dequeue() is None
+
+        queue.enqueue("job3")
+        metrics = queue.get_metrics()
+        assert metrics.queue_depth == 1
+        assert 0.0 <= metrics.avg_wait_time_seconds < 1.0
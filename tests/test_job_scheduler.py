@@ -5,10 +5,13 @@ import asyncio
 from datetime import datetime, timedelta
 from src.core.job_scheduler import (
     JobScheduler,
+    JobPriority,
     JobStatus,
+    MisfirePolicy,
     ScheduleType,
     get_job_scheduler
 )
+from src.core.job_store import SQLiteJobStore
 
 
 class TestJobScheduler:
@@ -65,3 +68,139 @@ class TestJobScheduler:
         s1 = get_job_scheduler()
         s2 = get_job_scheduler()
         assert s1 is s2
+
+
+class TestSchedulerCore:
+    @staticmethod
+    async def _run_until(scheduler, predicate, timeout=2.0):
+        task = asyncio.create_task(scheduler.start())
+        try:
+            deadline = asyncio.get_running_loop().time() + timeout
+            while not predicate():
+                assert asyncio.get_running_loop().time() < deadline, "timed out"
+                await asyncio.sleep(0.01)
+        finally:
+            scheduler.stop()
+            await asyncio.wait_for(task, timeout=1.0)
+
+    @pytest.mark.asyncio
+    async def test_runs_at_deadline_without_polling(self):
+        scheduler = JobScheduler()
+        executed = []
+
+        async def handler():
+            executed.append(datetime.now())
+
+        scheduled_at = datetime.now()
+        scheduler.schedule_one_time("soon", handler, scheduled_at + timedelta(milliseconds=50))
+        await self._run_until(scheduler, lambda: executed)
+
+        assert (executed[0] - scheduled_at).total_seconds() < 0.5
+        assert scheduler.get_statistics()["wakeups"] <= 3
+
+    @pytest.mark.asyncio
+    async def test_priority_and_class_limit(self):
+        scheduler = JobScheduler(class_limits={"reports": 1})
+        order = []
+        now = datetime.now() - timedelta(milliseconds=10)
+
+        def make(label):
+            async def handler():
+                order.append(label)
+                await asyncio.sleep(0.01)
+            return handler
+
+        scheduler.schedule_one_time("low", make("low"), now, priority=JobPriority.LOW,
+                                    job_class="reports")
+        scheduler.schedule_one_time("critical", make("critical"), now,
+                                    priority=JobPriority.CRITICAL, job_class="reports")
+        await self._run_until(scheduler, lambda: len(order) == 2)
+
+        assert order == ["critical", "low"]
+
+    @pytest.mark.asyncio
+    async def test_tenant_fairness(self):
+        scheduler = JobScheduler(max_concurrency=1)
+        order = []
+        now = datetime.now() - timedelta(milliseconds=10)
+
+        def make(label):
+            async def handler():
+                order.append(label)
+            return handler
+
+        for i in range(3):
+            scheduler.schedule_one_time(f"a{i}", make("a"), now, tenant="a")
+        scheduler.schedule_one_time("b0", make("b"), now, tenant="b")
+        await self._run_until(scheduler, lambda: len(order) == 4)
+
+        assert order.index("b") <= 1
+
+    @pytest.mark.asyncio
+    async def test_cancel_while_running_stops_interval_job(self):
+        scheduler = JobScheduler()
+        runs = []
+        release = asyncio.Event()
+
+        async def handler():
+            runs.append(datetime.now())
+            await release.wait()
+
+        job_id = scheduler.schedule_interval("cancel_mid_run", handler, 0.05)
+        task = asyncio.create_task(scheduler.start())
+        try:
+            while not runs:
+                await asyncio.sleep(0.01)
+            assert scheduler.cancel_job(job_id) is True
+            release.set()
+            await asyncio.sleep(0.3)  # several intervals
+        finally:
+            scheduler.stop()
+            await asyncio.wait_for(task, timeout=1.0)
+
+        job = scheduler.get_job(job_id)
+        assert len(runs) == 1
+        assert job["status"] == JobStatus.CANCELLED.value
+        assert job["run_count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_misfire_skip(self):
+        scheduler = JobScheduler(misfire_grace_seconds=0.5)
+        executed = []
+
+        async def handler():
+            executed.append(1)
+
+        late = datetime.now() - timedelta(seconds=10)
+        job_id = scheduler.schedule_interval("late", handler, 60, start_at=late,
+                                             misfire_policy=MisfirePolicy.SKIP)
+        one_time = scheduler.schedule_one_time("late_once", handler, late,
+                                               misfire_policy=MisfirePolicy.SKIP)
+        await self._run_until(
+            scheduler, lambda: scheduler.get_job(one_time)["status"] == JobStatus.CANCELLED.value
+        )
+
+        job = scheduler.get_job(job_id)
+        assert executed == []
+        assert job["missed_runs"] == 1
+        assert datetime.fromisoformat(job["next_run"]) > datetime.now()
+
+    def test_persistence_restores_jobs(self, tmp_path):
+        db_path = tmp_path / "jobs.db"
+
+        async def handler():
+            pass
+
+        scheduler = JobScheduler(store=SQLiteJobStore(db_path), handlers={"cleanup": handler})
+        job_id = scheduler.schedule_interval("cleanup", handler, 30, tenant="t1",
+                                             priority=JobPriority.HIGH)
+
+        restored = JobScheduler(store=SQLiteJobStore(db_path), handlers={"cleanup": handler})
+        job = restored.get_job(job_id)
+        assert job["name"] == "cleanup"
+        assert job["tenant"] == "t1"
+        assert job["priority"] == JobPriority.HIGH
+        assert restored.get_statistics()["heap_entries"] == 1
+
+        restored.cancel_job(job_id)
+        assert JobScheduler(store=SQLiteJobStore(db_path)).get_job(job_id) is None
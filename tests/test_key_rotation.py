@@ -0,0 +1,247 @@
+"""Tests for key rotation, the rotation journal and online re-encryption"""
+
+import json
+import threading
+
+import pytest
+
+from src.security.compliance import init_compliance_manager
+from src.security.encryption import DataEncryption
+from src.security.field_encryption import FieldEncryptionEngine, FieldEncryptionMapper
+from src.security.key_rotation import KeyRotationManager
+from src.security.reencryption import FieldRecordStore, ReencryptionJob, ReencryptionStore, admission_load_probe
+from core import connection_limiter
+from core.connection_limiter import AdmissionController, GradientLimit
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return KeyRotationManager(storage_path=str(tmp_path / "rotations"))
+
+
+@pytest.fixture
+def field_engine(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # Audit log files land under ./logs/audit
+    init_compliance_manager()
+    mapper = FieldEncryptionMapper()
+    mapper.register_field("ssn")
+    mapper.register_field("email")
+    return FieldEncryptionEngine(DataEncryption(master_key="old-master-key"), mapper)
+
+
+def _rotate_engine(field_engine):
+    """Swap in a new engine key; return the retiring engine."""
+    previous = field_engine.encryption_engine
+    field_engine.encryption_engine = DataEncryption(master_key="new-master-key")
+    return previous
+
+
+class ListStore(ReencryptionStore):
+    """Counts items; optionally fails once or blocks on a batch."""
+
+    def __init__(self, size, fail_at=None, gate=None):
+        self.name = "list"
+        self.items = list(range(size))
+        self.seen = []
+        self.fail_at = fail_at
+        self.gate = gate
+
+    def fetch_batch(self, cursor, limit):
+        start = cursor or 0
+        end = min(start + limit, len(self.items))
+        return self.items[start:end], (end if end < len(self.items) else None)
+
+    def reencrypt_batch(self, items, event):
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail_at is not None and items[0] == self.fail_at:
+            self.fail_at = None
+            raise IOError("store unavailable")
+        self.seen.extend(items)
+        return len(items)
+
+    def estimate_total(self):
+        return len(self.items)
+
+
+class FakeEvent:
+    event_id = "rot-test"
+
+
+class TestRotationJournal:
+    def test_rotations_append_to_journal(self, manager):
+        for _ in range(3):
+            manager.rotate_kek()
+
+        journal = manager.storage_path / "rotation_journal.jsonl"
+        assert len(journal.read_text().splitlines()) == 3
+        assert not (manager.storage_path / "rotation_history.json").exists()
+
+    def test_history_replayed_with_latest_status(self, manager):
+        event = manager.rotate_kek()
+        manager.complete_rotation("kek")
+
+        reloaded = KeyRotationManager(storage_path=str(manager.storage_path))
+        history = reloaded.get_rotation_history()
+        assert [e.event_id for e in history] == [event.event_id]
+        assert history[0].status == "completed"
+        assert reloaded.get_active_rotations() == []
+
+    def test_compaction(self, tmp_path):
+        manager = KeyRotationManager(storage_path=str(tmp_path / "rotations"), compact_every=3)
+        for _ in range(4):
+            manager.rotate_kek()
+
+        snapshot = json.loads((manager.storage_path / "rotation_history.json").read_text())
+        assert len(snapshot) == 3
+        reloaded = KeyRotationManager(storage_path=str(manager.storage_path))
+        assert len(reloaded.get_rotation_history()) == 4
+
+    def test_torn_record_skipped(self, manager):
+        manager.rotate_kek()
+        with open(manager.storage_path / "rotation_journal.jsonl", "a") as f:
+            f.write('{"event_id": "rot-torn", "key')
+
+        reloaded = KeyRotationManager(storage_path=str(manager.storage_path))
+        assert len(reloaded.get_rotation_history()) == 1
+
+
+class TestFieldRewrap:
+    def test_rewrap_moves_records_to_new_key(self, field_engine):
+        records = field_engine.encrypt_records(
+            [{"ssn": f"123-45-{i:04d}", "email": f"u{i}@x.io"} for i in range(10)]
+        )
+        records += field_engine.encrypt_records([{"ssn": "binary"}], binary=True)
+        previous = _rotate_engine(field_engine)
+
+        rewrapped, changed = field_engine.rewrap_records(records, previous)
+
+        assert changed == 11
+        assert field_engine.decrypt_records(rewrapped)[-1] == {"ssn": "binary"}
+        assert field_engine.decrypt_records(rewrapped)[0]["ssn"] == "123-45-0000"
+        assert rewrapped[0]["ssn"]["data"] == records[0]["ssn"]["data"]
+
+    def test_rewrap_is_idempotent(self, field_engine):
+        records = field_engine.encrypt_records([{"ssn": "a"}, {"ssn": "b"}])
+        previous = _rotate_engine(field_engine)
+
+        once, _ = field_engine.rewrap_records(records, previous)
+        twice, changed = field_engine.rewrap_records(once, previous)
+
+        assert changed == 0
+        assert twice == once
+
+
+class TestReencryptionJob:
+    def test_job_reencrypts_field_store(self, field_engine, tmp_path):
+        records = field_engine.encrypt_records([{"ssn": f"v{i}"} for i in range(250)])
+        previous = _rotate_engine(field_engine)
+        store = FieldRecordStore("users", records, field_engine, previous)
+
+        job = ReencryptionJob(store, FakeEvent(), str(tmp_path / "ckpt"), batch_size=100)
+        checkpoint = job.run()
+
+        assert checkpoint.status == "completed"
+        assert (checkpoint.processed, checkpoint.rewritten) == (250, 250)
+        assert field_engine.decrypt_records(records)[249] == {"ssn": "v249"}
+        assert job.get_progress()["ratio"] == 1.0
+
+    def test_job_resumes_from_checkpoint(self, tmp_path):
+        store = ListStore(1000, fail_at=300)
+        first = ReencryptionJob(store, FakeEvent(), str(tmp_path), batch_size=100).run()
+
+        assert first.status == "failed"
+        assert first.cursor == 300
+
+        resumed = ReencryptionJob(store, FakeEvent(), str(tmp_path), batch_size=100).run()
+        assert resumed.status == "completed"
+        assert resumed.processed == 1000
+        assert store.seen == list(range(1000))
+
+    def test_rate_limit(self, tmp_path):
+        clock = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            clock[0] += seconds
+
+        job = ReencryptionJob(
+            ListStore(300), FakeEvent(), str(tmp_path), batch_size=100,
+            max_records_per_second=100, clock=lambda: clock[0], sleep=sleep,
+        )
+        job.run()
+
+        assert sleeps == [1.0, 1.0]  # No pause after the final batch
+
+    def test_backs_off_under_live_load(self, tmp_path):
+        loads = iter([0.95, 0.9, 0.2, 0.1])
+        sleeps = []
+
+        job = ReencryptionJob(
+            ListStore(300), FakeEvent(), str(tmp_path), batch_size=100,
+            load_probe=lambda: next(loads), max_load=0.8, load_backoff_seconds=0.25,
+            sleep=sleeps.append,
+        )
+        assert job.run().status == "completed"
+        assert sleeps == [0.25, 0.25]
+
+    async def test_admission_probe_sees_serving_controller(self, monkeypatch):
+        monkeypatch.setattr(connection_limiter, "_admission_controller", None)
+        probe = admission_load_probe()  # Created before the API installs its controller
+        serving = AdmissionController(limit=GradientLimit(initial_limit=4, min_limit=1, max_limit=4))
+        connection_limiter.set_admission_controller(serving)
+
+        assert probe() == 0.0
+        tickets = [await serving.acquire() for _ in range(3)]
+        assert probe() == 0.75
+        for ticket in tickets:
+            serving.release(ticket)
+        assert probe() == 0.0
+
+
+class TestManagerReencryption:
+    def test_kek_rotation_starts_jobs_and_gates_completion(self, manager):
+        gate = threading.Event()
+        store = ListStore(200, gate=gate)
+        manager.register_store(store)
+
+        event = manager.rotate_kek()
+        assert manager.complete_rotation("kek") is False
+
+        gate.set()
+        for job in manager._reencryption_jobs[event.event_id]:
+            assert job.wait(5)
+        status = manager.get_reencryption_status()[event.event_id]
+        assert status[0]["status"] == "completed"
+        assert manager.complete_rotation("kek") is True
+
+    def test_resume_after_restart(self, tmp_path):
+        path = str(tmp_path / "rotations")
+        first = KeyRotationManager(storage_path=path)
+        event = first.rotate_kek()  # No stores registered yet
+
+        restarted = KeyRotationManager(storage_path=path)
+        store = ListStore(50)
+        restarted.register_store(store)
+        jobs = restarted.resume_reencryption()
+
+        assert [job.job_id for job in jobs] == [f"{event.event_id}-list"]
+        assert jobs[0].wait(5) and jobs[0].done
+
+    def test_completion_consults_checkpoints_after_restart(self, tmp_path):
+        path = str(tmp_path / "rotations")
+        first = KeyRotationManager(storage_path=path)
+        first.register_store(ListStore(300, fail_at=0))
+        event = first.rotate_kek()
+        for job in first._reencryption_jobs[event.event_id]:
+            assert job.wait(5) and not job.done
+
+        # No jobs in memory yet, but the checkpoint on disk is unfinished
+        restarted = KeyRotationManager(storage_path=path)
+        assert restarted.complete_rotation("kek") is False
+
+        restarted.register_store(ListStore(300))
+        for job in restarted.resume_reencryption():
+            assert job.wait(5) and job.done
+        assert restarted.complete_rotation("kek") is True
@@ -0,0 +1,134 @@
+"""
+Tests for the in-process sharded GCRA rate limiter (core/local_rate_limiter.py)
+"""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from core.local_rate_limiter import ShardedRateLimiter
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestGCRA:
+    def test_burst_then_steady_rate(self, clock):
+        limiter = ShardedRateLimiter(5, 3600, clock=clock)
+        remaining = [limiter.hit("ip").remaining for _ in range(5)]
+        assert remaining == [4, 3, 2, 1, 0]
+
+        denied = limiter.hit("ip")
+        assert not denied.allowed
+        assert denied.retry_after == pytest.approx(720)
+
+        # One emission interval later exactly one more request fits
+        clock.now += 720
+        assert limiter.hit("ip").allowed
+        assert not limiter.hit("ip").allowed
+
+    def test_denied_requests_do_not_consume_quota(self, clock):
+        limiter = ShardedRateLimiter(2, 10, clock=clock)
+        limiter.hit("k")
+        limiter.hit("k")
+        for _ in range(10):
+            assert not limiter.hit("k").allowed
+        clock.now += 5
+        assert limiter.hit("k").allowed
+
+    def test_fractional_intervals_admit_full_burst(self):
+        limiter = ShardedRateLimiter(3, 1.0, clock=FakeClock(123456.789))
+        assert all(limiter.hit("k").allowed for _ in range(3))
+        assert not limiter.hit("k").allowed
+
+    def test_per_call_limit_override_and_cost(self, clock):
+        limiter = ShardedRateLimiter(100, 60, clock=clock)
+        assert limiter.hit("a", limit=1).allowed
+        assert not limiter.hit("a", limit=1).allowed
+        assert limiter.hit("b", cost=100).allowed
+        assert not limiter.hit("b").allowed
+
+    def test_keys_are_independent(self, clock):
+        limiter = ShardedRateLimiter(1, 60, clock=clock)
+        assert limiter.hit("a").allowed
+        assert not limiter.hit("a").allowed
+        assert limiter.hit("b").allowed
+
+    def test_invalid_parameters(self):
+        with pytest.raises(ValueError):
+            ShardedRateLimiter(0, 60)
+        with pytest.raises(ValueError):
+            ShardedRateLimiter(5, 0)
+
+
+class TestKeyTable:
+    def test_lru_bound(self, clock):
+        limiter = ShardedRateLimiter(5, 60, shards=1, max_keys=100, clock=clock)
+        for i in range(1000):
+            limiter.hit(f"k{i}")
+        assert len(limiter) == 100
+
+    def test_incremental_expiry(self, clock):
+        limiter = ShardedRateLimiter(5, 60, shards=1, expire_batch=2, clock=clock)
+        for i in range(10):
+            limiter.hit(f"idle{i}")
+        clock.now += 60
+        # Each decision retires up to two fully replenished keys
+        limiter.hit("active")
+        assert len(limiter) == 9
+        for _ in range(5):
+            limiter.hit("active", limit=1000)
+        assert len(limiter) == 1
+
+    def test_sweep_and_reset(self, clock):
+        limiter = ShardedRateLimiter(1, 60, clock=clock)
+        for i in range(50):
+            limiter.hit(f"k{i}")
+        limiter.reset("k0")
+        assert limiter.hit("k0").allowed
+        clock.now += 61
+        assert limiter.sweep() == 50
+        assert len(limiter) == 0
+
+
+class TestConcurrency:
+    def test_threads_share_one_quota(self):
+        limiter = ShardedRateLimiter(1000, 3600)
+        allowed = []
+
+        def worker():
+            allowed.append(sum(limiter.hit("shared").allowed for _ in range(500)))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert sum(allowed) == 1000
+
+
+class TestRequestKeys:
+    def test_key_func_hook(self, clock):
+        limiter = ShardedRateLimiter(
+            1, 60, clock=clock, key_func=lambda request: request.headers["X-Forwarded-For"]
+        )
+        request = SimpleNamespace(headers={"X-Forwarded-For": "203.0.113.9"}, client=None)
+        assert limiter.hit_request(request, prefix="contact:").allowed
+        assert not limiter.hit("contact:203.0.113.9").allowed
+
+    def test_default_key_is_client_host(self, clock):
+        limiter = ShardedRateLimiter(1, 60, clock=clock)
+        request = SimpleNamespace(client=SimpleNamespace(host="10.0.0.1"))
+        assert limiter.hit_request(request).allowed
+        assert not limiter.hit("10.0.0.1").allowed
@@ -312,9 +312,11 @@ class TestProcessFeedbackHook:
     """Test public API integration hook."""
 
     def test_process_feedback_after_review(
-        self, tmp_path: Path, mock_memory: MagicMock
+        self, tmp_path: Path, mock_memory: MagicMock, monkeypatch
     ) -> None:
         """process_feedback_after_review() calls pin_all_feedback()."""
+        monkeypatch.chdir(tmp_path)  # Learner checkpoint lands in the cwd
+        mock_memory.get_threshold.return_value = 1.0  # Read by the learner's policy update
         event = FeedbackEvent(
             fault_id="f001",
             anomaly_type="power",
@@ -130,6 +130,119 @@ class TestMemoryLeakDetector:
         assert len(detector._samples) == 0
 
 
+class TestGrowthDetection:
+    """Streaming regression and change-point detection on synthetic samples"""
+    
+    @staticmethod
+    def _feed(detector, values, start=0.0, interval=60.0):
+        for i, value in enumerate(values):
+            detector.add_sample(value, monotonic_time=start + i * interval)
+    
+    def test_steady_growth_rate(self):
+        """30 MB/h of growth sampled every minute"""
+        detector = MemoryLeakDetector(max_samples=60, leak_threshold_mb_per_hour=10.0)
+        self._feed(detector, [500 + 0.5 * i for i in range(120)])
+        
+        report = detector.detect_leak()
+        assert report.is_leaking is True
+        assert report.pattern == "steady_growth"
+        assert report.growth_rate_mb_per_hour == pytest.approx(30.0)
+        assert report.samples_analyzed == 60
+    
+    def test_one_off_step_is_not_a_leak(self):
+        """A single 200 MB jump on an otherwise flat line"""
+        detector = MemoryLeakDetector(max_samples=60, leak_threshold_mb_per_hour=10.0)
+        values = [500.0 + (i % 2) * 0.1 for i in range(30)] + [700.0 + (i % 2) * 0.1 for i in range(30)]
+        self._feed(detector, values)
+        
+        report = detector.detect_leak()
+        assert report.is_leaking is False
+        assert report.pattern == "step"
+        assert len(report.change_points) == 1
+        assert report.change_points[0].delta_mb == pytest.approx(199.9)
+        assert report.baseline_memory_mb == pytest.approx(700.0, abs=0.2)
+    
+    def test_growth_after_step_still_detected(self):
+        detector = MemoryLeakDetector(max_samples=60, leak_threshold_mb_per_hour=10.0)
+        values = [500.0] * 20 + [800.0 + 0.5 * i for i in range(40)]
+        self._feed(detector, values)
+        
+        report = detector.detect_leak()
+        assert report.is_leaking is True
+        assert report.growth_rate_mb_per_hour == pytest.approx(30.0)
+    
+    def test_large_regular_increments_are_growth_not_steps(self):
+        """Increments above the step threshold that are all alike are steady growth"""
+        detector = MemoryLeakDetector(max_samples=30, step_threshold_mb=20.0)
+        self._feed(detector, [100.0 + 25 * i for i in range(30)])
+        
+        report = detector.detect_leak()
+        assert report.change_points == []
+        assert report.pattern == "steady_growth"
+        assert report.growth_rate_mb_per_hour == pytest.approx(1500.0)
+    
+    def test_regression_stays_accurate_over_long_runs(self):
+        """Running sums re-anchor, so a week of samples matches a fresh fit"""
+        detector = MemoryLeakDetector(max_samples=60)
+        minutes = 7 * 24 * 60
+        self._feed(detector, [1000.0 + (i % 60) * 0.01 + i * 0.001 for i in range(minutes)], start=1e6)
+        
+        window = detector._regression.points
+        xs = [(t - window[0][0]) / 3600.0 for t, _ in window]
+        ys = [y for _, y in window]
+        n = len(xs)
+        mean_x, mean_y = sum(xs) / n, sum(ys) / n
+        expected = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / sum((x - mean_x) ** 2 for x in xs)
+        assert detector.detect_leak().growth_rate_mb_per_hour == pytest.approx(expected, rel=1e-6)
+
+
+class TestAllocationTracking:
+    """Opt-in tracemalloc attribution"""
+    
+    def test_report_names_growing_site_and_type(self):
+        class LeakyRecord:
+            pass
+        
+        detector = MemoryLeakDetector(allocation_top_n=5)
+        detector.start_allocation_tracking()
+        try:
+            retained = [LeakyRecord() for _ in range(20000)]
+            report = detector.allocation_report()
+        finally:
+            detector.stop_allocation_tracking()
+        
+        assert report is not None
+        assert any("test_memory_leak_detector.py" in site.location for site in report.top_sites)
+        assert ("TestAllocationTracking.test_report_names_growing_site_and_type.<locals>.LeakyRecord",
+                20000) in [(name, diff) for name, diff in report.top_types]
+        assert report.tracemalloc_overhead_mb > 0
+        assert len(retained) == 20000
+    
+    def test_census_taken_once_outside_lock(self, monkeypatch):
+        detector = MemoryLeakDetector(allocation_window_seconds=0)
+        detector.start_allocation_tracking()
+        censuses = []
+        census = MemoryLeakDetector._type_census
+        
+        def tracked_census():
+            censuses.append(detector._lock.locked())
+            return census()
+        
+        monkeypatch.setattr(detector, "_type_census", tracked_census)
+        try:
+            report = detector.allocation_report()
+        finally:
+            detector.stop_allocation_tracking()
+        
+        assert report is not None
+        assert censuses == [False]  # Reused as the new baseline, never under the lock
+    
+    def test_disabled_by_default(self):
+        detector = MemoryLeakDetector()
+        assert detector.allocation_report() is None
+        assert detector.get_statistics()["total_samples"] == 0
+
+
 class TestMemoryLeakDetectorSingleton:
     """Test singleton pattern"""
     
@@ -0,0 +1,169 @@
+"""Incremental feedback learner test suite."""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from models.feedback import FeedbackEvent, FeedbackLabel
+from security_engine.adaptive_memory import FeedbackPinner, process_feedback_after_review
+from security_engine.policy_engine import FeedbackLearner
+
+
+@pytest.fixture
+def mock_memory() -> MagicMock:
+    """Mock adaptive memory."""
+    memory = MagicMock()
+    memory.get_threshold.return_value = 1.0
+    return memory
+
+
+def _event(i: int, label: FeedbackLabel, phase: str = "NOMINAL_OPS", action: str = "cycle") -> FeedbackEvent:
+    return FeedbackEvent(
+        fault_id=f"fault_{i}",
+        anomaly_type="power",
+        recovery_action=action,
+        mission_phase=phase,
+        label=label,
+        confidence_score=0.9,
+    )
+
+
+class TestSufficientStatistics:
+    """Per-pattern counts match a full recomputation."""
+
+    def test_counts_and_rate(self, mock_memory: MagicMock) -> None:
+        learner = FeedbackLearner(mock_memory)
+        learner.observe_many(
+            _event(i, FeedbackLabel.CORRECT if i < 7 else FeedbackLabel.WRONG) for i in range(10)
+        )
+
+        stats = learner.get_pattern_stats("power", "cycle")
+        assert stats.total == 10
+        assert stats.labels == {"correct": 7, "wrong": 3}
+        assert stats.success_rate == 0.7
+        assert learner.events_seen == 10
+
+    def test_dominant_phase_tracked_incrementally(self, mock_memory: MagicMock) -> None:
+        learner = FeedbackLearner(mock_memory)
+        phases = ["NOMINAL_OPS", "SAFE_MODE", "SAFE_MODE", "NOMINAL_OPS", "NOMINAL_OPS"]
+        for i, phase in enumerate(phases):
+            learner.observe(_event(i, FeedbackLabel.CORRECT, phase))
+
+        assert learner.get_pattern_stats("power", "cycle").dominant_phase == "NOMINAL_OPS"
+
+
+class TestIncrementalUpdates:
+    """Threshold adjustments are only emitted on band crossings."""
+
+    def test_threshold_adjusted_once_per_crossing(self, mock_memory: MagicMock) -> None:
+        learner = FeedbackLearner(mock_memory)
+        learner.observe(_event(0, FeedbackLabel.CORRECT))
+        first = learner.apply_updates()
+
+        learner.observe(_event(1, FeedbackLabel.CORRECT))
+        second = learner.apply_updates()
+
+        assert first == {"updated": 1, "boosted": 1, "suppressed": 0}
+        assert second == {"updated": 1, "boosted": 0, "suppressed": 0}
+        assert mock_memory.set_threshold.call_count == 1
+        assert mock_memory.set_action_preference.call_count == 2
+
+    def test_crossing_into_low_band_suppresses(self, mock_memory: MagicMock) -> None:
+        learner = FeedbackLearner(mock_memory)
+        learner.observe(_event(0, FeedbackLabel.CORRECT))
+        learner.apply_updates()
+
+        learner.observe_many(_event(i, FeedbackLabel.WRONG) for i in range(1, 4))
+        stats = learner.apply_updates()
+
+        assert stats["suppressed"] == 1
+        mock_memory.suppress_action.assert_called_once_with("cycle", "NOMINAL_OPS")
+        mock_memory.set_threshold.assert_called_with("power", "NOMINAL_OPS", pytest.approx(0.8))
+
+    def test_untouched_patterns_are_skipped(self, mock_memory: MagicMock) -> None:
+        learner = FeedbackLearner(mock_memory)
+        learner.observe(_event(0, FeedbackLabel.CORRECT, action="cycle"))
+        learner.observe(_event(1, FeedbackLabel.CORRECT, action="reset"))
+        learner.apply_updates()
+
+        learner.observe(_event(2, FeedbackLabel.CORRECT, action="reset"))
+        assert learner.apply_updates()["updated"] == 1
+        assert learner.apply_updates()["updated"] == 0
+
+    def test_no_memory_is_noop(self) -> None:
+        learner = FeedbackLearner(None)
+        learner.observe(_event(0, FeedbackLabel.CORRECT))
+        assert learner.apply_updates() == {"updated": 0, "boosted": 0, "suppressed": 0}
+
+
+class TestCheckpoint:
+    """Learner state survives restarts without reprocessing history."""
+
+    def test_restart_resumes_from_checkpoint(self, mock_memory: MagicMock, tmp_path) -> None:
+        path = tmp_path / "learner.json"
+        learner = FeedbackLearner(mock_memory, checkpoint_path=path)
+        learner.observe_many(_event(i, FeedbackLabel.CORRECT) for i in range(5))
+        learner.apply_updates()
+        learner.observe(_event(5, FeedbackLabel.WRONG, action="reset"))
+        learner.checkpoint()
+
+        restarted = FeedbackLearner(mock_memory, checkpoint_path=path)
+        assert restarted.events_seen == 6
+        assert restarted.get_pattern_stats("power", "cycle").band == "high"
+        # Only the pattern left pending before the restart is updated
+        assert restarted.apply_updates() == {"updated": 1, "boosted": 0, "suppressed": 1}
+
+    def test_unreadable_checkpoint_starts_empty(self, mock_memory: MagicMock, tmp_path) -> None:
+        path = tmp_path / "learner.json"
+        path.write_text("{not json")
+
+        learner = FeedbackLearner(mock_memory, checkpoint_path=path)
+        assert learner.events_seen == 0
+        assert learner.patterns == {}
+
+
+class TestPinnerIntegration:
+    """FeedbackPinner feeds the learner instead of reprocessing all feedback."""
+
+    def test_pinner_uses_learner(self, mock_memory: MagicMock, tmp_path, monkeypatch) -> None:
+        monkeypatch.chdir(tmp_path)
+        processed = tmp_path / "feedback_processed.json"
+        processed.write_text(json.dumps([
+            _event(i, FeedbackLabel.CORRECT).model_dump(mode="json") for i in range(3)
+        ]))
+        learner = FeedbackLearner(mock_memory, checkpoint_path=tmp_path / "learner.json")
+
+        stats = FeedbackPinner(mock_memory, processed, learner=learner).pin_all_feedback()
+
+        assert stats["pinned"] == 3
+        assert learner.events_seen == 3
+        mock_memory.query_feedback_events.assert_not_called()
+        assert (tmp_path / "learner.json").exists()
+
+    def test_review_hook_seeds_learner_once(self, mock_memory: MagicMock, tmp_path, monkeypatch) -> None:
+        monkeypatch.chdir(tmp_path)
+        mock_memory.query_feedback_events.return_value = [
+            _event(i, FeedbackLabel.WRONG) for i in range(4)
+        ]
+        processed = tmp_path / "feedback_processed.json"
+        processed.write_text(json.dumps([_event(10, FeedbackLabel.CORRECT).model_dump(mode="json")]))
+
+        assert process_feedback_after_review(mock_memory)["pinned"] == 1
+        state = json.loads((tmp_path / "feedback_learner.json").read_text())
+        assert state["events_seen"] == 5  # Pinned history plus the new event
+
+        processed.write_text(json.dumps([_event(11, FeedbackLabel.CORRECT).model_dump(mode="json")]))
+        process_feedback_after_review(mock_memory)
+        mock_memory.query_feedback_events.assert_called_once()
+        assert json.loads((tmp_path / "feedback_learner.json").read_text())["events_seen"] == 6
+
+    def test_checkpoint_precedes_cleanup(self, mock_memory: MagicMock, tmp_path, monkeypatch) -> None:
+        monkeypatch.chdir(tmp_path)
+        processed = tmp_path / "feedback_processed.json"
+        processed.write_text(json.dumps([_event(0, FeedbackLabel.CORRECT).model_dump(mode="json")]))
+        learner = FeedbackLearner(mock_memory, checkpoint_path=tmp_path / "missing" / "learner.json")
+
+        with pytest.raises(Exception):
+            FeedbackPinner(mock_memory, processed, learner=learner).pin_all_feedback()
+        assert processed.exists()  # Not yet durable in the learner, so kept for the next run
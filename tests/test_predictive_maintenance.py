@@ -0,0 +1,347 @@
+"""Predictive maintenance training buffer, incremental models and batched scoring."""
+
+import asyncio
+import importlib
+import os
+import pickle  # nosec B403
+import sys
+import types
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from security_engine.contracts import FailureType, PredictionModel, TimeSeriesData
+from security_engine.maintenance_models import ModelBundle, fit_model_bundle, grow_forest
+from security_engine.telemetry_buffer import (
+    BUFFER_COLUMNS,
+    FEATURE_COLUMNS,
+    WARMUP_ROWS,
+    TelemetryRingBuffer,
+    build_feature_matrix,
+    feature_indices,
+    telemetry_row,
+    window_feature_row,
+)
+
+
+def _point(timestamp, cpu=45.0, failure=False):
+    return TimeSeriesData(
+        timestamp=timestamp,
+        cpu_usage=cpu,
+        memory_usage=60.0,
+        network_latency=50.0,
+        disk_io=100.0,
+        error_rate=0.1,
+        response_time=200.0,
+        active_connections=20,
+        failure_occurred=failure,
+    )
+
+
+def _rows(count, seed=0):
+    rng = np.random.default_rng(seed)
+    values = np.column_stack([
+        rng.normal(45, 10, count),
+        rng.normal(60, 15, count),
+        rng.normal(50, 20, count),
+        rng.normal(100, 30, count),
+        rng.normal(0.1, 0.05, count),
+        rng.normal(200, 50, count),
+        rng.integers(10, 50, count),
+        rng.random(count) < 0.05,
+    ]).astype(float)
+    # Make CPU predictable from the other metrics
+    values[:, 0] = 0.5 * values[:, 1] + 0.2 * values[:, 3] + rng.normal(0, 1, count)
+    return values
+
+
+class TestTelemetryRingBuffer:
+    def test_overwrites_oldest_when_full(self):
+        buffer = TelemetryRingBuffer(capacity=5, retention=None)
+        for i in range(8):
+            buffer.extend(np.array([float(i)]), np.full((1, len(BUFFER_COLUMNS)), float(i)))
+
+        assert len(buffer) == 5
+        assert (buffer.sequence, buffer.first_sequence) == (8, 3)
+        assert buffer.tail(2)[:, 0].tolist() == [6.0, 7.0]
+        timestamps, values = buffer.since_sequence(5)
+        assert timestamps.tolist() == [5.0, 6.0, 7.0]
+        assert buffer.since_sequence(0)[0].tolist() == [3.0, 4.0, 5.0, 6.0, 7.0]
+
+    def test_bulk_extend_larger_than_capacity(self):
+        buffer = TelemetryRingBuffer(capacity=4, retention=None)
+        buffer.extend(np.arange(3.0), np.zeros((3, len(BUFFER_COLUMNS))))
+        buffer.extend(np.arange(3.0, 13.0), np.zeros((10, len(BUFFER_COLUMNS))))
+        assert buffer.since_sequence(0)[0].tolist() == [9.0, 10.0, 11.0, 12.0]
+        assert buffer.sequence == 13
+
+    def test_expires_data_past_retention(self):
+        now = datetime(2025, 1, 31)
+        buffer = TelemetryRingBuffer(capacity=100, retention=timedelta(days=30))
+        for day in range(31):
+            buffer.append(_point(datetime(2025, 1, 1) + timedelta(days=day)), now=now.timestamp())
+
+        timestamps, _ = buffer.since_sequence(0)
+        assert len(buffer) == 30
+        assert datetime.fromtimestamp(timestamps[0]) == datetime(2025, 1, 2)
+
+    def test_time_range_queries(self):
+        buffer = TelemetryRingBuffer(capacity=6, retention=None)
+        buffer.extend(np.arange(10.0), np.arange(10.0)[:, None].repeat(len(BUFFER_COLUMNS), axis=1))
+        start, end = datetime.fromtimestamp(5.0), datetime.fromtimestamp(8.0)
+
+        timestamps, values = buffer.between(start, end)
+        assert timestamps.tolist() == [6.0, 7.0, 8.0]
+        assert values[:, 0].tolist() == [6.0, 7.0, 8.0]
+
+        buffer.extend(np.array([1.0]), np.zeros((1, len(BUFFER_COLUMNS))))
+        assert not buffer.in_order
+        assert buffer.between(start, end)[0].tolist() == [6.0, 7.0, 8.0]
+
+    def test_row_layout(self):
+        row = telemetry_row(_point(datetime(2025, 1, 1), cpu=91.0, failure=True))
+        assert dict(zip(BUFFER_COLUMNS, row.tolist()))["cpu_usage"] == 91.0
+        assert row[-1] == 1.0
+
+
+class TestFeatures:
+    def test_training_features_match_pandas_rolling(self):
+        values = _rows(200)
+        df = pd.DataFrame(values, columns=list(BUFFER_COLUMNS))
+        for col in ["cpu_usage", "memory_usage", "network_latency", "disk_io", "error_rate"]:
+            for window in (3, 6):
+                df[f"{col}_rolling_mean_{window}"] = df[col].rolling(window=window).mean()
+                df[f"{col}_rolling_std_{window}"] = df[col].rolling(window=window).std()
+        expected = df[list(FEATURE_COLUMNS)].dropna().values
+
+        features = build_feature_matrix(values)
+        assert features.shape == (200 - WARMUP_ROWS, len(FEATURE_COLUMNS))
+        np.testing.assert_allclose(features, expected)
+
+    def test_short_windows(self):
+        values = _rows(5)
+        assert build_feature_matrix(values).shape == (0, len(FEATURE_COLUMNS))
+
+        row = window_feature_row(values[:3])
+        assert row[len(BUFFER_COLUMNS):].tolist() == [0.0] * 20
+
+        row = window_feature_row(values[:5])
+        assert row[FEATURE_COLUMNS.index("cpu_usage_rolling_mean_6")] == pytest.approx(values[:5, 0].mean())
+        assert row[FEATURE_COLUMNS.index("failure_occurred")] == 0.0
+
+    def test_window_row_matches_last_training_row(self):
+        values = _rows(30)
+        values[-1, -1] = 0.0
+        np.testing.assert_allclose(window_feature_row(values[-10:]), build_feature_matrix(values)[-1])
+
+
+@pytest.fixture(scope="module")
+def bundle():
+    return fit_model_bundle(_rows(600), version=1, trained_through=600, n_estimators=20)[0]
+
+
+class TestModels:
+    def test_full_fit(self, bundle):
+        assert bundle.version == 1
+        assert bundle.scorer.failure_types == list(FailureType)
+        for models in bundle.models.values():
+            assert len(models[PredictionModel.RANDOM_FOREST].estimators_) == 20
+            assert PredictionModel.ISOLATION_FOREST in models
+
+    def test_scorer_matches_forest_predict(self, bundle):
+        rows = build_feature_matrix(_rows(50, seed=3))
+        predicted = bundle.scorer.predict(rows)
+
+        for i, failure_type in enumerate(bundle.scorer.failure_types):
+            inputs = bundle.scalers[failure_type].transform(rows[:, feature_indices(failure_type)])
+            expected = bundle.models[failure_type][PredictionModel.RANDOM_FOREST].predict(inputs)
+            np.testing.assert_allclose(predicted[:, i], expected)
+
+        probabilities = bundle.scorer.failure_probabilities(rows[:1])
+        assert probabilities.shape == (1, len(FailureType))
+        assert ((probabilities > 0) & (probabilities < 1)).all()
+
+    def test_incremental_update_leaves_previous_version_intact(self, bundle):
+        previous_trees = {
+            ft: list(models[PredictionModel.RANDOM_FOREST].estimators_) for ft, models in bundle.models.items()
+        }
+        updated, metrics = fit_model_bundle(
+            _rows(200, seed=1), version=2, previous=bundle, trained_through=800,
+            n_estimators=25, trees_per_update=10,
+        )
+
+        assert set(metrics) == {ft.value for ft in FailureType}
+        for ft, models in updated.models.items():
+            forest = models[PredictionModel.RANDOM_FOREST]
+            assert len(forest.estimators_) == 25
+            assert forest.estimators_[:15] == previous_trees[ft][5:]
+            assert updated.scalers[ft] is bundle.scalers[ft]
+            assert bundle.models[ft][PredictionModel.RANDOM_FOREST].estimators_ == previous_trees[ft]
+
+    def test_grow_forest_caps_size(self, bundle):
+        forest = bundle.models[FailureType.CPU_SPIKE][PredictionModel.RANDOM_FOREST]
+        X, y = np.random.default_rng(0).random((100, 27)), np.ones(100)
+        grown = grow_forest(forest, X, y, new_trees=5, max_trees=20, random_state=7)
+        assert len(grown.estimators_) == 20
+        assert grown.estimators_[-1] not in forest.estimators_
+
+    def test_too_few_rows_fits_nothing(self):
+        bundle, metrics = fit_model_bundle(_rows(40), version=1)
+        assert metrics == {}
+        assert bundle.scorer.failure_types == []
+
+    def test_state_round_trip(self, bundle):
+        restored = ModelBundle.from_state(bundle.to_state())
+        assert restored.version == 1
+        assert restored.trained_through == 0
+        rows = build_feature_matrix(_rows(20))
+        np.testing.assert_allclose(restored.scorer.predict(rows), bundle.scorer.predict(rows))
+
+
+def _torch_stub():
+    """The torch names predictive_maintenance needs at import time (LSTM classes only)."""
+    torch = types.ModuleType("torch")
+    torch.nn = types.ModuleType("torch.nn")
+    torch.nn.Module = type("Module", (), {})
+    torch.optim = types.ModuleType("torch.optim")
+    torch.utils = types.ModuleType("torch.utils")
+    torch.utils.data = types.ModuleType("torch.utils.data")
+    torch.utils.data.Dataset = type("Dataset", (), {})
+    torch.utils.data.DataLoader = MagicMock()
+    return {
+        "torch": torch,
+        "torch.nn": torch.nn,
+        "torch.optim": torch.optim,
+        "torch.utils": torch.utils,
+        "torch.utils.data": torch.utils.data,
+    }
+
+
+@pytest.fixture(scope="module")
+def engine_class():
+    """PredictiveMaintenanceEngine, imported against a torch stub when torch is missing."""
+    name = "security_engine.predictive_maintenance"
+    try:
+        import torch  # noqa: F401
+    except ImportError:
+        with pytest.MonkeyPatch.context() as mp:
+            for module_name, module in _torch_stub().items():
+                mp.setitem(sys.modules, module_name, module)
+            yield importlib.import_module(name).PredictiveMaintenanceEngine
+        # Leave no module bound to the stub behind for other test files
+        sys.modules.pop(name, None)
+        vars(sys.modules["security_engine"]).pop("predictive_maintenance", None)
+    else:
+        yield importlib.import_module(name).PredictiveMaintenanceEngine
+
+
+class TestEngine:
+    @pytest.fixture
+    def engine(self, engine_class, tmp_path):
+        with patch("security_engine.predictive_maintenance.get_health_monitor"), \
+             patch("security_engine.predictive_maintenance.get_resource_monitor"):
+            engine = engine_class(
+                MagicMock(), retrain_interval=150, n_estimators=10, trees_per_update=2, model_dir=str(tmp_path)
+            )
+        return engine
+
+    async def _feed(self, engine, count, seed=0):
+        start = datetime.now() - timedelta(hours=count)
+        for i, row in enumerate(_rows(count, seed)):
+            await engine.add_training_data(TimeSeriesData(
+                start + timedelta(hours=i), *row[:6].tolist(), int(row[6]), bool(row[7])
+            ))
+
+    async def test_retrains_in_background_and_swaps_versions(self, engine):
+        await self._feed(engine, 149)
+        assert engine._retrain_task is None
+
+        await self._feed(engine, 1, seed=1)
+        await engine.wait_for_retrain()
+        assert engine.model_version == 1
+        assert os.path.exists(os.path.join(engine.model_dir, "model_bundle.pkl"))
+
+        first = engine._bundle
+        await self._feed(engine, 150, seed=2)
+        await engine.wait_for_retrain()
+        assert engine.model_version == 2
+        forest = engine.models[FailureType.CPU_SPIKE][PredictionModel.RANDOM_FOREST]
+        assert len(forest.estimators_) == 10
+        assert len(first.models[FailureType.CPU_SPIKE][PredictionModel.RANDOM_FOREST].estimators_) == 10
+
+    async def test_predicts_all_failure_types_in_one_pass(self, engine):
+        assert await engine.predict_failures(_point(datetime.now())) == []
+
+        await self._feed(engine, 300)
+        assert "cpu_spike" in await engine.train_models()
+
+        predictions = await engine.predict_failures(_point(datetime.now(), cpu=99.0))
+        assert predictions == sorted(predictions, key=lambda p: p.probability * p.confidence, reverse=True)
+        assert all(p.probability > 0.3 for p in predictions)
+
+    async def test_loads_saved_version(self, engine):
+        await self._feed(engine, 300)
+        await engine.train_models()
+
+        with patch("security_engine.predictive_maintenance.get_health_monitor"), \
+             patch("security_engine.predictive_maintenance.get_resource_monitor"):
+            restarted = type(engine)(MagicMock(), model_dir=engine.model_dir)
+        await restarted._load_models()
+        assert restarted.model_version == engine.model_version
+        assert set(restarted.models) == set(FailureType)
+
+    async def test_retrain_not_scheduled_below_interval_or_while_running(self, engine):
+        engine.retrain_interval = None
+        await self._feed(engine, 200)
+        assert engine._retrain_task is None
+
+        engine.retrain_interval = 150
+        running = asyncio.get_running_loop().create_future()
+        engine._retrain_task = running
+        engine._maybe_schedule_retrain()
+        assert engine._retrain_task is running
+
+        running.set_result(None)
+        engine._maybe_schedule_retrain()
+        assert engine._retrain_task is not running
+        await engine.wait_for_retrain()
+        assert engine.model_version == 1
+
+    async def test_incremental_retrain_uses_only_new_points(self, engine):
+        engine.retrain_interval = None
+        await self._feed(engine, 300)
+        await engine.retrain()
+        assert engine._bundle.trained_through == 300
+
+        await self._feed(engine, 50, seed=1)
+        with patch("security_engine.predictive_maintenance.fit_model_bundle", wraps=fit_model_bundle) as fit:
+            await engine.retrain()
+        values = fit.call_args.args[0]
+        assert len(values) == 50 + WARMUP_ROWS
+        assert fit.call_args.kwargs["previous"] is not None
+        assert engine.model_version == 2
+
+    async def test_failed_retrain_keeps_current_version(self, engine):
+        engine.retrain_interval = None
+        await self._feed(engine, 300)
+        await engine.retrain()
+        current = engine._bundle
+
+        with patch("security_engine.predictive_maintenance.fit_model_bundle", side_effect=ValueError("boom")):
+            assert await engine.retrain() == {"error": "boom"}
+        assert engine._bundle is current
+
+    def test_write_bundle_replaces_file_atomically(self, engine, bundle):
+        engine._write_bundle(bundle)
+        path = os.path.join(engine.model_dir, "model_bundle.pkl")
+        assert os.listdir(engine.model_dir) == ["model_bundle.pkl"]
+
+        with patch("security_engine.predictive_maintenance.pickle.dump", side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                engine._write_bundle(bundle)
+        with open(path, "rb") as f:
+            restored = ModelBundle.from_state(pickle.load(f))  # nosec B301
+        assert restored.version == bundle.version
@@ -17,7 +17,9 @@ from core.resource_monitor import (
     ResourceMetrics,
     ResourceThresholds,
     ResourceStatus,
+    ResourceSampleRing,
     get_resource_monitor,
+    monitor_operation_resources,
 )
 
 
@@ -254,6 +256,95 @@ class TestResourceMonitor:
         assert metrics.memory_percent == 0.0
 
 
+class TestResourceSampling:
+    """Test the background sampler and snapshot reads"""
+
+    @staticmethod
+    def _metrics(cpu, memory=50.0):
+        return ResourceMetrics(
+            cpu_percent=cpu,
+            memory_percent=memory,
+            memory_available_mb=1024.0,
+            disk_usage_percent=50.0,
+            process_memory_mb=100.0
+        )
+
+    def test_ring_ewma_and_percentiles(self):
+        """Test EWMA smoothing and percentiles over the ring"""
+        ring = ResourceSampleRing(capacity=10, ewma_alpha=0.5)
+        for cpu in (10.0, 20.0, 30.0, 40.0):
+            ring.record(self._metrics(cpu))
+
+        snapshot = ring.latest
+        assert snapshot.metrics.cpu_percent == 40.0
+        assert snapshot.cpu_ewma == pytest.approx(31.25)
+        assert snapshot.sequence == 4
+        assert ring.percentiles('cpu') == {'p50': 20.0, 'p95': 40.0, 'p99': 40.0}
+
+    def test_ring_overwrites_oldest(self):
+        """Test that the ring keeps only the most recent samples"""
+        ring = ResourceSampleRing(capacity=3)
+        for cpu in range(10):
+            ring.record(self._metrics(float(cpu)))
+
+        assert len(ring) == 3
+        assert ring.percentiles('cpu', quantiles=(0, 100)) == {'p0': 7.0, 'p100': 9.0}
+
+    def test_readers_use_snapshot_without_sampling(self):
+        """Test that health checks read the published snapshot"""
+        monitor = ResourceMonitor()
+        monitor._samples.record(self._metrics(95.0))
+        monitor._sampler = Mock(is_running=True)
+
+        with patch('psutil.cpu_percent') as mock_cpu:
+            status = monitor.check_resource_health()
+            available = monitor.is_resource_available(min_cpu_free=10.0)
+
+        mock_cpu.assert_not_called()
+        assert status['cpu'] == ResourceStatus.CRITICAL.value
+        assert available is False
+
+    def test_stale_snapshot_resampled_without_sampler(self):
+        """Test that a stale snapshot is refreshed when no sampler runs"""
+        monitor = ResourceMonitor(sample_interval_seconds=0.01)
+        monitor._samples.record(self._metrics(95.0))
+
+        import time
+        time.sleep(0.02)
+        with patch('psutil.cpu_percent', return_value=5.0):
+            assert monitor.get_latest_metrics().cpu_percent == 5.0
+
+    def test_sampler_publishes_snapshots(self):
+        """Test that the background sampler records samples at its cadence"""
+        import time
+        monitor = ResourceMonitor(sample_interval_seconds=0.01)
+        monitor.start_sampler()
+        try:
+            time.sleep(0.2)
+            assert monitor.is_sampling
+            assert monitor.get_snapshot().sequence >= 2
+            assert monitor.get_sample_stats()['samples'] >= 2
+        finally:
+            monitor.stop_sampler(timeout=1.0)
+        assert not monitor.is_sampling
+
+    def test_operation_decorator_uses_process_counters(self):
+        """Test that the decorator never takes a blocking system sample"""
+        monitor = ResourceMonitor()
+
+        @monitor_operation_resources()
+        def operation():
+            return "done"
+
+        with patch('core.resource_monitor.get_resource_monitor', return_value=monitor), \
+             patch('psutil.cpu_percent') as mock_cpu, \
+             patch.object(monitor, 'get_process_usage', return_value=(1.0, 100.0)) as usage:
+            assert operation() == "done"
+
+        mock_cpu.assert_not_called()
+        assert usage.call_count == 2
+
+
 class TestResourceMonitorSingleton:
     """Test resource monitor singleton"""
     
@@ -0,0 +1,228 @@
+"""
+Tests for retry budgets, deadline-aware retries, decorrelated jitter and
+hedged requests (core/retry.py), driven by an in-process fake dependency.
+"""
+import asyncio
+import random
+import time
+
+import pytest
+
+from core.retry import (
+    Hedge,
+    LatencyTracker,
+    Retry,
+    RetryBudget,
+    get_retry_budget,
+    get_retry_metrics,
+)
+from core.timeout_handler import with_timeout
+
+
+class FakeDependency:
+    """Async dependency with a configurable latency distribution and failure rate."""
+
+    def __init__(self, latencies=((1.0, 0.001),), failure_rate=0.0, seed=7):
+        # latencies: (probability, seconds) pairs
+        self.latencies = latencies
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _latency(self):
+        roll = self.rng.random()
+        for probability, seconds in self.latencies:
+            if roll < probability:
+                return seconds
+            roll -= probability
+        return self.latencies[-1][1]
+
+    async def get(self, key="k"):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self._latency())
+            if self.rng.random() < self.failure_rate:
+                raise ConnectionError("dependency unavailable")
+            return f"value:{key}"
+        finally:
+            self.in_flight -= 1
+
+
+class TestRetryBudget:
+    def test_retries_capped_at_ratio_of_traffic(self):
+        budget = RetryBudget(ratio=0.1, min_retries_per_second=0.0, max_tokens=0.0)
+        allowed = 0
+        for _ in range(1000):
+            budget.deposit()
+            allowed += budget.try_withdraw()
+        assert allowed == 0  # no capacity to bank tokens
+
+        budget = RetryBudget(ratio=0.1, min_retries_per_second=0.0, max_tokens=10.0)
+        budget._tokens = 0.0
+        allowed = 0
+        for _ in range(1000):
+            budget.deposit()
+            allowed += budget.try_withdraw()
+        assert 95 <= allowed <= 100
+        assert budget.rejected_total == 1000 - allowed
+
+    def test_reserve_refills_over_time(self):
+        budget = RetryBudget(ratio=0.0, min_retries_per_second=50.0, max_tokens=1.0)
+        assert budget.try_withdraw()
+        assert not budget.try_withdraw()
+        time.sleep(0.05)
+        assert budget.try_withdraw()
+
+    def test_shared_per_target(self):
+        assert get_retry_budget("test-shared-target") is get_retry_budget("test-shared-target")
+        retry = Retry(budget="test-shared-target")
+        assert retry.budget is get_retry_budget("test-shared-target")
+
+    @pytest.mark.asyncio
+    async def test_outage_load_amplification_bounded(self):
+        """During a full outage, 200 callers with 5 attempts each stay near 1.2x base load."""
+        dependency = FakeDependency(failure_rate=1.0)
+        budget = RetryBudget(target="outage", ratio=0.2, min_retries_per_second=0.0, max_tokens=5.0)
+        fetch = Retry(max_attempts=5, base_delay=0.0, budget=budget,
+                      allowed_exceptions=(ConnectionError,))(dependency.get)
+
+        results = await asyncio.gather(*(fetch() for _ in range(200)), return_exceptions=True)
+
+        assert all(isinstance(r, ConnectionError) for r in results)
+        assert dependency.calls <= 200 * 1.2 + 5
+        unbudgeted = FakeDependency(failure_rate=1.0)
+        fetch = Retry(max_attempts=5, base_delay=0.0, allowed_exceptions=(ConnectionError,))(unbudgeted.get)
+        await asyncio.gather(*(fetch() for _ in range(200)), return_exceptions=True)
+        assert unbudgeted.calls == 1000
+
+
+class TestDeadlines:
+    @pytest.mark.asyncio
+    async def test_gives_up_when_backoff_would_pass_deadline(self):
+        dependency = FakeDependency(failure_rate=1.0)
+        fetch = Retry(max_attempts=10, base_delay=0.05, max_delay=0.05, jitter_type="none",
+                      deadline=0.12, allowed_exceptions=(ConnectionError,))(dependency.get)
+        start = time.monotonic()
+        with pytest.raises(ConnectionError):
+            await fetch()
+        assert time.monotonic() - start < 0.15
+        assert dependency.calls < 4
+
+    @pytest.mark.asyncio
+    async def test_respects_enclosing_timeout_scope(self):
+        dependency = FakeDependency(failure_rate=1.0)
+        fetch = Retry(max_attempts=10, base_delay=0.2, max_delay=0.2, jitter_type="none",
+                      allowed_exceptions=(ConnectionError,))(dependency.get)
+
+        @with_timeout(0.3)
+        async def scoped():
+            return await fetch()
+
+        with pytest.raises(ConnectionError):
+            await scoped()
+        assert dependency.calls == 2
+
+    def test_sync_deadline(self):
+        calls = []
+
+        @Retry(max_attempts=10, base_delay=0.05, max_delay=0.05, jitter_type="none", deadline=0.08)
+        def flaky():
+            calls.append(1)
+            raise ConnectionError("down")
+
+        with pytest.raises(ConnectionError):
+            flaky()
+        assert len(calls) == 2
+
+
+class TestDecorrelatedJitter:
+    def test_grows_from_previous_delay(self):
+        retry = Retry(base_delay=0.1, max_delay=5.0, jitter_type="decorrelated")
+        delay = None
+        for attempt in range(50):
+            previous = delay or retry.base_delay
+            delay = retry._calculate_delay(attempt, delay)
+            assert retry.base_delay <= delay <= min(5.0, previous * 3)
+
+
+class TestHedging:
+    def test_latency_tracker_percentile(self):
+        tracker = LatencyTracker(size=100, refresh_every=1)
+        for i in range(100):
+            tracker.record(i / 1000)
+        assert tracker.percentile(0.95) == pytest.approx(0.095)
+
+    @pytest.mark.asyncio
+    async def test_hedge_cuts_tail_latency(self):
+        # 90% fast (2 ms), 10% slow (200 ms)
+        distribution = ((0.9, 0.002), (0.1, 0.2))
+        plain = FakeDependency(distribution, seed=1)
+        hedged_dep = FakeDependency(distribution, seed=1)
+        budget = RetryBudget(target="hedge-test", ratio=0.5, max_tokens=50.0)
+        hedged = Hedge(target="hedge-test", percentile=0.5, min_delay=0.005,
+                       max_delay=0.05, min_samples=5, budget=budget)(hedged_dep.get)
+
+        async def worst(fetch, n=100):
+            latencies = []
+            for _ in range(n):
+                start = time.monotonic()
+                assert (await fetch()).startswith("value:")
+                latencies.append(time.monotonic() - start)
+            return sorted(latencies)[int(0.99 * n) - 1]
+
+        plain_p99 = await worst(plain.get)
+        hedged_p99 = await worst(hedged)
+        assert plain_p99 >= 0.2
+        assert hedged_p99 < 0.1
+        assert hedged_dep.calls < 100 * 1.3
+
+    @pytest.mark.asyncio
+    async def test_first_success_wins_and_loser_cancelled(self):
+        dependency = FakeDependency(((1.0, 0.3),))
+        hedge = Hedge(target="hedge-cancel", max_delay=0.01, min_samples=1000,
+                      budget=RetryBudget(max_tokens=10.0))
+
+        attempts = []
+
+        @hedge
+        async def fetch():
+            attempts.append(1)
+            if len(attempts) == 1:
+                return await dependency.get()
+            return "hedged"
+
+        assert await fetch() == "hedged"
+        await asyncio.sleep(0)
+        assert dependency.in_flight == 0
+        # The cancelled primary still counts, with at least the hedge delay
+        assert len(hedge.tracker) == 2
+        assert hedge.tracker.percentile(1.0) >= 0.01
+
+    @pytest.mark.asyncio
+    async def test_hedge_denied_without_budget(self):
+        dependency = FakeDependency(((1.0, 0.03),))
+        budget = RetryBudget(ratio=0.0, min_retries_per_second=0.0, max_tokens=0.0)
+        fetch = Hedge(target="hedge-denied", max_delay=0.005, budget=budget)(dependency.get)
+        assert await fetch() == "value:k"
+        assert dependency.calls == 1
+        assert dependency.max_in_flight == 1
+
+    @pytest.mark.asyncio
+    async def test_all_attempts_fail(self):
+        dependency = FakeDependency(((1.0, 0.01),), failure_rate=1.0)
+        fetch = Hedge(target="hedge-fail", max_delay=0.002, budget=RetryBudget(max_tokens=10.0))(dependency.get)
+        with pytest.raises(ConnectionError):
+            await fetch()
+        assert dependency.calls == 2
+
+    def test_rejects_sync_functions(self):
+        with pytest.raises(TypeError):
+            Hedge()(lambda: None)
+
+    def test_metrics_snapshot_includes_budgets(self):
+        get_retry_budget("metrics-target")
+        assert "metrics-target" in get_retry_metrics()["budgets"]
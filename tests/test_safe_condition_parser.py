@@ -18,6 +18,11 @@ from backend.safe_condition_parser import (
     SafeConditionParser,
     safe_evaluate_condition,
     TokenType,
+    BoolOp,
+    Compare,
+    Literal,
+    compile_condition,
+    evaluate_conditions,
 )
 
 
@@ -349,6 +354,84 @@ class TestComparisonWithEval:
             )
 
 
+# ============================================================================
+# COMPILED CONDITION TESTS
+# ============================================================================
+
+
+class TestCompiledConditions:
+    """Test the cached, constant-folded, compiled condition engine."""
+
+    def test_compile_is_cached_by_source(self):
+        assert compile_condition("severity >= 0.8") is compile_condition("severity >= 0.8")
+
+    def test_constant_folding(self):
+        assert compile_condition("1 < 2").tree == Literal(True)
+        assert compile_condition("1 > 2 and severity >= 0.5").tree == Literal(False)
+        assert compile_condition("1 < 2 and severity >= 0.5").tree == Compare(
+            ">=", compile_condition("severity >= 0.5").tree.left, Literal(0.5)
+        )
+
+    def test_nested_operators_are_flattened(self):
+        tree = compile_condition("(step > 1 and (step > 2 and step > 3))").tree
+        assert isinstance(tree, BoolOp) and len(tree.operands) == 3
+
+    def test_missing_variable_raises_even_if_short_circuited(self):
+        with pytest.raises(ValueError, match="not provided in context"):
+            safe_evaluate_condition("severity >= 0.5 or duration > 10", {"severity": 0.9})
+
+    def test_nesting_depth_limited(self):
+        expr = "(" * 20 + "step > 1" + ")" * 20
+        with pytest.raises(ValueError, match="nested too deeply"):
+            compile_condition(expr)
+
+    def test_evaluate_conditions_batch(self):
+        context = {"severity": 0.85, "recurrence_count": 3, "confidence": 0.5, "step": 1}
+        results = evaluate_conditions(
+            ["always", "severity >= 0.8", "confidence > 0.9", "recurrence_count >= 2 and step < 2"],
+            context
+        )
+        assert results == [True, True, False, True]
+
+    def test_evaluate_columns(self):
+        import numpy as np
+
+        condition = compile_condition("severity >= 0.8 and recurrence_count >= 2")
+        result = condition.evaluate_columns({
+            "severity": np.array([0.9, 0.9, 0.5, 0.85]),
+            "recurrence_count": np.array([3, 1, 5, 2]),
+        })
+        assert result.dtype == bool
+        assert result.tolist() == [True, False, False, True]
+
+    def test_evaluate_columns_constant_and_missing(self):
+        import numpy as np
+
+        assert compile_condition("always").evaluate_columns(
+            {"severity": np.zeros(3)}
+        ).tolist() == [True, True, True]
+        with pytest.raises(ValueError, match="not provided"):
+            compile_condition("step > 1").evaluate_columns({"severity": np.zeros(3)})
+
+    def test_columns_match_scalar_evaluation(self):
+        import numpy as np
+
+        rng = np.random.default_rng(7)
+        columns = {
+            "severity": rng.random(200),
+            "confidence": rng.random(200),
+            "recurrence_count": rng.integers(0, 6, 200),
+            "step": rng.integers(0, 5, 200),
+        }
+        expr = "(severity >= 0.8 or (confidence > 0.9 and recurrence_count >= 3)) and step < 3"
+        vector = compile_condition(expr).evaluate_columns(columns)
+        scalar = [
+            safe_evaluate_condition(expr, {k: v[i] for k, v in columns.items()})
+            for i in range(200)
+        ]
+        assert vector.tolist() == scalar
+
+
 # ============================================================================
 # PERFORMANCE TESTS
 # ============================================================================
@@ -48,6 +48,58 @@ class TestWAFRules:
         assert waf.check_rate_limit("client1") is False
         assert waf.check_rate_limit("client1") is False
         assert waf.check_rate_limit("client1") is True  # Exceeded
+    
+    def test_rate_limit_window_slides(self):
+        now = [0.0]
+        waf = WAFRules(rate_limit_per_minute=10, clock=lambda: now[0])
+        
+        assert sum(waf.check_rate_limit("c") for _ in range(12)) == 2
+        now[0] = 90.0  # Half of the previous minute still counts: 10 * 0.5
+        assert sum(waf.check_rate_limit("c") for _ in range(10)) == 5
+        now[0] = 300.0
+        assert waf.check_rate_limit("c") is False
+        assert len(waf._windows) == 1
+    
+    def test_combined_rules_match_legacy_per_pattern_search(self):
+        import re
+        waf = WAFRules()
+        samples = [
+            "plain text", "1 or 1=1", "UNION all SELECT", "x; Drop Table t", "exec (cmd)",
+            "<ScRiPt src=x></script>", "JavaScript:go()", "img onerror =1", "body ONLOAD=f",
+            "javascr\u0130pt:alert(1)", "\u017fcript>", "for more information",
+        ]
+        for text in samples:
+            text = text.encode().decode("unicode_escape")
+            legacy_sql = any(re.search(p, text, re.IGNORECASE) for p in waf.sql_patterns)
+            legacy_xss = any(re.search(p, text, re.IGNORECASE) for p in waf.xss_patterns)
+            assert waf.check_sql_injection(text) is legacy_sql, text
+            assert waf.check_xss(text) is legacy_xss, text
+    
+    def test_inspect_body_reports_rule_and_path(self):
+        waf = WAFRules()
+        body = {"items": [{"name": "ok"}, {"name": "x", "bio": "<script>alert(1)</script>"}]}
+        
+        match = waf.inspect(body, category="xss")
+        
+        assert match.rule == "xss_script_block"
+        assert match.path == "$.items[1].bio"
+        assert waf.inspect(body).path == "$.items[1].bio"
+        assert waf.inspect({"items": [{"name": "fine"}]}) is None
+        assert waf.get_stats()["rule_hits"] == {"xss_script_block": 1, "sql_script_tag": 1}
+    
+    def test_inspect_does_not_match_across_leaves(self):
+        waf = WAFRules()
+        
+        assert waf.inspect(["exec", "(1)"]) is None
+        assert waf.inspect({"tags": ["onerror", "=x"]}) is None
+        assert waf.inspect(["ok", "exec(1)"]).path == "$[1]"
+        assert waf.get_stats()["rule_hits"] == {"sql_exec_call": 1}
+    
+    def test_inspect_respects_max_scan_length(self):
+        waf = WAFRules(max_scan_length=100)
+        
+        assert waf.inspect({"pad": "a" * 200, "attack": "javascript:x"}) is None
+        assert waf.inspect({"attack": "javascript:x", "pad": "a" * 200}).rule == "xss_javascript_uri"
 
 
 class TestAPIKeyManager:
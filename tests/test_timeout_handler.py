@@ -17,6 +17,11 @@ from core.timeout_handler import (
     TimeoutContext,
     TimeoutError as CustomTimeoutError,
     get_timeout_config,
+    get_timeout_executor,
+    current_cancellation_token,
+    remaining_time,
+    TimeoutExecutor,
+    TimeoutPoolSaturatedError,
 )
 
 
@@ -217,3 +222,132 @@ class TestTimeoutIntegration:
             await error_operation()
         
         assert "async custom error" in str(exc_info.value)
+
+
+class TestTimeoutExecutor:
+    """Test the shared timeout pool, deadlines and cancellation"""
+
+    def test_sync_calls_reuse_named_workers(self):
+        """Test that sync calls run on the shared named pool"""
+        import threading
+
+        @with_timeout(seconds=2.0)
+        def thread_name():
+            return threading.current_thread().name
+
+        names = {thread_name() for _ in range(20)}
+        assert all(name.startswith("astra-timeout") for name in names)
+        assert len(names) <= get_timeout_executor().max_workers
+
+    def test_nested_calls_share_budget(self):
+        """Test that nested decorated calls inherit the outer deadline"""
+        @with_timeout(seconds=10.0, operation_name="inner")
+        def inner():
+            return remaining_time()
+
+        @with_timeout(seconds=0.5, operation_name="outer")
+        def outer():
+            return inner()
+
+        remaining = outer()
+        assert remaining is not None
+        assert remaining <= 0.5
+
+    def test_nested_call_with_exhausted_budget(self):
+        """Test that a nested call fails fast once the budget is spent"""
+        @with_timeout(seconds=5.0, operation_name="inner")
+        def inner():
+            return "unreachable"
+
+        with pytest.raises(CustomTimeoutError) as exc_info:
+            with TimeoutContext(seconds=0.05, operation="outer"):
+                time.sleep(0.1)
+                inner()
+
+        assert exc_info.value.operation == "inner"
+
+    def test_cancellation_token_stops_abandoned_work(self):
+        """Test that timed-out work sees its token cancelled"""
+        iterations = []
+
+        @with_timeout(seconds=0.2)
+        def long_loop():
+            token = current_cancellation_token()
+            for i in range(1000):
+                token.raise_if_cancelled()
+                iterations.append(i)
+                time.sleep(0.01)
+
+        with pytest.raises(CustomTimeoutError):
+            long_loop()
+
+        time.sleep(0.1)
+        count = len(iterations)
+        time.sleep(0.1)
+        assert len(iterations) == count
+        assert count < 1000
+
+    def test_abandoned_work_is_tracked(self):
+        """Test that work outliving its deadline is reported until it finishes"""
+        executor = TimeoutExecutor(max_workers=2, max_queue_depth=0)
+        future = executor.submit("sleepy", time.sleep, 0.3)
+        executor.abandon("sleepy", future)
+
+        stats = executor.stats()
+        assert stats["abandoned_in_flight"] == 1
+        assert stats["abandoned_total"] == 1
+
+        future.result()
+        time.sleep(0.05)
+        assert executor.stats()["abandoned_in_flight"] == 0
+        executor.shutdown(wait=True)
+
+    def test_queue_depth_limit(self):
+        """Test that a full pool rejects new work"""
+        executor = TimeoutExecutor(max_workers=1, max_queue_depth=1)
+        executor.submit("a", time.sleep, 0.2)
+        executor.submit("b", time.sleep, 0.2)
+
+        with pytest.raises(TimeoutPoolSaturatedError):
+            executor.submit("c", time.sleep, 0.2)
+
+        assert executor.stats()["rejected_total"] == 1
+        executor.shutdown(wait=True)
+
+    @pytest.mark.asyncio
+    async def test_async_timeout_runs_without_threads(self):
+        """Test that async functions are not moved to worker threads"""
+        import threading
+
+        @with_timeout(seconds=1.0)
+        async def where():
+            await asyncio.sleep(0)
+            return threading.current_thread()
+
+        assert await where() is threading.current_thread()
+
+    @pytest.mark.asyncio
+    async def test_async_nested_calls_share_budget(self):
+        """Test deadline propagation across nested async calls"""
+        @async_timeout(seconds=10.0, operation_name="inner")
+        async def inner():
+            await asyncio.sleep(1.0)
+
+        @async_timeout(seconds=0.2, operation_name="outer")
+        async def outer():
+            await inner()
+
+        start = time.monotonic()
+        with pytest.raises(CustomTimeoutError):
+            await outer()
+        assert time.monotonic() - start < 0.5
+
+    @pytest.mark.asyncio
+    async def test_async_inner_timeout_error_propagates(self):
+        """Test that asyncio.TimeoutError raised by the function is not remapped"""
+        @async_timeout(seconds=2.0)
+        async def raises_own_timeout():
+            raise asyncio.TimeoutError()
+
+        with pytest.raises(asyncio.TimeoutError):
+            await raises_own_timeout()